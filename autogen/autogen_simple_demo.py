@@ -7,11 +7,18 @@ and the GroupChatManager orchestrates speaker selection via LLM.
 
 This contrasts with CrewAI's task-based approach — here the agents CHAT
 rather than execute isolated tasks.
+
+The agents, their system messages and the kickoff message are declared in
+workflows/interview_platform.json (AUTOGEN_WORKFLOW_FILE selects another file).
 """
 
+import dataclasses
 import os
+from contextlib import nullcontext
 from datetime import datetime
-from config import Config
+from typing import Optional
+
+from config import AgentConfig, Config, WorkflowConfig
 
 # Try to import AutoGen
 try:
@@ -21,145 +28,253 @@ except ImportError:
     print("Please run: pip install -r ../requirements.txt")
     exit(1)
 
+from chat_hooks import ObservedGroupChat
+from deadline import DeadlineGuard
+from fanout import ParallelRound, ResearchFanOut
+from memory import PhaseMemory, WorkflowMemory
+from message_store import MessageArena, MessageStore, compact_histories, message_previews, transcript
+from model_client import activate_model_client
+from shared_budgets import OutputBudgetMonitor
+from shared_deadline import DeadlineExceeded, RunDeadline
+from shared_profiler import RunProfiler
+from shared_retrieval import retrieval_notes
+from shared_tokens import BudgetExceeded
+from summarizer import ExtractiveSummarizer, create_summarizer
+from usage import TokenAccountant
+
+# Framework functions whose samples the profiler reports as steps of their own
+PROFILE_PHASES = {"select_speaker": "speaker selection", "a_select_speaker": "speaker selection",
+                  "_summarize_chat": "summary"}
+
 
 class GroupChatInterviewPlatform:
     """Multi-agent GroupChat workflow for interview platform planning using AutoGen"""
 
-    def __init__(self):
-        """Initialize the GroupChat with specialized agents"""
+    def __init__(self, deadline: Optional[float] = None):
+        """
+        Initialize the GroupChat with specialized agents.
+
+        Args:
+            deadline: Seconds the run may take (default Config.RUN_DEADLINE; 0 = no deadline).
+                The chat degrades as the deadline nears and returns a partial result at it.
+        """
         if not Config.validate_setup():
             print("ERROR: Configuration validation failed!")
             exit(1)
 
-        self.config_list = Config.get_config_list()
-        self.llm_config = {"config_list": self.config_list, "temperature": Config.AGENT_TEMPERATURE}
+        # One configuration snapshot for the whole chat; a reloaded .env applies to the next run
+        self.snapshot = Config.snapshot()
+        if deadline is not None:
+            # Before the agents are built: a deadline routes them through the call layer,
+            # which cuts in-flight calls off at the deadline
+            self.snapshot = dataclasses.replace(self.snapshot, run_deadline=deadline)
+        self.config_list = Config.get_config_list(snapshot=self.snapshot)
+        self.llm_config = {"config_list": self.config_list, "temperature": self.snapshot.agent_temperature}
+        self.summarizer = create_summarizer(Config.SUMMARY_METHOD, self.config_list)
+        self.budget_monitor = OutputBudgetMonitor()
+        self.accountant = TokenAccountant(config=self.snapshot)
+        self.run_id = datetime.now().strftime('%Y%m%d_%H%M%S')
+        self.deadline: Optional[RunDeadline] = None
+        self.partial = False
+        self.summary_label = self.summarizer.label if self.summarizer else "LLM-generated reflection"
+        self.memory = None
+        if Config.MEMORY_MODE != "off":
+            self.memory = WorkflowMemory(PhaseMemory(), run_id=self.run_id)
 
         # Create agents and GroupChat
         self._create_agents()
+        if self.memory:
+            # After the fan-out so a fresh stored result takes precedence over it
+            self.memory.attach(self.agents.values())
         self._setup_groupchat()
+        self._setup_topology()
+        self._activate_model_clients()
+        self._attach_accounting()
+        self.profiler = RunProfiler("autogen/groupchat", phases=PROFILE_PHASES) if Config.PROFILE else None
+        if self.profiler:
+            self._attach_profiler()
 
         print("All AutoGen agents created and GroupChat initialized.")
 
+    def _agent_llm_config(self, role: str):
+        """LLM config for one agent role, carrying that role's output budget"""
+        return {"config_list": Config.get_config_list(role, snapshot=self.snapshot),
+                "temperature": self.snapshot.agent_temperature}
+
+    def _record_output(self, message, speaker):
+        """GroupChat observer: track output length and truncation per role"""
+        role = AgentConfig.get_phase_for_agent(message.get("name", ""))
+        if role and message.get("content"):
+            self.budget_monitor.record(role, message["content"])
+
     def _create_agents(self):
-        """Create UserProxyAgent and 4 specialist AssistantAgents"""
+        """Create the UserProxyAgent and the specialist agents declared in the workflow file"""
+        self.workflow = WorkflowConfig.load_workflow()
+        self.values = self.workflow.values({
+            "competitors": ", ".join(WorkflowConfig.COMPETITORS),
+            "competitor_count": len(WorkflowConfig.COMPETITORS),
+        })
 
         # UserProxyAgent acts as the product manager who kicks off the discussion
+        proxy = self.workflow.setting("proxy", self.values)
         self.user_proxy = autogen.UserProxyAgent(
-            name="ProductManager",
-            system_message="A product manager who initiates the product planning discussion and oversees the collaborative process.",
+            name=proxy["name"],
+            system_message=proxy["system_message"],
             human_input_mode="NEVER",
             code_execution_config=False,
             max_consecutive_auto_reply=0,
             is_termination_msg=lambda x: "TERMINATE" in x.get("content", ""),
         )
 
-        # Research Agent - starts the conversation with market analysis
-        self.research_agent = autogen.AssistantAgent(
-            name="ResearchAgent",
-            system_message="""You are a market research analyst specializing in AI-powered recruitment technology.
-Your role in this group discussion is to START the conversation by providing competitive landscape analysis.
-
-Your responsibilities:
-- Analyze 3-4 major competitors in AI interview platforms (HireVue, Pymetrics, Codility, Interviewing.io)
-- Summarize their key features, strengths, and weaknesses
-- Identify current market trends in AI-powered recruiting
-- Note unmet market needs and gaps
-
-When you present your findings, be specific with competitor names, features, and data points.
-After presenting your research, invite the AnalysisAgent to identify opportunities based on your findings.
-Keep your response focused and under 400 words.""",
-            llm_config=self.llm_config,
-            description="A market research analyst who provides competitive landscape analysis and identifies market gaps in AI interview platforms.",
-        )
-
-        # Analysis Agent - builds on research to identify opportunities
-        self.analysis_agent = autogen.AssistantAgent(
-            name="AnalysisAgent",
-            system_message="""You are a strategic product analyst with expertise in SaaS product development.
-Your role in this group discussion is to BUILD ON the ResearchAgent's findings.
-
-Your responsibilities:
-- When the ResearchAgent shares market research, analyze it for strategic opportunities
-- Identify 3 key market gaps or opportunities for a new AI interview platform
-- For each opportunity, explain: what the gap is, why it matters, and how to address it
-- Consider technical feasibility, market size, and customer value
-
-Reference specific findings from the ResearchAgent's analysis when making your points.
-After presenting your analysis, invite the BlueprintAgent to design the product based on these opportunities.
-Keep your response focused and under 400 words.""",
-            llm_config=self.llm_config,
-            description="A product analyst who identifies strategic opportunities and market gaps based on research findings.",
+        # Specialists, keyed by workflow agent key (research, analysis, blueprint, review)
+        self.agents = {spec.key: self._create_agent(spec) for spec in self.workflow.agents}
+
+        # Optional fan-out: ResearchAgent coordinates one sub-agent per competitor
+        self.research_fanout = None
+        if Config.RESEARCH_FANOUT:
+            if "research" not in self.agents:
+                raise ValueError(f"RESEARCH_FANOUT needs a 'research' agent in {self.workflow.source}")
+            self.research_fanout = ResearchFanOut(self._agent_llm_config("research_brief"), WorkflowConfig.COMPETITORS)
+            self.research_fanout.attach(self.agents["research"])
+
+    def _create_agent(self, spec):
+        """Instantiate one workflow agent from its pre-compiled prompts"""
+        fields = spec.render(self.values)
+        system_message = fields["system_message"]
+        retrieval = fields.get("retrieval")
+        if retrieval:
+            system_message += retrieval_notes(retrieval["query"],
+                                              k=retrieval.get("k_scale", 1) * Config.RETRIEVAL_TOP_K)
+        return autogen.AssistantAgent(
+            name=fields.get("name", spec.key),
+            system_message=system_message,
+            llm_config=self._agent_llm_config(fields.get("llm_role", spec.key)),
+            description=fields.get("description"),
         )
 
-        # Blueprint Agent - designs the product based on opportunities
-        self.blueprint_agent = autogen.AssistantAgent(
-            name="BlueprintAgent",
-            system_message="""You are an experienced product designer and UX strategist.
-Your role in this group discussion is to DESIGN a product based on the opportunities identified.
-
-Your responsibilities:
-- When the AnalysisAgent identifies opportunities, create a product blueprint that addresses them
-- Define 4-5 core MVP features with brief descriptions
-- Map a key user journey (hiring manager perspective)
-- Highlight competitive differentiation
-
-Reference specific opportunities from the AnalysisAgent and market gaps from the ResearchAgent.
-After presenting your blueprint, invite the ReviewerAgent to review and provide recommendations.
-Keep your response focused and under 400 words.""",
-            llm_config=self.llm_config,
-            description="A product designer who creates feature blueprints and user journeys based on identified market opportunities.",
+    def _create_critic(self, critic: str):
+        """Create an independent critic for parallel rounds"""
+        spec = AgentConfig.CRITIC_AGENTS[critic]
+        return autogen.AssistantAgent(
+            name=spec["name"],
+            system_message=f"""You are a {spec['role']} reviewing a product plan for an AI-powered interview platform.
+Critique the proposal discussed so far strictly from the angle of {spec['focus']}.
+Give 3-4 concrete findings, each with a recommendation. Do not repeat the proposal, do not
+address other team members and do not conclude the discussion. Keep it under 200 words.""",
+            llm_config=self._agent_llm_config("critique"),
         )
 
-        # Reviewer Agent - reviews and concludes with strategic recommendations
-        self.reviewer_agent = autogen.AssistantAgent(
-            name="ReviewerAgent",
-            system_message="""You are a product executive and business strategist.
-Your role in this group discussion is to REVIEW and provide final recommendations.
-
-Your responsibilities:
-- When the BlueprintAgent presents the product design, evaluate its feasibility and market fit
-- Provide 3-4 strategic recommendations for launch success
-- Suggest a phased implementation approach (MVP → V1 → V2)
-- Identify key risks and mitigation strategies
-
-Reference specific features from the BlueprintAgent and opportunities from earlier discussion.
-After your review, conclude the discussion by ending your message with the word TERMINATE.""",
-            llm_config=self.llm_config,
-            description="A product executive who reviews blueprints, assesses feasibility, and provides strategic recommendations for launch.",
-        )
+    def _setup_topology(self):
+        """Attach the parallel rounds of Config.GROUPCHAT_TOPOLOGY to their host agents"""
+        self.parallel_rounds = {}
+        hosts = {agent.name: agent for agent in self.groupchat.agents}
+        for host_name, spec in WorkflowConfig.get_topology(Config.GROUPCHAT_TOPOLOGY).items():
+            critics = [self._create_critic(critic) for critic in spec["critics"]]
+            parallel_round = ParallelRound(critics, merge=spec.get("merge", "llm"), closing=spec.get("closing", ""))
+            parallel_round.attach(hosts[host_name])
+            self.parallel_rounds[host_name] = parallel_round
 
     def _setup_groupchat(self):
         """Create the GroupChat and GroupChatManager"""
-        self.groupchat = autogen.GroupChat(
-            agents=[
-                self.user_proxy,
-                self.research_agent,
-                self.analysis_agent,
-                self.blueprint_agent,
-                self.reviewer_agent,
-            ],
-            messages=[],
-            max_round=8,
+        self.arena = MessageArena() if Config.COMPACT_MESSAGES else None
+        speaker_selector = None
+        if self.snapshot.runs_locally("speaker_selection"):
+            # Only its llm_config is used: speaker selection goes to the local model's
+            # OpenAI-compatible URL, while the chat summary stays on the manager's model
+            speaker_selector = autogen.ConversableAgent(
+                "speaker_selector",
+                llm_config={"config_list": Config.get_config_list("speaker_selection", custom_client=False,
+                                                                  snapshot=self.snapshot),
+                            "temperature": 0.0},
+                human_input_mode="NEVER",
+            )
+        self.groupchat = ObservedGroupChat(
+            agents=[self.user_proxy] + list(self.agents.values()),
+            messages=MessageStore(arena=self.arena) if self.arena else [],
+            max_round=self.workflow.setting("max_round", default=8),
             speaker_selection_method="auto",
             allow_repeat_speaker=False,
             send_introductions=True,
+            observers=[self._record_output]
+                      + ([self.summarizer.observe] if self.summarizer else [])
+                      + ([self.memory.observe] if self.memory else []),
+            speaker_selector=speaker_selector,
         )
 
+        # AutoGen builds throwaway agents from the manager's llm_config for speaker
+        # selection; those cannot have a custom model client registered
+        manager_llm_config = {"config_list": Config.get_config_list(custom_client=False, snapshot=self.snapshot),
+                              "temperature": self.snapshot.agent_temperature}
         self.manager = autogen.GroupChatManager(
             groupchat=self.groupchat,
-            llm_config=self.llm_config,
+            llm_config=manager_llm_config,
             is_termination_msg=lambda x: "TERMINATE" in x.get("content", ""),
         )
+        if self.arena:
+            # Every agent keeps its own copy of the conversation; share the chat's arena
+            compact_histories(self.groupchat.agents + [self.manager], self.arena)
+
+    def _activate_model_clients(self):
+        """Register the resilient model client on everything that calls the LLM"""
+        clients = list(self.groupchat.agents)
+        if self.research_fanout:
+            clients += self.research_fanout.sub_agents
+        for parallel_round in self.parallel_rounds.values():
+            clients += parallel_round.agents
+        if getattr(self.summarizer, "client", None) is not None:
+            clients.append(self.summarizer.client)
+        activate_model_client(clients)
+
+    def _attach_accounting(self):
+        """Estimate, record and budget-check every LLM call of the run"""
+        agents = list(self.groupchat.agents)
+        if self.research_fanout:
+            agents += self.research_fanout.sub_agents
+        for parallel_round in self.parallel_rounds.values():
+            agents += parallel_round.agents
+        self.accountant.attach(agents, skip=self.memory.serves_without_llm if self.memory else None)
+        if getattr(self.summarizer, "client", None) is not None:
+            self.accountant.track("Summarizer", self.summarizer.client)
+
+    def _attach_profiler(self):
+        """Label profiler steps by speaker: each agent's reply, then the manager's work between turns"""
+        for agent in self.groupchat.agents:
+            if agent.llm_config:
+                agent.register_hook("process_all_messages_before_reply", self._profile_step(agent.name))
+        self.groupchat.add_observer(lambda message, speaker: self.profiler.step(self.manager.name))
+
+    def _profile_step(self, label: str):
+        def hook(messages):
+            self.profiler.step(label)
+            return messages
+        return hook
 
     def run(self):
-        """Execute the GroupChat workflow"""
+        """
+        Execute the GroupChat workflow.
+
+        Returns:
+            ChatResult: The conversation and summary (None if the budget guard stopped it)
+        """
         print("\n" + "=" * 80)
         print("AUTOGEN GROUPCHAT - AI INTERVIEW PLATFORM PRODUCT PLANNING")
         print("=" * 80)
         print(f"Start Time: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
-        print(f"Model: {Config.OPENAI_MODEL}")
+        print(f"Workflow: {self.workflow.name} ({self.workflow.version})")
+        print(f"Model: {self.snapshot.model}")
         print(f"Max Rounds: {self.groupchat.max_round}")
         print(f"Speaker Selection: {self.groupchat.speaker_selection_method}")
+        print(f"Summary Method: {Config.SUMMARY_METHOD}")
+        if self.research_fanout:
+            print(f"Research Fan-Out: {len(self.research_fanout.sub_agents)} sub-agents, width {self.research_fanout.width}")
+        if self.memory:
+            print(f"Cross-Run Memory: {self.memory.mode} (reusable phases: {', '.join(sorted(self.memory.phases))})")
+        print(f"Topology: {Config.GROUPCHAT_TOPOLOGY}")
+        if self.snapshot.run_deadline:
+            print(f"Deadline: {self.snapshot.run_deadline:g}s (optional phases: {', '.join(WorkflowConfig.OPTIONAL_PHASES)})")
+        for host_name, parallel_round in self.parallel_rounds.items():
+            print(f"  - {host_name} turn: {', '.join(a.name for a in parallel_round.agents)} in parallel, "
+                  f"{parallel_round.merge} merge")
         print("\nAgents in GroupChat:")
         for agent in self.groupchat.agents:
             print(f"  - {agent.name}")
@@ -167,35 +282,112 @@ After your review, conclude the discussion by ending your message with the word
         print("MULTI-AGENT CONVERSATION BEGINS")
         print("=" * 80 + "\n")
 
-        # Initiate the group chat conversation
-        initial_message = """Team, we need to develop a product plan for an AI-powered interview platform.
-
-Let's collaborate on this:
-1. ResearchAgent: Start by analyzing the competitive landscape
-2. AnalysisAgent: Then identify key market opportunities
-3. BlueprintAgent: Design the product features and user journey
-4. ReviewerAgent: Finally, review and provide strategic recommendations
-
-ResearchAgent, please begin with your market analysis."""
-
-        chat_result = self.user_proxy.initiate_chat(
-            self.manager,
-            message=initial_message,
-            summary_method="reflection_with_llm",
-            summary_args={
-                "summary_prompt": "Summarize the complete product plan developed through this multi-agent discussion. Include: key market findings, identified opportunities, proposed features, and strategic recommendations."
-            },
-        )
+        try:
+            with self.profiler.activate() if self.profiler else nullcontext():
+                chat_result = self.chat()
+        except BudgetExceeded as e:
+            print(f"\n❌ Run stopped by budget guard: {e}")
+            self.accountant.sync()
+            self.accountant.ledger.print_report("GroupChat (aborted)")
+            return None
+        finally:
+            self.close()
 
         # Print results
         self._print_summary(chat_result)
+        if self.deadline:
+            self.deadline.print_report(partial=self.partial)
+        if self.profiler:
+            self.profiler.print_report()
+            self.profiler.save()
+        self.budget_monitor.print_report()
+        self.budget_monitor.save()
+        if self.memory:
+            self.memory.print_report()
+        self.accountant.sync()
+        self.accountant.ledger.print_report("GroupChat")
+        if self.snapshot.semantic_cache:
+            from shared_semantic_cache import get_semantic_cache
+            get_semantic_cache().print_report()
+        if self.snapshot.draft_refine:
+            from shared_draft import get_draft_stats
+            get_draft_stats().print_report()
+        if self.snapshot.model_cascade:
+            from shared_cascade import get_cascade_stats
+            get_cascade_stats().print_report()
+            get_cascade_stats().save()
+        if self.snapshot.local_roles:
+            from shared_local_llm import print_local_report
+            print_local_report()
 
         # Save to file
-        output_file = self._save_results(chat_result)
-        print(f"\nFull results saved to: {output_file}")
+        self.output_file = self._save_results(chat_result)
+        print(f"\nFull results saved to: {self.output_file}")
 
         print(f"\nEnd Time: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
         print("=" * 80)
+        return chat_result
+
+    def close(self):
+        """Release the run's background resources (the incremental summarizer's worker thread)"""
+        if self.summarizer:
+            self.summarizer.close()
+
+    def chat(self):
+        """
+        Run the GroupChat conversation and its summary (no reports or files), within the run's deadline.
+
+        Returns:
+            ChatResult: The conversation and summary; partial (``self.partial``) if the deadline stopped it
+        """
+        summary_args = {}
+        if self.summarizer:
+            summary_method = self.summarizer.summarize
+        else:
+            summary_method = "reflection_with_llm"
+            summary_args["summary_prompt"] = self.workflow.setting("summary_prompt", self.values)
+        message = self.workflow.setting("initial_message", self.values)
+
+        if not self.snapshot.run_deadline:
+            return self.user_proxy.initiate_chat(self.manager, message=message, summary_method=summary_method,
+                                                 summary_args=summary_args)
+
+        self.deadline = RunDeadline(self.snapshot.run_deadline, steps=len(self.agents))
+        self.partial = False
+        guard = DeadlineGuard(self.deadline, self.manager)
+        guard.attach(self.agents.values())
+
+        def summarize(sender, recipient, args):
+            # The full summary only while on schedule; the extractive one costs no LLM call
+            if self.deadline.level == 0 and self.deadline.remaining() > self.deadline.step_estimate:
+                if self.summarizer:
+                    return self.summarizer.summarize(sender, recipient, args)
+                return autogen.ConversableAgent._reflection_with_llm_as_summary(sender, recipient, args)
+            return self._extractive_summary()
+
+        try:
+            with self.deadline.activate():
+                chat_result = self.user_proxy.initiate_chat(self.manager, message=message, summary_method=summarize,
+                                                            summary_args=summary_args)
+            self.partial = guard.ended_early()
+            return chat_result
+        except DeadlineExceeded as e:
+            print(f"\n⏱️  Deadline reached: {e}; returning the turns so far")
+            self.partial = True
+            return autogen.ChatResult(chat_history=self.groupchat.messages.copy(),
+                                      summary=self._extractive_summary(), cost={}, human_input=[])
+        finally:
+            guard.close()
+
+    def _extractive_summary(self) -> str:
+        """Summary of the transcript so far built locally (no LLM call)"""
+        self.summary_label = ExtractiveSummarizer.label
+        if isinstance(self.summarizer, ExtractiveSummarizer):
+            return self.summarizer.render()
+        summarizer = ExtractiveSummarizer()
+        for speaker, content in transcript(self.groupchat.messages):
+            summarizer.observe({"name": speaker, "content": content}, None)
+        return summarizer.render()
 
     def _print_summary(self, chat_result):
         """Print educational summary highlighting GroupChat behavior"""
@@ -203,17 +395,16 @@ ResearchAgent, please begin with your market analysis."""
         print("CONVERSATION COMPLETE")
         print("=" * 80)
 
+        if self.partial:
+            print("\n⏱️  PARTIAL RESULT: the deadline ended the chat before every phase finished")
         print(f"\nTotal conversation rounds: {len(self.groupchat.messages)}")
         print("\nSpeaker order (as selected by GroupChatManager):")
-        for i, msg in enumerate(self.groupchat.messages, 1):
-            speaker = msg.get("name", "Unknown")
-            content = msg.get("content", "")
-            preview = content[:80].replace("\n", " ") + "..." if len(content) > 80 else content.replace("\n", " ")
+        for i, (speaker, preview) in enumerate(message_previews(self.groupchat.messages), 1):
             print(f"  {i}. [{speaker}]: {preview}")
 
         if chat_result.summary:
             print("\n" + "-" * 80)
-            print("EXECUTIVE SUMMARY (LLM-generated reflection)")
+            print(f"EXECUTIVE SUMMARY ({self.summary_label})")
             print("-" * 80)
             print(chat_result.summary)
 
@@ -245,16 +436,18 @@ Compare with CrewAI (crewai/crewai_demo.py):
             f.write("AUTOGEN GROUPCHAT - AI INTERVIEW PLATFORM PRODUCT PLAN\n")
             f.write("=" * 80 + "\n")
             f.write(f"Generated: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}\n")
-            f.write(f"Model: {Config.OPENAI_MODEL}\n")
-            f.write(f"Conversation Rounds: {len(self.groupchat.messages)}\n\n")
+            f.write(f"Model: {self.snapshot.model}\n")
+            f.write(f"Conversation Rounds: {len(self.groupchat.messages)}\n")
+            if self.deadline:
+                f.write(f"Deadline: {self.deadline.seconds:g}s, "
+                        f"{'partial result' if self.partial else 'finished'} at level '{self.deadline.level_name}'\n")
+            f.write("\n")
 
             f.write("=" * 80 + "\n")
             f.write("MULTI-AGENT CONVERSATION\n")
             f.write("=" * 80 + "\n\n")
 
-            for i, msg in enumerate(self.groupchat.messages, 1):
-                speaker = msg.get("name", "Unknown")
-                content = msg.get("content", "")
+            for i, (speaker, content) in enumerate(transcript(self.groupchat.messages), 1):
                 f.write(f"--- Turn {i}: {speaker} ---\n")
                 f.write(content + "\n\n")
 
@@ -267,6 +460,22 @@ Compare with CrewAI (crewai/crewai_demo.py):
         return output_file
 
 
+def run_job(payload):
+    """``shared_jobs`` entry point: run one GroupChat and return its summary and usage (payload: optional "deadline")"""
+    workflow = GroupChatInterviewPlatform(deadline=(payload or {}).get("deadline"))
+    chat_result = workflow.run()
+    if chat_result is None:
+        raise BudgetExceeded("GroupChat stopped by the run budget guard")
+    return {
+        "summary": chat_result.summary,
+        "rounds": len(workflow.groupchat.messages),
+        "output_file": workflow.output_file,
+        "usage": workflow.accountant.ledger.to_dict(),
+        "partial": workflow.partial,
+        "deadline": workflow.deadline.to_dict() if workflow.deadline else None,
+    }
+
+
 if __name__ == "__main__":
     try:
         workflow = GroupChatInterviewPlatform()
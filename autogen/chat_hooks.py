@@ -0,0 +1,62 @@
+"""
+GroupChat hooks for the AutoGen Interview Platform Workflow
+
+AutoGen's GroupChat appends every message (including the kickoff message) to
+``groupchat.messages`` through ``GroupChat.append``. ``ObservedGroupChat`` keeps
+that behavior and additionally notifies a list of observers after each append,
+so helpers such as the incremental summarizer can react to one turn at a time
+instead of re-reading the whole transcript at the end of the run.
+
+AutoGen's "auto" speaker selection runs on a throwaway agent built from the
+manager's ``llm_config``. With a ``speaker_selector`` agent, its ``llm_config``
+is used instead, so speaker selection can run on another model (e.g. the local
+one of ``LOCAL_ROLES``) than the manager's chat summary.
+
+Usage:
+    from chat_hooks import ObservedGroupChat
+
+    def on_message(message, speaker):
+        print(f"{speaker.name} said {len(message.get('content') or '')} chars")
+
+    groupchat = ObservedGroupChat(
+        agents=[...],
+        messages=[],
+        max_round=8,
+        observers=[on_message],
+    )
+"""
+
+from typing import Any, Callable, Dict, List, Optional
+
+import autogen
+
+# An observer receives the message dict and the speaking agent
+MessageObserver = Callable[[Dict[str, Any], Any], None]
+
+
+class ObservedGroupChat(autogen.GroupChat):
+    """GroupChat that notifies observers after every appended message"""
+
+    def __init__(self, *args, observers: Optional[List[MessageObserver]] = None,
+                 speaker_selector: Optional[autogen.ConversableAgent] = None, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.observers: List[MessageObserver] = list(observers or [])
+        self.speaker_selector = speaker_selector
+
+    def add_observer(self, observer: MessageObserver) -> None:
+        """Register an observer called as ``observer(message, speaker)``"""
+        self.observers.append(observer)
+
+    def append(self, message: Dict, speaker) -> None:
+        """Append a message to the chat, then notify observers"""
+        super().append(message, speaker)
+        # GroupChat.append stores the normalized message (name/content set)
+        stored = self.messages[-1]
+        for observer in self.observers:
+            observer(stored, speaker)
+
+    def _auto_select_speaker(self, last_speaker, selector, messages, agents):
+        return super()._auto_select_speaker(last_speaker, self.speaker_selector or selector, messages, agents)
+
+    async def a_auto_select_speaker(self, last_speaker, selector, messages, agents):
+        return await super().a_auto_select_speaker(last_speaker, self.speaker_selector or selector, messages, agents)
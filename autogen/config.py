@@ -18,14 +18,16 @@ Usage:
     config_list = Config.get_config_list()
 """
 
+import os
 import sys
 from pathlib import Path
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Optional
 
 # Add parent directory to path to import shared_config
 sys.path.insert(0, str(Path(__file__).parent.parent))
 
-from shared_config import Config as SharedConfig
+from shared_config import Config as SharedConfig, ConfigSnapshot
+from shared_workflow import CompiledWorkflow, load_workflow
 
 
 class Config(SharedConfig):
@@ -38,29 +40,112 @@ class Config(SharedConfig):
 
     # AutoGen-specific settings
     HUMAN_INPUT_MODE = "NEVER"  # Agents operate autonomously
-    MAX_RETRIES = 2  # Retry failed API calls
 
     # Output Settings
     OUTPUT_DIR = str(Path(__file__).parent)
     SAVE_OUTPUTS = True
     CREATE_SUMMARY = True
 
+    # Summary Settings
+    # "reflection_with_llm" re-sends the whole transcript to the model after the chat,
+    # "incremental" folds each turn into a running summary with small LLM calls,
+    # "extractive" builds the summary locally with no LLM call at all.
+    SUMMARY_METHOD = os.getenv("SUMMARY_METHOD", "reflection_with_llm")
+    SUMMARY_MAX_TOKENS = int(os.getenv("SUMMARY_MAX_TOKENS", "300"))
+    SUMMARY_POINTS_PER_SECTION = int(os.getenv("SUMMARY_POINTS_PER_SECTION", "4"))
+
+    # Research Fan-Out Settings
+    # When enabled, ResearchAgent coordinates one sub-agent per competitor; up to
+    # RESEARCH_FANOUT_WIDTH of them run concurrently. RESEARCH_FANOUT_MERGE is
+    # "llm" (short synthesis call) or "local" (concatenate the briefs).
+    RESEARCH_FANOUT = os.getenv("RESEARCH_FANOUT", "False").lower() == "true"
+    RESEARCH_FANOUT_WIDTH = int(os.getenv("RESEARCH_FANOUT_WIDTH", "4"))
+    RESEARCH_FANOUT_MERGE = os.getenv("RESEARCH_FANOUT_MERGE", "llm")
+
+    # GroupChat Topology Settings
+    # A key of WorkflowConfig.TOPOLOGIES: "sequential" (one speaker per round) or
+    # "parallel_critique" (the review turn runs the critics concurrently, then merges).
+    GROUPCHAT_TOPOLOGY = os.getenv("GROUPCHAT_TOPOLOGY", "sequential")
+    PARALLEL_ROUND_WIDTH = int(os.getenv("PARALLEL_ROUND_WIDTH", "4"))
+
+    # Cross-Run Memory Settings
+    # Phase results are saved to CACHE_DIR/memory.sqlite3 (TTLs in WorkflowConfig.MEMORY_TTLS).
+    # MEMORY_MODE "skip" posts a fresh stored result as the agent's turn (no LLM call),
+    # "shorten" lets the agent add only what changed, "off" neither saves nor reuses.
+    MEMORY_MODE = os.getenv("MEMORY_MODE", "off")
+    MEMORY_PHASES = [p.strip() for p in os.getenv("MEMORY_PHASES", "research").split(",") if p.strip()]
+
+    # Message Storage
+    # Store the GroupChat transcript and the agents' histories in one compact UTF-8
+    # arena per chat (message_store.py) instead of a dict and string per message and agent.
+    COMPACT_MESSAGES = os.getenv("COMPACT_MESSAGES", "True").lower() == "true"
+
+    # Response Cache
+    # AutoGen's disk cache of LLM responses (.cache/<seed>); repeated prompts are answered
+    # from it. "none" disables it, e.g. for load tests where every call must reach the model.
+    CACHE_SEED = os.getenv("AUTOGEN_CACHE_SEED", "41")
+
+    # Workflow Definition
+    # Agents, system messages and the kickoff message of the GroupChat (see shared_workflow.py)
+    WORKFLOW_FILE = os.getenv("AUTOGEN_WORKFLOW_FILE", str(Path(__file__).parent / "workflows" / "interview_platform.json"))
+
     @classmethod
-    def get_config_list(cls) -> List[Dict[str, Any]]:
+    def get_config_list(cls, role: Optional[str] = None, custom_client: bool = True,
+                        snapshot: Optional[ConfigSnapshot] = None) -> List[Dict[str, Any]]:
         """
         Get LLM configuration list for AutoGen.
 
+        Args:
+            role: Agent role key; selects the role's output budget (max_tokens)
+            custom_client: Use ResilientModelClient when RESILIENT_CALLS, SEMANTIC_CACHE, DRAFT_REFINE,
+                MODEL_CASCADE or LOCAL_ROLES is on. Without it, a local role gets the local model's
+                OpenAI-compatible URL (``shared_local_llm.local_api_base``)
+            snapshot: Configuration snapshot of the run (default: the current one, so
+                .env reloads reach runs started afterwards)
+
         Returns:
             List[Dict[str, Any]]: Configuration list compatible with AutoGen
         """
+        snapshot = snapshot or cls.snapshot()
         config = {
-            "model": cls.OPENAI_MODEL,
-            "api_key": cls.API_KEY,
-            "base_url": cls.API_BASE,
+            "model": snapshot.model,
+            "api_key": snapshot.api_key,
+            "base_url": snapshot.api_base,
+            "max_tokens": snapshot.get_max_tokens(role) if role else snapshot.agent_max_tokens,
+            "cache_seed": None if cls.CACHE_SEED.lower() == "none" else int(cls.CACHE_SEED),
         }
+        local = bool(role) and snapshot.runs_locally(role)
+        if local and not custom_client:
+            from shared_local_llm import local_api_base, local_model_name
+            config.update(model=local_model_name(), api_key="local", base_url=local_api_base(), cache_seed=None,
+                          price=[0, 0])
+        elif local:
+            # Runs on the local model; drafting and the cascade's remote models do not apply
+            from shared_local_llm import local_model_name
+            config.update(model=local_model_name(), model_client_cls="ResilientModelClient",
+                          cache_scope=f"autogen/{role}", local=True)
+        elif cls.uses_call_layer(snapshot) and custom_client:
+            # Retries/hedging/semantic cache via shared_llm; agents must call activate_model_client()
+            config["model_client_cls"] = "ResilientModelClient"
+            config["cache_scope"] = f"autogen/{role}" if role else ""
+            config["draft_refine"] = bool(role) and AgentConfig.drafts(role, snapshot)
+            if snapshot.model_cascade and role:
+                # Turns start on the cheapest model and escalate when their checks fail
+                config["cascade"] = list(snapshot.model_cascade)
+                config["required_terms"] = WorkflowConfig.TURN_REQUIREMENTS.get(role, [])
+        if config.get("model_client_cls"):
+            # Config entries must stay JSON (AutoGen's cache keys); the client looks the snapshot up
+            config["config_version"] = snapshot.version
 
         return [config]
 
+    @classmethod
+    def uses_call_layer(cls, snapshot: Optional[ConfigSnapshot] = None) -> bool:
+        """Whether agent completions go through shared_llm (ResilientModelClient)"""
+        snapshot = snapshot or cls.snapshot()
+        return (snapshot.resilient_calls or snapshot.semantic_cache or snapshot.draft_refine
+                or bool(snapshot.model_cascade) or snapshot.run_deadline > 0 or bool(snapshot.local_roles))
+
     @classmethod
     def validate_setup(cls) -> bool:
         """
@@ -90,6 +175,16 @@ Configuration Summary:
 - API Base: {cls.API_BASE}
 - Timeout: {cls.AGENT_TIMEOUT}s
 - Max Tokens: {cls.AGENT_MAX_TOKENS}
+- Summary Method: {cls.SUMMARY_METHOD}
+- Research Fan-Out: {cls.RESEARCH_FANOUT} (width {cls.RESEARCH_FANOUT_WIDTH})
+- GroupChat Topology: {cls.GROUPCHAT_TOPOLOGY}
+- Cross-Run Memory: {cls.MEMORY_MODE} (phases {", ".join(cls.MEMORY_PHASES)})
+- Workflow: {Path(cls.WORKFLOW_FILE).name}
+- Resilient Calls: {cls.RESILIENT_CALLS} (retries {cls.MAX_RETRIES}, hedge model {cls.HEDGE_MODEL or "-"})
+- Semantic Cache: {cls.SEMANTIC_CACHE} (threshold {cls.SEMANTIC_CACHE_THRESHOLD})
+- Model Cascade: {" → ".join(cls.MODEL_CASCADE) or "off"}
+- Run Deadline: {f"{cls.RUN_DEADLINE:g}s (fallback model {cls.DEADLINE_FALLBACK_MODEL or '-'})" if cls.RUN_DEADLINE else "none"}
+- Draft & Refine: {cls.DRAFT_REFINE} (draft model {cls.DRAFT_MODEL}, phases {", ".join(p for p in WorkflowConfig.PHASES if AgentConfig.drafts(p)) or "-"})
 """
 
 
@@ -99,21 +194,60 @@ class AgentConfig:
     RESEARCH_AGENT = {
         "name": "ResearchAgent",
         "role": "Market Researcher",
+        "phase": "research",
     }
 
     ANALYSIS_AGENT = {
         "name": "AnalysisAgent",
         "role": "Product Analyst",
+        "phase": "analysis",
     }
 
     BLUEPRINT_AGENT = {
         "name": "BlueprintAgent",
         "role": "Product Designer",
+        "phase": "blueprint",
     }
 
     REVIEWER_AGENT = {
         "name": "ReviewerAgent",
         "role": "Product Reviewer",
+        "phase": "review",
+    }
+
+    # Critics for parallel rounds; each reviews the same context independently
+    CRITIC_AGENTS = {
+        "feasibility": {
+            "name": "FeasibilityCritic",
+            "role": "Technical Feasibility Critic",
+            "phase": "review",
+            "focus": "technical feasibility: build effort, AI/ML risks, integrations, and what an MVP team can ship in 3-6 months",
+        },
+        "market_fit": {
+            "name": "MarketFitCritic",
+            "role": "Market Fit Critic",
+            "phase": "review",
+            "focus": "market fit: target buyers, differentiation against the competitors discussed, pricing and go-to-market",
+        },
+        "risk": {
+            "name": "RiskCritic",
+            "role": "Risk Critic",
+            "phase": "review",
+            "focus": "risks: bias and fairness in AI hiring, regulation (EEOC, EU AI Act, GDPR), candidate trust, and mitigations",
+        },
+    }
+
+    # Generation mode per phase (with DRAFT_REFINE=True; DRAFT_ROLES overrides).
+    # "draft_refine": DRAFT_MODEL writes the turn and the main model approves or edits it;
+    # "direct": the main model writes it. Reviews and critiques stay direct: they judge
+    # the other agents' work, which is what the large model is for.
+    GENERATION_MODES = {
+        "research": "draft_refine",
+        "research_brief": "draft_refine",
+        "analysis": "draft_refine",
+        "blueprint": "draft_refine",
+        "review": "direct",
+        "critique": "direct",
     }
 
     @classmethod
@@ -127,6 +261,17 @@ class AgentConfig:
         }
         return agents.get(agent_type, {})
 
+    @classmethod
+    def get_phase_for_agent(cls, agent_name: str) -> str:
+        """Get the workflow phase an agent (by name) contributes to, or "" if none"""
+        return WorkflowConfig.get_agent_phases().get(agent_name, "")
+
+    @classmethod
+    def drafts(cls, phase: str, snapshot: Optional[ConfigSnapshot] = None) -> bool:
+        """Whether a phase's turns are drafted by DRAFT_MODEL and refined by the main model"""
+        snapshot = snapshot or Config.snapshot()
+        return snapshot.drafts(phase, default=cls.GENERATION_MODES.get(phase) == "draft_refine")
+
 
 class WorkflowConfig:
     """Configuration for workflow parameters"""
@@ -139,6 +284,14 @@ class WorkflowConfig:
         "review",
     ]
 
+    # Competitors covered by the research phase
+    COMPETITORS = [
+        "HireVue",
+        "Pymetrics",
+        "Codility",
+        "Interviewing.io",
+    ]
+
     # Phase descriptions
     PHASE_DESCRIPTIONS = {
         "research": "Market Research & Competitive Analysis",
@@ -155,6 +308,71 @@ class WorkflowConfig:
         "review": "Review blueprint and provide strategic recommendations",
     }
 
+    # Executive summary sections, one per phase
+    SUMMARY_SECTIONS = {
+        "research": "Key Market Findings",
+        "analysis": "Identified Opportunities",
+        "blueprint": "Proposed Features",
+        "review": "Strategic Recommendations",
+    }
+
+    # Phases a deadline-limited run skips once it has to wrap up (shared_deadline.py)
+    OPTIONAL_PHASES = ["review"]
+
+    # Terms a phase's turn must contain to be accepted on a cheaper model of the
+    # MODEL_CASCADE ("a|b" accepts either). The review must end the chat.
+    TURN_REQUIREMENTS = {
+        "research": COMPETITORS,
+        "review": ["TERMINATE"],
+    }
+
+    # Seconds a saved phase result stays fresh for reuse by later runs (0 = not saved).
+    # Market research changes slowly; later phases depend on the run's own discussion.
+    MEMORY_TTLS = {
+        "research": 24 * 3600,
+        "analysis": 12 * 3600,
+        "blueprint": 6 * 3600,
+        "review": 6 * 3600,
+    }
+
+    # GroupChat topologies. Each maps a host agent to a parallel round: when the
+    # host is selected to speak, the listed critics (AgentConfig.CRITIC_AGENTS keys)
+    # respond concurrently to the same context and the host merges their critiques
+    # ("llm": one synthesis call in the host's voice, "local": concatenate).
+    # "closing" is appended to a local merge so the chat still terminates.
+    TOPOLOGIES = {
+        "sequential": {},
+        "parallel_critique": {
+            "ReviewerAgent": {
+                "critics": ["feasibility", "market_fit", "risk"],
+                "merge": "llm",
+                "closing": "TERMINATE",
+            },
+        },
+    }
+
+    @classmethod
+    def get_topology(cls, name: str) -> Dict[str, Dict[str, Any]]:
+        """Get the parallel rounds of a topology, keyed by host agent name"""
+        if name not in cls.TOPOLOGIES:
+            raise ValueError(f"Unknown GROUPCHAT_TOPOLOGY '{name}'. Expected one of {sorted(cls.TOPOLOGIES)}")
+        return cls.TOPOLOGIES[name]
+
+    @classmethod
+    def load_workflow(cls, path: Optional[str] = None) -> CompiledWorkflow:
+        """Get the compiled GroupChat workflow (recompiled only when the file changes)"""
+        return load_workflow(path or Config.WORKFLOW_FILE)
+
+    @classmethod
+    def get_agent_phases(cls) -> Dict[str, str]:
+        """Map the agent names of the workflow to their phases"""
+        phases = {}
+        for spec in cls.load_workflow().agents:
+            name, phase = spec.get("name"), spec.get("phase")
+            if phase is not None:
+                phases[name.source if name is not None else spec.key] = phase.source
+        return phases
+
     @classmethod
     def get_phase_description(cls, phase: str) -> str:
         """Get description for a specific phase"""
@@ -0,0 +1,122 @@
+"""
+Deadline-aware GroupChat runs for the AutoGen Interview Platform Workflow
+
+Applies a ``shared_deadline.RunDeadline`` to a GroupChat:
+
+- Each appended turn ends a step. ``groupchat.max_round`` is lowered to the
+  turns that still fit in the remaining time, so the chat ends early instead
+  of running out of time mid-turn (at ``wrap_up`` it ends after the current turn).
+  The first agent turn always starts while time is left, so the run has a result.
+- Before an agent replies, the deadline is checked (``DeadlineExceeded`` stops
+  the chat) and the agent's client is switched to the degraded settings of the
+  current level: shorter max_tokens from ``lean``, the fallback model from ``fast``.
+- Agents of ``WorkflowConfig.OPTIONAL_PHASES`` are not started at ``wrap_up``.
+
+The demo then summarizes locally (``ExtractiveSummarizer``) instead of making
+the reflection call, and returns the turns so far when the deadline stops it.
+
+Usage:
+    from deadline import DeadlineGuard
+
+    guard = DeadlineGuard(RunDeadline(20, steps=4), manager)
+    guard.attach(manager.groupchat.agents)
+    with guard.deadline.activate():
+        user_proxy.initiate_chat(manager, ...)
+    guard.close()
+"""
+
+from typing import Any, Dict, Iterable, List
+
+import autogen
+
+from config import AgentConfig, WorkflowConfig
+from model_client import activate_model_client
+from shared_deadline import DeadlineExceeded, RunDeadline
+
+
+class DeadlineGuard:
+    """Fits a GroupChat into a RunDeadline by ending it early and degrading its agents"""
+
+    def __init__(self, deadline: RunDeadline, manager: autogen.GroupChatManager):
+        self.deadline = deadline
+        self.groupchat = groupchat = manager.groupchat
+        self.max_round = groupchat.max_round
+        # register_reply keeps a shallow copy of the GroupChat; run_chat reads max_round from it
+        self._chats = [groupchat] + [f["config"] for f in manager._reply_func_list
+                                     if isinstance(f.get("config"), autogen.GroupChat)]
+        self.skipped: List[str] = []
+        self._agents: List[autogen.ConversableAgent] = []
+        self._levels: Dict[str, int] = {}
+        self._original_configs: Dict[str, Dict[str, Any]] = {}
+        self._active = True
+        groupchat.observers.append(self.observe)
+
+    def attach(self, agents: Iterable[autogen.ConversableAgent]) -> None:
+        """Check the deadline and apply its degradations before every LLM reply of the agents"""
+        for agent in agents:
+            if not agent.llm_config:
+                continue
+            agent.register_hook("process_all_messages_before_reply", self._hook(agent))
+            self._agents.append(agent)
+            self._levels[agent.name] = 0
+            self._original_configs[agent.name] = agent.llm_config
+
+    def observe(self, message: Dict[str, Any], speaker) -> None:
+        """GroupChat observer: a turn ended; shrink the remaining rounds to what fits"""
+        if not self._active:
+            return
+        if len(self.groupchat.messages) > 1:  # The kickoff message is not a step
+            self.deadline.end_step()
+        turns = len(self.groupchat.messages)
+        fits = 0 if self.deadline.skip_optional else self.deadline.affordable_steps()
+        if turns <= 1 and not self.deadline.expired:
+            # Nothing to return yet: an anytime run starts at least one turn
+            fits = max(fits, 1)
+        # GroupChatManager ends the chat once the transcript reaches max_round
+        self._set_max_round(max(turns, min(self.max_round, turns + fits)))
+
+    def ended_early(self) -> bool:
+        """Whether the chat stopped at a round limit the deadline lowered"""
+        return self.groupchat.max_round < self.max_round and len(self.groupchat.messages) >= self.groupchat.max_round
+
+    def _set_max_round(self, max_round: int) -> None:
+        for chat in self._chats:
+            chat.max_round = max_round
+
+    def _hook(self, agent: autogen.ConversableAgent):
+        def hook(messages: List[Dict]) -> List[Dict]:
+            if not self._active:
+                return messages
+            self.deadline.check()
+            level = self.deadline.update()
+            phase = AgentConfig.get_phase_for_agent(agent.name)
+            if phase in WorkflowConfig.OPTIONAL_PHASES and self.deadline.skip_optional:
+                self.skipped.append(phase)
+                raise DeadlineExceeded(f"no time left for the optional {phase} phase")
+            if level > self._levels.get(agent.name, 0):
+                self._degrade(agent)
+                self._levels[agent.name] = level
+            return messages
+        return hook
+
+    def _degrade(self, agent: autogen.ConversableAgent) -> None:
+        """Rebuild the agent's client with the current level's max_tokens and model"""
+        original = self._original_configs[agent.name]
+        config_list = [{**c, "max_tokens": self.deadline.max_tokens(c.get("max_tokens")),
+                        "model": self.deadline.model(c["model"])}
+                       for c in original["config_list"]]
+        self._switch(agent, {**original, "config_list": config_list})
+
+    @staticmethod
+    def _switch(agent: autogen.ConversableAgent, llm_config: Dict[str, Any]) -> None:
+        agent.llm_config = llm_config
+        agent.client = autogen.OpenAIWrapper(**llm_config)
+        activate_model_client([agent])
+
+    def close(self) -> None:
+        """Stop applying the deadline and restore the agents' original clients"""
+        self._active = False
+        for agent in self._agents:
+            if self._levels.get(agent.name):
+                self._switch(agent, self._original_configs[agent.name])
+        self._set_max_round(self.max_round)
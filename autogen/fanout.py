@@ -0,0 +1,223 @@
+"""
+Fan-out orchestration for the AutoGen Interview Platform Workflow
+
+In the default GroupChat the ResearchAgent covers every competitor in one long
+serial generation. With fan-out enabled (``Config.RESEARCH_FANOUT``) the
+ResearchAgent becomes a coordinator: when the GroupChatManager selects it, it
+spawns one short-lived sub-agent per competitor, runs up to
+``Config.RESEARCH_FANOUT_WIDTH`` of them concurrently, merges their briefs and
+posts the merged findings as its own turn. The rest of the chat is unchanged,
+so AnalysisAgent still builds on a single ResearchAgent message.
+
+``ParallelRound`` applies the same idea to a GroupChat topology
+(``WorkflowConfig.TOPOLOGIES``): when its host is selected, several critics
+answer the same conversation concurrently and the host merges their critiques
+into its single turn.
+
+Usage:
+    from fanout import ParallelRound, ResearchFanOut
+
+    fanout = ResearchFanOut(llm_config, competitors=WorkflowConfig.COMPETITORS)
+    fanout.attach(research_agent)
+
+    ParallelRound(critics, merge="llm").attach(reviewer_agent)
+"""
+
+import re
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+import autogen
+
+from config import Config
+from shared_retrieval import retrieval_notes
+
+
+def reply_text(reply: Any) -> str:
+    """Normalize a ``generate_reply`` result (str, dict or None) to text"""
+    if isinstance(reply, dict):
+        return reply.get("content") or ""
+    return reply or ""
+
+
+def generate_parallel(jobs: Sequence[Tuple[autogen.ConversableAgent, List[Dict[str, Any]]]],
+                      width: int) -> List[Tuple[str, str]]:
+    """
+    Generate replies for several agents concurrently.
+
+    Each agent answers its own message list independently, so the jobs share
+    no state. Results keep the order of ``jobs``; a failing job yields an
+    error note instead of aborting the others.
+
+    Args:
+        jobs: (agent, messages) pairs
+        width: Maximum number of concurrent generations
+
+    Returns:
+        List[Tuple[str, str]]: (agent name, reply text) per job
+    """
+    def _run(agent, messages):
+        try:
+            return reply_text(agent.generate_reply(messages=messages))
+        except Exception as e:
+            return f"[{agent.name} failed: {e}]"
+
+    with ThreadPoolExecutor(max_workers=max(1, width), thread_name_prefix="fanout") as pool:
+        futures = [pool.submit(_run, agent, messages) for agent, messages in jobs]
+        return [(agent.name, future.result()) for (agent, _), future in zip(jobs, futures)]
+
+
+class ResearchFanOut:
+    """Coordinator that splits competitive research into per-competitor sub-agents"""
+
+    BRIEF_PROMPT = """{context}
+{notes}
+You are covering ONLY {competitor}. Summarize its key features, strengths, weaknesses,
+pricing/positioning and any notable data points. Keep it under 150 words and do not
+address other team members."""
+
+    MERGE_PROMPT = """Here are competitor briefs gathered by your research team:
+
+{briefs}
+
+Write the competitive landscape for the group: one or two lines per competitor, then the
+current market trends in AI-powered recruiting and the unmet needs or gaps you see.
+Be specific with names and data points. Finish by inviting the AnalysisAgent to identify
+opportunities based on these findings. Keep it under 400 words."""
+
+    def __init__(self, llm_config: Dict[str, Any], competitors: Sequence[str],
+                 width: int = Config.RESEARCH_FANOUT_WIDTH,
+                 merge: str = Config.RESEARCH_FANOUT_MERGE):
+        if merge not in ("llm", "local"):
+            raise ValueError(f"Unknown RESEARCH_FANOUT_MERGE '{merge}'. Expected 'llm' or 'local'")
+        self.llm_config = llm_config
+        self.competitors = list(competitors)
+        self.width = width
+        self.merge = merge
+        self.sub_agents = [self._create_sub_agent(c) for c in self.competitors]
+        self.last_timings: Dict[str, float] = {}
+
+    def _create_sub_agent(self, competitor: str) -> autogen.AssistantAgent:
+        """Create a focused researcher for one competitor"""
+        slug = re.sub(r"[^A-Za-z0-9]+", "", competitor)
+        return autogen.AssistantAgent(
+            name=f"ResearchAgent_{slug}",
+            system_message=f"You are a market research analyst focused on {competitor}, "
+                           f"an AI-powered recruitment technology company. Give concise, factual briefs.",
+            llm_config=self.llm_config,
+        )
+
+    def attach(self, coordinator: autogen.ConversableAgent) -> None:
+        """Make ``coordinator`` answer its GroupChat turn through the fan-out"""
+        coordinator.register_reply([autogen.Agent, None], ResearchFanOut._reply, position=0,
+                                   config=self)
+
+    @staticmethod
+    def _reply(recipient: autogen.ConversableAgent, messages: Optional[List[Dict]] = None,
+               sender: Optional[autogen.Agent] = None, config: Optional["ResearchFanOut"] = None):
+        """Reply function registered on the coordinator (AutoGen reply signature)"""
+        context = messages[-1].get("content", "") if messages else ""
+        return True, config.research(recipient, context)
+
+    def research(self, coordinator: autogen.ConversableAgent, context: str) -> str:
+        """
+        Run the per-competitor sub-agents concurrently and merge their briefs.
+
+        Args:
+            coordinator: Agent whose LLM performs the merge step
+            context: Latest chat message (the kickoff request)
+
+        Returns:
+            str: Merged research findings
+        """
+        start = time.perf_counter()
+        jobs = [
+            (agent, [{"role": "user", "content": self.BRIEF_PROMPT.format(
+                context=context, competitor=competitor, notes=retrieval_notes(competitor))}])
+            for agent, competitor in zip(self.sub_agents, self.competitors)
+        ]
+        briefs = generate_parallel(jobs, self.width)
+        self.last_timings["fanout"] = time.perf_counter() - start
+
+        text = "\n\n".join(
+            f"### {competitor}\n{brief.strip()}" for competitor, (_, brief) in zip(self.competitors, briefs)
+        )
+        if Config.VERBOSE:
+            print(f"✓ Research fan-out: {len(briefs)} competitor briefs in {self.last_timings['fanout']:.1f}s "
+                  f"(width {self.width})")
+
+        if self.merge == "local":
+            return text + "\n\nAnalysisAgent, please identify the key market opportunities based on these findings."
+
+        start = time.perf_counter()
+        # Bypass the registered fan-out reply and answer with the coordinator's own LLM
+        merged = coordinator.generate_oai_reply(
+            messages=[{"role": "user", "content": self.MERGE_PROMPT.format(briefs=text)}]
+        )[1]
+        self.last_timings["merge"] = time.perf_counter() - start
+        return reply_text(merged) or text
+
+
+class ParallelRound:
+    """GroupChat turn answered by several agents concurrently, then merged by the host"""
+
+    MERGE_PROMPT = """Independent critics reviewed the discussion above:
+
+{critiques}
+
+Respond now as yourself, following your role: build on these critiques, resolve any
+disagreements between them and keep the points that matter most."""
+
+    def __init__(self, agents: Sequence[autogen.ConversableAgent],
+                 width: int = Config.PARALLEL_ROUND_WIDTH,
+                 merge: str = "llm", closing: str = ""):
+        if merge not in ("llm", "local"):
+            raise ValueError(f"Unknown parallel round merge '{merge}'. Expected 'llm' or 'local'")
+        self.agents = list(agents)
+        self.width = width
+        self.merge = merge
+        self.closing = closing
+        self.last_timings: Dict[str, float] = {}
+
+    def attach(self, host: autogen.ConversableAgent) -> None:
+        """Make ``host`` answer its GroupChat turn through the parallel round"""
+        host.register_reply([autogen.Agent, None], ParallelRound._reply, position=0, config=self)
+
+    @staticmethod
+    def _reply(recipient: autogen.ConversableAgent, messages: Optional[List[Dict]] = None,
+               sender: Optional[autogen.Agent] = None, config: Optional["ParallelRound"] = None):
+        """Reply function registered on the host (AutoGen reply signature)"""
+        return True, config.run(recipient, list(messages or []))
+
+    def run(self, host: autogen.ConversableAgent, messages: List[Dict[str, Any]]) -> str:
+        """
+        Let every agent respond to the same context concurrently and merge the results.
+
+        Args:
+            host: Agent whose turn this is; its LLM performs the merge step
+            messages: The conversation as the host sees it
+
+        Returns:
+            str: The host's merged reply
+        """
+        start = time.perf_counter()
+        critiques = generate_parallel([(agent, messages) for agent in self.agents], self.width)
+        self.last_timings["round"] = time.perf_counter() - start
+        text = "\n\n".join(f"### {name}\n{critique.strip()}" for name, critique in critiques)
+        if Config.VERBOSE:
+            print(f"✓ Parallel round for {host.name}: {len(critiques)} responses in "
+                  f"{self.last_timings['round']:.1f}s (width {self.width})")
+
+        if self.merge == "local":
+            return f"{text}\n\n{self.closing}".strip()
+
+        start = time.perf_counter()
+        merged = host.generate_oai_reply(
+            messages=messages + [{"role": "user", "content": self.MERGE_PROMPT.format(critiques=text)}]
+        )[1]
+        self.last_timings["merge"] = time.perf_counter() - start
+        merged = reply_text(merged)
+        if not merged:
+            return f"{text}\n\n{self.closing}".strip()
+        return merged
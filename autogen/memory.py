@@ -0,0 +1,263 @@
+"""
+Cross-run memory for the AutoGen Interview Platform Workflow
+
+Every run starts its GroupChat from ``messages=[]``, so the competitive
+research is regenerated on every run although it rarely changes within a day.
+``PhaseMemory`` keeps the result of each workflow phase (``WorkflowConfig.PHASES``)
+in a persistent, versioned SQLite store keyed by phase and topic, with a
+freshness TTL per phase (``WorkflowConfig.MEMORY_TTLS``).
+
+``WorkflowMemory`` attaches the store to a run (``Config.MEMORY_MODE``):
+
+- Every agent turn is saved as a new version of its phase once the turn is
+  complete, unless the turn itself came from memory.
+- ``skip``: when an agent of a reusable phase (``Config.MEMORY_PHASES``) is
+  selected and a fresh result exists, the stored result is posted as its turn.
+  No LLM call is made.
+- ``shorten``: the agent sees its stored result and only writes what changed;
+  the turn is the stored result followed by that short update.
+
+The topic of a phase is a digest of the agent's rendered system message, so
+editing the prompt or the competitor list never reuses stale results.
+
+Usage:
+    from memory import PhaseMemory, WorkflowMemory
+
+    memory = WorkflowMemory(PhaseMemory(), mode="skip", run_id="20250101_120000")
+    memory.attach(agents)                      # registers the reuse reply
+    groupchat = ObservedGroupChat(..., observers=[memory.observe])
+"""
+
+import hashlib
+import sqlite3
+import threading
+import time
+from dataclasses import dataclass
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+import autogen
+
+from config import AgentConfig, Config, WorkflowConfig
+
+MEMORY_MODES = ("off", "skip", "shorten")
+
+
+@dataclass
+class MemoryEntry:
+    """One stored version of a phase result"""
+
+    phase: str
+    topic: str
+    version: int
+    content: str
+    created_at: float
+    expires_at: Optional[float]
+    run_id: str = ""
+
+    @property
+    def fresh(self) -> bool:
+        return self.expires_at is None or self.expires_at > time.time()
+
+    @property
+    def saved(self) -> str:
+        return datetime.fromtimestamp(self.created_at).strftime("%Y-%m-%d %H:%M")
+
+
+class PhaseMemory:
+    """Persistent, versioned phase results backed by SQLite"""
+
+    def __init__(self, path: Optional[Path] = None, keep: int = 5):
+        """
+        Args:
+            path: SQLite file (defaults to Config.CACHE_DIR / "memory.sqlite3")
+            keep: Versions kept per (phase, topic); older ones are pruned on write
+        """
+        self.path = Path(path or Config.CACHE_DIR / "memory.sqlite3")
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.keep = keep
+        # One connection per thread; SQLite handles cross-process locking
+        self._local = threading.local()
+        with self._conn() as conn:
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS phase_memory "
+                "(phase TEXT NOT NULL, topic TEXT NOT NULL, version INTEGER NOT NULL, content TEXT NOT NULL, "
+                "created_at REAL NOT NULL, expires_at REAL, run_id TEXT, PRIMARY KEY (phase, topic, version))"
+            )
+
+    def _conn(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=30)
+            conn.execute("PRAGMA journal_mode=WAL")
+            self._local.conn = conn
+        return conn
+
+    def put(self, phase: str, topic: str, content: str, ttl: Optional[float] = None,
+            run_id: str = "") -> MemoryEntry:
+        """
+        Store a new version of a phase result.
+
+        Args:
+            phase: Workflow phase (e.g. "research")
+            topic: Topic key within the phase
+            content: The result text
+            ttl: Seconds the result stays fresh (None = no expiry)
+            run_id: Run that produced the result
+
+        Returns:
+            MemoryEntry: The stored version
+        """
+        now = time.time()
+        expires_at = now + ttl if ttl else None
+        with self._conn() as conn:
+            # BEGIN IMMEDIATE keeps version numbers unique across processes
+            conn.execute("BEGIN IMMEDIATE")
+            version = conn.execute(
+                "SELECT COALESCE(MAX(version), 0) + 1 FROM phase_memory WHERE phase = ? AND topic = ?",
+                (phase, topic),
+            ).fetchone()[0]
+            conn.execute(
+                "INSERT INTO phase_memory (phase, topic, version, content, created_at, expires_at, run_id) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (phase, topic, version, content, now, expires_at, run_id),
+            )
+            conn.execute(
+                "DELETE FROM phase_memory WHERE phase = ? AND topic = ? AND version <= ?",
+                (phase, topic, version - self.keep),
+            )
+        return MemoryEntry(phase, topic, version, content, now, expires_at, run_id)
+
+    def latest(self, phase: str, topic: str, include_stale: bool = False) -> Optional[MemoryEntry]:
+        """Get the newest version of a phase result, or None if there is no fresh one"""
+        row = self._conn().execute(
+            "SELECT phase, topic, version, content, created_at, expires_at, run_id FROM phase_memory "
+            "WHERE phase = ? AND topic = ? ORDER BY version DESC LIMIT 1",
+            (phase, topic),
+        ).fetchone()
+        entry = MemoryEntry(*row) if row else None
+        if entry is None or (not include_stale and not entry.fresh):
+            return None
+        return entry
+
+    def history(self, phase: str, topic: str) -> List[MemoryEntry]:
+        """All kept versions of a phase result, newest first"""
+        rows = self._conn().execute(
+            "SELECT phase, topic, version, content, created_at, expires_at, run_id FROM phase_memory "
+            "WHERE phase = ? AND topic = ? ORDER BY version DESC",
+            (phase, topic),
+        ).fetchall()
+        return [MemoryEntry(*row) for row in rows]
+
+    def invalidate(self, phase: str, topic: Optional[str] = None) -> int:
+        """Expire the stored results of a phase (all topics by default); returns how many"""
+        query, args = "UPDATE phase_memory SET expires_at = ? WHERE phase = ?", [time.time(), phase]
+        if topic is not None:
+            query, args = query + " AND topic = ?", args + [topic]
+        with self._conn() as conn:
+            return conn.execute(query, args).rowcount
+
+
+class WorkflowMemory:
+    """Saves phase results of a GroupChat run and reuses fresh ones in later runs"""
+
+    UPDATE_PROMPT = """Your analysis from an earlier session ({saved}) is below. It is still current.
+
+{content}
+
+Do not repeat it. In under 120 words, list only what has changed since then or what is
+missing for the discussion above. If nothing has changed, say so in one sentence."""
+
+    def __init__(self, store: PhaseMemory, mode: str = Config.MEMORY_MODE,
+                 phases: Iterable[str] = Config.MEMORY_PHASES,
+                 ttls: Optional[Dict[str, float]] = None, run_id: str = ""):
+        if mode not in MEMORY_MODES:
+            raise ValueError(f"Unknown MEMORY_MODE '{mode}'. Expected one of {list(MEMORY_MODES)}")
+        self.store = store
+        self.mode = mode
+        self.phases = set(phases)
+        self.ttls = ttls if ttls is not None else WorkflowConfig.MEMORY_TTLS
+        self.run_id = run_id
+        self.topics: Dict[str, str] = {}  # agent name -> topic
+        self.served: Dict[str, MemoryEntry] = {}  # phase -> entry reused this run
+        self.saved: Dict[str, MemoryEntry] = {}  # phase -> entry written this run
+
+    @staticmethod
+    def topic_for(agent: autogen.ConversableAgent) -> str:
+        """Topic key of an agent's results: digest of its prompt"""
+        return hashlib.sha256(agent.system_message.encode()).hexdigest()[:16]
+
+    def attach(self, agents: Iterable[autogen.ConversableAgent]) -> None:
+        """Track the agents' phases and let reusable phases answer from memory"""
+        for agent in agents:
+            phase = AgentConfig.get_phase_for_agent(agent.name)
+            if not phase:
+                continue
+            self.topics[agent.name] = self.topic_for(agent)
+            if self.mode != "off" and phase in self.phases:
+                # Registered last at position 0, so it runs before a fan-out reply
+                agent.register_reply([autogen.Agent, None], WorkflowMemory._reply, position=0,
+                                     config=(self, phase))
+
+    def reusable(self, agent: autogen.ConversableAgent) -> Optional[MemoryEntry]:
+        """Fresh stored result the agent's next turn would reuse (None if it calls the LLM)"""
+        phase = AgentConfig.get_phase_for_agent(agent.name)
+        if self.mode == "off" or phase not in self.phases or phase in self.served:
+            return None
+        return self.store.latest(phase, self.topics.get(agent.name) or self.topic_for(agent))
+
+    def serves_without_llm(self, agent: autogen.ConversableAgent) -> bool:
+        """Whether the agent's next turn is posted from memory with no LLM call"""
+        return self.mode == "skip" and self.reusable(agent) is not None
+
+    @staticmethod
+    def _reply(recipient: autogen.ConversableAgent, messages: Optional[List[Dict]] = None,
+               sender: Optional[autogen.Agent] = None,
+               config: Optional[Tuple["WorkflowMemory", str]] = None):
+        """Reply function registered on reusable agents (AutoGen reply signature)"""
+        memory, phase = config
+        entry = memory.reusable(recipient)
+        if entry is None:
+            return False, None
+        memory.served[phase] = entry
+        if Config.VERBOSE:
+            print(f"✓ Memory: {recipient.name} reuses {phase} v{entry.version} from {entry.saved} ({memory.mode})")
+        if memory.mode == "skip":
+            return True, entry.content
+        update = recipient.generate_oai_reply(
+            messages=list(messages or []) + [{"role": "user", "content": memory.UPDATE_PROMPT.format(
+                saved=entry.saved, content=entry.content)}]
+        )[1]
+        update = update.get("content") if isinstance(update, dict) else update
+        if not update:
+            return True, entry.content
+        return True, f"{entry.content}\n\n**Update since {entry.saved}:**\n{update.strip()}"
+
+    def observe(self, message: Dict[str, Any], speaker) -> None:
+        """ObservedGroupChat observer: save every generated phase result as a new version"""
+        name = message.get("name") or getattr(speaker, "name", "")
+        phase = AgentConfig.get_phase_for_agent(name)
+        content = (message.get("content") or "").strip()
+        if self.mode == "off" or not phase or not content or phase in self.served or name not in self.topics:
+            return
+        ttl = self.ttls.get(phase)
+        if not ttl:
+            return
+        self.saved[phase] = self.store.put(phase, self.topics[name], content, ttl=ttl, run_id=self.run_id)
+
+    def print_report(self) -> None:
+        """Print which phases were reused and which were saved this run"""
+        if not self.served and not self.saved:
+            return
+        print("\n" + "-" * 80)
+        print(f"CROSS-RUN MEMORY ({self.mode})")
+        print("-" * 80)
+        for phase in WorkflowConfig.PHASES:
+            if phase in self.served:
+                entry = self.served[phase]
+                print(f"  {phase:<10} reused v{entry.version} from {entry.saved}")
+            elif phase in self.saved:
+                entry = self.saved[phase]
+                ttl = self.ttls.get(phase, 0) / 3600
+                print(f"  {phase:<10} saved v{entry.version} (fresh for {ttl:g}h)")
@@ -0,0 +1,279 @@
+"""
+Compact message storage for the AutoGen Interview Platform Workflow
+
+A GroupChat keeps the transcript several times over. ``groupchat.messages`` holds
+one dict per turn, and every agent (and the manager) keeps its own history with
+one more dict per turn and per conversation. Each dict holds the content string
+and a ``name``/``role``. Content with non-ASCII characters (emoji, typographic
+quotes) is held in 2 or 4 bytes per character. Long discussions and many
+concurrent chats per process make this the largest part of a chat's memory.
+
+``MessageArena`` holds the content of one chat in a single UTF-8 buffer. A turn
+is broadcast to every agent right after it is appended, so the arena stores
+repeated content only once. Speaker names and roles are interned into small
+integer ids. ``MessageStore`` is a list-compatible sequence over an arena: it
+keeps only offsets and ids per message, and builds the message dict when it is
+accessed. ``preview`` decodes only the first bytes of a message instead of the
+whole content.
+
+Usage:
+    from message_store import MessageArena, MessageStore, compact_histories
+
+    arena = MessageArena()
+    groupchat = ObservedGroupChat(agents=agents, messages=MessageStore(arena=arena), ...)
+    manager = autogen.GroupChatManager(groupchat=groupchat, ...)
+    compact_histories(agents + [manager], arena)
+
+    for speaker, preview in message_previews(groupchat.messages):
+        print(f"[{speaker}]: {preview}")
+"""
+
+import threading
+from array import array
+from collections import OrderedDict, defaultdict
+from collections.abc import MutableSequence
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Sequence, Tuple
+
+# Keys stored in compact form; any other key (tool_calls, function_call, context, ...)
+# is kept as-is for the few messages that carry one
+_COMPACT_KEYS = ("content", "role", "name")
+
+# Recently stored contents checked for reuse (a turn is stored once per agent history)
+_RECENT = 32
+
+
+class MessageArena:
+    """Shared UTF-8 content buffer and symbol table of one chat"""
+
+    def __init__(self):
+        self._buffer = bytearray()
+        self._symbols: List[Optional[str]] = [None]  # id 0: key absent
+        self._symbol_ids: Dict[str, int] = {}
+        self._recent: "OrderedDict[Tuple[int, int], Tuple[int, int]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    @property
+    def nbytes(self) -> int:
+        """Bytes of content held by the arena"""
+        return len(self._buffer)
+
+    def put(self, text: str) -> Tuple[int, int]:
+        """Store text and return its (start, end) span; content stored recently is reused"""
+        data = text.encode("utf-8")
+        key = (hash(text), len(data))
+        with self._lock:
+            span = self._recent.get(key)
+            if span is not None:
+                with memoryview(self._buffer) as view:
+                    if view[span[0]:span[1]] == data:
+                        self._recent.move_to_end(key)
+                        return span
+            start = len(self._buffer)
+            self._buffer += data
+            span = (start, len(self._buffer))
+            self._recent[key] = span
+            if len(self._recent) > _RECENT:
+                self._recent.popitem(last=False)
+            return span
+
+    def text(self, start: int, end: int) -> str:
+        return self._buffer[start:end].decode("utf-8")
+
+    def prefix(self, start: int, end: int, chars: int) -> str:
+        """First ``chars`` characters of a span, decoding at most 4 bytes per character"""
+        return self._buffer[start:min(end, start + 4 * chars)].decode("utf-8", errors="ignore")[:chars]
+
+    def symbol_id(self, value: Optional[str]) -> int:
+        if value is None:
+            return 0
+        with self._lock:
+            symbol_id = self._symbol_ids.get(value)
+            if symbol_id is None:
+                symbol_id = self._symbol_ids[value] = len(self._symbols)
+                self._symbols.append(value)
+            return symbol_id
+
+    def symbol(self, symbol_id: int) -> Optional[str]:
+        return self._symbols[symbol_id]
+
+
+class MessageStore(MutableSequence):
+    """
+    List of message dicts stored as spans in a ``MessageArena``.
+
+    Indexing, iteration and ``copy()`` return freshly built dicts, so editing a
+    returned message does not change the store (assign it back to do that).
+    Appending and clearing are cheap. Inserting or deleting in the middle rebuilds
+    the index, which AutoGen does not do during a chat.
+    """
+
+    def __init__(self, messages: Iterable[Dict[str, Any]] = (), arena: Optional[MessageArena] = None):
+        self.arena = arena or MessageArena()
+        self._starts = array("Q")
+        self._ends = array("Q")
+        self._lengths = array("I")    # content length in characters
+        self._names = array("I")      # symbol ids (0 = no name)
+        self._roles = array("I")
+        self._extras: Dict[int, Dict[str, Any]] = {}  # position -> other keys, or non-string content
+        self.extend(messages)
+
+    # --- list protocol ---------------------------------------------------
+
+    def __len__(self) -> int:
+        return len(self._starts)
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self._message(i) for i in range(*index.indices(len(self)))]
+        return self._message(self._position(index))
+
+    def __setitem__(self, index, message) -> None:
+        messages = self.copy()
+        messages[index] = message
+        self._rebuild(messages)
+
+    def __delitem__(self, index) -> None:
+        messages = self.copy()
+        del messages[index]
+        self._rebuild(messages)
+
+    def insert(self, index: int, message: Dict[str, Any]) -> None:
+        if index >= len(self):
+            self.append(message)
+            return
+        messages = self.copy()
+        messages.insert(index, message)
+        self._rebuild(messages)
+
+    def append(self, message: Dict[str, Any]) -> None:
+        position = len(self)
+        content = message.get("content")
+        if isinstance(content, str):
+            start, end = self.arena.put(content)
+            length = len(content)
+        else:
+            start = end = length = 0
+        extras = {k: v for k, v in message.items() if k not in _COMPACT_KEYS}
+        if not isinstance(content, str):
+            extras["content"] = content
+        if extras:
+            self._extras[position] = extras
+        self._starts.append(start)
+        self._ends.append(end)
+        self._lengths.append(length)
+        self._names.append(self.arena.symbol_id(message.get("name")))
+        self._roles.append(self.arena.symbol_id(message.get("role")))
+
+    def clear(self) -> None:
+        # The arena keeps the bytes: other stores of the chat may point at them
+        for column in (self._starts, self._ends, self._lengths, self._names, self._roles):
+            del column[:]
+        self._extras.clear()
+
+    def copy(self) -> List[Dict[str, Any]]:
+        """The messages as a plain list of dicts (what ``list.copy`` gives AutoGen)"""
+        return self[:]
+
+    def __add__(self, other: Sequence[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        return self.copy() + list(other)
+
+    def __radd__(self, other: Sequence[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        return list(other) + self.copy()
+
+    def __repr__(self) -> str:
+        return f"MessageStore({len(self)} messages, {self.nbytes} bytes)"
+
+    # --- compact access ----------------------------------------------------
+
+    @property
+    def nbytes(self) -> int:
+        """Bytes of the per-message index (the content lives in the shared arena)"""
+        columns = (self._starts, self._ends, self._lengths, self._names, self._roles)
+        return sum(c.itemsize * len(c) for c in columns)
+
+    def speaker(self, index: int) -> Optional[str]:
+        return self.arena.symbol(self._names[self._position(index)])
+
+    def content(self, index: int) -> Any:
+        position = self._position(index)
+        extras = self._extras.get(position)
+        if extras and "content" in extras:
+            return extras["content"]
+        return self.arena.text(self._starts[position], self._ends[position])
+
+    def content_length(self, index: int) -> int:
+        """Length of a message's content in characters, without decoding it"""
+        return self._lengths[self._position(index)]
+
+    def preview(self, index: int, width: int = 80) -> str:
+        """One-line preview of a message (first ``width`` characters), decoding only that prefix"""
+        position = self._position(index)
+        extras = self._extras.get(position)
+        if extras and "content" in extras:
+            return _preview(str(extras["content"] or ""), width)
+        text = self.arena.prefix(self._starts[position], self._ends[position], width).replace("\n", " ")
+        return text + "..." if self._lengths[position] > width else text
+
+    def turns(self) -> Iterator[Tuple[Optional[str], Any]]:
+        """(speaker, content) per message, without building message dicts"""
+        for position in range(len(self)):
+            yield self.speaker(position), self.content(position)
+
+    # --- internals ---------------------------------------------------------
+
+    def _position(self, index: int) -> int:
+        position = index + len(self) if index < 0 else index
+        if not 0 <= position < len(self):
+            raise IndexError("message index out of range")
+        return position
+
+    def _message(self, position: int) -> Dict[str, Any]:
+        message: Dict[str, Any] = {"content": self.arena.text(self._starts[position], self._ends[position])}
+        role = self.arena.symbol(self._roles[position])
+        if role is not None:
+            message["role"] = role
+        name = self.arena.symbol(self._names[position])
+        if name is not None:
+            message["name"] = name
+        extras = self._extras.get(position)
+        if extras:
+            message.update(extras)
+        return message
+
+    def _rebuild(self, messages: List[Dict[str, Any]]) -> None:
+        self.clear()
+        self.extend(messages)
+
+
+def compact_histories(agents: Iterable[Any], arena: MessageArena) -> None:
+    """Store the conversation histories of agents (and a GroupChatManager) in ``arena``"""
+    for agent in agents:
+        histories = defaultdict(lambda: MessageStore(arena=arena))
+        for partner, messages in agent._oai_messages.items():
+            histories[partner].extend(messages)
+        agent._oai_messages = histories
+
+
+def _preview(content: str, width: int) -> str:
+    text = content[:width].replace("\n", " ")
+    return text + "..." if len(content) > width else text
+
+
+def message_previews(messages: Sequence[Dict[str, Any]], width: int = 80) -> Iterator[Tuple[str, str]]:
+    """(speaker, one-line preview) per message of a MessageStore or a plain list"""
+    if isinstance(messages, MessageStore):
+        for i in range(len(messages)):
+            yield messages.speaker(i) or "Unknown", messages.preview(i, width)
+    else:
+        for msg in messages:
+            yield msg.get("name", "Unknown"), _preview(msg.get("content") or "", width)
+
+
+def transcript(messages: Sequence[Dict[str, Any]]) -> Iterator[Tuple[str, str]]:
+    """(speaker, content) per message of a MessageStore or a plain list"""
+    if isinstance(messages, MessageStore):
+        for speaker, content in messages.turns():
+            yield speaker or "Unknown", content if isinstance(content, str) else str(content or "")
+    else:
+        for msg in messages:
+            yield msg.get("name", "Unknown"), msg.get("content") or ""
@@ -0,0 +1,117 @@
+"""
+Custom AutoGen model client for the Interview Platform Workflow
+
+Routes AutoGen completions through ``shared_llm.ResilientCaller`` (retries,
+per-attempt deadlines and hedged requests) using AutoGen's custom model client
+extension point. ``Config.get_config_list()`` adds
+``"model_client_cls": "ResilientModelClient"`` when ``RESILIENT_CALLS=True``,
+``SEMANTIC_CACHE=True`` or ``DRAFT_REFINE=True``; every agent that talks to the
+LLM must then register the class. The entry's ``cache_scope`` (the agent role)
+scopes the semantic cache, and ``draft_refine`` (from ``AgentConfig.drafts``)
+lets the draft model write the role's turns. With a ``cascade`` (``MODEL_CASCADE``)
+each turn runs on the cheapest model first and is retried on the next stronger
+one while it fails ``shared_cascade.completeness_problems``. Entries of
+``LOCAL_ROLES`` carry ``local`` and run on the local model (``shared_local_llm.py``).
+The entry's ``config_version`` selects the run's configuration snapshot, so a
+reloaded .env does not change the settings of a chat in flight.
+
+Usage:
+    from model_client import activate_model_client
+
+    activate_model_client([research_agent, analysis_agent, manager])
+"""
+
+from types import SimpleNamespace
+from typing import Any, Dict, Iterable, List
+
+from config import Config
+from shared_cascade import completeness_problems, get_cascade_stats
+from shared_llm import complete
+from shared_tokens import estimate_cost
+
+
+class ResilientModelClient:
+    """AutoGen ModelClient backed by the shared resilient call layer"""
+
+    def __init__(self, config: Dict[str, Any], **kwargs):
+        self.snapshot = Config.snapshot(config.get("config_version"))
+        self.model = config.get("model", self.snapshot.model)
+        self.max_tokens = config.get("max_tokens")
+        self.cache_scope = config.get("cache_scope", "")
+        self.draft_refine = config.get("draft_refine", False)
+        self.cascade = config.get("cascade") or []
+        self.required_terms = config.get("required_terms") or []
+        self.local = config.get("local", False)
+
+    def create(self, params: Dict[str, Any]) -> SimpleNamespace:
+        """Run one completion and wrap it in an OpenAI-like response object"""
+        # A switched agent (e.g. budget downgrade) keeps its model instead of cascading
+        models = self.cascade if self.cascade and self.model == self.snapshot.model else [self.model]
+        usage = SimpleNamespace(prompt_tokens=0, completion_tokens=0, total_tokens=0)
+        cost = 0.0
+        for level, model in enumerate(models):
+            result = complete(
+                params["messages"],
+                scope=self.cache_scope,
+                config=self.snapshot,
+                draft=self.draft_refine,
+                local=self.local,
+                max_tokens=params.get("max_tokens", self.max_tokens),
+                temperature=params.get("temperature"),
+                stop=params.get("stop"),
+                # Only override the endpoint model when this agent was switched or cascades
+                model=model if model != self.snapshot.model else None,
+            )
+            prompt_tokens = result.usage.get("prompt_tokens", 0)
+            completion_tokens = result.usage.get("completion_tokens", 0)
+            usage.prompt_tokens += prompt_tokens
+            usage.completion_tokens += completion_tokens
+            usage.total_tokens += result.usage.get("total_tokens", 0)
+            cost += estimate_cost(result.model, prompt_tokens, completion_tokens)
+            if len(models) == 1:
+                break
+            problems = completeness_problems(result.text, result.finish_reason, self.required_terms)
+            if not problems or level == len(models) - 1:
+                get_cascade_stats().record(self.cache_scope or "autogen", model, level, passed=not problems)
+                break
+            if self.snapshot.verbose:
+                print(f"🪜 {self.cache_scope or 'turn'}: {model} failed ({problems[0]}); "
+                      f"escalating to {models[level + 1]}")
+        message = SimpleNamespace(role="assistant", content=result.text, function_call=None, tool_calls=None)
+        choice = SimpleNamespace(index=0, message=message, finish_reason=result.finish_reason)
+        return SimpleNamespace(choices=[choice], model=result.model, usage=usage, cost=cost, result=result)
+
+    def message_retrieval(self, response: SimpleNamespace) -> List[str]:
+        return [choice.message.content for choice in response.choices]
+
+    def cost(self, response: SimpleNamespace) -> float:
+        return response.cost
+
+    @staticmethod
+    def get_usage(response: SimpleNamespace) -> Dict[str, Any]:
+        return {
+            "prompt_tokens": response.usage.prompt_tokens,
+            "completion_tokens": response.usage.completion_tokens,
+            "total_tokens": response.usage.total_tokens,
+            "cost": response.cost,
+            "model": response.model,
+        }
+
+
+def activate_model_client(clients: Iterable[Any]) -> None:
+    """
+    Register the custom client on agents (or OpenAIWrapper instances) that need it.
+
+    Agents without an LLM (e.g. the UserProxyAgent) and clients whose config list
+    has no ``ResilientModelClient`` entry (call layer off in their snapshot) are skipped.
+
+    Args:
+        clients: Agents or OpenAIWrapper instances
+    """
+    for client in clients:
+        llm_config = getattr(client, "llm_config", None)
+        if llm_config is False:
+            continue
+        entries = llm_config.get("config_list", []) if isinstance(llm_config, dict) else getattr(client, "_config_list", [])
+        if any(entry.get("model_client_cls") == ResilientModelClient.__name__ for entry in entries):
+            client.register_model_client(model_client_cls=ResilientModelClient)
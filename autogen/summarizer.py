@@ -0,0 +1,231 @@
+"""
+Executive summary strategies for the AutoGen Interview Platform Workflow
+
+AutoGen's default ``summary_method="reflection_with_llm"`` sends the entire
+transcript back to the model once the chat has finished. That is the largest
+prompt of the run and it sits on the critical path. This module provides two
+cheaper alternatives, selected with ``Config.SUMMARY_METHOD``:
+
+- ``extractive``: picks the most informative bullet points and sentences of
+  each phase locally. No LLM call is made.
+- ``incremental``: keeps a running summary with one section per workflow phase.
+  Every new turn is folded into its section by a small LLM call that only sees
+  the section so far and the new message (the delta). Updates run on a
+  background thread while the chat continues, so the summary is ready as soon
+  as the conversation ends.
+
+Both summarizers observe the chat through ``ObservedGroupChat`` and are passed
+to ``initiate_chat`` as a callable ``summary_method``.
+
+Usage:
+    from summarizer import create_summarizer
+
+    summarizer = create_summarizer("extractive", config_list)
+    groupchat = ObservedGroupChat(..., observers=[summarizer.observe])
+    user_proxy.initiate_chat(manager, message=..., summary_method=summarizer.summarize)
+    summarizer.close()  # or: with create_summarizer(...) as summarizer:
+"""
+
+import re
+from abc import ABC, abstractmethod
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Any, Dict, List, Optional
+
+import autogen
+
+from config import AgentConfig, Config, WorkflowConfig
+
+REFLECTION_METHOD = "reflection_with_llm"
+SUMMARY_METHODS = (REFLECTION_METHOD, "incremental", "extractive")
+
+# Lines that only steer the conversation and carry no findings
+_CHATTER = re.compile(r"\b(invite|let'?s hear|over to you|please (share|review|begin)|TERMINATE)\b", re.IGNORECASE)
+_BULLET = re.compile(r"^\s*(?:[-*•]|\d+[.)])\s+")
+_SENTENCE_SPLIT = re.compile(r"(?<=[.!?])\s+(?=[A-Z])")
+
+
+def _clean(text: str) -> str:
+    """Strip markdown markers and collapse whitespace"""
+    text = _BULLET.sub("", text)
+    text = text.replace("**", "").replace("__", "").strip(" #*:-")
+    return re.sub(r"\s+", " ", text).strip()
+
+
+def extract_points(content: str, limit: int) -> List[str]:
+    """
+    Pick the most informative points from one agent message.
+
+    Bullet and numbered lines are preferred because the agents are prompted to
+    answer in lists; prose is split into sentences. Points are scored by length,
+    numbers and proper nouns and returned in their original order.
+
+    Args:
+        content: Message content
+        limit: Maximum number of points to return
+
+    Returns:
+        List[str]: Selected points
+    """
+    candidates = []
+    for line in content.splitlines():
+        if not line.strip() or _CHATTER.search(line):
+            continue
+        is_bullet = bool(_BULLET.match(line))
+        parts = [line] if is_bullet else _SENTENCE_SPLIT.split(line)
+        for part in parts:
+            point = _clean(part)
+            if len(point) < 25 or _CHATTER.search(point):
+                continue
+            score = 2.0 if is_bullet else 1.0
+            score += min(len(point), 200) / 200
+            score += 0.5 * bool(re.search(r"\d", point))
+            score += 0.1 * len(re.findall(r"\b[A-Z][a-z]+", point[1:]))
+            candidates.append((score, len(candidates), point))
+
+    best = sorted(candidates, reverse=True)[:limit]
+    return [point for _, _, point in sorted(best, key=lambda c: c[1])]
+
+
+def merge_points(points: List[str], content: str, limit: int) -> List[str]:
+    """Best ``limit`` points of a section and a new message, re-ranked together"""
+    combined = points + extract_points(content, limit)
+    return extract_points("\n".join(f"- {p}" for p in combined), limit)
+
+
+class _PhaseSummarizer(ABC):
+    """Common state: one summary section per workflow phase, fed turn by turn"""
+
+    label = ""
+
+    def __init__(self, points_per_section: int = Config.SUMMARY_POINTS_PER_SECTION):
+        self.points_per_section = points_per_section
+        self.sections: Dict[str, List[str]] = {phase: [] for phase in WorkflowConfig.PHASES}
+
+    def observe(self, message: Dict[str, Any], speaker) -> None:
+        """ObservedGroupChat observer: fold one turn into its phase section"""
+        speaker_name = message.get("name") or getattr(speaker, "name", "")
+        phase = AgentConfig.get_phase_for_agent(speaker_name)
+        content = message.get("content") or ""
+        if phase and content.strip():
+            self._update(phase, speaker_name, content)
+
+    @abstractmethod
+    def _update(self, phase: str, speaker_name: str, content: str) -> None:
+        """Fold one agent turn into its phase section"""
+
+    def render(self) -> str:
+        """Render the structured summary"""
+        blocks = []
+        for phase in WorkflowConfig.PHASES:
+            points = self.sections[phase]
+            if points:
+                title = WorkflowConfig.SUMMARY_SECTIONS.get(phase, phase.title())
+                blocks.append(f"{title}:\n" + "\n".join(f"- {p}" for p in points))
+        return "\n\n".join(blocks)
+
+    def summarize(self, sender, recipient, summary_args: Optional[Dict[str, Any]] = None) -> str:
+        """Callable ``summary_method`` for ``initiate_chat``"""
+        return self.render()
+
+    def close(self) -> None:
+        """Release background resources (the run is over)"""
+
+    def __enter__(self) -> "_PhaseSummarizer":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+
+class ExtractiveSummarizer(_PhaseSummarizer):
+    """Local summary built from the most informative points of each phase"""
+
+    label = "extractive, no LLM call"
+
+    def _update(self, phase: str, speaker_name: str, content: str) -> None:
+        # Agents may speak more than once; keep the best points across turns
+        self.sections[phase] = merge_points(self.sections[phase], content, self.points_per_section)
+
+
+class IncrementalSummarizer(_PhaseSummarizer):
+    """Running summary updated per turn by small LLM calls on the delta only"""
+
+    label = "incremental LLM summary"
+
+    UPDATE_PROMPT = """You maintain the "{title}" section of an executive summary for a product plan.
+
+Current section:
+{current}
+
+New contribution from {speaker}:
+{delta}
+
+Rewrite the section so it reflects the new contribution. Reply with at most {limit} short bullet points, one per line, and nothing else."""
+
+    def __init__(self, config_list: List[Dict[str, Any]],
+                 max_tokens: int = Config.SUMMARY_MAX_TOKENS,
+                 max_delta_chars: int = 4000, **kwargs):
+        super().__init__(**kwargs)
+        self.client = autogen.OpenAIWrapper(config_list=config_list)
+        self.max_tokens = max_tokens
+        self.max_delta_chars = max_delta_chars
+        # A single worker keeps the updates of a section in turn order
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="summarizer")
+        self._pending: List[Future] = []
+
+    def _update(self, phase: str, speaker_name: str, content: str) -> None:
+        self._pending.append(self._executor.submit(self._fold, phase, speaker_name, content))
+
+    def _fold(self, phase: str, speaker_name: str, content: str) -> None:
+        prompt = self.UPDATE_PROMPT.format(
+            title=WorkflowConfig.SUMMARY_SECTIONS.get(phase, phase.title()),
+            current="\n".join(f"- {p}" for p in self.sections[phase]) or "(empty)",
+            speaker=speaker_name,
+            delta=content[: self.max_delta_chars],
+            limit=self.points_per_section,
+        )
+        try:
+            response = self.client.create(
+                messages=[{"role": "user", "content": prompt}],
+                max_tokens=self.max_tokens,
+            )
+            text = self.client.extract_text_or_completion_object(response)[0] or ""
+            points = [_clean(line) for line in text.splitlines() if _clean(line)][: self.points_per_section]
+        except Exception as e:
+            if Config.VERBOSE:
+                print(f"⚠️  Incremental summary update failed ({e}); using extractive points")
+            points = merge_points(self.sections[phase], content, self.points_per_section)
+        self.sections[phase] = points
+
+    def summarize(self, sender, recipient, summary_args: Optional[Dict[str, Any]] = None) -> str:
+        for future in self._pending:
+            future.result()
+        self._pending.clear()
+        return self.render()
+
+    def close(self) -> None:
+        """Stop the background worker; updates still queued (e.g. after an aborted chat) are dropped"""
+        self._executor.shutdown(wait=True, cancel_futures=True)
+
+
+def create_summarizer(method: str, config_list: List[Dict[str, Any]]) -> Optional[_PhaseSummarizer]:
+    """
+    Create the summarizer for a summary method.
+
+    Args:
+        method: One of SUMMARY_METHODS
+        config_list: AutoGen config list (used by the incremental summarizer)
+
+    Returns:
+        Optional[_PhaseSummarizer]: None for "reflection_with_llm" (AutoGen built-in)
+
+    Raises:
+        ValueError: If the method is unknown
+    """
+    if method == REFLECTION_METHOD:
+        return None
+    if method == "extractive":
+        return ExtractiveSummarizer()
+    if method == "incremental":
+        return IncrementalSummarizer(config_list)
+    raise ValueError(f"Unknown SUMMARY_METHOD '{method}'. Expected one of: {', '.join(SUMMARY_METHODS)}")
@@ -0,0 +1,118 @@
+"""
+Token accounting for the AutoGen Interview Platform Workflow
+
+Attaches ``shared_tokens`` to the agents of a run:
+
+- Before every reply an agent generates with its LLM, the prompt (system
+  message plus the messages it is about to send) is counted locally and
+  checked against the run budget. ``BudgetExceeded`` stops the GroupChat; in
+  downgrade mode the agent is switched to ``Config.BUDGET_DOWNGRADE_MODEL``.
+- Actual usage is read from each agent's ``OpenAIWrapper`` usage summary, so
+  the budget check always sees what the run has really spent so far.
+
+Speaker selection runs on throwaway agents that AutoGen creates inside the
+GroupChatManager, so those calls are not included.
+
+Usage:
+    from usage import TokenAccountant
+
+    accountant = TokenAccountant("groupchat")
+    accountant.attach([research_agent, analysis_agent])
+    ...
+    accountant.sync()
+    accountant.ledger.print_report()
+"""
+
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
+
+import autogen
+
+from config import Config
+from model_client import activate_model_client
+from shared_config import ConfigSnapshot
+from shared_tokens import BudgetGuard, UsageLedger, count_message_tokens
+
+
+class TokenAccountant:
+    """Pre-flight estimates, actual usage and the budget guard for one AutoGen run"""
+
+    def __init__(self, run_id: str = "groupchat", config: Optional[ConfigSnapshot] = None):
+        config = config or Config.snapshot()
+        self.ledger = UsageLedger(run_id)
+        self.guard = BudgetGuard(self.ledger, config.run_budget_usd, config.run_budget_tokens,
+                                 config.budget_action, config.budget_downgrade_model)
+        self._clients: List[Tuple[str, Any]] = []
+        # (name, model) -> usage already copied into the ledger
+        self._seen: Dict[Tuple[str, str], Tuple[int, int, float]] = {}
+        # name -> client those counts came from (switching models or degrading builds a new client)
+        self._counted: Dict[str, Any] = {}
+
+    def attach(self, agents: Iterable[autogen.ConversableAgent],
+               skip: Optional[Callable[[autogen.ConversableAgent], bool]] = None) -> None:
+        """
+        Register the pre-flight hook on every agent that has an LLM.
+
+        Args:
+            agents: Agents to account for
+            skip: Returns True when an agent's next reply makes no LLM call
+                  (e.g. it is served from cross-run memory); such turns are not estimated
+        """
+        for agent in agents:
+            if not agent.llm_config:
+                continue
+            agent.register_hook("process_all_messages_before_reply", self._preflight_hook(agent, skip))
+            self._clients.append((agent.name, agent))
+
+    def track(self, name: str, client: autogen.OpenAIWrapper) -> None:
+        """Include a bare client (e.g. the incremental summarizer) in actual usage"""
+        self._clients.append((name, client))
+
+    def _preflight_hook(self, agent: autogen.ConversableAgent, skip=None):
+        def hook(messages: List[Dict]) -> List[Dict]:
+            if skip is not None and skip(agent):
+                return messages
+            config = agent.llm_config["config_list"][0]
+            model = config["model"]
+            prompt = [{"content": agent.system_message}] + list(messages or [])
+            prompt_tokens = count_message_tokens(prompt, model)
+            self.sync()
+            allowed = self.guard.check(agent.name, model, prompt_tokens,
+                                       config.get("max_tokens", Config.AGENT_MAX_TOKENS))
+            if allowed != model:
+                self._switch_model(agent, allowed)
+            self.ledger.record_estimate(agent.name, allowed, prompt_tokens)
+            return messages
+        return hook
+
+    @staticmethod
+    def _switch_model(agent: autogen.ConversableAgent, model: str) -> None:
+        """Point an agent at another model for the rest of the run"""
+        agent.llm_config["config_list"] = [{**c, "model": model} for c in agent.llm_config["config_list"]]
+        agent.client = autogen.OpenAIWrapper(**agent.llm_config)
+        activate_model_client([agent])
+
+    def sync(self) -> None:
+        """Copy new actual usage from the tracked clients into the ledger"""
+        for name, holder in self._clients:
+            client = getattr(holder, "client", holder)
+            previous = self._counted.setdefault(name, client)
+            if previous is not client:
+                # Drain the replaced client's last calls, then count the rebuilt one from zero
+                self._copy_usage(name, previous)
+                self._seen = {key: seen for key, seen in self._seen.items() if key[0] != name}
+                self._counted[name] = client
+            self._copy_usage(name, client)
+
+    def _copy_usage(self, name: str, client: Any) -> None:
+        """Record a client's usage since the last copy"""
+        summary = getattr(client, "actual_usage_summary", None) or {}
+        for model, usage in summary.items():
+            if model == "total_cost":
+                continue
+            seen = self._seen.get((name, model), (0, 0, 0.0))
+            current = (usage["prompt_tokens"], usage["completion_tokens"], usage["cost"])
+            if current == seen:
+                continue
+            self.ledger.record_actual(name, model, current[0] - seen[0], current[1] - seen[1],
+                                      cost=current[2] - seen[2])
+            self._seen[(name, model)] = current
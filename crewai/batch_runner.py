@@ -0,0 +1,315 @@
+"""
+Multi-Process Batch Runner for the CrewAI Travel Planning System
+================================================================
+
+Runs a batch of trip requests across a pool of worker processes so large
+batches use every core instead of one per script invocation.
+
+- Requests are split into small shards on a shared job queue. Idle workers
+  pull the next shard as soon as they finish, so a worker stuck on slow trips
+  never holds back work the others could take.
+- Each worker stays warm for the whole batch: LLM clients, tool lookups and
+  one template crew per trip shape are built once and reused. Workers watch
+  the .env file; a change produces a new configuration snapshot for the next
+  trips without restarting the worker or dropping its caches. Edits to the
+  workflow file are picked up the same way.
+- Finished plans are stored in a shared on-disk cache (``shared_cache.DiskCache``)
+  so identical requests are answered once per batch and across batches. Plans
+  with a task output that still failed validation after its repairs are not cached.
+- The parent aggregates progress and metrics from all workers.
+
+Usage:
+    python batch_runner.py trips.jsonl --workers 32
+
+Each line of trips.jsonl holds ``main()`` keyword arguments, e.g.
+    {"id": "t1", "destination": "Iceland", "trip_duration": "5 days", "departure_city": "Boston"}
+Missing fields use the defaults in ``crewai_demo.DEFAULT_TRIP``.
+
+``--offline`` plans the batch through bulk jobs instead, one per workflow stage
+(``offline_batch.py``); it needs no worker processes.
+"""
+
+import argparse
+import json
+import multiprocessing as mp
+import os
+import queue
+import sys
+import time
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+# Add parent directory to path to import shared modules
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from shared_cache import DiskCache
+from shared_tokens import UsageLedger
+
+RESULT_TTL = 24 * 3600  # Seconds a cached trip plan stays valid
+
+
+def plan_cache_key(trip: Dict[str, Any], config, workflow) -> str:
+    """Plan cache key of a trip (``main()`` keyword arguments)"""
+    # Plans depend on the model and the prompts, so a reload of either does not reuse them
+    return DiskCache.make_key({**trip, "model": config.model, "workflow": workflow.version})
+
+
+# ============================================================================
+# WORKER
+# ============================================================================
+
+class TripRunner:
+    """Plans trips in one warm process: template crews, plan cache and config reloads stay in memory."""
+
+    def __init__(self, cache_ttl: float = RESULT_TTL):
+        # Heavy imports happen once per process and stay warm for every later trip
+        import crewai_demo
+        from shared_config import Config
+        from usage import CrewTokenAccountant
+        from validation import validation_results
+
+        self.demo = crewai_demo
+        self.accountant_cls = CrewTokenAccountant
+        self.validation_results = validation_results
+        self.config_cls = Config
+        # Edits to .env reach warm workers as new snapshots; trips in flight keep theirs
+        Config.watch_for_changes()
+        self.cache = DiskCache("trip_results")
+        self.cache_ttl = cache_ttl
+        self.templates: Dict[tuple, Any] = {}
+        self.ledger: Optional[UsageLedger] = None
+        self.validation: List[Dict[str, Any]] = []
+
+    def run(self, request: Dict[str, Any]) -> Tuple[str, bool]:
+        """
+        Plan one trip.
+
+        Args:
+            request: ``main()`` keyword arguments plus "id"; missing fields use DEFAULT_TRIP
+
+        Returns:
+            Tuple[str, bool]: The plan and whether it came from the cache. ``self.ledger``
+            holds the trip's token usage (None for cached plans), also after a failure, and
+            ``self.validation`` the validation results of its task outputs ([] for cached plans).
+        """
+        trip = {**self.demo.DEFAULT_TRIP, **{k: v for k, v in request.items() if k in self.demo.DEFAULT_TRIP}}
+        config = self.config_cls.snapshot()
+        workflow = self.demo.load_travel_workflow()
+        version = (config.version, workflow.version)
+        key = plan_cache_key(trip, config, workflow)
+        self.ledger = None
+        self.validation = []
+        plan = self.cache.get(key)
+        if plan is not None:
+            return plan, True
+
+        shape = tuple(trip[name] for name in self.demo.DEFAULT_TRIP)
+        if (shape, version) not in self.templates:
+            # Templates built on an older snapshot or workflow are dropped after a reload
+            self.templates = {k: v for k, v in self.templates.items() if k[1] == version}
+            self.templates[(shape, version)] = self.demo.build_crew(*shape, log=lambda *a, **k: None, verbose=False,
+                                                                   config=config, workflow=workflow)
+        crew = self.templates[(shape, version)].copy()
+        with self.accountant_cls.for_crew(request.get("id", trip["destination"]), crew, workflow.roles,
+                                         config) as accountant:
+            self.ledger = accountant.ledger
+            result = crew.kickoff(inputs=self.demo.trip_inputs(**trip))
+        plan = str(result)
+        self.validation = [r.to_dict() for r in self.validation_results(crew)]
+        if all(r["passed"] for r in self.validation):
+            self.cache.set(key, plan, ttl=self.cache_ttl)
+        return plan, False
+
+
+_runner: Optional[TripRunner] = None
+
+
+def run_job(payload: Dict[str, Any]) -> Dict[str, Any]:
+    """``shared_jobs`` entry point: plan one trip in this (warm) worker process."""
+    global _runner
+    _runner = _runner or TripRunner()
+    plan, cached = _runner.run(payload)
+    return {"plan": plan, "cached": cached, "validation": _runner.validation,
+            "usage": _runner.ledger.to_dict() if _runner.ledger else None}
+
+
+def _worker_main(worker_id: int, jobs, events, cache_ttl: float) -> None:
+    """Worker process: pull shards until the sentinel, report one event per trip."""
+    runner = TripRunner(cache_ttl)
+
+    while True:
+        shard = jobs.get()
+        if shard is None:
+            break
+        for request in shard:
+            start = time.perf_counter()
+            events.put({"type": "start", "worker": worker_id, "id": request["id"]})
+            try:
+                plan, cached = runner.run(request)
+                events.put({"type": "done", "worker": worker_id, "id": request["id"], "plan": plan,
+                            "cached": cached, "elapsed": time.perf_counter() - start,
+                            "validation": runner.validation,
+                            "usage": runner.ledger.to_dict() if runner.ledger else None})
+            except Exception as e:
+                events.put({"type": "error", "worker": worker_id, "id": request["id"],
+                            "error": f"{type(e).__name__}: {e}", "elapsed": time.perf_counter() - start,
+                            "usage": runner.ledger.to_dict() if runner.ledger else None})
+    events.put({"type": "exit", "worker": worker_id})
+
+
+# ============================================================================
+# PARENT
+# ============================================================================
+
+class BatchMetrics:
+    """Aggregated progress and latency metrics across workers"""
+
+    def __init__(self, total: int):
+        self.total = total
+        self.started_at = time.perf_counter()
+        self.latencies: List[float] = []
+        self.cache_hits = 0
+        self.errors: Dict[str, str] = {}
+        self.per_worker: Dict[int, int] = {}
+        self.repaired = 0  # Task outputs repaired until they passed validation
+        self.invalid = 0  # Task outputs accepted although still failing validation
+        self.usage = UsageLedger("batch")
+
+    @property
+    def finished(self) -> int:
+        return len(self.latencies) + len(self.errors)
+
+    def record(self, event: Dict[str, Any]) -> None:
+        self.per_worker[event["worker"]] = self.per_worker.get(event["worker"], 0) + 1
+        if event.get("usage"):
+            self.usage.merge(UsageLedger.from_dict(event["usage"]))
+        if event["type"] == "error":
+            self.errors[event["id"]] = event["error"]
+        else:
+            self.latencies.append(event["elapsed"])
+            self.cache_hits += event["cached"]
+            for result in event.get("validation", []):
+                self.repaired += result["passed"] and result["repairs"] > 0
+                self.invalid += not result["passed"]
+
+    def percentile(self, q: float) -> float:
+        if not self.latencies:
+            return 0.0
+        ordered = sorted(self.latencies)
+        return ordered[min(len(ordered) - 1, int(q / 100 * len(ordered)))]
+
+    def progress_line(self) -> str:
+        elapsed = time.perf_counter() - self.started_at
+        rate = self.finished / elapsed if elapsed else 0.0
+        return (f"[{self.finished}/{self.total}] {rate:.2f} trips/s | "
+                f"p50 {self.percentile(50):.1f}s p95 {self.percentile(95):.1f}s | "
+                f"cache hits {self.cache_hits} | errors {len(self.errors)} | ${self.usage.total_cost:.4f}")
+
+    def print_report(self) -> None:
+        elapsed = time.perf_counter() - self.started_at
+        print("\n" + "=" * 80)
+        print("BATCH COMPLETE")
+        print("=" * 80)
+        print(f"Trips:        {self.finished}/{self.total} in {elapsed:.1f}s "
+              f"({self.finished / elapsed if elapsed else 0:.2f} trips/s)")
+        print(f"Latency:      p50 {self.percentile(50):.1f}s | p95 {self.percentile(95):.1f}s | "
+              f"max {max(self.latencies, default=0):.1f}s")
+        print(f"Cache hits:   {self.cache_hits}")
+        print(f"Validation:   {self.repaired} task outputs repaired, {self.invalid} accepted with problems")
+        print(f"Errors:       {len(self.errors)}")
+        for request_id, error in list(self.errors.items())[:10]:
+            print(f"  - {request_id}: {error}")
+        print("Per worker:   " + ", ".join(f"w{w}={n}" for w, n in sorted(self.per_worker.items())))
+        self.usage.print_report(f"batch of {self.total} trips")
+
+
+def load_requests(path: Path) -> List[Dict[str, Any]]:
+    """Read trip requests from a JSONL file, assigning ids where missing."""
+    requests = []
+    with open(path) as f:
+        for line_no, line in enumerate(f, 1):
+            if line.strip():
+                request = json.loads(line)
+                request.setdefault("id", f"trip-{line_no}")
+                requests.append(request)
+    return requests
+
+
+def run_batch(requests: List[Dict[str, Any]], workers: Optional[int] = None, shard_size: int = 2,
+              output_path: Optional[Path] = None, cache_ttl: float = RESULT_TTL) -> BatchMetrics:
+    """
+    Run trip requests across worker processes.
+
+    Args:
+        requests: Trip requests (``main()`` keyword arguments plus "id")
+        workers: Number of worker processes (defaults to the CPU count)
+        shard_size: Requests per shard; small shards balance load better
+        output_path: JSONL file for results (one line per request)
+        cache_ttl: Seconds a cached plan stays valid
+
+    Returns:
+        BatchMetrics: Aggregated metrics for the batch
+    """
+    workers = max(1, min(workers or os.cpu_count() or 1, len(requests)))
+    ctx = mp.get_context("spawn")
+    jobs, events = ctx.Queue(), ctx.Queue()
+    for i in range(0, len(requests), shard_size):
+        jobs.put(requests[i:i + shard_size])
+    for _ in range(workers):
+        jobs.put(None)
+
+    processes = [ctx.Process(target=_worker_main, args=(w, jobs, events, cache_ttl), daemon=True)
+                 for w in range(workers)]
+    for process in processes:
+        process.start()
+    print(f"🚀 Running {len(requests)} trips on {workers} worker processes (shard size {shard_size})")
+
+    metrics = BatchMetrics(len(requests))
+    running = workers
+    out = open(output_path, "w") if output_path else None
+    try:
+        while running:
+            try:
+                event = events.get(timeout=5)
+            except queue.Empty:
+                # Stop waiting for workers that died without reporting
+                running = sum(p.is_alive() for p in processes)
+                continue
+            if event["type"] == "exit":
+                running -= 1
+            elif event["type"] in ("done", "error"):
+                metrics.record(event)
+                if out:
+                    out.write(json.dumps({k: v for k, v in event.items() if k not in ("type", "usage")}) + "\n")
+                    out.flush()
+                print(metrics.progress_line())
+    finally:
+        if out:
+            out.close()
+        for process in processes:
+            process.join(timeout=5)
+
+    metrics.print_report()
+    return metrics
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Run a batch of CrewAI trip plans on a process pool")
+    parser.add_argument("requests", type=Path, help="JSONL file with one trip request per line")
+    parser.add_argument("--workers", type=int, default=None, help="Worker processes (default: CPU count)")
+    parser.add_argument("--shard-size", type=int, default=2, help="Requests per shard")
+    parser.add_argument("--output", type=Path, default=Path(__file__).parent / "batch_results.jsonl")
+    parser.add_argument("--offline", action="store_true",
+                        help="Submit each workflow stage as one bulk job (BATCH_BACKEND) instead of running crews")
+    args = parser.parse_args()
+
+    from shared_config import validate_config
+    if not validate_config():
+        exit(1)
+
+    if args.offline:
+        from offline_batch import run_offline
+        run_offline(load_requests(args.requests), args.output)
+    else:
+        run_batch(load_requests(args.requests), args.workers, args.shard_size, args.output)
+    print(f"\n✅ Results saved to {args.output}")
@@ -12,34 +12,54 @@ Agents:
 3. ItineraryAgent - Travel Planner (creates day-by-day itineraries)
 4. BudgetAgent - Financial Advisor (analyzes total costs)
 
+Agents, prompts and tasks are declared in workflows/travel_planning.json
+(CREWAI_WORKFLOW_FILE selects another workflow file).
+
+With a deadline (``main(deadline=...)`` or RUN_DEADLINE) the crew degrades as
+time runs short, skips ``optional`` tasks at the end and, if the deadline
+stops it, reports the partial plan of the tasks that finished.
+
 Configuration:
 - Uses shared configuration from the root .env file
 """
 
+import dataclasses
 import os
 import sys
+from contextlib import nullcontext
 from pathlib import Path
 from datetime import datetime
-from crewai import Agent, Task, Crew
+from functools import lru_cache, partial
+from typing import Collection, Dict, Optional, Set
+from crewai import Agent, Task, Crew, LLM
+from crewai.hooks.dispatch import HookAborted
+from crewai.tasks.conditional_task import ConditionalTask
 from crewai.tools import tool
 
 # Add parent directory to path to import shared_config
 sys.path.insert(0, str(Path(__file__).parent.parent))
 
 # Import shared configuration
-from shared_config import Config, validate_config
+from shared_config import Config, ConfigSnapshot, validate_config
+from shared_budgets import OutputBudgetMonitor
+from shared_cascade import ModelCascade, get_cascade_stats
+from shared_deadline import RunDeadline
+from shared_profiler import RunProfiler
+from shared_retrieval import retrieval_notes
+from shared_tools import get_tool_executor
+from shared_workflow import CompiledWorkflow, NodeSpec, WorkflowError, load_workflow
+from resilient_llm import DEADLINE_ABORT, ResilientLLM
+from usage import CrewTokenAccountant
+from validation import TaskValidator, print_validation_report, validation_results
 
 
 # ============================================================================
 # TOOLS (Real API implementations using web search)
 # ============================================================================
 
-@tool
-def search_flight_prices(destination: str, departure_city: str = "New York") -> str:
-    """
-    Search for flight prices and options to a destination.
-    Returns current flight information from major booking sites.
-    """
+@lru_cache(maxsize=256)
+def lookup_flight_prices(destination: str, departure_city: str = "New York", generic: bool = False) -> str:
+    """Formatted flight search results (cached per process, shared by tools and prefetching)."""
     # Static flight data simulating real search results
     flights_data = {
         "Iceland": [
@@ -56,7 +76,8 @@ def search_flight_prices(destination: str, departure_city: str = "New York") ->
         ],
     }
 
-    key = "Iceland" if "iceland" in destination.lower() or "reykjavik" in destination.lower() else "default"
+    iceland = "iceland" in destination.lower() or "reykjavik" in destination.lower()
+    key = "Iceland" if iceland and not generic else "default"
     results = flights_data[key]
 
     output = f"Flight Search Results: {departure_city} → {destination}\n"
@@ -72,11 +93,17 @@ def search_flight_prices(destination: str, departure_city: str = "New York") ->
 
 
 @tool
-def search_hotel_options(location: str, check_in_date: str) -> str:
+def search_flight_prices(destination: str, departure_city: str = "New York") -> str:
     """
-    Search for hotel options in a location.
-    Returns current hotel availability and pricing information.
+    Search for flight prices and options to a destination.
+    Returns current flight information from major booking sites.
     """
+    return get_tool_executor().call("search_flight_prices", destination=destination, departure_city=departure_city)
+
+
+@lru_cache(maxsize=256)
+def lookup_hotel_options(location: str, check_in_date: str, generic: bool = False) -> str:
+    """Formatted hotel search results (cached per process, shared by tools and prefetching)."""
     # Static hotel data simulating real search results
     hotels_data = {
         "Reykjavik": [
@@ -93,7 +120,8 @@ def search_hotel_options(location: str, check_in_date: str) -> str:
         ],
     }
 
-    key = "Reykjavik" if "reykjavik" in location.lower() or "iceland" in location.lower() else "default"
+    reykjavik = "reykjavik" in location.lower() or "iceland" in location.lower()
+    key = "Reykjavik" if reykjavik and not generic else "default"
     results = hotels_data[key]
 
     output = f"Hotel Search Results: {location} (check-in: {check_in_date})\n"
@@ -109,11 +137,17 @@ def search_hotel_options(location: str, check_in_date: str) -> str:
 
 
 @tool
-def search_attractions_activities(destination: str) -> str:
+def search_hotel_options(location: str, check_in_date: str) -> str:
     """
-    Search for attractions and activities in a destination.
-    Returns popular sites, tours, and experiences with pricing.
+    Search for hotel options in a location.
+    Returns current hotel availability and pricing information.
     """
+    return get_tool_executor().call("search_hotel_options", location=location, check_in_date=check_in_date)
+
+
+@lru_cache(maxsize=256)
+def lookup_attractions_activities(destination: str, generic: bool = False) -> str:
+    """Formatted attractions and activities (cached per process, shared by tools and prefetching)."""
     # Static attractions data simulating real search results
     attractions_data = {
         "Iceland": [
@@ -135,7 +169,8 @@ def search_attractions_activities(destination: str) -> str:
         ],
     }
 
-    key = "Iceland" if "iceland" in destination.lower() or "reykjavik" in destination.lower() else "default"
+    iceland = "iceland" in destination.lower() or "reykjavik" in destination.lower()
+    key = "Iceland" if iceland and not generic else "default"
     results = attractions_data[key]
 
     output = f"Attractions & Activities: {destination}\n"
@@ -149,11 +184,17 @@ def search_attractions_activities(destination: str) -> str:
 
 
 @tool
-def search_travel_costs(destination: str) -> str:
+def search_attractions_activities(destination: str) -> str:
     """
-    Search for travel costs and budgeting information.
-    Returns current pricing for meals, activities, and transportation.
+    Search for attractions and activities in a destination.
+    Returns popular sites, tours, and experiences with pricing.
     """
+    return get_tool_executor().call("search_attractions_activities", destination=destination)
+
+
+@lru_cache(maxsize=256)
+def lookup_travel_costs(destination: str, generic: bool = False) -> str:
+    """Formatted travel cost guide (cached per process, shared by tools and prefetching)."""
     # Static cost data simulating real search results
     costs_data = {
         "Iceland": {
@@ -205,7 +246,8 @@ def search_travel_costs(destination: str) -> str:
         },
     }
 
-    key = "Iceland" if "iceland" in destination.lower() or "reykjavik" in destination.lower() else "default"
+    iceland = "iceland" in destination.lower() or "reykjavik" in destination.lower()
+    key = "Iceland" if iceland and not generic else "default"
     data = costs_data[key]
 
     output = f"Travel Cost Guide: {destination}\n"
@@ -231,179 +273,303 @@ def search_travel_costs(destination: str) -> str:
     return output
 
 
+@tool
+def search_travel_costs(destination: str) -> str:
+    """
+    Search for travel costs and budgeting information.
+    Returns current pricing for meals, activities, and transportation.
+    """
+    return get_tool_executor().call("search_travel_costs", destination=destination)
+
+
 # ============================================================================
-# AGENT DEFINITIONS
+# WORKFLOW (agents and tasks are declared in workflows/travel_planning.json)
 # ============================================================================
 
-def create_flight_agent(destination: str, trip_dates: str):
-    """Create the Flight Specialist agent with real research tools."""
-    return Agent(
-        role="Flight Specialist",
-        goal=f"Research and recommend the best flight options for the {destination} trip "
-             f"({trip_dates}), considering dates, airlines, prices, and flight durations. "
-             f"Use real data from flight booking sites to provide accurate, current pricing.",
-        backstory="You are an experienced flight specialist with deep knowledge of "
-                  "airline schedules, pricing patterns, and travel routes. You excel at "
-                  "finding the best flight options that balance cost and convenience. "
-                  "You have booked thousands of flights and know the best times to fly. "
-                  "You always research current prices and use real booking site data.",
-        tools=[search_flight_prices],
-        verbose=True,
-        allow_delegation=False
-    )
+WORKFLOW_FILE = os.getenv("CREWAI_WORKFLOW_FILE", str(Path(__file__).parent / "workflows" / "travel_planning.json"))
 
+# Tools a workflow file may assign to its agents, by name
+TOOLS = {
+    "search_flight_prices": search_flight_prices,
+    "search_hotel_options": search_hotel_options,
+    "search_attractions_activities": search_attractions_activities,
+    "search_travel_costs": search_travel_costs,
+}
 
-def create_hotel_agent(destination: str, trip_dates: str):
-    """Create the Accommodation Specialist agent with real research tools."""
-    # Determine main city for hotels (if destination is just a country, use capital)
-    hotel_location = destination
-    if destination.lower() == "iceland":
-        hotel_location = "Reykjavik"
-    elif destination.lower() == "france":
-        hotel_location = "Paris"
-    elif destination.lower() == "japan":
-        hotel_location = "Tokyo"
+# Plain functions behind the tools, called directly when a task's tool calls are prefetched
+LOOKUPS = {
+    "search_flight_prices": lookup_flight_prices,
+    "search_hotel_options": lookup_hotel_options,
+    "search_attractions_activities": lookup_attractions_activities,
+    "search_travel_costs": lookup_travel_costs,
+}
 
-    return Agent(
-        role="Accommodation Specialist",
-        goal=f"Suggest top-rated hotels in {hotel_location} for the {destination} trip "
-             f"({trip_dates}), considering amenities, location, and value for money. "
-             f"Use real hotel data from booking sites with current prices and reviews.",
-        backstory="You are a seasoned accommodation expert with extensive knowledge of "
-                  "hotels worldwide. You understand traveler needs and can match them with "
-                  "perfect accommodations. You read reviews meticulously and know which "
-                  "hotels offer the best experience for different budgets. You always "
-                  "check current availability and actual guest reviews.",
-        tools=[search_hotel_options],
-        verbose=True,
-        allow_delegation=False
-    )
+# Tools and prefetches call the lookups through the tool executor: bounded pool, timeouts, and
+# on failure the last good result or the lookup's generic "default" entries
+for _name, _lookup in LOOKUPS.items():
+    get_tool_executor().register(_name, _lookup, default=partial(_lookup, generic=True))
 
+# Workflow keys interpreted here rather than passed to Agent()/Task()
+AGENT_KEYS = {"key", "tools", "llm_role", "generation", "progress"}
+TASK_KEYS = {"key", "agent", "context", "retrieval", "prefetch", "validation", "optional"}
 
-def create_itinerary_agent(destination: str, trip_duration: str):
-    """Create the Travel Planner agent with real research tools."""
-    return Agent(
-        role="Travel Planner",
-        goal=f"Create a detailed day-by-day travel plan with activities and attractions "
-             f"that maximize the {destination} experience in {trip_duration}. "
-             f"Use real current information about attractions, opening hours, and accessibility.",
-        backstory=f"You are a creative travel planner with a passion for {destination}. "
-                  f"You have extensive knowledge of {destination}'s attractions, culture, and hidden gems. "
-                  f"You create itineraries that are well-paced, exciting, and memorable. "
-                  f"You consider travel times, weather, and traveler preferences to craft the perfect journey. "
-                  f"You always verify current information about attractions and tours.",
-        tools=[search_attractions_activities],
-        verbose=True,
-        allow_delegation=False
+
+def load_travel_workflow(path: Optional[str] = None) -> CompiledWorkflow:
+    """The compiled travel planning workflow (recompiled only when the file changes)."""
+    return load_workflow(path or WORKFLOW_FILE, tools=TOOLS)
+
+
+@lru_cache(maxsize=64)
+def create_llm(role: str, config: Optional[ConfigSnapshot] = None, generation: str = "direct"):
+    """
+    Create the agent LLM with the role's output budget enforced via max_tokens.
+
+    LLMs are cached per (role, config snapshot, generation mode): runs on the same
+    snapshot share clients, and a reloaded configuration gets new ones without
+    disturbing runs still using the old snapshot. ``generation`` is the agent's
+    default mode ("direct" or "draft_refine"), used when DRAFT_ROLES is empty.
+    Roles in LOCAL_ROLES run on the local model, without drafting or the cascade.
+    """
+    config = config or Config.snapshot()
+    model = config.model if "/" in config.model else f"openai/{config.model}"
+    local = config.runs_locally(role)
+    if local:
+        # Token accounting and budget checks then see the local model (no cost)
+        from shared_local_llm import local_model_name
+        model = f"openai/{local_model_name()}"
+    draft = config.drafts(role, default=generation == "draft_refine") and not local
+    cascade = ModelCascade(config.model_cascade) if config.model_cascade and not local else None
+    # ResilientLLM adds retries, per-attempt deadlines, hedged requests, the semantic cache,
+    # draft-and-refine generation, the model cascade, run deadlines and the local model
+    call_layer = (config.resilient_calls or config.semantic_cache or draft or cascade is not None
+                  or config.run_deadline > 0 or local)
+    llm_cls = ResilientLLM if call_layer else LLM
+    llm = llm_cls(
+        model=model,
+        base_url=config.api_base,
+        api_key=config.api_key,
+        temperature=config.agent_temperature,
+        max_tokens=config.get_max_tokens(role),
+        timeout=config.agent_timeout,
     )
+    if not call_layer:
+        return llm
+    return llm.bind_config(config, cache_scope=f"crewai/{role}", draft=draft, cascade=cascade, local=local)
 
 
-def create_budget_agent(destination: str):
-    """Create the Financial Advisor agent with real cost research tools."""
+def create_agent(spec: NodeSpec, values: dict, config: Optional[ConfigSnapshot] = None,
+                 prefetched: Collection[str] = ()):
+    """Instantiate a workflow agent with its tools (minus ``prefetched`` ones) and role LLM."""
+    fields = spec.render(values)
     return Agent(
-        role="Financial Advisor",
-        goal=f"Calculate total trip costs for {destination} and identify cost-saving opportunities "
-             f"while maintaining quality. Use real current pricing data for all expenses.",
-        backstory="You are a meticulous financial advisor specializing in travel budgeting. "
-                  "You can analyze costs across flights, accommodations, activities, and meals. "
-                  "You identify hidden costs and suggest smart ways to save money without "
-                  "compromising the travel experience. You research actual current prices "
-                  "and provide realistic budget estimates.",
-        tools=[search_travel_costs],
-        verbose=True,
-        allow_delegation=False
+        **{k: v for k, v in fields.items() if k not in AGENT_KEYS},
+        tools=[TOOLS[name] for name in fields.get("tools", []) if name not in prefetched],
+        llm=create_llm(fields.get("llm_role", spec.key), config, fields.get("generation", "direct")),
     )
 
 
+def prefetch_results(calls: list) -> str:
+    """
+    Run a task's declared tool calls now (concurrently, through the tool executor) and format
+    their results for its description.
+
+    Args:
+        calls: Rendered ``prefetch`` entries ({"tool": name, "args": {...}})
+
+    Returns:
+        str: The results, or "" when there are no calls
+    """
+    unknown = [call["tool"] for call in calls if call["tool"] not in LOOKUPS]
+    if unknown:
+        raise WorkflowError(f"Cannot prefetch tools {unknown}; prefetchable tools: {sorted(LOOKUPS)}")
+    outputs = get_tool_executor().call_many([(call["tool"], call.get("args", {})) for call in calls])
+    results = [f"### {call['tool']}\n{output}" for call, output in zip(calls, outputs)]
+    if not results:
+        return ""
+    return ("\n\nThe tool results below were already retrieved for this task. Base your answer on them "
+            "directly; do not call any tool.\n\n" + "\n\n".join(results))
+
+
+def prefetched_tools(workflow: CompiledWorkflow, values: dict) -> Dict[str, Set[str]]:
+    """Tools each agent no longer needs because its tasks' calls are prefetched, by agent key."""
+    prefetched: Dict[str, Set[str]] = {}
+    for spec in workflow.tasks:
+        calls = spec.render(values).get("prefetch") or []
+        prefetched.setdefault(spec.get("agent"), set()).update(call["tool"] for call in calls)
+    return prefetched
+
+
+def create_task(spec: NodeSpec, values: dict, agents: dict, tasks: dict,
+                config: Optional[ConfigSnapshot] = None, deadline: Optional[RunDeadline] = None):
+    """
+    Instantiate a workflow task, appending retrieved notes to its description.
+
+    Tasks with ``validation`` checks get a TaskValidator guardrail (unless
+    OUTPUT_VALIDATION is off), so a failing output is repaired on its own. With
+    TOOL_PREFETCH on, the results of the task's ``prefetch`` tool calls are
+    appended as well. Under a model cascade every task gets a validator, which
+    escalates its agent's LLM when the output fails. Under a ``deadline``,
+    ``optional`` tasks are skipped once the deadline reaches its wrap-up level.
+    """
+    config = config or Config.snapshot()
+    fields = spec.render(values)
+    kwargs = {k: v for k, v in fields.items() if k not in TASK_KEYS}
+    if fields.get("retrieval"):
+        kwargs["description"] = kwargs.get("description", "") + retrieval_notes(fields["retrieval"])
+    if fields.get("prefetch") and config.tool_prefetch:
+        kwargs["description"] = kwargs.get("description", "") + prefetch_results(fields["prefetch"])
+    if "context" in fields:
+        kwargs["context"] = [tasks[key] for key in fields["context"]]
+    agent = agents[fields["agent"]]
+    checks = (fields.get("validation") or []) if config.output_validation else []
+    cascade = getattr(agent.llm, "cascade", None)
+    if checks or cascade is not None:
+        validator = TaskValidator(spec.key, checks, config.validation_max_repairs, cascade=cascade)
+        kwargs["guardrail"] = validator.validate
+        kwargs["guardrail_max_retries"] = validator.max_retries
+    if fields.get("optional") and deadline is not None:
+        return ConditionalTask(agent=agent, condition=lambda _: not deadline.skip_optional, **kwargs)
+    return Task(agent=agent, **kwargs)
+
+
 # ============================================================================
-# TASK DEFINITIONS
+# CREW ORCHESTRATION
 # ============================================================================
 
-def create_flight_task(flight_agent, destination: str, trip_dates: str, departure_city: str):
-    """Define the flight research task using real data."""
-    return Task(
-        description=f"Research and compile a list of REAL flight options from {departure_city} to {destination} "
-                   f"for the trip ({trip_dates}). "
-                   f"Use actual current flight data from booking sites like Skyscanner, Kayak, "
-                   f"Google Flights, or Expedia. Find at least 2-3 different flight options from "
-                   f"major airlines, including details about departure times, arrival times, "
-                   f"duration, and current realistic prices. Provide "
-                   f"recommendations on which flight offers the best value considering both "
-                   f"price and convenience.",
-        agent=flight_agent,
-        expected_output=f"A detailed report with 2-3 REAL flight options from {departure_city} to {destination} "
-                       f"including airlines, times, duration, current prices, and a recommendation with reasoning based on "
-                       f"actual data from flight booking sites"
-    )
+# Default trip parameters (same as main()'s defaults)
+DEFAULT_TRIP = {
+    "destination": "Iceland",
+    "trip_duration": "5 days",
+    "trip_dates": "January 15-20, 2026",
+    "departure_city": "New York",
+    "travelers": 2,
+    "budget_preference": "mid-range"
+}
+
+
+def trip_inputs(destination: str, trip_duration: str, trip_dates: str, departure_city: str,
+                travelers: int, budget_preference: str) -> dict:
+    """Inputs passed to crew.kickoff()."""
+    return {
+        "trip_destination": destination,
+        "trip_duration": trip_duration,
+        "trip_dates": trip_dates,
+        "departure_city": departure_city,
+        "travelers": travelers,
+        "budget_preference": budget_preference
+    }
 
 
-def create_hotel_task(hotel_agent, destination: str, trip_dates: str):
-    """Define the hotel recommendation task using real data."""
-    # Determine main city for hotels
-    hotel_location = destination
-    if destination.lower() == "iceland":
-        hotel_location = "Reykjavik"
-    elif destination.lower() == "france":
-        hotel_location = "Paris"
-    elif destination.lower() == "japan":
-        hotel_location = "Tokyo"
-
-    return Task(
-        description=f"Based on the trip dates ({trip_dates}), find and recommend "
-                   f"the top 3-4 REAL hotels in {hotel_location}. Research actual hotels "
-                   f"on Booking.com, TripAdvisor, Google Hotels, and Expedia. For each hotel, "
-                   f"provide the actual name, current guest ratings, real prices per night, "
-                   f"confirmed amenities, and explain why it suits this trip. "
-                   f"Include a mix of budget, mid-range, and luxury options with honest reviews.",
-        agent=hotel_agent,
-        expected_output=f"A curated list of 3-4 REAL hotel recommendations in {hotel_location} with actual details "
-                       f"about each hotel, confirmed amenities, real guest ratings, current prices, "
-                       f"and personalized recommendations based on actual guest reviews"
+def build_crew(destination: str, trip_duration: str, trip_dates: str, departure_city: str,
+               travelers: int = 2, budget_preference: str = "mid-range", log=print, verbose: bool = True, config: Optional[ConfigSnapshot] = None,
+               workflow: Optional[CompiledWorkflow] = None, deadline: Optional[RunDeadline] = None):
+    """
+    Instantiate the agents and tasks of the workflow as a crew.
+
+    Args:
+        destination: Travel destination
+        trip_duration: Duration of trip
+        trip_dates: Specific dates
+        departure_city: City you're departing from
+        travelers: Number of travelers
+        budget_preference: Budget level ("budget", "mid-range", "luxury")
+        log: Progress printer (pass a no-op to build quietly, e.g. in batch workers)
+        verbose: CrewAI verbose output
+        config: Configuration snapshot for the run (default: the current one)
+        workflow: Compiled workflow (default: CREWAI_WORKFLOW_FILE)
+        deadline: Run deadline; each finished task ends one of its steps
+
+    Returns:
+        Crew: The travel planning crew
+    """
+    config = config or Config.snapshot()
+    workflow = workflow or load_travel_workflow()
+    values = workflow.values({
+        "destination": destination,
+        "trip_duration": trip_duration,
+        "trip_dates": trip_dates,
+        "departure_city": departure_city,
+        "travelers": travelers,
+        "budget_preference": budget_preference,
+    })
+
+    # Tool calls fully determined by the trip run now, so agents skip the tool round-trip
+    prefetched = prefetched_tools(workflow, values) if config.tool_prefetch else {}
+    if prefetched:
+        log(f"Tool prefetch: {sum(len(t) for t in prefetched.values())} tool results go straight into the tasks")
+
+    agents = {}
+    for i, spec in enumerate(workflow.agents, 1):
+        progress = spec.get("progress")
+        log(f"[{i}/{len(workflow.agents)}] Creating {spec.get('role').render(values)} Agent"
+            + (f" ({progress.render(values)})..." if progress else "..."))
+        agents[spec.key] = create_agent(spec, values, config, prefetched.get(spec.key, ()))
+
+    log("\n✅ All agents created successfully!")
+    log()
+
+    log("Creating tasks for the crew...")
+    tasks = {}
+    for spec in workflow.tasks:
+        tasks[spec.key] = create_task(spec, values, agents, tasks, config, deadline)
+
+    log("Tasks created successfully!")
+    log()
+
+    process = workflow.setting("process", values, "sequential")
+    log(f"Forming the Travel Planning Crew ({workflow.name})...")
+    log("Task Sequence: " + " → ".join(f"{spec.get('agent').title()}Agent" for spec in workflow.tasks))
+    log()
+
+    return Crew(
+        agents=list(agents.values()),
+        tasks=list(tasks.values()),
+        verbose=verbose,
+        process=process,
+        task_callback=(lambda _: deadline.end_step()) if deadline else None,
     )
 
 
-def create_itinerary_task(itinerary_agent, destination: str, trip_duration: str, trip_dates: str):
-    """Define the itinerary planning task using real information."""
-    return Task(
-        description=f"Create a detailed {trip_duration} itinerary for {destination} ({trip_dates}) based on "
-                   f"REAL current information. Research actual attractions, their opening hours, "
-                   f"accessibility, and entry fees. Plan day-by-day activities including visits "
-                   f"to real attractions and verified sites. Include realistic estimated travel times between "
-                   f"locations, activity durations, and recommended visit times. Consider actual "
-                   f"weather patterns for this time period in {destination} and make the itinerary realistic and well-paced.",
-        agent=itinerary_agent,
-        expected_output=f"A detailed day-by-day itinerary for {destination} with REAL activities based on verified "
-                       f"attractions, realistic travel times, accurate estimated durations, current "
-                       f"entry fees, and practical tips for {trip_duration} trip to {destination}"
-    )
+def partial_plan(workflow: CompiledWorkflow, crew: Crew) -> Optional[str]:
+    """
+    The plan made of the finished tasks' outputs, if some tasks did not finish.
 
+    Args:
+        workflow: Compiled workflow of the crew
+        crew: The crew after kickoff (or after the deadline stopped it)
 
-def create_budget_task(budget_agent, destination: str, trip_duration: str):
-    """Define the budget calculation task using real cost data."""
-    return Task(
-        description=f"Based on the REAL flight options, hotel recommendations, and itinerary "
-                   f"created by the other agents, calculate a comprehensive budget for the "
-                   f"{trip_duration} {destination} trip using current pricing. Research and include actual "
-                   f"costs for flights, accommodation, meals (use real restaurant prices in the destination), "
-                   f"activities/tours (verified prices), transportation within {destination}, "
-                   f"and miscellaneous expenses. Provide total cost estimates "
-                   f"for budget, mid-range, and luxury options based on real prices. Suggest "
-                   f"genuine cost-saving tips based on current market conditions.",
-        agent=budget_agent,
-        expected_output=f"A comprehensive budget report with itemized REAL costs for flights, "
-                       f"accommodation, meals, activities with actual entry fees, transportation, "
-                       f"and total realistic estimates at different budget levels, plus "
-                       f"evidence-based cost-saving recommendations for a {trip_duration} trip to {destination}"
-    )
+    Returns:
+        Optional[str]: The partial plan, or None when every task finished
+    """
+    finished, missing = [], []
+    for spec, task in zip(workflow.tasks, crew.tasks):
+        if task.output is not None and task.output.raw:
+            finished.append(f"## {task.agent.role}\n\n{task.output.raw}")
+        else:
+            missing.append(task.agent.role)
+    if not missing:
+        return None
+    note = f"PARTIAL PLAN: stopped by the run deadline before {', '.join(missing)} finished."
+    return "\n\n".join([note] + finished)
 
 
-# ============================================================================
-# CREW ORCHESTRATION
-# ============================================================================
+def profile_tasks(profiler: RunProfiler, workflow: CompiledWorkflow, crew: Crew) -> None:
+    """Label the profiler's steps with the running task: the first one now, the next one as each finishes"""
+    keys = iter([spec.key for spec in workflow.tasks][1:])
+    previous = crew.task_callback
+
+    def task_done(output):
+        if previous:
+            previous(output)
+        profiler.step(next(keys, "(report)"))
+
+    profiler.step(workflow.tasks[0].key)
+    crew.task_callback = task_done
+
 
 def main(destination: str = "Iceland", trip_duration: str = "5 days",
          trip_dates: str = "January 15-20, 2026", departure_city: str = "New York",
-         travelers: int = 2, budget_preference: str = "mid-range"):
+         travelers: int = 2, budget_preference: str = "mid-range", deadline: Optional[float] = None):
     """
     Main function to orchestrate the travel planning crew.
 
@@ -414,6 +580,7 @@ def main(destination: str = "Iceland", trip_duration: str = "5 days",
         departure_city: City you're departing from (e.g., "New York", "Los Angeles")
         travelers: Number of travelers
         budget_preference: Budget level ("budget", "mid-range", "luxury")
+        deadline: Seconds the run may take (default RUN_DEADLINE; 0 = no deadline)
     """
 
     print("=" * 80)
@@ -434,14 +601,10 @@ def main(destination: str = "Iceland", trip_duration: str = "5 days",
         print("❌ Configuration validation failed. Please set up your .env file.")
         exit(1)
 
-    # Set environment variables for CrewAI (it reads from os.environ)
-    # CrewAI uses OPENAI_API_KEY and OPENAI_API_BASE environment variables
-    os.environ["OPENAI_API_KEY"] = Config.API_KEY
-    os.environ["OPENAI_API_BASE"] = Config.API_BASE
-    
-    # For Groq compatibility, also set OPENAI_MODEL_NAME
-    if Config.USE_GROQ:
-        os.environ["OPENAI_MODEL_NAME"] = Config.OPENAI_MODEL
+    # One immutable snapshot for the whole run; nothing is written to os.environ
+    config = Config.snapshot()
+    if deadline is not None:
+        config = dataclasses.replace(config, run_deadline=deadline)
 
     print("✅ Configuration validated successfully!")
     print()
@@ -453,66 +616,74 @@ def main(destination: str = "Iceland", trip_duration: str = "5 days",
     print("Tip: Check your API usage at https://platform.openai.com/account/usage")
     print()
 
-    # Create agents with destination parameters
-    print("[1/4] Creating Flight Specialist Agent (researches real flights)...")
-    flight_agent = create_flight_agent(destination, trip_dates)
-
-    print("[2/4] Creating Accommodation Specialist Agent (researches real hotels)...")
-    hotel_agent = create_hotel_agent(destination, trip_dates)
-
-    print("[3/4] Creating Travel Planner Agent (researches real attractions)...")
-    itinerary_agent = create_itinerary_agent(destination, trip_duration)
-
-    print("[4/4] Creating Financial Advisor Agent (analyzes real costs)...")
-    budget_agent = create_budget_agent(destination)
-
-    print("\n✅ All agents created successfully!")
-    print()
-
-    # Create tasks with destination parameters
-    print("Creating tasks for the crew...")
-    flight_task = create_flight_task(flight_agent, destination, trip_dates, departure_city)
-    hotel_task = create_hotel_task(hotel_agent, destination, trip_dates)
-    itinerary_task = create_itinerary_task(itinerary_agent, destination, trip_duration, trip_dates)
-    budget_task = create_budget_task(budget_agent, destination, trip_duration)
-
-    print("Tasks created successfully!")
-    print()
-
-    # Create the crew with sequential task execution
-    print("Forming the Travel Planning Crew...")
-    print("Task Sequence: FlightAgent → HotelAgent → ItineraryAgent → BudgetAgent")
-    print()
-
-    crew = Crew(
-        agents=[flight_agent, hotel_agent, itinerary_agent, budget_agent],
-        tasks=[flight_task, hotel_task, itinerary_task, budget_task],
-        verbose=True,
-        process="sequential"  # Sequential task execution
-    )
+    workflow = load_travel_workflow()
+    run_deadline = RunDeadline(config.run_deadline, steps=len(workflow.tasks)) if config.run_deadline else None
+    profiler = RunProfiler(f"crewai/{destination.lower()}") if Config.PROFILE else None
+    with profiler.activate() if profiler else nullcontext():
+        crew = build_crew(destination, trip_duration, trip_dates, departure_city, travelers, budget_preference,
+                          config=config, workflow=workflow, deadline=run_deadline)
+    if profiler:
+        profile_tasks(profiler, workflow, crew)
 
     # Execute the crew
     print("=" * 80)
     print("Starting Crew Execution with REAL API Calls...")
     print(f"Planning {trip_duration} trip to {destination} ({trip_dates})")
+    if run_deadline:
+        print(f"⏱️  Deadline: {run_deadline.seconds:g}s")
     print("=" * 80)
     print()
 
+    accountant = CrewTokenAccountant.for_crew(destination, crew, workflow.roles, config)
     try:
-        result = crew.kickoff(inputs={
-            "trip_destination": destination,
-            "trip_duration": trip_duration,
-            "trip_dates": trip_dates,
-            "departure_city": departure_city,
-            "travelers": travelers,
-            "budget_preference": budget_preference
-        })
+        try:
+            with accountant, run_deadline.activate() if run_deadline else nullcontext(), \
+                    profiler.activate() if profiler else nullcontext():
+                result = crew.kickoff(inputs=trip_inputs(destination, trip_duration, trip_dates,
+                                                         departure_city, travelers, budget_preference))
+        except HookAborted as e:
+            if e.source != DEADLINE_ABORT:
+                raise
+            print(f"\n⏱️  Deadline reached: {e.reason}; keeping the finished tasks")
+            result = None
+        partial = partial_plan(workflow, crew) if run_deadline else None
+        if partial:
+            result = partial
 
         print()
         print("=" * 80)
-        print("✅ Crew Execution Completed Successfully!")
+        print("⏱️  Crew Stopped by the Deadline (partial plan)" if partial else "✅ Crew Execution Completed Successfully!")
         print("=" * 80)
         print()
+        # Track output lengths against each task's budget and flag truncations
+        budget_monitor = OutputBudgetMonitor()
+        for role, task in zip(workflow.roles, crew.tasks):
+            if task.output is not None and task.output.raw:
+                budget_monitor.record(role, task.output.raw)
+        budget_monitor.print_report()
+        budget_monitor.save()
+        print_validation_report(validation_results(crew))
+        get_tool_executor().print_report()
+        accountant.ledger.print_report(f"Trip to {destination}")
+        if config.semantic_cache:
+            from shared_semantic_cache import get_semantic_cache
+            get_semantic_cache().print_report()
+        if config.draft_refine:
+            from shared_draft import get_draft_stats
+            get_draft_stats().print_report()
+        if config.model_cascade:
+            get_cascade_stats().print_report()
+            get_cascade_stats().save()
+        if config.local_roles:
+            from shared_local_llm import print_local_report
+            print_local_report()
+        if run_deadline:
+            run_deadline.print_report(partial=bool(partial))
+        if profiler:
+            profiler.print_report()
+            profiler.save()
+        print()
+
         print(f"FINAL TRAVEL PLAN REPORT FOR {destination.upper()} (Based on Real API Data):")
         print("-" * 80)
         print(result)
@@ -552,6 +723,7 @@ def main(destination: str = "Iceland", trip_duration: str = "5 days",
         print("    and research of current travel information sources.")
 
     except Exception as e:
+        accountant.ledger.print_report(f"Trip to {destination} (failed)")
         print(f"\n❌ Error during crew execution: {str(e)}")
         print("\n🔍 Troubleshooting:")
         print("   1. Verify OPENAI_API_KEY is set: export OPENAI_API_KEY='sk-...'")
@@ -567,14 +739,7 @@ if __name__ == "__main__":
     # Allow command line arguments to override defaults
     import sys
 
-    kwargs = {
-        "destination": "Iceland",
-        "trip_duration": "5 days",
-        "trip_dates": "January 15-20, 2026",
-        "departure_city": "New York",
-        "travelers": 2,
-        "budget_preference": "mid-range"
-    }
+    kwargs = dict(DEFAULT_TRIP)
 
     # Parse command line arguments (optional)
     # Usage: python crewai_demo.py [destination] [duration] [departure_city]
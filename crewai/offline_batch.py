@@ -0,0 +1,245 @@
+"""
+Offline Bulk Mode for the CrewAI Travel Planning System
+=======================================================
+
+Plans a batch of trips stage by stage through bulk jobs (``shared_batch.py``)
+instead of one crew kickoff, and one synchronous call after another, per trip.
+
+- Each workflow task is a stage. Its prompts for all queued trips are compiled
+  into one bulk job file. Each prompt holds the agent's role, goal and backstory,
+  the task with its expected output, retrieved notes, prefetched tool results,
+  and the trip's earlier task outputs as context (all of them, as in a
+  sequential crew, unless the task names its ``context``). The job's results
+  feed the next stage.
+- There is no agent loop to call tools, so every task's ``prefetch`` calls run
+  while its prompt is compiled.
+- Outputs are checked with the task's ``validation`` checks. Failing outputs
+  get a repair request in a follow-up job of the same stage, for up to
+  ``VALIDATION_MAX_REPAIRS`` rounds.
+- A trip whose request fails is dropped from the later stages and reported
+  as an error.
+- Plans share the batch runner's cache, so trips planned either way are reused.
+  Draft-and-refine and the model cascade are not applied in bulk mode.
+
+Usage:
+    python batch_runner.py trips.jsonl --offline
+    BATCH_BACKEND=provider python batch_runner.py trips.jsonl --offline
+"""
+
+import json
+import sys
+import time
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+# Add parent directory to path to import shared modules
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from shared_batch import BatchBackend, BatchRequest, BatchResult, get_batch_backend, run_batch_job
+from shared_cache import DiskCache
+from shared_config import Config, ConfigSnapshot
+from shared_retrieval import retrieval_notes
+from shared_tokens import UsageLedger, count_message_tokens
+
+import crewai_demo
+from batch_runner import RESULT_TTL, plan_cache_key
+from validation import TaskValidator, ValidationResult, print_validation_report
+
+# CrewAI's separator between the outputs of earlier tasks in a task's context
+CONTEXT_SEPARATOR = "\n\n----------\n\n"
+
+
+def agent_prompt(fields: Dict[str, Any]) -> str:
+    """System prompt of a rendered agent spec, in CrewAI's wording"""
+    return f"You are {fields['role']}. {fields['backstory']}\nYour personal goal is: {fields['goal']}"
+
+
+def task_prompt(fields: Dict[str, Any], description: str, context: str) -> str:
+    """User prompt of a rendered task spec, in CrewAI's wording"""
+    prompt = (f"Current Task: {description}\n\n"
+              f"This is the expected criteria for your final answer: {fields['expected_output']}\n"
+              "you MUST return the actual complete content as the final answer, not a summary.")
+    if context:
+        prompt += f"\n\nThis is the context you're working with:\n{context}"
+    return prompt + "\n\nBegin! This is VERY important to you, give your best Final Answer, your job depends on it!"
+
+
+class OfflineTrip:
+    """One queued trip: its template values and the outputs of the stages it has passed"""
+
+    def __init__(self, request: Dict[str, Any], workflow):
+        self.id = request["id"]
+        self.trip = {**crewai_demo.DEFAULT_TRIP,
+                     **{k: v for k, v in request.items() if k in crewai_demo.DEFAULT_TRIP}}
+        self.values = workflow.values(self.trip)
+        self.outputs: Dict[str, str] = {}
+        self.validation: List[ValidationResult] = []
+        self.error = ""
+
+
+class OfflinePlanner:
+    """Runs the workflow's tasks as one bulk job per stage across all queued trips"""
+
+    def __init__(self, backend: Optional[BatchBackend] = None, config: Optional[ConfigSnapshot] = None,
+                 cache_ttl: float = RESULT_TTL, log=print):
+        self.config = config or Config.snapshot()
+        self.backend = backend or get_batch_backend(config=self.config)
+        self.workflow = crewai_demo.load_travel_workflow()
+        self.cache = DiskCache("trip_results")
+        self.cache_ttl = cache_ttl
+        self.ledger = UsageLedger("offline batch")
+        self.jobs = 0
+        self.repairs = 0
+        self.log = log
+
+    def run(self, requests: List[Dict[str, Any]]) -> Dict[str, Dict[str, Any]]:
+        """
+        Plan trips through bulk jobs.
+
+        Args:
+            requests: Trip requests (``main()`` keyword arguments plus "id")
+
+        Returns:
+            Dict[str, Dict[str, Any]]: Result per trip id (plan, cached, validation or error)
+        """
+        results: Dict[str, Dict[str, Any]] = {}
+        trips = []
+        for request in requests:
+            trip = OfflineTrip(request, self.workflow)
+            plan = self.cache.get(self._cache_key(trip))
+            if plan is not None:
+                results[trip.id] = {"id": trip.id, "plan": plan, "cached": True, "validation": []}
+            else:
+                trips.append(trip)
+        if len(trips) < len(requests):
+            self.log(f"♻️  {len(requests) - len(trips)} trips answered from the plan cache")
+
+        for spec in self.workflow.tasks:
+            active = [trip for trip in trips if not trip.error]
+            if not active:
+                break
+            self._run_stage(spec, active)
+
+        final = self.workflow.tasks[-1].key
+        for trip in trips:
+            if trip.error:
+                results[trip.id] = {"id": trip.id, "error": trip.error}
+                continue
+            plan = trip.outputs[final]
+            validation = [r.to_dict() for r in trip.validation]
+            if all(r["passed"] for r in validation):
+                self.cache.set(self._cache_key(trip), plan, ttl=self.cache_ttl)
+            results[trip.id] = {"id": trip.id, "plan": plan, "cached": False, "validation": validation}
+        return results
+
+    def _cache_key(self, trip: OfflineTrip) -> str:
+        return plan_cache_key(trip.trip, self.config, self.workflow)
+
+    def _run_stage(self, spec, trips: List[OfflineTrip]) -> None:
+        """One task for every trip: the bulk job, then repair jobs for failing outputs"""
+        agent_fields = self.workflow.agent(spec.get("agent")).render(trips[0].values)
+        role = agent_fields.get("llm_role", spec.get("agent"))
+        params = {"max_tokens": self.config.get_max_tokens(role), "temperature": self.config.agent_temperature}
+        max_repairs = self.config.validation_max_repairs
+        conversations, validators = {}, {}
+        for trip in trips:
+            fields = spec.render(trip.values)
+            conversations[trip.id] = self._messages(fields, trip)
+            checks = (fields.get("validation") or []) if self.config.output_validation else []
+            validators[trip.id] = TaskValidator(spec.key, checks, max_repairs) if checks else None
+
+        by_id = {trip.id: trip for trip in trips}
+        pending = list(by_id)
+        for repair in range(max_repairs + 1):
+            name = f"{self.workflow.name}_{spec.key}" + (f"_repair{repair}" if repair else "")
+            requests = [BatchRequest(f"{trip_id}/{spec.key}", conversations[trip_id], params) for trip_id in pending]
+            outcomes = run_batch_job(requests, name, self.backend, self.config, self.log)
+            self.jobs += 1
+            failing = []
+            for trip_id in pending:
+                trip, outcome = by_id[trip_id], outcomes[f"{trip_id}/{spec.key}"]
+                self._record_usage(spec.key, conversations[trip_id], outcome)
+                if outcome.ok:
+                    trip.outputs[spec.key] = outcome.text
+                elif spec.key not in trip.outputs:
+                    trip.error = f"{spec.key}: {outcome.error}"
+                    continue
+                validator = validators[trip_id]
+                if validator is None:
+                    continue
+                problems = validator.problems(trip.outputs[spec.key])
+                if problems and outcome.ok and repair < max_repairs:
+                    conversations[trip_id] = conversations[trip_id] + [
+                        {"role": "assistant", "content": outcome.text},
+                        {"role": "user", "content": validator.REPAIR_PROMPT.format(
+                            problems="\n".join(f"- {p}" for p in problems))},
+                    ]
+                    failing.append(trip_id)
+                else:
+                    # Passed, out of repairs, or the repair request failed: the last answer stands
+                    trip.validation.append(ValidationResult(spec.key, passed=not problems, repairs=repair,
+                                                            problems=problems))
+            self.repairs += len(failing)
+            pending = failing
+            if not pending:
+                break
+
+    def _messages(self, fields: Dict[str, Any], trip: OfflineTrip) -> List[Dict[str, str]]:
+        """Chat messages of one rendered task for one trip"""
+        agent_fields = self.workflow.agent(fields["agent"]).render(trip.values)
+        description = fields.get("description", "")
+        if fields.get("retrieval"):
+            description += retrieval_notes(fields["retrieval"])
+        if fields.get("prefetch"):
+            description += crewai_demo.prefetch_results(fields["prefetch"])
+        context_keys = fields["context"] if "context" in fields else list(trip.outputs)
+        context = CONTEXT_SEPARATOR.join(trip.outputs[key] for key in context_keys if key in trip.outputs)
+        return [{"role": "system", "content": agent_prompt(agent_fields)},
+                {"role": "user", "content": task_prompt(fields, description, context)}]
+
+    def _record_usage(self, task: str, messages: List[Dict[str, str]], outcome: BatchResult) -> None:
+        model = outcome.model or self.config.model
+        self.ledger.record_estimate(f"crewai/{task}", model, count_message_tokens(messages, model))
+        if outcome.usage:
+            self.ledger.record_actual(f"crewai/{task}", model, outcome.usage.get("prompt_tokens", 0),
+                                      outcome.usage.get("completion_tokens", 0))
+
+
+def run_offline(requests: List[Dict[str, Any]], output_path: Optional[Path] = None,
+                backend: Optional[BatchBackend] = None) -> Dict[str, Dict[str, Any]]:
+    """
+    Plan trips through bulk jobs and write one JSONL result line per trip.
+
+    Args:
+        requests: Trip requests (``main()`` keyword arguments plus "id")
+        output_path: JSONL file for results, in the batch runner's format
+        backend: Bulk job backend (default: BATCH_BACKEND)
+
+    Returns:
+        Dict[str, Dict[str, Any]]: Result per trip id
+    """
+    started = time.perf_counter()
+    planner = OfflinePlanner(backend)
+    print(f"🚀 Planning {len(requests)} trips offline: one {planner.backend.name} bulk job per stage "
+          f"({' → '.join(spec.key for spec in planner.workflow.tasks)})")
+    results = planner.run(requests)
+    if output_path:
+        with open(output_path, "w") as f:
+            for request in requests:
+                f.write(json.dumps(results[request["id"]]) + "\n")
+
+    elapsed = time.perf_counter() - started
+    errors = {trip_id: r["error"] for trip_id, r in results.items() if "error" in r}
+    print("\n" + "=" * 80)
+    print("OFFLINE BATCH COMPLETE")
+    print("=" * 80)
+    print(f"Trips:        {len(results) - len(errors)}/{len(requests)} planned in {elapsed:.1f}s")
+    print(f"Bulk jobs:    {planner.jobs} ({planner.repairs} repair requests)")
+    print(f"Cache hits:   {sum(bool(r.get('cached')) for r in results.values())}")
+    print(f"Errors:       {len(errors)}")
+    for trip_id, error in list(errors.items())[:10]:
+        print(f"  - {trip_id}: {error}")
+    print_validation_report([ValidationResult(**{**v, "task": f"{trip_id}/{v['task']}"})
+                             for trip_id, r in results.items() for v in r.get("validation", []) if not v["passed"]])
+    planner.ledger.print_report(f"offline batch of {len(requests)} trips")
+    return results
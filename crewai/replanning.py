@@ -0,0 +1,227 @@
+"""
+Incremental Re-planning for the CrewAI Travel Planning System
+=============================================================
+
+Users often change one input after seeing a plan: another departure city, one
+more traveler, a different budget tier. ``crewai_demo.main`` reruns all four
+tasks for that. A ``PlanningSession`` keeps the outputs of a trip's tasks and,
+when inputs change, reruns only the tasks whose output depends on a changed
+input (``CompiledWorkflow.affected_tasks``):
+
+- A task depends on the inputs in its own and its agent's templates, and on
+  everything the tasks in its ``context`` depend on. With the travel workflow,
+  a new departure city reruns flight and budget; travelers or budget tier
+  rerun only budget; a new destination or new dates rerun everything.
+- Kept tasks do not run again. Their stored outputs are the context of the
+  rerun tasks, as in a full run.
+- Sessions are stored in the disk cache (``planning_sessions``) for
+  ``SESSION_TTL``, so a later request or another process can continue one by
+  id. A session planned with another model or workflow version starts over.
+
+Usage:
+    from replanning import PlanningSession
+
+    session = PlanningSession(destination="Japan", trip_dates="April 1-10, 2026")
+    session.plan()
+    session.update(departure_city="Boston")   # reruns flight and budget only
+
+    python replanning.py --destination Japan             # prints the session id
+    python replanning.py --session 3f2a9c --travelers 3  # reruns budget only
+"""
+
+import argparse
+import sys
+import time
+import uuid
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+from crewai import Crew, Task
+from crewai.tasks.task_output import TaskOutput
+
+# Add parent directory to path to import shared modules
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from shared_cache import DiskCache
+from shared_config import Config, ConfigSnapshot
+from shared_tokens import UsageLedger
+from shared_workflow import CompiledWorkflow
+
+from crewai_demo import (DEFAULT_TRIP, create_agent, create_task, load_travel_workflow, prefetched_tools,
+                         trip_inputs)
+from usage import CrewTokenAccountant
+from validation import print_validation_report, validation_results
+
+# Seconds a session stays resumable after its last plan
+SESSION_TTL = 7 * 24 * 3600
+
+
+class PlanningSession:
+    """A trip's task outputs, kept so that changed inputs rerun only the tasks they affect"""
+
+    def __init__(self, session_id: Optional[str] = None, config: Optional[ConfigSnapshot] = None,
+                 workflow: Optional[CompiledWorkflow] = None, verbose: bool = False, log=print, **trip):
+        """
+        Args:
+            session_id: Id the session is stored under (default: a new one)
+            config: Configuration snapshot (default: the current one)
+            workflow: Compiled workflow (default: CREWAI_WORKFLOW_FILE)
+            verbose: CrewAI verbose output
+            log: Progress printer
+            **trip: Trip inputs (``main()`` keyword arguments); missing ones take the defaults
+        """
+        _check_inputs(trip)
+        self.id = session_id or uuid.uuid4().hex[:12]
+        self.config = config or Config.snapshot()
+        self.workflow = workflow or load_travel_workflow()
+        self.trip: Dict[str, Any] = {**DEFAULT_TRIP, **trip}
+        self.outputs: Dict[str, str] = {}
+        self.history: List[Dict[str, Any]] = []
+        self.ledger: Optional[UsageLedger] = None
+        self.verbose = verbose
+        self.log = log
+
+    @classmethod
+    def load(cls, session_id: str, config: Optional[ConfigSnapshot] = None, **kwargs) -> Optional["PlanningSession"]:
+        """
+        Resume a stored session.
+
+        Args:
+            session_id: Id of the session
+            config: Configuration snapshot (default: the current one)
+            **kwargs: Further ``PlanningSession`` arguments (workflow, verbose, log)
+
+        Returns:
+            Optional[PlanningSession]: The session, or None when it is unknown or expired
+        """
+        state = _store().get(session_id)
+        if state is None:
+            return None
+        session = cls(session_id, config, **kwargs, **state["trip"])
+        session.history = state["history"]
+        if state["model"] == session.config.model and state["workflow"] == session.workflow.version:
+            session.outputs = state["outputs"]
+        else:
+            session.log("ℹ️  Model or workflow changed since this session was planned; planning it again")
+        return session
+
+    def save(self) -> None:
+        _store().set(self.id, {"trip": self.trip, "outputs": self.outputs, "history": self.history,
+                               "model": self.config.model, "workflow": self.workflow.version}, ttl=SESSION_TTL)
+
+    # --- planning ---------------------------------------------------------
+
+    def plan(self) -> str:
+        """Plan the trip: every task the first time, afterwards only the tasks without a current output"""
+        return self._replan([])
+
+    def update(self, **changes) -> str:
+        """
+        Change trip inputs and rerun only the tasks whose outputs depend on them.
+
+        Args:
+            **changes: New input values (``main()`` keyword arguments)
+
+        Returns:
+            str: The updated plan
+        """
+        _check_inputs(changes)
+        changed = [name for name, value in changes.items() if value != self.trip[name]]
+        self.trip.update(changes)
+        for key in self.workflow.affected_tasks(changed):
+            self.outputs.pop(key, None)
+        return self._replan(changed)
+
+    def plan_text(self) -> str:
+        """The plan: the final task's report (as ``crewai_demo.main`` prints it)"""
+        return self.outputs.get(self.workflow.tasks[-1].key, "")
+
+    def _replan(self, changed: List[str]) -> str:
+        stale = [spec.key for spec in self.workflow.tasks if spec.key not in self.outputs]
+        if not stale:
+            self.log("✅ Plan is up to date; nothing to rerun")
+            return self.plan_text()
+        reused = [spec.key for spec in self.workflow.tasks if spec.key in self.outputs]
+        self.log(f"🔁 Session {self.id}: rerunning {', '.join(stale)}"
+                 + (f" (changed: {', '.join(changed)})" if changed else "")
+                 + (f"; reusing {', '.join(reused)}" if reused else ""))
+        started = time.perf_counter()
+        self._run(stale)
+        self.history.append({"changed": changed, "rerun": stale, "reused": reused,
+                             "seconds": round(time.perf_counter() - started, 2)})
+        self.save()
+        return self.plan_text()
+
+    def _run(self, keys: List[str]) -> None:
+        """Run the tasks ``keys`` as one crew, with the kept tasks' outputs as their context"""
+        workflow, config = self.workflow, self.config
+        values = workflow.values(self.trip)
+        prefetched = prefetched_tools(workflow, values) if config.tool_prefetch else {}
+        specs = [spec for spec in workflow.tasks if spec.key in keys]
+
+        agents = {}
+        for spec in specs:
+            name = spec.get("agent")
+            if name not in agents:
+                agents[name] = create_agent(workflow.agent(name), values, config, prefetched.get(name, ()))
+        tasks = {}
+        for spec in workflow.tasks:
+            if spec.key in keys:
+                tasks[spec.key] = create_task(spec, values, agents, tasks, config)
+                # Spell out the implicit "all earlier tasks" context: some of them are not in this crew
+                tasks[spec.key].context = [tasks[key] for key in workflow.context(spec.key)]
+            else:
+                tasks[spec.key] = self._finished_task(spec, values)
+
+        crew = Crew(agents=list(agents.values()), tasks=[tasks[spec.key] for spec in specs], verbose=self.verbose,
+                    process=workflow.setting("process", values, "sequential"))
+        roles = [workflow.agent(name).get("llm_role", name) for name in agents]
+        with CrewTokenAccountant.for_crew(self.id, crew, roles, config) as accountant:
+            crew.kickoff(inputs=trip_inputs(**self.trip))
+        self.ledger = accountant.ledger
+        for spec in specs:
+            self.outputs[spec.key] = tasks[spec.key].output.raw
+        print_validation_report(validation_results(crew))
+
+    def _finished_task(self, spec, values: Dict[str, Any]) -> Task:
+        """A task that is not run again: it only carries its stored output as context"""
+        fields = spec.render(values)
+        task = Task(description=fields["description"], expected_output=fields["expected_output"])
+        role = self.workflow.agent(fields["agent"]).render(values)["role"]
+        task.output = TaskOutput(description=fields["description"], raw=self.outputs[spec.key], agent=role)
+        return task
+
+
+def _check_inputs(inputs: Dict[str, Any]) -> None:
+    unknown = sorted(set(inputs) - set(DEFAULT_TRIP))
+    if unknown:
+        raise ValueError(f"Unknown trip inputs {unknown}. Expected some of {list(DEFAULT_TRIP)}")
+
+
+def _store() -> DiskCache:
+    return DiskCache("planning_sessions")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Plan a trip, then rerun only what changed inputs affect")
+    parser.add_argument("--session", help="Session to continue (default: start a new one)")
+    for name, default in DEFAULT_TRIP.items():
+        parser.add_argument(f"--{name}", type=type(default), help=f"Trip input (default: {default})")
+    args = parser.parse_args()
+    inputs = {name: getattr(args, name) for name in DEFAULT_TRIP if getattr(args, name) is not None}
+
+    session = PlanningSession.load(args.session) if args.session else None
+    if session is None:
+        if args.session:
+            print(f"ℹ️  No stored session '{args.session}'; starting it from scratch")
+        session = PlanningSession(args.session, **inputs)
+        plan = session.plan()
+    else:
+        plan = session.update(**inputs)
+
+    if session.ledger is not None:
+        session.ledger.print_report(f"Session {session.id}")
+    print("-" * 80)
+    print(plan)
+    print("-" * 80)
+    print(f"Session: {session.id} (continue with --session {session.id})")
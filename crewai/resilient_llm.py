@@ -0,0 +1,116 @@
+"""
+Resilient CrewAI LLM for the Travel Planning System
+
+A custom CrewAI LLM (``BaseLLM``) whose completions go through
+``shared_llm.ResilientCaller`` (retries, per-attempt deadlines and hedged
+requests) instead of a single blocking call. Used by ``create_llm`` in
+``crewai_demo.py`` when ``RESILIENT_CALLS=True``, ``SEMANTIC_CACHE=True``,
+``DRAFT_REFINE=True``, ``MODEL_CASCADE`` or ``RUN_DEADLINE`` is set, or the role
+is in ``LOCAL_ROLES`` (calls of an LLM bound to a role are then answered from
+the semantic cache when possible, drafted by ``DRAFT_MODEL`` if the role drafts,
+and run on the cascade's current model, or on the local model for a local
+role). Inside ``RunDeadline.activate()`` calls use the deadline's degraded
+max_tokens and model, and a call at or past the deadline aborts the crew
+(``HookAborted``, which CrewAI does not retry).
+
+Usage:
+    from resilient_llm import ResilientLLM
+
+    llm = ResilientLLM(model="openai/llama-3.3-70b-versatile", max_tokens=800)
+    llm.bind_config(Config.snapshot(), cache_scope="crewai/flight", draft=True)  # optional
+    agent = Agent(role="Flight Specialist", llm=llm, ...)
+"""
+
+import sys
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Union
+
+from crewai.hooks.dispatch import HookAborted
+from crewai.llms.base_llm import BaseLLM
+from pydantic import PrivateAttr
+
+# Add parent directory to path to import shared modules
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from shared_cascade import ModelCascade
+from shared_config import Config, ConfigSnapshot
+from shared_deadline import DeadlineExceeded, current_deadline
+from shared_llm import complete
+
+# HookAborted.source of the aborts raised by a run deadline
+DEADLINE_ABORT = "run_deadline"
+
+
+class ResilientLLM(BaseLLM):
+    """CrewAI LLM that completes through the shared resilient call layer
+
+    Based on ``BaseLLM`` rather than ``crewai.LLM``: the latter's constructor
+    routes ``openai/...`` models with a custom ``base_url`` to CrewAI's native
+    OpenAI client, which would silently replace this class.
+    """
+
+    _config: Optional[ConfigSnapshot] = PrivateAttr(default=None)
+    _cache_scope: str = PrivateAttr(default="")
+    _draft: bool = PrivateAttr(default=False)
+    _cascade: Optional[ModelCascade] = PrivateAttr(default=None)
+    _local: bool = PrivateAttr(default=False)
+
+    def bind_config(self, config: ConfigSnapshot, cache_scope: str = "", draft: bool = False,
+                    cascade: Optional[ModelCascade] = None, local: bool = False) -> "ResilientLLM":
+        """Use the endpoints and retry settings of a run's config snapshot (and a semantic cache scope)"""
+        self._config = config
+        self._cache_scope = cache_scope
+        self._draft = draft
+        self._cascade = cascade
+        self._local = local
+        return self
+
+    @property
+    def cascade(self) -> Optional[ModelCascade]:
+        """Model cascade the LLM runs on (the task's validator escalates it)"""
+        return self._cascade
+
+    def supports_function_calling(self) -> bool:
+        # Tools are used through CrewAI's text (ReAct) protocol, which only needs completions
+        return False
+
+    def call(self, messages: Union[str, List[Dict[str, str]]], tools=None, callbacks=None,
+             available_functions=None, from_task=None, from_agent=None,
+             response_model=None, **kwargs: Any) -> str:
+        if isinstance(messages, str):
+            messages = [{"role": "user", "content": messages}]
+        config = self._config or Config.snapshot()
+        model = self.model.split("/", 1)[-1]
+        if self._cascade is not None and model == config.model:
+            if from_task is not None:
+                # A new task starts on the cheapest model, whatever an interrupted one left behind
+                self._cascade.begin(from_task)
+            model = self._cascade.model
+        max_tokens = self.max_tokens
+        run = current_deadline()
+        if run is not None:
+            if run.expired:
+                raise HookAborted(f"run deadline of {run.seconds:g}s reached", source=DEADLINE_ABORT)
+            run.update()
+            max_tokens = run.max_tokens(max_tokens)
+            model = run.model(model)
+        try:
+            result = complete(
+                messages,
+                scope=self._cache_scope,
+                config=config,
+                draft=self._draft,
+                local=self._local,
+                max_tokens=max_tokens,
+                temperature=self.temperature,
+                stop=self.stop_sequences or None,
+                # Only override the endpoint model when this LLM was switched (e.g. budget downgrade)
+                model=model if model != config.model else None,
+            )
+        except DeadlineExceeded as e:
+            # CrewAI retries a failed task; an abort stops the crew instead
+            raise HookAborted(str(e), source=DEADLINE_ABORT) from e
+        if result.usage:
+            # Keep get_token_usage_summary() accurate, as the stock LLM does
+            self._track_token_usage_internal(result.usage)
+        return result.text
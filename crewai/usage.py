@@ -0,0 +1,135 @@
+"""
+Token Accounting for the CrewAI Travel Planning System
+
+Attaches ``shared_tokens`` to a crew run:
+
+- A global ``before_llm_call`` hook counts the prompt of every agent LLM call
+  locally and checks it against the run budget. A call that would go over
+  aborts the crew (``HookAborted``) or, in downgrade mode, switches that role's
+  LLM to ``Config.BUDGET_DOWNGRADE_MODEL`` for the rest of the run. The crew's
+  agents get per-run copies of their LLMs, so a downgrade never reaches the
+  shared (cached) LLMs of other runs.
+- Actual usage is read from each role LLM's token counters, so the budget
+  check always sees what the run has really spent so far.
+- The accountant of the run in progress is context-local, so concurrent runs
+  in one process (threads, replanning sessions) each meter their own calls.
+
+Usage:
+    from usage import CrewTokenAccountant
+
+    with CrewTokenAccountant.for_crew("iceland", crew, workflow.roles) as accountant:
+        result = crew.kickoff(inputs=...)
+    accountant.ledger.print_report()
+"""
+
+import sys
+import threading
+from contextvars import ContextVar
+from pathlib import Path
+from typing import Any, Dict, Optional, Sequence, Tuple
+
+from crewai.hooks import register_before_llm_call_hook
+from crewai.hooks.dispatch import HookAborted
+
+# Add parent directory to path to import shared modules
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from shared_config import Config, ConfigSnapshot
+from shared_tokens import BudgetExceeded, BudgetGuard, UsageLedger, count_message_tokens
+
+# CrewAI copies the context into the threads it starts for async tasks
+_active: ContextVar[Optional["CrewTokenAccountant"]] = ContextVar("crew_token_accountant", default=None)
+_hook_registered = False
+_hook_lock = threading.Lock()
+
+
+def _before_llm_call(context) -> None:
+    """Global hook; forwards to the accountant of the run in progress (if any)"""
+    accountant = _active.get()
+    if accountant is not None:
+        accountant.preflight(context)
+
+
+def _run_copy(llm):
+    """Copy of a shared role LLM whose model and token counters belong to one run"""
+    copy = llm.model_copy()
+    # A shallow copy would share the counters dict with the original
+    copy._token_usage = {key: 0 for key in llm._token_usage}
+    return copy
+
+
+class CrewTokenAccountant:
+    """Pre-flight estimates, actual usage and the budget guard for one crew run"""
+
+    def __init__(self, run_id: str, llms: Dict[str, Any], config: Optional[ConfigSnapshot] = None):
+        config = config or Config.snapshot()
+        self.ledger = UsageLedger(run_id)
+        self.guard = BudgetGuard(self.ledger, config.run_budget_usd, config.run_budget_tokens,
+                                 config.budget_action, config.budget_downgrade_model)
+        self.llms = llms
+        self._roles = {id(llm): role for role, llm in llms.items()}
+        # role -> (prompt, completion) tokens already copied into the ledger
+        self._seen: Dict[str, Tuple[int, int]] = {}
+        self._token = None
+
+    @classmethod
+    def for_crew(cls, run_id: str, crew, roles: Sequence[str],
+                 config: Optional[ConfigSnapshot] = None) -> "CrewTokenAccountant":
+        """
+        Accountant over the LLMs of a crew's agents (``roles`` aligned with ``crew.agents``).
+
+        Each agent is switched to a per-run copy of its LLM; agents sharing an
+        LLM keep sharing one copy.
+        """
+        copies: Dict[int, Any] = {}
+        llms: Dict[str, Any] = {}
+        for role, agent in zip(roles, crew.agents):
+            if id(agent.llm) not in copies:
+                copies[id(agent.llm)] = _run_copy(agent.llm)
+            agent.llm = llms[role] = copies[id(agent.llm)]
+        return cls(run_id, llms, config)
+
+    def __enter__(self) -> "CrewTokenAccountant":
+        global _hook_registered
+        with _hook_lock:
+            if not _hook_registered:
+                register_before_llm_call_hook(_before_llm_call)
+                _hook_registered = True
+        # LLMs passed in directly may have been used before; only usage from now on belongs to this run
+        for role, llm in self.llms.items():
+            usage = llm.get_token_usage_summary()
+            self._seen[role] = (usage.prompt_tokens, usage.completion_tokens)
+        self._token = _active.set(self)
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        _active.reset(self._token)
+        self._token = None
+        self.sync()
+
+    def preflight(self, context) -> None:
+        """Estimate the prompt of a call about to be sent and enforce the budget"""
+        role = self._roles.get(id(context.llm))
+        if role is None:
+            return
+        llm = context.llm
+        prompt_tokens = count_message_tokens(context.messages, llm.model)
+        self.sync()
+        try:
+            allowed = self.guard.check(role, llm.model, prompt_tokens, llm.max_tokens or Config.AGENT_MAX_TOKENS)
+        except BudgetExceeded as e:
+            raise HookAborted(str(e), source="budget_guard") from e
+        if allowed != llm.model:
+            provider = llm.model.partition("/")[0] if "/" in llm.model else ""
+            llm.model = allowed if "/" in allowed or not provider else f"{provider}/{allowed}"
+        self.ledger.record_estimate(role, llm.model, prompt_tokens)
+
+    def sync(self) -> None:
+        """Copy new actual usage from the role LLMs into the ledger"""
+        for role, llm in self.llms.items():
+            usage = llm.get_token_usage_summary()
+            current = (usage.prompt_tokens, usage.completion_tokens)
+            seen = self._seen.get(role, (0, 0))
+            if current != seen:
+                self.ledger.record_actual(role, llm.model, current[0] - seen[0], current[1] - seen[1])
+                self._seen[role] = current
@@ -0,0 +1,289 @@
+"""
+Local Output Validation for the CrewAI Travel Planning System
+=============================================================
+
+Each task's ``expected_output`` promises a shape ("2-3 flight options with
+prices", "a day-by-day itinerary", "itemized costs and totals"), but nothing
+checked it, and the only remedy for a bad result was rerunning the whole crew.
+
+``TaskValidator`` checks a task output locally, with no LLM call, against the
+``validation`` checks declared on the task in the workflow file. It is attached
+as the task's CrewAI guardrail: when a check fails, CrewAI re-asks only that
+task, with the previous answer and a repair prompt listing exactly what is
+missing. Downstream tasks then see the repaired output. After
+``VALIDATION_MAX_REPAIRS`` repairs the output is accepted as it is and
+reported as failing, so a heuristic check can never fail a trip.
+
+With a model cascade (``MODEL_CASCADE``, see ``shared_cascade.py``) the task
+first runs on the cheapest model. A failing output is redone on the next
+stronger model before any repair on the strongest one, and the model each
+output was accepted on is recorded per agent.
+
+Checks (``CHECKS``):
+- ``options``: list items or sections that carry a price (``min`` / ``max``)
+- ``prices``: prices anywhere in the output (``min``)
+- ``days``: "Day N" headings for every day of the trip (``count``, e.g. "{trip_duration}")
+- ``mentions``: every term appears (``terms``; "a|b" accepts either)
+- ``totals``: every "Total" line matches the sum of the amounts itemized above it
+- ``complete``: not empty, cut off, a refusal or full of placeholders (added to every
+  task under a model cascade)
+
+Usage:
+    "validation": [{"check": "options", "min": 2, "max": 3, "label": "flight options"}]
+
+    task = Task(..., guardrail=TaskValidator("flight", checks).validate, guardrail_max_retries=1)
+    task = Task(..., guardrail=TaskValidator("flight", checks, cascade=llm.cascade).validate, ...)
+    crew.kickoff(...)
+    print_validation_report(validation_results(crew))
+"""
+
+import re
+import sys
+import threading
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+# Add parent directory to path to import shared modules
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from shared_cascade import ModelCascade, completeness_problems, get_cascade_stats
+
+# Prices: "$1,250", "€89.50", "189 USD", "25,000 ISK", "$800-1,200" (ranges keep both ends)
+_NUMBER = r"\d[\d,]*(?:\.\d+)?"
+_PRICE = re.compile(
+    rf"(?:[$€£¥]\s?(?P<a>{_NUMBER})(?:\s?(?:-|–|to)\s?[$€£¥]?\s?(?P<b>{_NUMBER}))?"
+    rf"|(?P<c>{_NUMBER})(?:\s?(?:-|–|to)\s?(?P<d>{_NUMBER}))?\s?(?:USD|EUR|GBP|ISK|JPY|kr)\b)"
+)
+# Lines that start an entry: headings, numbered items, bold leads, "Option 2:"
+_ENTRY = re.compile(r"^(?:#{1,4}\s|\d{1,2}[.)]\s|\*\*|Option\s+\d)", re.IGNORECASE)
+_BULLET = re.compile(r"^[-*•]\s")
+# Entries that summarize rather than offer an option
+_NOT_AN_OPTION = re.compile(r"recommend|summary|total|tip|note|conclusion|overview|comparison", re.IGNORECASE)
+_DAY = re.compile(r"\bDay\s+(\d{1,2})\b", re.IGNORECASE)
+_TOTAL = re.compile(r"\btotal\b", re.IGNORECASE)
+
+
+def _amounts(line: str) -> List[Tuple[float, float]]:
+    """Prices on a line as (low, high) pairs"""
+    out = []
+    for m in _PRICE.finditer(line):
+        low = m.group("a") or m.group("c")
+        high = m.group("b") or m.group("d") or low
+        out.append((float(low.replace(",", "")), float(high.replace(",", ""))))
+    return out
+
+
+def _first_int(value: Any) -> Optional[int]:
+    match = re.search(r"\d+", str(value))
+    return int(match.group()) if match else None
+
+
+def _sections(text: str) -> List[List[str]]:
+    """Split output into entries: top-level headings/numbered/bold lines, else top-level bullets"""
+    lines = [line.rstrip() for line in text.splitlines() if line.strip()]
+    top = [line for line in lines if not line[:1].isspace()]
+    starts = _ENTRY if any(_ENTRY.match(line) for line in top) else _BULLET
+    sections: List[List[str]] = []
+    for line in lines:
+        if not line[:1].isspace() and starts.match(line):
+            sections.append([line])
+        elif sections:
+            sections[-1].append(line)
+    return sections
+
+
+# ============================================================================
+# CHECKS — each returns a problem description, or "" when the output passes
+# ============================================================================
+
+def check_options(text: str, min: int = 1, max: Optional[int] = None, label: str = "options") -> str:
+    options = [s for s in _sections(text)
+               if not _NOT_AN_OPTION.search(s[0]) and any(_amounts(line) for line in s)]
+    if len(options) < min:
+        return f"found {len(options)} {label} with a price; list at least {min}, each with its price"
+    if max is not None and len(options) > max:
+        return f"found {len(options)} {label}; list at most {max} (keep the best ones)"
+    return ""
+
+
+def check_prices(text: str, min: int = 1) -> str:
+    found = sum(len(_amounts(line)) for line in text.splitlines())
+    if found < min:
+        return f"found {found} prices; give concrete prices (e.g. $120) for at least {min} items"
+    return ""
+
+
+def check_days(text: str, count: Any = None) -> str:
+    days = {int(n) for n in _DAY.findall(text)}
+    wanted = _first_int(count)
+    if not wanted:
+        return "" if days else "no day-by-day headings; structure the plan as Day 1, Day 2, ..."
+    missing = [d for d in range(1, wanted + 1) if d not in days]
+    if missing:
+        return (f"missing day headings for Day {', Day '.join(map(str, missing))}; "
+                f"cover all {wanted} days under 'Day N' headings")
+    return ""
+
+
+def check_mentions(text: str, terms: List[str] = ()) -> str:
+    lowered = text.lower()
+    missing = [term for term in terms if not any(t.strip().lower() in lowered for t in term.split("|"))]
+    if missing:
+        return "missing sections or line items for: " + ", ".join(t.split("|")[0] for t in missing)
+    return ""
+
+
+def check_totals(text: str, tolerance: float = 0.05) -> str:
+    """Every total equals the amounts itemized since the previous total or heading"""
+    problems = []
+    block: List[Tuple[float, float]] = []
+    for line in text.splitlines():
+        amounts = _amounts(line)
+        if _TOTAL.search(line) and amounts:
+            low, high = amounts[-1]
+            if len(block) >= 2:
+                item_low, item_high = sum(a[0] for a in block), sum(a[1] for a in block)
+                if (abs(item_low - low) > tolerance * low or abs(item_high - high) > tolerance * high):
+                    stated = f"${low:,.0f}" if low == high else f"${low:,.0f}-{high:,.0f}"
+                    summed = f"${item_low:,.0f}" if item_low == item_high else f"${item_low:,.0f}-{item_high:,.0f}"
+                    problems.append(f"'{line.strip()[:60]}' states {stated} but its items add up to {summed}")
+            block = []
+        elif line.lstrip().startswith("#") or (line.strip().endswith(":") and not amounts):
+            block = []
+        elif amounts:
+            # "3 nights x $189 = $567": the last amount is the line's cost
+            block.append(amounts[-1])
+    if problems:
+        return "totals do not add up: " + "; ".join(problems[:3])
+    return ""
+
+
+def check_complete(text: str) -> str:
+    return "; ".join(completeness_problems(text))
+
+
+CHECKS: Dict[str, Callable[..., str]] = {
+    "options": check_options,
+    "prices": check_prices,
+    "days": check_days,
+    "mentions": check_mentions,
+    "totals": check_totals,
+    "complete": check_complete,
+}
+
+
+# ============================================================================
+# GUARDRAIL
+# ============================================================================
+
+@dataclass
+class ValidationResult:
+    """Outcome of validating one task output"""
+
+    task: str
+    passed: bool
+    repairs: int = 0
+    problems: List[str] = field(default_factory=list)
+    model: str = ""         # Cascade model the output was accepted on ("" without a cascade)
+    escalations: int = 0
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {"task": self.task, "passed": self.passed, "repairs": self.repairs, "problems": self.problems,
+                "model": self.model, "escalations": self.escalations}
+
+
+class TaskValidator:
+    """CrewAI guardrail running a task's local checks and asking for targeted repairs"""
+
+    REPAIR_PROMPT = ("Your answer does not yet meet the expected output:\n{problems}\n"
+                     "Fix exactly these points. Keep everything that is already correct, and answer "
+                     "with the complete corrected result.")
+
+    def __init__(self, task: str, checks: List[Dict[str, Any]], max_repairs: int = 1,
+                 cascade: Optional[ModelCascade] = None):
+        """
+        Args:
+            task: Task key (for reports)
+            checks: Check specs from the workflow file ({"check": name, **params})
+            max_repairs: Repair prompts before a failing output is accepted
+            cascade: Model cascade of the task's agent LLM; failing outputs escalate first
+        """
+        if cascade is not None and not any(spec.get("check") == "complete" for spec in checks):
+            checks = list(checks) + [{"check": "complete"}]
+        unknown = [spec.get("check") for spec in checks if spec.get("check") not in CHECKS]
+        if unknown:
+            raise ValueError(f"Unknown validation checks {unknown} for task '{task}'. Expected some of {sorted(CHECKS)}")
+        self.task = task
+        self.checks = checks
+        self.max_repairs = max_repairs
+        self.cascade = cascade
+        # Crew copies share the validator. A task's guardrail attempts run one after
+        # another in the thread that kicked the crew off, so per-thread state tracks
+        # the current repair chain even when several copies run concurrently.
+        self._state = threading.local()
+
+    @property
+    def max_retries(self) -> int:
+        """Guardrail retries the task needs: one per stronger model, then the repairs"""
+        return self.max_repairs + (len(self.cascade.models) - 1 if self.cascade else 0)
+
+    @property
+    def last(self) -> Optional[ValidationResult]:
+        """Result of the task's last validation in this thread"""
+        return getattr(self._state, "last", None)
+
+    def problems(self, text: str) -> List[str]:
+        """Problems found by the task's checks ([] when the output passes)"""
+        found = []
+        for spec in self.checks:
+            params = {k: v for k, v in spec.items() if k != "check"}
+            problem = CHECKS[spec["check"]](text, **params)
+            if problem:
+                found.append(problem)
+        return found
+
+    def validate(self, output) -> Tuple[bool, Any]:
+        """Guardrail callable (CrewAI needs a function or method, it reads the guardrail's source)"""
+        problems = self.problems(output.raw or "")
+        repairs = getattr(self._state, "failures", 0)
+        escalations = self.cascade.level if self.cascade else 0
+        if problems and self.cascade is not None and self.cascade.escalate():
+            # The redo runs on the next stronger model, with the same list of problems
+            return False, self.REPAIR_PROMPT.format(problems="\n".join(f"- {p}" for p in problems))
+        if not problems or repairs >= self.max_repairs:
+            self._state.failures = 0
+            model = ""
+            if self.cascade is not None:
+                model = self.cascade.model
+                get_cascade_stats().record(f"crewai/{self.task}", model, escalations, passed=not problems)
+                self.cascade.reset()
+            self._state.last = ValidationResult(self.task, passed=not problems, repairs=repairs, problems=problems,
+                                                model=model, escalations=escalations)
+            return True, output
+        self._state.failures = repairs + 1
+        return False, self.REPAIR_PROMPT.format(problems="\n".join(f"- {p}" for p in problems))
+
+
+def validation_results(crew) -> List[ValidationResult]:
+    """Results of the crew's last run, in task order (tasks without checks are skipped)"""
+    validators = [getattr(task.guardrail, "__self__", None) for task in crew.tasks]
+    return [v.last for v in validators if isinstance(v, TaskValidator) and v.last is not None]
+
+
+def print_validation_report(results: List[ValidationResult]) -> None:
+    """Print which task outputs passed, were repaired or were accepted with problems"""
+    if not results:
+        return
+    print("\n" + "-" * 80)
+    print("OUTPUT VALIDATION")
+    print("-" * 80)
+    for result in results:
+        model = f" on {result.model}" if result.model else ""
+        if result.escalations:
+            model += f" ({result.escalations} escalation(s))"
+        if result.passed:
+            status = "passed" + model + (f" after {result.repairs} repair(s)" if result.repairs else "")
+            print(f"✓ {result.task:<10} {status}")
+        else:
+            print(f"⚠️  {result.task:<10} accepted{model} after {result.repairs} repair(s): {'; '.join(result.problems)}")
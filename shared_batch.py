@@ -0,0 +1,318 @@
+"""
+Offline Bulk Jobs for AutoGen and CrewAI Lab Demo
+
+Nightly batches do not need interactive latency, yet every call used to go
+through the synchronous per-call path. A bulk job sends many chat completions
+as one OpenAI Batch-style JSONL file instead. Provider batch endpoints accept
+far more requests per job than the per-minute rate limits allow, and bill them
+at a discount, in exchange for completing within ``BATCH_COMPLETION_WINDOW``.
+
+- ``write_job_file``: one line per request,
+  ``{"custom_id": ..., "method": "POST", "url": "/v1/chat/completions", "body": {...}}``
+- ``run_batch_job``: writes the file, uploads it, creates the batch, polls until it
+  ends and parses the output and error files into ``BatchResult`` per custom_id
+- Backends (``BATCH_BACKEND``):
+  - ``provider``: the endpoint's Files and Batches API (``/v1/files``, ``/v1/batches``)
+  - ``local``: a stand-in with the same interface. It runs the file's requests
+    against the configured chat endpoint in a background thread pool
+    (``BATCH_LOCAL_CONCURRENCY``) and writes provider-format output files, so
+    the whole submit/poll/download path runs in tests and against the mock server
+
+Job, output and error files are kept under ``Config.CACHE_DIR / "batches"``.
+
+Usage:
+    from shared_batch import BatchRequest, run_batch_job
+
+    results = run_batch_job([BatchRequest("t1/flight", messages, {"max_tokens": 800})], name="flight")
+    print(results["t1/flight"].text)
+"""
+
+import json
+import threading
+import time
+import uuid
+from abc import ABC, abstractmethod
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Sequence
+
+import openai
+
+from shared_config import Config, ConfigSnapshot
+
+ENDPOINT = "/v1/chat/completions"
+# Batch states after which nothing changes any more
+FINAL_STATES = ("completed", "failed", "expired", "cancelled")
+
+
+@dataclass
+class BatchRequest:
+    """One chat completion of a bulk job"""
+
+    custom_id: str
+    messages: List[Dict[str, Any]]
+    params: Dict[str, Any] = field(default_factory=dict)  # max_tokens, temperature, model, ...
+
+
+@dataclass
+class BatchResult:
+    """The outcome of one request of a finished bulk job"""
+
+    custom_id: str
+    text: str = ""
+    model: str = ""
+    finish_reason: Optional[str] = None
+    usage: Dict[str, int] = field(default_factory=dict)
+    error: str = ""
+
+    @property
+    def ok(self) -> bool:
+        return not self.error
+
+
+def write_job_file(requests: Sequence[BatchRequest], path: Path, model: str) -> Path:
+    """
+    Write requests as an OpenAI Batch-style JSONL job file.
+
+    Args:
+        requests: Requests with unique custom_ids
+        path: File to write
+        model: Model of requests whose params do not name one
+
+    Returns:
+        Path: The written file
+    """
+    ids = [r.custom_id for r in requests]
+    if len(set(ids)) != len(ids):
+        raise ValueError("custom_id values of a bulk job must be unique")
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with open(path, "w") as f:
+        for request in requests:
+            body = {"model": model, **{k: v for k, v in request.params.items() if v is not None},
+                    "messages": request.messages}
+            f.write(json.dumps({"custom_id": request.custom_id, "method": "POST", "url": ENDPOINT,
+                                "body": body}) + "\n")
+    return path
+
+
+def parse_results(lines: str) -> Dict[str, BatchResult]:
+    """Parse the lines of a batch output or error file into results by custom_id"""
+    results = {}
+    for line in lines.splitlines():
+        if not line.strip():
+            continue
+        record = json.loads(line)
+        custom_id = record.get("custom_id", "")
+        response = record.get("response") or {}
+        body = response.get("body") or {}
+        error = record.get("error")
+        if error or response.get("status_code", 200) >= 400:
+            message = (error or {}).get("message") or (body.get("error") or {}).get("message") or "request failed"
+            results[custom_id] = BatchResult(custom_id, error=f"{response.get('status_code', '')} {message}".strip())
+            continue
+        choice = (body.get("choices") or [{}])[0]
+        results[custom_id] = BatchResult(
+            custom_id,
+            text=(choice.get("message") or {}).get("content") or "",
+            model=body.get("model", ""),
+            finish_reason=choice.get("finish_reason"),
+            usage={k: v for k, v in (body.get("usage") or {}).items() if isinstance(v, int)},
+        )
+    return results
+
+
+class BatchBackend(ABC):
+    """Files + Batches interface shared by the provider and the local stand-in"""
+
+    name = ""
+    # Seconds between status polls
+    poll_interval = 1.0
+
+    @abstractmethod
+    def upload(self, path: Path) -> str:
+        """Upload a job file; returns its file id"""
+
+    @abstractmethod
+    def create(self, file_id: str, metadata: Optional[Dict[str, str]] = None) -> str:
+        """Start a batch over an uploaded job file; returns the batch id"""
+
+    @abstractmethod
+    def retrieve(self, batch_id: str) -> Dict[str, Any]:
+        """Batch state: status, output_file_id, error_file_id, completed, failed, total"""
+
+    @abstractmethod
+    def content(self, file_id: str) -> str:
+        """Text of an output or error file"""
+
+
+class ProviderBatchBackend(BatchBackend):
+    """The OpenAI-compatible Files and Batches API of the configured endpoint"""
+
+    name = "provider"
+
+    def __init__(self, config: Optional[ConfigSnapshot] = None):
+        config = config or Config.snapshot()
+        self.client = openai.OpenAI(base_url=config.api_base, api_key=config.api_key)
+        self.poll_interval = Config.BATCH_POLL_SECONDS
+
+    def upload(self, path: Path) -> str:
+        with open(path, "rb") as f:
+            return self.client.files.create(file=f, purpose="batch").id
+
+    def create(self, file_id: str, metadata: Optional[Dict[str, str]] = None) -> str:
+        batch = self.client.batches.create(input_file_id=file_id, endpoint=ENDPOINT,
+                                           completion_window=Config.BATCH_COMPLETION_WINDOW, metadata=metadata)
+        return batch.id
+
+    def retrieve(self, batch_id: str) -> Dict[str, Any]:
+        batch = self.client.batches.retrieve(batch_id)
+        counts = batch.request_counts
+        return {"status": batch.status, "output_file_id": batch.output_file_id,
+                "error_file_id": batch.error_file_id, "completed": counts.completed if counts else 0,
+                "failed": counts.failed if counts else 0, "total": counts.total if counts else 0}
+
+    def content(self, file_id: str) -> str:
+        return self.client.files.content(file_id).text
+
+
+class LocalBatchBackend(BatchBackend):
+    """
+    Stand-in for a provider batch endpoint.
+
+    Runs each request of the job file through ``shared_llm`` against the
+    configured chat endpoint, in a background pool, and writes output and
+    error files in the provider's format.
+    """
+
+    name = "local"
+    poll_interval = 0.2
+
+    def __init__(self, config: Optional[ConfigSnapshot] = None, concurrency: int = Config.BATCH_LOCAL_CONCURRENCY,
+                 directory: Optional[Path] = None):
+        self.config = config or Config.snapshot()
+        self.directory = directory or Config.CACHE_DIR / "batches" / "local"
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self._pool = ThreadPoolExecutor(max_workers=max(1, concurrency), thread_name_prefix="local-batch")
+        self._batches: Dict[str, Dict[str, Any]] = {}
+        self._lock = threading.Lock()
+
+    def upload(self, path: Path) -> str:
+        file_id = f"file-{uuid.uuid4().hex[:12]}"
+        (self.directory / file_id).write_text(Path(path).read_text())
+        return file_id
+
+    def create(self, file_id: str, metadata: Optional[Dict[str, str]] = None) -> str:
+        lines = [json.loads(line) for line in (self.directory / file_id).read_text().splitlines() if line.strip()]
+        batch_id = f"batch-{uuid.uuid4().hex[:12]}"
+        with self._lock:
+            self._batches[batch_id] = {"status": "in_progress", "output_file_id": None, "error_file_id": None,
+                                       "completed": 0, "failed": 0, "total": len(lines)}
+        threading.Thread(target=self._run, args=(batch_id, lines), daemon=True, name=batch_id).start()
+        return batch_id
+
+    def retrieve(self, batch_id: str) -> Dict[str, Any]:
+        with self._lock:
+            return dict(self._batches[batch_id])
+
+    def content(self, file_id: str) -> str:
+        return (self.directory / file_id).read_text()
+
+    def _run(self, batch_id: str, lines: List[Dict[str, Any]]) -> None:
+        outputs, errors = [], []
+        for record in self._pool.map(self._execute, lines):
+            ok = record["error"] is None
+            (outputs if ok else errors).append(json.dumps(record))
+            with self._lock:
+                self._batches[batch_id]["completed" if ok else "failed"] += 1
+        state = {"status": "completed"}
+        for kind, records in (("output_file_id", outputs), ("error_file_id", errors)):
+            if records:
+                file_id = f"file-{uuid.uuid4().hex[:12]}"
+                (self.directory / file_id).write_text("\n".join(records) + "\n")
+                state[kind] = file_id
+        with self._lock:
+            self._batches[batch_id].update(state)
+
+    def _execute(self, line: Dict[str, Any]) -> Dict[str, Any]:
+        from shared_llm import get_caller
+
+        body = dict(line["body"])
+        messages = body.pop("messages")
+        record = {"id": f"batch_req_{uuid.uuid4().hex[:12]}", "custom_id": line["custom_id"]}
+        try:
+            result = get_caller(self.config).complete(messages, **body)
+        except Exception as e:
+            return {**record, "response": None, "error": {"code": type(e).__name__, "message": str(e)}}
+        completion = {
+            "object": "chat.completion",
+            "model": result.model,
+            "choices": [{"index": 0, "message": {"role": "assistant", "content": result.text},
+                         "finish_reason": result.finish_reason}],
+            "usage": result.usage,
+        }
+        return {**record, "response": {"status_code": 200, "body": completion}, "error": None}
+
+
+_BACKENDS = {"provider": ProviderBatchBackend, "local": LocalBatchBackend}
+
+
+def get_batch_backend(kind: Optional[str] = None, config: Optional[ConfigSnapshot] = None) -> BatchBackend:
+    """
+    The bulk job backend to use.
+
+    Args:
+        kind: "provider" or "local" (default: BATCH_BACKEND)
+        config: Configuration snapshot whose endpoint the backend uses
+
+    Returns:
+        BatchBackend: A new backend
+    """
+    kind = kind or Config.BATCH_BACKEND
+    if kind not in _BACKENDS:
+        raise ValueError(f"Unknown BATCH_BACKEND '{kind}'. Expected one of {sorted(_BACKENDS)}")
+    return _BACKENDS[kind](config=config)
+
+
+def run_batch_job(requests: Sequence[BatchRequest], name: str, backend: Optional[BatchBackend] = None,
+                  config: Optional[ConfigSnapshot] = None,
+                  log: Callable[..., None] = print) -> Dict[str, BatchResult]:
+    """
+    Submit requests as one bulk job and wait for its results.
+
+    Args:
+        requests: The job's requests
+        name: Job name (file names and batch metadata)
+        backend: Backend to submit to (default: ``get_batch_backend()``)
+        config: Configuration snapshot (default model of the requests)
+        log: Progress printer
+
+    Returns:
+        Dict[str, BatchResult]: Result per custom_id; requests without a result carry an error
+    """
+    if not requests:
+        return {}
+    config = config or Config.snapshot()
+    backend = backend or get_batch_backend(config=config)
+    stamp = time.strftime("%Y%m%d_%H%M%S")
+    path = write_job_file(requests, Config.CACHE_DIR / "batches" / f"{name}_{stamp}.jsonl", config.model)
+    batch_id = backend.create(backend.upload(path), metadata={"job": name})
+    log(f"📦 Bulk job '{name}': {len(requests)} requests submitted ({backend.name} batch {batch_id})")
+
+    started = time.monotonic()
+    state = backend.retrieve(batch_id)
+    while state["status"] not in FINAL_STATES:
+        time.sleep(backend.poll_interval)
+        state = backend.retrieve(batch_id)
+    log(f"📦 Bulk job '{name}': {state['status']} after {time.monotonic() - started:.1f}s "
+        f"({state['completed']} completed, {state['failed']} failed)")
+
+    results: Dict[str, BatchResult] = {}
+    for file_key in ("output_file_id", "error_file_id"):
+        if state.get(file_key):
+            text = backend.content(state[file_key])
+            (path.parent / f"{path.stem}.{file_key.split('_')[0]}.jsonl").write_text(text)
+            results.update(parse_results(text))
+    for request in requests:
+        results.setdefault(request.custom_id, BatchResult(request.custom_id, error=f"no result (batch {state['status']})"))
+    return results
@@ -0,0 +1,191 @@
+"""
+Output Budget Module for AutoGen and CrewAI Lab Demo
+
+Decode time dominates LLM latency, so every agent role gets an explicit output
+budget (``max_tokens``) that is sent with its API calls. This module records
+how long each role's outputs actually are, recommends tighter budgets from
+those observations and flags outputs that were cut off by their budget.
+
+Observations are stored in ``Config.CACHE_DIR / "output_budgets.json"`` so
+budgets adapt across runs when ``ADAPTIVE_MAX_TOKENS=True``.
+
+Usage:
+    from shared_budgets import OutputBudgetMonitor
+
+    monitor = OutputBudgetMonitor()
+    monitor.record("review", reply_text, max_tokens=Config.get_max_tokens("review"))
+    monitor.print_report()
+    monitor.save()
+"""
+
+import json
+import math
+import threading
+from functools import lru_cache
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+from shared_config import Config
+from shared_tokens import count_tokens
+
+_STATS_FILE = "output_budgets.json"
+
+
+def estimate_tokens(text: str) -> int:
+    """Token count of an output (see ``shared_tokens.count_tokens``)."""
+    return count_tokens(text or "")
+
+
+def is_truncated(text: str, max_tokens: int, finish_reason: Optional[str] = None) -> bool:
+    """
+    Decide whether an output was cut off by its token budget.
+
+    The provider's ``finish_reason`` is authoritative when available. Otherwise
+    an output is treated as truncated when it used almost the whole budget and
+    does not end like a finished sentence or list item.
+
+    Args:
+        text: Output text
+        max_tokens: Budget the output was generated with
+        finish_reason: Provider finish reason, if known
+
+    Returns:
+        bool: True if the output was likely truncated
+    """
+    if finish_reason is not None:
+        return finish_reason == "length"
+    stripped = (text or "").rstrip()
+    if not stripped or estimate_tokens(stripped) < 0.9 * max_tokens:
+        return False
+    return stripped[-1] not in ".!?)]\"'`*|"
+
+
+class OutputBudgetTuner:
+    """Persistent per-role history of output lengths used to size budgets"""
+
+    WINDOW = 50          # Observations kept per role
+    MIN_SAMPLES = 5      # Below this, keep the configured budget
+    HEADROOM = 1.25      # Budget = p95 output length * headroom
+    FLOOR = 256          # Never recommend less than this
+    MAX_TRUNCATION_RATE = 0.1
+
+    def __init__(self, path: Optional[Path] = None, stats: Optional[Dict[str, Any]] = None):
+        self.path = path or Config.CACHE_DIR / _STATS_FILE
+        self.stats: Dict[str, Dict[str, List]] = stats or {}
+        self._lock = threading.Lock()
+
+    @classmethod
+    def load(cls, path: Optional[Path] = None) -> "OutputBudgetTuner":
+        """Load observations from disk (an empty tuner if none are stored yet)"""
+        path = path or Config.CACHE_DIR / _STATS_FILE
+        try:
+            with open(path) as f:
+                return cls(path, json.load(f))
+        except (OSError, ValueError):
+            return cls(path)
+
+    @classmethod
+    def current(cls, path: Optional[Path] = None) -> "OutputBudgetTuner":
+        """
+        Stored observations for sizing budgets, parsed once per version of the file.
+
+        The tuner is shared by the whole process and is reloaded only when the
+        file's mtime changes, so per-agent and per-task budget lookups do not
+        re-read it. Do not add observations to it; use ``load`` for a tuner to update.
+        """
+        path = Path(path or Config.CACHE_DIR / _STATS_FILE)
+        try:
+            mtime_ns = path.stat().st_mtime_ns
+        except OSError:
+            mtime_ns = None
+        return _load_tuner(str(path), mtime_ns)
+
+    def observe(self, role: str, output_tokens: int, truncated: bool) -> None:
+        """Add one observation for a role"""
+        with self._lock:
+            entry = self.stats.setdefault(role, {"tokens": [], "truncated": []})
+            entry["tokens"] = (entry["tokens"] + [output_tokens])[-self.WINDOW:]
+            entry["truncated"] = (entry["truncated"] + [bool(truncated)])[-self.WINDOW:]
+
+    def recommend(self, role: str, ceiling: int) -> int:
+        """
+        Recommend a budget for a role.
+
+        Args:
+            role: Role key
+            ceiling: Configured budget; the recommendation never exceeds it
+
+        Returns:
+            int: Recommended max_tokens
+        """
+        entry = self.stats.get(role)
+        if not entry or len(entry["tokens"]) < self.MIN_SAMPLES:
+            return ceiling
+        # Recent truncations mean the budget is already too tight
+        if sum(entry["truncated"]) / len(entry["truncated"]) > self.MAX_TRUNCATION_RATE:
+            return ceiling
+        lengths = sorted(entry["tokens"])
+        p95 = lengths[min(len(lengths) - 1, math.ceil(0.95 * len(lengths)) - 1)]
+        budget = math.ceil(p95 * self.HEADROOM / 64) * 64
+        return max(self.FLOOR, min(ceiling, budget))
+
+    def save(self) -> None:
+        """Write observations to disk"""
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        with self._lock, open(self.path, "w") as f:
+            json.dump(self.stats, f, indent=2)
+
+
+@lru_cache(maxsize=8)
+def _load_tuner(path: str, mtime_ns: Optional[int]) -> OutputBudgetTuner:
+    return OutputBudgetTuner.load(Path(path))
+
+
+class OutputBudgetMonitor:
+    """Records output lengths for one run and reports truncated outputs"""
+
+    def __init__(self, tuner: Optional[OutputBudgetTuner] = None):
+        self.tuner = tuner or OutputBudgetTuner.load()
+        self.records: List[Dict[str, Any]] = []
+
+    def record(self, role: str, text: str, max_tokens: Optional[int] = None,
+               finish_reason: Optional[str] = None, output_tokens: Optional[int] = None) -> bool:
+        """
+        Record one agent output.
+
+        Args:
+            role: Role key
+            text: Output text
+            max_tokens: Budget used (defaults to the role's current budget)
+            finish_reason: Provider finish reason, if known
+            output_tokens: Exact completion tokens, if the provider reported them
+
+        Returns:
+            bool: True if the output was truncated
+        """
+        max_tokens = max_tokens or Config.get_max_tokens(role)
+        tokens = output_tokens if output_tokens is not None else estimate_tokens(text)
+        truncated = is_truncated(text, max_tokens, finish_reason)
+        self.tuner.observe(role, tokens, truncated)
+        self.records.append({"role": role, "tokens": tokens, "max_tokens": max_tokens, "truncated": truncated})
+        return truncated
+
+    @property
+    def truncations(self) -> List[Dict[str, Any]]:
+        return [r for r in self.records if r["truncated"]]
+
+    def print_report(self) -> None:
+        """Print output lengths per role and any truncations"""
+        if not self.records:
+            return
+        print("\n📏 Output budgets (tokens used / max_tokens):")
+        for r in self.records:
+            flag = "  ⚠️  TRUNCATED" if r["truncated"] else ""
+            print(f"   {r['role']:<15} {r['tokens']:>5} / {r['max_tokens']}{flag}")
+        if self.truncations:
+            print(f"⚠️  {len(self.truncations)} output(s) hit their token budget. "
+                  f"Raise AGENT_MAX_TOKENS_<ROLE> for: {', '.join(sorted({r['role'] for r in self.truncations}))}")
+
+    def save(self) -> None:
+        """Persist observations for adaptive budgets"""
+        self.tuner.save()
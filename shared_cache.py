@@ -0,0 +1,91 @@
+"""
+Shared On-Disk Cache for AutoGen and CrewAI Lab Demo
+
+A small key/value cache stored in SQLite so several processes (e.g. the
+workers of ``crewai/batch_runner.py``) can share results safely. Values are
+JSON-serializable; entries can carry a time-to-live.
+
+Usage:
+    from shared_cache import DiskCache
+
+    cache = DiskCache("trip_results")
+    key = DiskCache.make_key({"destination": "Iceland", "trip_duration": "5 days"})
+    plan = cache.get(key)
+    if plan is None:
+        plan = run_trip(...)
+        cache.set(key, plan, ttl=24 * 3600)
+"""
+
+import hashlib
+import json
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import Any, Optional
+
+from shared_config import Config
+
+
+class DiskCache:
+    """Process-safe JSON key/value cache backed by SQLite"""
+
+    def __init__(self, name: str, path: Optional[Path] = None):
+        """
+        Args:
+            name: Cache namespace (one table per namespace)
+            path: SQLite file (defaults to Config.CACHE_DIR / "cache.sqlite3")
+        """
+        if not name.isidentifier():
+            raise ValueError(f"Cache name must be an identifier, got '{name}'")
+        self.name = name
+        self.path = Path(path or Config.CACHE_DIR / "cache.sqlite3")
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        # One connection per thread; SQLite handles cross-process locking
+        self._local = threading.local()
+        with self._conn() as conn:
+            conn.execute(
+                f"CREATE TABLE IF NOT EXISTS {self.name} "
+                f"(key TEXT PRIMARY KEY, value TEXT NOT NULL, expires_at REAL)"
+            )
+
+    def _conn(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=30)
+            conn.execute("PRAGMA journal_mode=WAL")
+            self._local.conn = conn
+        return conn
+
+    @staticmethod
+    def make_key(data: Any) -> str:
+        """Stable key for any JSON-serializable value"""
+        return hashlib.sha256(json.dumps(data, sort_keys=True, default=str).encode()).hexdigest()
+
+    def get(self, key: str, default: Any = None) -> Any:
+        """Get a value, or ``default`` if missing or expired"""
+        row = self._conn().execute(
+            f"SELECT value, expires_at FROM {self.name} WHERE key = ?", (key,)
+        ).fetchone()
+        if row is None or (row[1] is not None and row[1] < time.time()):
+            return default
+        return json.loads(row[0])
+
+    def set(self, key: str, value: Any, ttl: Optional[float] = None) -> None:
+        """Store a value, optionally expiring after ``ttl`` seconds"""
+        expires_at = time.time() + ttl if ttl else None
+        with self._conn() as conn:
+            conn.execute(
+                f"INSERT OR REPLACE INTO {self.name} (key, value, expires_at) VALUES (?, ?, ?)",
+                (key, json.dumps(value), expires_at),
+            )
+
+    def delete(self, key: str) -> None:
+        with self._conn() as conn:
+            conn.execute(f"DELETE FROM {self.name} WHERE key = ?", (key,))
+
+    def purge_expired(self) -> int:
+        """Delete expired entries; returns how many were removed"""
+        with self._conn() as conn:
+            cursor = conn.execute(f"DELETE FROM {self.name} WHERE expires_at < ?", (time.time(),))
+            return cursor.rowcount
@@ -0,0 +1,235 @@
+"""
+Model Cascade for AutoGen and CrewAI Lab Demo
+
+Every agent used to run on the one model in ``Config``, so a flight search that
+a small model handles well paid large-model latency and price. With a cascade
+(``MODEL_CASCADE``, cheapest model first) each task or turn runs on the
+cheapest model. Its output is scored locally, and it is redone on the next
+stronger model only when the score fails:
+
+- CrewAI: the task's ``TaskValidator`` (``crewai/validation.py``) scores the
+  output with the task's checks plus ``completeness_problems``. A failing
+  output is redone by the agent on the next model, with the problems listed.
+  Repairs (``VALIDATION_MAX_REPAIRS``) start once the strongest model is reached.
+- AutoGen: ``ResilientModelClient`` scores each turn with
+  ``completeness_problems`` and the phase's required terms
+  (``WorkflowConfig.TURN_REQUIREMENTS``), and retries a failing turn on the
+  next model.
+
+``CascadeStats`` records which model each agent's outputs were accepted on.
+The totals persist in ``Config.CACHE_DIR / "cascade_stats.json"``, so the
+escalation rate per agent shows whether the cheap model is worth trying for it.
+
+Usage:
+    from shared_cascade import ModelCascade, completeness_problems, get_cascade_stats
+
+    cascade = ModelCascade(["llama-3.1-8b-instant", "llama-3.3-70b-versatile"])
+    text = run(cascade.model)
+    while completeness_problems(text) and cascade.escalate():
+        text = run(cascade.model)
+    get_cascade_stats().record("crewai/flight", cascade.model, cascade.level)
+    cascade.reset()
+"""
+
+import json
+import re
+import threading
+from collections import defaultdict
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional, Sequence
+
+from shared_config import Config
+
+_STATS_FILE = "cascade_stats.json"
+
+# Outputs shorter than this (characters, after stripping) are not an answer
+MIN_OUTPUT_CHARS = 80
+
+_REFUSAL = re.compile(
+    r"^(?:I'm sorry|I am sorry|I apologi[sz]e|I cannot|I can't|I am unable|I'm unable|As an AI)\b",
+    re.IGNORECASE,
+)
+_PLACEHOLDER = re.compile(r"\[(?:insert|your|add|placeholder)[^\]]*\]|\bTBD\b|\bX{2,}\b|\$X+\b|lorem ipsum",
+                          re.IGNORECASE)
+
+
+def completeness_problems(text: str, finish_reason: Optional[str] = None,
+                          required: Iterable[str] = ()) -> List[str]:
+    """
+    Generic checks of an output that apply to every agent.
+
+    Args:
+        text: Output text
+        finish_reason: Provider finish reason, if known ("length" = cut off)
+        required: Terms the output must contain ("a|b" accepts either)
+
+    Returns:
+        List[str]: Problems found ([] when the output passes)
+    """
+    stripped = (text or "").strip()
+    problems = []
+    if len(stripped) < MIN_OUTPUT_CHARS:
+        problems.append(f"the answer is only {len(stripped)} characters; give the complete answer")
+    if finish_reason == "length":
+        problems.append("the answer was cut off by the output budget; be more concise and finish it")
+    if _REFUSAL.match(stripped):
+        problems.append("the answer declines the task instead of doing it")
+    placeholders = sorted({m.group() for m in _PLACEHOLDER.finditer(stripped)})
+    if placeholders:
+        problems.append(f"the answer has placeholders ({', '.join(placeholders[:3])}); fill in concrete values")
+    lowered = stripped.lower()
+    missing = [term for term in required if not any(t.strip().lower() in lowered for t in term.split("|"))]
+    if missing:
+        problems.append("the answer does not cover: " + ", ".join(t.split("|")[0] for t in missing))
+    return problems
+
+
+class ModelCascade:
+    """
+    Models of one agent, cheapest first, and the model its current output runs on.
+
+    The level is per thread: an agent's LLM is shared by every crew or chat of a
+    config snapshot, and each of them runs its tasks in one thread.
+    """
+
+    def __init__(self, models: Sequence[str]):
+        if not models:
+            raise ValueError("A model cascade needs at least one model")
+        self.models = tuple(models)
+        self._state = threading.local()
+
+    @property
+    def level(self) -> int:
+        """Escalations so far for the current output (0 = cheapest model)"""
+        return getattr(self._state, "level", 0)
+
+    @property
+    def model(self) -> str:
+        return self.models[self.level]
+
+    def escalate(self) -> bool:
+        """Move to the next stronger model; False when already on the strongest"""
+        if self.level + 1 >= len(self.models):
+            return False
+        self._state.level = self.level + 1
+        return True
+
+    def reset(self) -> None:
+        """Start the next output on the cheapest model again"""
+        self._state.level = 0
+
+    def begin(self, owner: Any) -> None:
+        """
+        Start on the cheapest model when this thread moves on to another output.
+
+        Acceptance resets the level, but a repair chain cut short (e.g. a crew
+        aborted mid-repair) never reaches it; the next output must not start on
+        the model that chain escalated to.
+
+        Args:
+            owner: What the output is for (e.g. the CrewAI task); calls for the
+                same owner keep their level
+        """
+        if getattr(self._state, "owner", None) is not owner:
+            self._state.owner = owner
+            self._state.level = 0
+
+
+class CascadeStats:
+    """Which model each agent's outputs were accepted on, this process and across runs"""
+
+    def __init__(self, path: Optional[Path] = None):
+        self.path = path or Config.CACHE_DIR / _STATS_FILE
+        self.session: Dict[str, Dict[str, Any]] = defaultdict(self._entry)
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _entry() -> Dict[str, Any]:
+        return {"outputs": 0, "escalations": 0, "escalated": 0, "failed": 0, "models": {}}
+
+    def record(self, agent: str, model: str, escalations: int, passed: bool = True) -> None:
+        """
+        Record one accepted output.
+
+        Args:
+            agent: Agent key, e.g. "crewai/flight"
+            model: Model the output was accepted on
+            escalations: Models skipped past the cheapest one
+            passed: False if the output still failed its checks on the strongest model
+        """
+        with self._lock:
+            entry = self.session[agent]
+            entry["outputs"] += 1
+            entry["escalations"] += escalations
+            entry["escalated"] += bool(escalations)
+            entry["failed"] += not passed
+            entry["models"][model] = entry["models"].get(model, 0) + 1
+
+    def escalation_rate(self, agent: str) -> float:
+        """Share of an agent's outputs (this process) that needed a stronger model"""
+        with self._lock:
+            entry = self.session.get(agent)
+            return entry["escalated"] / entry["outputs"] if entry and entry["outputs"] else 0.0
+
+    def print_report(self) -> None:
+        """Print per-agent escalation rates of this process, with the stored totals"""
+        with self._lock:
+            session = {agent: dict(entry) for agent, entry in self.session.items()}
+        if not session:
+            return
+        totals = self._merged(self._load(), session)
+        print("\n🪜 Model cascade (escalation rate: this run / all runs):")
+        for agent, entry in sorted(session.items()):
+            total = totals[agent]
+            models = ", ".join(f"{model} {count}" for model, count in entry["models"].items())
+            failed = f", {entry['failed']} accepted with problems" if entry["failed"] else ""
+            print(f"   {agent:<20} {entry['escalated'] / entry['outputs']:>4.0%} / "
+                  f"{total['escalated'] / total['outputs']:>4.0%} of {total['outputs']} "
+                  f"({models}{failed})")
+
+    def save(self) -> None:
+        """Add this process's counts to the stored totals and start counting afresh"""
+        with self._lock:
+            session = {agent: dict(entry) for agent, entry in self.session.items()}
+            self.session.clear()
+        if not session:
+            return
+        totals = self._merged(self._load(), session)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        with open(self.path, "w") as f:
+            json.dump(totals, f, indent=2)
+
+    def to_dict(self) -> Dict[str, Dict[str, Any]]:
+        with self._lock:
+            return {agent: dict(entry) for agent, entry in self.session.items()}
+
+    def _load(self) -> Dict[str, Dict[str, Any]]:
+        try:
+            with open(self.path) as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {}
+
+    def _merged(self, stored: Dict[str, Dict[str, Any]],
+                session: Dict[str, Dict[str, Any]]) -> Dict[str, Dict[str, Any]]:
+        totals = {agent: dict(entry, models=dict(entry.get("models", {}))) for agent, entry in stored.items()}
+        for agent, entry in session.items():
+            total = totals.setdefault(agent, self._entry())
+            for key in ("outputs", "escalations", "escalated", "failed"):
+                total[key] = total.get(key, 0) + entry[key]
+            for model, count in entry["models"].items():
+                total["models"][model] = total["models"].get(model, 0) + count
+        return totals
+
+
+_stats: Optional[CascadeStats] = None
+_stats_lock = threading.Lock()
+
+
+def get_cascade_stats() -> CascadeStats:
+    """Process-wide cascade statistics"""
+    global _stats
+    with _stats_lock:
+        if _stats is None:
+            _stats = CascadeStats()
+        return _stats
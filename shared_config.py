@@ -4,6 +4,13 @@ Shared Configuration Module for AutoGen and CrewAI Lab Demo
 This module provides a unified configuration interface for both AutoGen and CrewAI frameworks.
 It loads environment variables from the root .env file and provides validation and configuration objects.
 
+Class attributes of ``Config`` are resolved once at import, by the same
+``ConfigSnapshot.from_env`` that builds snapshots. Long-running
+processes should take an immutable ``ConfigSnapshot`` per run instead
+(``Config.snapshot()``) and may call ``Config.watch_for_changes()`` to pick up
+edits to the .env file without a restart: new runs get the new snapshot while
+runs in flight keep the one they started with.
+
 Usage:
     from shared_config import Config
 
@@ -14,12 +21,178 @@ Usage:
     # Use configuration
     api_key = Config.OPENAI_API_KEY
     config_list = Config.get_config_list()  # For AutoGen
+
+    # Per-run snapshot (long-running services)
+    Config.watch_for_changes()
+    config = Config.snapshot()
+    model, max_tokens = config.model, config.get_max_tokens("review")
 """
 
 import os
+import threading
+import time
+from dataclasses import dataclass, field, replace
 from pathlib import Path
-from typing import Dict, List, Any
-from dotenv import load_dotenv
+from typing import Any, Callable, Dict, List, Mapping, Optional, Tuple
+from dotenv import dotenv_values, load_dotenv
+
+
+# ====================
+# Output Budgets (max_tokens per agent role)
+# ====================
+# Role keys are AutoGen phases and CrewAI tasks. Override one with
+# AGENT_MAX_TOKENS_<ROLE> (e.g. AGENT_MAX_TOKENS_REVIEW=900); roles without
+# an entry use AGENT_MAX_TOKENS. "under 400 words" is roughly 550 tokens.
+DEFAULT_ROLE_MAX_TOKENS = {
+    "research": 800,
+    "research_brief": 300,
+    "analysis": 800,
+    "blueprint": 800,
+    "review": 1000,
+    "critique": 400,
+    "speaker_selection": 20,
+    "flight": 800,
+    "hotel": 900,
+    "itinerary": 1500,
+    "budget": 1200,
+}
+
+
+def _flag(env: Mapping[str, str], name: str, default: str) -> bool:
+    return env.get(name, default).lower() == "true"
+
+
+@dataclass(frozen=True)
+class ConfigSnapshot:
+    """
+    Immutable view of the per-run settings, resolved from one reading of the environment.
+
+    Field names follow ``Config.to_dict()``. Snapshots are hashable, so they
+    can key caches of objects built from them (LLM clients, crews).
+    """
+
+    version: int
+    provider: str
+    api_key: str
+    api_base: str
+    model: str
+    agent_temperature: float
+    agent_max_tokens: int
+    agent_timeout: int
+    role_max_tokens: Tuple[Tuple[str, int], ...]
+    max_tokens_overrides: Tuple[Tuple[str, int], ...]
+    adaptive_max_tokens: bool
+    resilient_calls: bool
+    max_retries: int
+    attempt_timeout: float
+    hedge_api_base: str
+    hedge_api_key: str
+    hedge_model: str
+    hedge_delay: float
+    run_budget_usd: float
+    run_budget_tokens: int
+    budget_action: str
+    budget_downgrade_model: str
+    output_validation: bool
+    validation_max_repairs: int
+    tool_prefetch: bool
+    semantic_cache: bool
+    draft_refine: bool
+    draft_model: str
+    draft_roles: Tuple[str, ...]
+    refine_max_tokens: int
+    model_cascade: Tuple[str, ...]
+    local_roles: Tuple[str, ...]
+    run_deadline: float
+    verbose: bool
+    debug: bool
+    loaded_at: float = field(default_factory=time.time, compare=False)
+
+    @classmethod
+    def from_env(cls, env: Mapping[str, str], version: int = 0) -> "ConfigSnapshot":
+        """
+        Resolve a snapshot from an environment mapping (``Config`` resolves its attributes with it too).
+
+        Args:
+            env: Environment variables (.env values merged with the process env)
+            version: Snapshot version number
+
+        Returns:
+            ConfigSnapshot: The resolved settings
+        """
+        groq_key = env.get("GROQ_API_KEY", "")
+        if groq_key:
+            provider, api_key = "Groq", groq_key
+            api_base = env.get("GROQ_API_BASE", "https://api.groq.com/openai/v1")
+            default_model = env.get("GROQ_MODEL", "llama-3.3-70b-versatile")
+        else:
+            provider, api_key = "OpenAI", env.get("OPENAI_API_KEY", "")
+            api_base = env.get("OPENAI_API_BASE", "https://api.openai.com/v1")
+            default_model = env.get("OPENAI_MODEL", "gpt-4-turbo-preview")
+
+        overrides = {
+            name[len("AGENT_MAX_TOKENS_"):].lower(): int(value)
+            for name, value in env.items() if name.startswith("AGENT_MAX_TOKENS_") and value
+        }
+
+        return cls(
+            version=version,
+            provider=provider,
+            api_key=api_key,
+            api_base=api_base,
+            model=env.get("OPENAI_MODEL") or env.get("GROQ_MODEL") or default_model,
+            agent_temperature=float(env.get("AGENT_TEMPERATURE", "0.7")),
+            agent_max_tokens=int(env.get("AGENT_MAX_TOKENS", "2000")),
+            agent_timeout=int(env.get("AGENT_TIMEOUT", "300")),
+            role_max_tokens=tuple(sorted(DEFAULT_ROLE_MAX_TOKENS.items())),
+            max_tokens_overrides=tuple(sorted(overrides.items())),
+            adaptive_max_tokens=_flag(env, "ADAPTIVE_MAX_TOKENS", "False"),
+            resilient_calls=_flag(env, "RESILIENT_CALLS", "False"),
+            max_retries=int(env.get("MAX_RETRIES", "2")),
+            attempt_timeout=float(env.get("ATTEMPT_TIMEOUT", "60")),
+            hedge_api_base=env.get("HEDGE_API_BASE", ""),
+            hedge_api_key=env.get("HEDGE_API_KEY", ""),
+            hedge_model=env.get("HEDGE_MODEL", ""),
+            hedge_delay=float(env.get("HEDGE_DELAY", "10")),
+            run_budget_usd=float(env.get("RUN_BUDGET_USD", "0")),
+            run_budget_tokens=int(env.get("RUN_BUDGET_TOKENS", "0")),
+            budget_action=env.get("BUDGET_ACTION", "abort"),
+            budget_downgrade_model=env.get("BUDGET_DOWNGRADE_MODEL", ""),
+            output_validation=_flag(env, "OUTPUT_VALIDATION", "True"),
+            validation_max_repairs=int(env.get("VALIDATION_MAX_REPAIRS", "1")),
+            tool_prefetch=_flag(env, "TOOL_PREFETCH", "False"),
+            semantic_cache=_flag(env, "SEMANTIC_CACHE", "False"),
+            draft_refine=_flag(env, "DRAFT_REFINE", "False"),
+            draft_model=env.get("DRAFT_MODEL", "llama-3.1-8b-instant"),
+            draft_roles=tuple(r.strip() for r in env.get("DRAFT_ROLES", "").split(",") if r.strip()),
+            refine_max_tokens=int(env.get("REFINE_MAX_TOKENS", "300")),
+            model_cascade=tuple(m.strip() for m in env.get("MODEL_CASCADE", "").split(",") if m.strip()),
+            local_roles=tuple(r.strip() for r in env.get("LOCAL_ROLES", "").split(",") if r.strip()),
+            run_deadline=float(env.get("RUN_DEADLINE", "0")),
+            verbose=_flag(env, "VERBOSE", "True"),
+            debug=_flag(env, "DEBUG", "False"),
+        )
+
+    def get_max_tokens(self, role: str) -> int:
+        """Output budget (max_tokens) for an agent role; see ``Config.get_max_tokens``"""
+        override = dict(self.max_tokens_overrides).get(role)
+        if override:
+            return override
+        budget = min(dict(self.role_max_tokens).get(role, self.agent_max_tokens), self.agent_max_tokens)
+        if self.adaptive_max_tokens:
+            from shared_budgets import OutputBudgetTuner
+            budget = OutputBudgetTuner.current().recommend(role, budget)
+        return budget
+
+    def drafts(self, role: str, default: bool = False) -> bool:
+        """Whether a role runs in draft-and-refine mode; see ``Config.drafts``"""
+        if not self.draft_refine:
+            return False
+        return role in self.draft_roles if self.draft_roles else default
+
+    def runs_locally(self, role: str) -> bool:
+        """Whether a role runs on the local model; see ``Config.runs_locally``"""
+        return role in self.local_roles
 
 
 class Config:
@@ -31,7 +204,12 @@ class Config:
 
     # Load environment variables from root .env file
     _env_path = Path(__file__).parent / ".env"
+    _process_env = dict(os.environ)  # Before .env is merged in; real env vars take precedence
     load_dotenv(_env_path)
+    # Settings that runs also read from snapshots are resolved here by the same
+    # code (ConfigSnapshot.from_env), and the per-role helpers below delegate to
+    # it, so the two can never disagree
+    _env = ConfigSnapshot.from_env(os.environ)
 
     # ====================
     # API Provider Settings (supports OpenAI and Groq)
@@ -39,36 +217,192 @@ class Config:
     # Check for Groq key first, then OpenAI key
     GROQ_API_KEY = os.getenv("GROQ_API_KEY", "")
     OPENAI_API_KEY = os.getenv("OPENAI_API_KEY", "")
-    
+
     # Determine which provider to use
-    USE_GROQ = bool(GROQ_API_KEY and GROQ_API_KEY != "")
-    
-    # Set API base URL based on provider
+    USE_GROQ = _env.provider == "Groq"
+
+    # API base URL and key of the provider
+    API_BASE = _env.api_base
+    API_KEY = _env.api_key
     if USE_GROQ:
-        API_BASE = os.getenv("GROQ_API_BASE", "https://api.groq.com/openai/v1")
-        API_KEY = GROQ_API_KEY
         DEFAULT_MODEL = os.getenv("GROQ_MODEL", "llama-3.3-70b-versatile")
     else:
-        API_BASE = os.getenv("OPENAI_API_BASE", "https://api.openai.com/v1")
-        API_KEY = OPENAI_API_KEY
         DEFAULT_MODEL = os.getenv("OPENAI_MODEL", "gpt-4-turbo-preview")
-    
+
     # For backward compatibility
     OPENAI_API_BASE = API_BASE
-    OPENAI_MODEL = os.getenv("OPENAI_MODEL") or os.getenv("GROQ_MODEL") or DEFAULT_MODEL
+    OPENAI_MODEL = _env.model
 
     # ====================
     # Agent Settings
     # ====================
-    AGENT_TEMPERATURE = float(os.getenv("AGENT_TEMPERATURE", "0.7"))
-    AGENT_MAX_TOKENS = int(os.getenv("AGENT_MAX_TOKENS", "2000"))
-    AGENT_TIMEOUT = int(os.getenv("AGENT_TIMEOUT", "300"))
+    AGENT_TEMPERATURE = _env.agent_temperature
+    AGENT_MAX_TOKENS = _env.agent_max_tokens
+    AGENT_TIMEOUT = _env.agent_timeout
+
+    # ====================
+    # Output Budgets (max_tokens per agent role)
+    # ====================
+    # DEFAULT_ROLE_MAX_TOKENS, overridden per role by AGENT_MAX_TOKENS_<ROLE>
+    ROLE_MAX_TOKENS = dict(_env.role_max_tokens)
+    MAX_TOKENS_OVERRIDES = dict(_env.max_tokens_overrides)
+    # Shrink budgets toward the observed output lengths of past runs
+    ADAPTIVE_MAX_TOKENS = _env.adaptive_max_tokens
+
+    # ====================
+    # Resilient Calls (retries, per-attempt deadlines, hedged requests)
+    # ====================
+    # Route LLM calls through shared_llm.ResilientCaller instead of the framework client
+    RESILIENT_CALLS = _env.resilient_calls
+    MAX_RETRIES = _env.max_retries  # Retry failed API calls
+    ATTEMPT_TIMEOUT = _env.attempt_timeout  # Seconds per attempt
+    # Hedge target: a second endpoint and/or model (unset = no hedging)
+    HEDGE_API_BASE = _env.hedge_api_base
+    HEDGE_API_KEY = _env.hedge_api_key
+    HEDGE_MODEL = _env.hedge_model
+    # Hedge after the primary's p95 latency; this delay is used until enough samples exist
+    HEDGE_DELAY = _env.hedge_delay
+
+    # ====================
+    # Token Accounting & Run Budget
+    # ====================
+    # Hard limits per run (0 = unlimited); checked before every call
+    RUN_BUDGET_USD = _env.run_budget_usd
+    RUN_BUDGET_TOKENS = _env.run_budget_tokens
+    # What to do when a call would go over: "abort" or "downgrade" to BUDGET_DOWNGRADE_MODEL
+    BUDGET_ACTION = _env.budget_action
+    BUDGET_DOWNGRADE_MODEL = _env.budget_downgrade_model
+    # JSON file {"model": [input_usd_per_1m, output_usd_per_1m]} extending the built-in prices
+    MODEL_PRICING_FILE = os.getenv("MODEL_PRICING_FILE", "")
+
+    # ====================
+    # Output Validation (CrewAI task outputs vs. their expected_output)
+    # ====================
+    # Check each task output locally (option counts, prices, day headings, totals)
+    OUTPUT_VALIDATION = _env.output_validation
+    # Repair prompts per failing task before its output is accepted as-is
+    VALIDATION_MAX_REPAIRS = _env.validation_max_repairs
+
+    # ====================
+    # Tool Prefetch (CrewAI tasks with deterministic tool calls)
+    # ====================
+    # Run a task's declared tool calls before the crew starts and put the results in
+    # the task description; the agent answers in one LLM call without calling tools
+    TOOL_PREFETCH = _env.tool_prefetch
+
+    # ====================
+    # Tool Execution (shared_tools.py)
+    # ====================
+    # "thread" or "process" workers for tool calls, shared by all tools
+    TOOL_EXECUTOR = os.getenv("TOOL_EXECUTOR", "thread")
+    TOOL_MAX_WORKERS = int(os.getenv("TOOL_MAX_WORKERS", "8"))
+    # Seconds a caller waits for a tool; TOOL_TIMEOUTS overrides it per tool ("search_flight_prices=5")
+    TOOL_TIMEOUT = float(os.getenv("TOOL_TIMEOUT", "10"))
+    TOOL_TIMEOUTS = os.getenv("TOOL_TIMEOUTS", "")
+    # Calls of one tool in flight at most (hung calls included)
+    TOOL_CONCURRENCY = int(os.getenv("TOOL_CONCURRENCY", "4"))
+    # Hours a good result stays available as the fallback for a failed call with the same arguments
+    TOOL_CACHE_TTL_HOURS = float(os.getenv("TOOL_CACHE_TTL_HOURS", "24"))
+
+    # ====================
+    # Semantic Cache (shared_semantic_cache.py)
+    # ====================
+    # Answer agent calls from stored completions of near-identical prompts (per role and model)
+    SEMANTIC_CACHE = _env.semantic_cache
+    # Minimum cosine similarity of a candidate; candidates are then verified by token diff
+    SEMANTIC_CACHE_THRESHOLD = float(os.getenv("SEMANTIC_CACHE_THRESHOLD", "0.9"))
+    SEMANTIC_CACHE_MAX_ENTRIES = int(os.getenv("SEMANTIC_CACHE_MAX_ENTRIES", "2000"))
+    SEMANTIC_CACHE_TTL_HOURS = float(os.getenv("SEMANTIC_CACHE_TTL_HOURS", "24"))
+
+    # ====================
+    # Draft & Refine (shared_draft.py)
+    # ====================
+    # A small DRAFT_MODEL writes a role's turn; the main model approves it or returns edits
+    DRAFT_REFINE = _env.draft_refine
+    DRAFT_MODEL = _env.draft_model
+    # Roles that draft (e.g. "research,flight"); empty = the framework's defaults
+    # (AgentConfig.GENERATION_MODES for AutoGen, "generation" in the CrewAI workflow)
+    DRAFT_ROLES = list(_env.draft_roles)
+    # Output budget of the main model's approve/edit pass
+    REFINE_MAX_TOKENS = _env.refine_max_tokens
+
+    # ====================
+    # Model Cascade (shared_cascade.py)
+    # ====================
+    # Models cheapest first (e.g. "llama-3.1-8b-instant,llama-3.3-70b-versatile"); each task
+    # or turn runs on the first and moves to the next only if its local checks fail. Empty = off
+    MODEL_CASCADE = list(_env.model_cascade)
+
+    # ====================
+    # Local Inference (shared_local_llm.py)
+    # ====================
+    # Roles answered by a model on this machine instead of the endpoint, e.g.
+    # "speaker_selection,research_brief" (AutoGen phases, CrewAI tasks). Empty = off
+    LOCAL_ROLES = list(_env.local_roles)
+    # "llama_cpp" (in-process GGUF model), "server" (OpenAI-compatible server at LOCAL_API_BASE) or "mock"
+    LOCAL_BACKEND = os.getenv("LOCAL_BACKEND", "llama_cpp")
+    LOCAL_MODEL_PATH = os.getenv("LOCAL_MODEL_PATH", "")
+    # Model name in reports and requests ("" = the GGUF file name)
+    LOCAL_MODEL = os.getenv("LOCAL_MODEL", "")
+    LOCAL_API_BASE = os.getenv("LOCAL_API_BASE", "http://127.0.0.1:8080/v1")
+    # CPU threads (0 = llama.cpp's default) and context window of the in-process model
+    LOCAL_THREADS = int(os.getenv("LOCAL_THREADS", "0"))
+    LOCAL_CONTEXT = int(os.getenv("LOCAL_CONTEXT", "4096"))
+    # Concurrent requests are batched: up to LOCAL_BATCH_SIZE arriving within LOCAL_BATCH_WAIT_MS
+    LOCAL_BATCH_SIZE = int(os.getenv("LOCAL_BATCH_SIZE", "8"))
+    LOCAL_BATCH_WAIT_MS = float(os.getenv("LOCAL_BATCH_WAIT_MS", "5"))
+
+    # ====================
+    # Run Deadline (shared_deadline.py)
+    # ====================
+    # Default time budget per run in seconds (0 = none); the demos' deadline argument overrides it
+    RUN_DEADLINE = _env.run_deadline
+    # Seconds per turn/task assumed until the run has timed one
+    DEADLINE_STEP_SECONDS = float(os.getenv("DEADLINE_STEP_SECONDS", "20"))
+    # Smaller model used when the deadline gets tight ("" = keep the model)
+    DEADLINE_FALLBACK_MODEL = os.getenv("DEADLINE_FALLBACK_MODEL", "llama-3.1-8b-instant")
+
+    # ====================
+    # Job Queue (shared_jobs.py)
+    # ====================
+    # Queued jobs per priority class before new submissions are rejected
+    JOB_QUEUE_MAX_DEPTH = int(os.getenv("JOB_QUEUE_MAX_DEPTH", "200"))
+    # Concurrent jobs per tenant; JOB_TENANT_CAPS overrides it per tenant ("acme=4,trial=1")
+    JOB_TENANT_CAP = int(os.getenv("JOB_TENANT_CAP", "2"))
+    JOB_TENANT_CAPS = os.getenv("JOB_TENANT_CAPS", "")
+    # Workers per job kind kept free of batch work so interactive jobs start immediately
+    JOB_INTERACTIVE_RESERVE = int(os.getenv("JOB_INTERACTIVE_RESERVE", "1"))
+    # Provider saturation (over the last JOB_PRESSURE_WINDOW seconds of finished jobs):
+    # share of jobs failing on rate limits/timeouts, or job duration vs. the usual duration
+    JOB_PRESSURE_WINDOW = float(os.getenv("JOB_PRESSURE_WINDOW", "300"))
+    JOB_SHED_FAILURE_RATE = float(os.getenv("JOB_SHED_FAILURE_RATE", "0.25"))
+    JOB_SHED_SLOWDOWN = float(os.getenv("JOB_SHED_SLOWDOWN", "2.0"))
+
+    # ====================
+    # Offline Bulk Jobs (shared_batch.py)
+    # ====================
+    # "provider" submits to the endpoint's Batches API; "local" runs a stand-in against the chat endpoint
+    BATCH_BACKEND = os.getenv("BATCH_BACKEND", "local")
+    BATCH_COMPLETION_WINDOW = os.getenv("BATCH_COMPLETION_WINDOW", "24h")
+    # Seconds between status polls of a provider batch
+    BATCH_POLL_SECONDS = float(os.getenv("BATCH_POLL_SECONDS", "30"))
+    # Concurrent requests of the local stand-in
+    BATCH_LOCAL_CONCURRENCY = int(os.getenv("BATCH_LOCAL_CONCURRENCY", "8"))
+
+    # ====================
+    # Run Profiler (shared_profiler.py)
+    # ====================
+    # Sample both demos' threads and report wall time per step: LLM wait, tools, framework, own code
+    PROFILE = os.getenv("PROFILE", "False").lower() == "true"
+    PROFILE_INTERVAL_MS = float(os.getenv("PROFILE_INTERVAL_MS", "5"))
+    # Also write collapsed stacks (CACHE_DIR/profiles/*.folded) for speedscope/flamegraph.pl
+    PROFILE_FLAMEGRAPH = os.getenv("PROFILE_FLAMEGRAPH", "False").lower() == "true"
 
     # ====================
     # Logging Settings
     # ====================
-    VERBOSE = os.getenv("VERBOSE", "True").lower() == "true"
-    DEBUG = os.getenv("DEBUG", "False").lower() == "true"
+    VERBOSE = _env.verbose
+    DEBUG = _env.debug
 
     # ====================
     # Project Paths
@@ -76,6 +410,14 @@ class Config:
     PROJECT_ROOT = Path(__file__).parent
     AUTOGEN_DIR = PROJECT_ROOT / "autogen"
     CREWAI_DIR = PROJECT_ROOT / "crewai"
+    CACHE_DIR = Path(os.getenv("CACHE_DIR", str(PROJECT_ROOT / ".cache")))
+    KNOWLEDGE_DIR = Path(os.getenv("KNOWLEDGE_DIR", str(PROJECT_ROOT / "knowledge")))
+
+    # ====================
+    # Retrieval (local vector index over KNOWLEDGE_DIR)
+    # ====================
+    RETRIEVAL_ENABLED = os.getenv("RETRIEVAL_ENABLED", "False").lower() == "true"
+    RETRIEVAL_TOP_K = int(os.getenv("RETRIEVAL_TOP_K", "4"))
 
     @classmethod
     def validate(cls) -> bool:
@@ -112,6 +454,46 @@ class Config:
 
         return True
 
+    @classmethod
+    def get_max_tokens(cls, role: str) -> int:
+        """
+        Get the output budget (max_tokens) for an agent role.
+
+        Args:
+            role: Role key, e.g. "research" or "budget"
+
+        Returns:
+            int: max_tokens to send with the role's completions
+        """
+        return cls._env.get_max_tokens(role)
+
+    @classmethod
+    def drafts(cls, role: str, default: bool = False) -> bool:
+        """
+        Whether an agent role runs in draft-and-refine mode.
+
+        Args:
+            role: Role key, e.g. "research" or "flight"
+            default: The framework's default for the role, used when DRAFT_ROLES is empty
+
+        Returns:
+            bool: True if DRAFT_MODEL drafts the role's turns
+        """
+        return cls._env.drafts(role, default)
+
+    @classmethod
+    def runs_locally(cls, role: str) -> bool:
+        """
+        Whether an agent role runs on the local model (shared_local_llm.py).
+
+        Args:
+            role: Role key, e.g. "speaker_selection" or "flight"
+
+        Returns:
+            bool: True if the role is listed in LOCAL_ROLES
+        """
+        return cls._env.runs_locally(role)
+
     @classmethod
     def get_config_list(cls) -> List[Dict[str, Any]]:
         """
@@ -140,6 +522,31 @@ class Config:
             }
         ]
 
+    @classmethod
+    def snapshot(cls, version: Optional[int] = None) -> "ConfigSnapshot":
+        """
+        Get the current immutable configuration snapshot.
+
+        Take one at the start of a run and pass it down; it never changes,
+        even if the .env file is reloaded while the run is in flight.
+
+        Args:
+            version: Version of an earlier snapshot, for code that can only carry
+                the version of its run's snapshot (e.g. AutoGen config lists)
+
+        Returns:
+            ConfigSnapshot: The latest loaded configuration, or the requested
+            version while it is still retained (the latest otherwise)
+        """
+        if version is not None:
+            return config_store.get(version) or config_store.current()
+        return config_store.current()
+
+    @classmethod
+    def watch_for_changes(cls, interval: float = 2.0) -> None:
+        """Reload the .env file into a new snapshot whenever it changes (background thread)."""
+        config_store.watch(interval)
+
     @classmethod
     def to_dict(cls) -> Dict[str, Any]:
         """
@@ -179,13 +586,123 @@ class Config:
         print(f"✓ API Base:          {cls.API_BASE}")
         print(f"✓ Model:             {cls.OPENAI_MODEL}")
         print(f"✓ Temperature:       {cls.AGENT_TEMPERATURE}")
-        print(f"✓ Max Tokens:        {cls.AGENT_MAX_TOKENS}")
+        print(f"✓ Max Tokens:        {cls.AGENT_MAX_TOKENS}"
+              f"{' (adaptive per role)' if cls.ADAPTIVE_MAX_TOKENS else ' (per-role budgets apply)'}")
         print(f"✓ Timeout:           {cls.AGENT_TIMEOUT}s")
+        if cls.RESILIENT_CALLS:
+            hedge = cls.HEDGE_MODEL or cls.HEDGE_API_BASE or "off"
+            print(f"✓ Resilient Calls:   {cls.MAX_RETRIES} retries, {cls.ATTEMPT_TIMEOUT:g}s/attempt, hedge: {hedge}")
+        if cls.DRAFT_REFINE:
+            roles = ", ".join(cls.DRAFT_ROLES) or "framework defaults"
+            print(f"✓ Draft & Refine:    {cls.DRAFT_MODEL} drafts ({roles}), refine ≤{cls.REFINE_MAX_TOKENS} tokens")
+        if cls.MODEL_CASCADE:
+            print(f"✓ Model Cascade:     {' → '.join(cls.MODEL_CASCADE)}")
+        if cls.LOCAL_ROLES:
+            print(f"✓ Local Model:       {cls.LOCAL_BACKEND} for {', '.join(cls.LOCAL_ROLES)}")
+        if cls.RUN_BUDGET_USD or cls.RUN_BUDGET_TOKENS:
+            limits = [f"${cls.RUN_BUDGET_USD:g}" if cls.RUN_BUDGET_USD else "",
+                      f"{cls.RUN_BUDGET_TOKENS} tokens" if cls.RUN_BUDGET_TOKENS else ""]
+            action = cls.BUDGET_ACTION
+            if action == "downgrade":
+                action += f" to {cls.BUDGET_DOWNGRADE_MODEL or '(no model set)'}"
+            print(f"✓ Run Budget:        {' / '.join(l for l in limits if l)} per run, then {action}")
+        from shared_tokens import model_prices
+        price_in, price_out = model_prices(cls.OPENAI_MODEL)
+        print(f"✓ Pricing:           ${price_in:g} in / ${price_out:g} out per 1M tokens"
+              f"{'' if price_in or price_out else ' (unknown model, cost not tracked)'}")
         print(f"✓ Verbose:           {cls.VERBOSE}")
         print(f"✓ Debug:             {cls.DEBUG}")
         print("="*60 + "\n")
 
 
+class ConfigStore:
+    """Holds the current ConfigSnapshot and swaps in a new one when the .env file changes"""
+
+    # Earlier snapshots kept for runs that look theirs up by version
+    HISTORY = 16
+
+    def __init__(self, env_path: Path, process_env: Mapping[str, str]):
+        self.env_path = Path(env_path)
+        self.process_env = dict(process_env)
+        self._lock = threading.Lock()
+        self._listeners: List[Callable[[ConfigSnapshot], None]] = []
+        self._watcher: Optional[threading.Thread] = None
+        self._mtime = self._current_mtime()
+        self._snapshot = self._load(version=0)
+        self._history: Dict[int, ConfigSnapshot] = {0: self._snapshot}
+
+    def _current_mtime(self) -> Optional[float]:
+        try:
+            return self.env_path.stat().st_mtime
+        except FileNotFoundError:
+            return None
+
+    def _load(self, version: int) -> ConfigSnapshot:
+        file_env = {k: v for k, v in dotenv_values(self.env_path).items() if v is not None}
+        return ConfigSnapshot.from_env({**file_env, **self.process_env}, version=version)
+
+    def current(self) -> ConfigSnapshot:
+        """The latest snapshot (a plain reference read; never blocks on a reload)"""
+        return self._snapshot
+
+    def get(self, version: int) -> Optional[ConfigSnapshot]:
+        """A published snapshot by version (None once it left the history)"""
+        return self._history.get(version)
+
+    def subscribe(self, listener: Callable[[ConfigSnapshot], None]) -> None:
+        """Call ``listener(snapshot)`` after every successful reload"""
+        self._listeners.append(listener)
+
+    def reload(self) -> bool:
+        """
+        Re-read the .env file and publish a new snapshot if any setting changed.
+
+        An invalid file (e.g. no API key, bad number) keeps the current snapshot.
+
+        Returns:
+            bool: True if a new snapshot was published
+        """
+        with self._lock:
+            self._mtime = self._current_mtime()
+            current = self._snapshot
+            try:
+                candidate = self._load(version=current.version + 1)
+            except ValueError as e:
+                print(f"⚠️  Config reload ignored, invalid value in {self.env_path}: {e}")
+                return False
+            if not candidate.api_key:
+                print(f"⚠️  Config reload ignored, no API key in {self.env_path}")
+                return False
+            if replace(candidate, version=current.version) == current:
+                return False
+            self._snapshot = candidate
+            self._history[candidate.version] = candidate
+            self._history.pop(candidate.version - self.HISTORY, None)
+        if candidate.verbose:
+            print(f"✓ Configuration reloaded (v{candidate.version}, model {candidate.model})")
+        for listener in list(self._listeners):
+            listener(candidate)
+        return True
+
+    def watch(self, interval: float = 2.0) -> None:
+        """Poll the .env file's mtime in a daemon thread and reload on change (idempotent)"""
+        with self._lock:
+            if self._watcher is not None:
+                return
+
+            def _poll():
+                while True:
+                    time.sleep(interval)
+                    if self._current_mtime() != self._mtime:
+                        self.reload()
+
+            self._watcher = threading.Thread(target=_poll, name="config-watch", daemon=True)
+            self._watcher.start()
+
+
+config_store = ConfigStore(Config._env_path, Config._process_env)
+
+
 # Convenience functions for quick access
 def validate_config() -> bool:
     """Quick function to validate configuration."""
@@ -0,0 +1,194 @@
+"""
+Run Deadlines for AutoGen and CrewAI Lab Demo
+
+``AGENT_TIMEOUT`` bounds a single LLM call, not a run, so a caller that needs
+an answer in 20 seconds had no way to say so. A ``RunDeadline`` is the time
+budget of one run. It tracks the remaining time and how long the run's steps
+(GroupChat turns, crew tasks) take. The run degrades one level at a time as the
+slack shrinks (judged from the first timed step on):
+
+============  ==========================================================
+Level         When the remaining time covers ... of the remaining steps
+============  ==========================================================
+``full``      all of them at the observed pace: no change
+``lean``      70%: shorter outputs (max_tokens x 0.6), local summary
+``fast``      40%: also the smaller ``DEADLINE_FALLBACK_MODEL``
+``wrap_up``   less: skip optional phases and end with what is done
+============  ==========================================================
+
+Levels never go back up during a run. Calls through ``shared_llm`` made while
+a deadline is active are cut off at the deadline and not retried after it.
+When the time is up, ``DeadlineExceeded`` stops the run, and the demos return
+the partial plan built from the finished steps.
+
+Usage:
+    from shared_deadline import RunDeadline, DeadlineExceeded
+
+    deadline = RunDeadline(20, steps=4)
+    with deadline.activate():
+        for step in steps:
+            deadline.check()
+            run(step, max_tokens=deadline.max_tokens(800), model=deadline.model(default_model))
+            deadline.end_step()
+    deadline.print_report()
+"""
+
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Iterator, List, Optional, Tuple
+
+from shared_config import Config
+
+LEVELS = ("full", "lean", "fast", "wrap_up")
+# Minimum share of the remaining steps' expected time that must be left to stay at a level
+LEVEL_SLACK = (1.0, 0.7, 0.4)
+# max_tokens multiplier per level
+TOKEN_SCALES = (1.0, 0.6, 0.4, 0.3)
+MIN_MAX_TOKENS = 128
+
+
+class DeadlineExceeded(Exception):
+    """Raised when a run's deadline has passed (or would pass during the next step)"""
+
+
+class RunDeadline:
+    """Time budget of one run and the degradation level it allows"""
+
+    def __init__(self, seconds: float, steps: int,
+                 step_estimate: float = Config.DEADLINE_STEP_SECONDS,
+                 fallback_model: str = Config.DEADLINE_FALLBACK_MODEL):
+        """
+        Args:
+            seconds: Time budget of the run, from now
+            steps: Steps the run needs (turns or tasks); sets the expected pace
+            step_estimate: Seconds per step assumed until a step has been timed (at most
+                an even share of the deadline, so a short deadline starts at full level)
+            fallback_model: Model used from the "fast" level on ("" = keep the model)
+        """
+        self.seconds = seconds
+        self.started = time.monotonic()
+        self.ends_at = self.started + seconds
+        self.steps_left = steps
+        self.fallback_model = fallback_model
+        self.level = 0
+        self.history: List[Tuple[float, str, str]] = []  # (elapsed, level, reason)
+        self._prior = min(step_estimate, seconds / max(steps, 1))
+        self._durations: List[float] = []
+        self._step_started = self.started
+        self._lock = threading.Lock()
+
+    # --- time -------------------------------------------------------------
+
+    def remaining(self) -> float:
+        return max(0.0, self.ends_at - time.monotonic())
+
+    def elapsed(self) -> float:
+        return time.monotonic() - self.started
+
+    @property
+    def expired(self) -> bool:
+        return time.monotonic() >= self.ends_at
+
+    @property
+    def step_estimate(self) -> float:
+        """Expected seconds per step: mean of the timed steps, else the prior"""
+        with self._lock:
+            return sum(self._durations) / len(self._durations) if self._durations else self._prior
+
+    def end_step(self) -> None:
+        """Mark a step finished; its duration refines the pace estimate"""
+        now = time.monotonic()
+        with self._lock:
+            self._durations.append(now - self._step_started)
+            self._step_started = now
+            self.steps_left = max(0, self.steps_left - 1)
+        self.update()
+
+    def affordable_steps(self) -> int:
+        """Steps that fit in the remaining time at the observed pace"""
+        return int(self.remaining() / max(self.step_estimate, 0.001))
+
+    # --- degradation ------------------------------------------------------
+
+    def update(self) -> int:
+        """Recompute the degradation level from the slack left (once a step was timed); returns it"""
+        with self._lock:
+            if not self._durations:
+                return self.level
+        estimate, remaining = self.step_estimate, self.remaining()
+        needed = max(self.steps_left, 1) * estimate
+        slack = remaining / needed if needed else 1.0
+        level = next((i for i, floor in enumerate(LEVEL_SLACK) if slack >= floor), len(LEVEL_SLACK))
+        with self._lock:
+            if level > self.level:
+                self.level = level
+                self.history.append((self.elapsed(), LEVELS[level],
+                                     f"{remaining:.1f}s left for ~{self.steps_left} steps of ~{estimate:.1f}s"))
+                if Config.VERBOSE:
+                    print(f"⏱️  Deadline: degrading to '{LEVELS[level]}' ({self.history[-1][2]})")
+            return self.level
+
+    @property
+    def level_name(self) -> str:
+        return LEVELS[self.level]
+
+    @property
+    def skip_optional(self) -> bool:
+        """Whether optional phases are skipped (wrap-up level or time is up)"""
+        return self.level >= len(LEVELS) - 1 or self.expired
+
+    def max_tokens(self, budget: Optional[int]) -> Optional[int]:
+        """Output budget scaled down for the current level"""
+        if budget is None or self.level == 0:
+            return budget
+        return max(MIN_MAX_TOKENS, int(budget * TOKEN_SCALES[self.level]))
+
+    def model(self, default: Optional[str]) -> Optional[str]:
+        """Model for the current level (the fallback model from "fast" on)"""
+        if self.level >= 2 and self.fallback_model:
+            return self.fallback_model
+        return default
+
+    def check(self) -> None:
+        """Raise DeadlineExceeded once the deadline has passed"""
+        if self.expired:
+            raise DeadlineExceeded(f"run deadline of {self.seconds:g}s reached after {self.elapsed():.1f}s")
+
+    # --- scope and report -------------------------------------------------
+
+    @contextmanager
+    def activate(self) -> Iterator["RunDeadline"]:
+        """Make this the deadline of shared_llm calls made in the current context
+
+        A context variable rather than a thread-local: CrewAI makes its LLM calls
+        in executor threads, which run in a copy of the caller's context.
+        """
+        token = _current.set(self)
+        try:
+            yield self
+        finally:
+            _current.reset(token)
+
+    def to_dict(self) -> dict:
+        return {"seconds": self.seconds, "elapsed": round(self.elapsed(), 2), "level": self.level_name,
+                "expired": self.expired,
+                "degradations": [{"at": round(at, 2), "level": level, "reason": reason}
+                                 for at, level, reason in self.history]}
+
+    def print_report(self, partial: bool = False) -> None:
+        """Print how the run used its deadline"""
+        outcome = "partial result" if partial else "finished"
+        print(f"\n⏱️  Deadline {self.seconds:g}s: {outcome} after {self.elapsed():.1f}s "
+              f"(final level '{self.level_name}')")
+        for at, level, reason in self.history:
+            print(f"   +{at:5.1f}s → {level}: {reason}")
+
+
+_current: ContextVar[Optional[RunDeadline]] = ContextVar("run_deadline", default=None)
+
+
+def current_deadline() -> Optional[RunDeadline]:
+    """The deadline active in this context (None outside a deadline run)"""
+    return _current.get()
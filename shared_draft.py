@@ -0,0 +1,212 @@
+"""
+Draft-and-Refine Generation for AutoGen and CrewAI Lab Demo
+
+Most agent turns are long, well-structured prose that a small model writes
+almost as well as the main one. In draft-and-refine mode a fast small model
+(``DRAFT_MODEL``) writes the turn first. The main model then reads the draft
+in the context of the same conversation and either approves it or returns
+search/replace edits, which are applied locally. The main model's output is a
+few dozen tokens instead of the whole answer, and its decode time is what
+dominates a turn.
+
+- ``APPROVED``: the draft is used as is.
+- Edit blocks (``<<<<<<< FIND`` / ``=======`` / ``>>>>>>> END``): each block
+  replaces the first occurrence of its FIND text. Blocks whose text is not in
+  the draft are skipped.
+- Anything else of substantial length is taken as a rewrite by the main model.
+- If the draft call fails, the turn is generated directly by the main model.
+  If the refine call fails, or stops at ``REFINE_MAX_TOKENS`` before finishing
+  its reply (``truncated``), the draft is used.
+
+The mode is per role: ``DRAFT_REFINE=True`` turns it on, and ``DRAFT_ROLES``
+lists the roles that draft. Without ``DRAFT_ROLES`` each framework uses its own
+defaults: ``AgentConfig.GENERATION_MODES`` for AutoGen, the agents' ``generation``
+key in the CrewAI workflow file. ``shared_llm.complete(..., draft=True)`` runs it.
+
+Usage:
+    from shared_draft import draft_and_refine, get_draft_stats
+
+    result = draft_and_refine(get_caller(config), messages, config, role="crewai/flight", max_tokens=800)
+    get_draft_stats().print_report()
+"""
+
+import re
+import threading
+from collections import defaultdict
+from typing import Any, Dict, List, Sequence, Tuple
+
+from shared_config import ConfigSnapshot
+from shared_llm import RETRYABLE_ERRORS, ChatResult, ResilientCaller
+
+REFINE_PROMPT = """The last assistant message is a draft reply written by a smaller model. Check it against the conversation above for errors, omissions and instructions it missed.
+
+If the draft is good as is, answer exactly: APPROVED
+
+Otherwise answer only with edits, one block per change. Copy the text to replace exactly from the draft and keep it short:
+<<<<<<< FIND
+text from the draft
+=======
+replacement text
+>>>>>>> END
+
+Do not repeat the whole reply and keep the draft's format."""
+
+_EDIT_BLOCK = re.compile(r"<{3,}\s*FIND[ \t]*\n(.*?)\n={3,}[ \t]*\n?(.*?)\n?>{3,}[ \t]*END", re.DOTALL)
+
+# A reply without edit blocks counts as a rewrite only if it is at least this share of the draft
+REWRITE_MIN_RATIO = 0.5
+
+
+def parse_edits(reply: str) -> List[Tuple[str, str]]:
+    """(find, replace) pairs of the edit blocks in a refine reply"""
+    return [(find, replace) for find, replace in _EDIT_BLOCK.findall(reply) if find.strip()]
+
+
+def apply_edits(draft: str, edits: Sequence[Tuple[str, str]]) -> Tuple[str, int]:
+    """
+    Apply search/replace edits to a draft.
+
+    Args:
+        draft: The draft text
+        edits: (find, replace) pairs, applied in order
+
+    Returns:
+        Tuple[str, int]: The edited text and the number of edits applied
+    """
+    applied = 0
+    for find, replace in edits:
+        if find in draft:
+            draft = draft.replace(find, replace, 1)
+        elif find.strip() and find.strip() in draft:
+            # Models often drop or add surrounding whitespace when copying
+            draft = draft.replace(find.strip(), replace.strip(), 1)
+        else:
+            continue
+        applied += 1
+    return draft, applied
+
+
+def _add_usage(*usages: Dict[str, int]) -> Dict[str, int]:
+    total: Dict[str, int] = {}
+    for usage in usages:
+        for key, value in usage.items():
+            total[key] = total.get(key, 0) + value
+    return total
+
+
+class DraftStats:
+    """Outcome counts and output tokens of draft-and-refine turns, per role"""
+
+    OUTCOMES = ("approved", "edited", "rewritten", "kept", "truncated", "direct")
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.roles: Dict[str, Dict[str, int]] = defaultdict(lambda: defaultdict(int))
+
+    def record(self, role: str, outcome: str, draft_tokens: int = 0, refine_tokens: int = 0,
+               edits: int = 0) -> None:
+        with self._lock:
+            counts = self.roles[role or "-"]
+            counts[outcome] += 1
+            counts["draft_tokens"] += draft_tokens
+            counts["refine_tokens"] += refine_tokens
+            counts["edits"] += edits
+
+    def print_report(self) -> None:
+        """
+        Print per-role outcomes and how much of the output the main model wrote.
+
+        Truncated refines are left out of the share: none of their tokens reach the turn.
+        """
+        with self._lock:
+            roles = {role: dict(counts) for role, counts in self.roles.items()}
+        if not roles:
+            return
+        print("\n✏️  Draft & refine:")
+        for role, counts in sorted(roles.items()):
+            turns = sum(counts.get(o, 0) for o in self.OUTCOMES)
+            outcomes = ", ".join(f"{counts[o]} {o}" for o in self.OUTCOMES if counts.get(o))
+            drafted = counts.get("draft_tokens", 0)
+            share = f", main model wrote {counts.get('refine_tokens', 0) / drafted:.0%} of the drafted tokens" if drafted else ""
+            print(f"   {role}: {turns} turns ({outcomes}; {counts.get('edits', 0)} edits){share}")
+
+    def to_dict(self) -> Dict[str, Dict[str, int]]:
+        with self._lock:
+            return {role: dict(counts) for role, counts in self.roles.items()}
+
+
+_stats = DraftStats()
+
+
+def get_draft_stats() -> DraftStats:
+    """Process-wide draft-and-refine statistics"""
+    return _stats
+
+
+def draft_and_refine(caller: ResilientCaller, messages: Sequence[Dict[str, Any]], config: ConfigSnapshot,
+                     role: str = "", **params) -> ChatResult:
+    """
+    Complete a turn with the draft model and let the main model approve or edit it.
+
+    Args:
+        caller: Caller serving both models
+        messages: Chat messages
+        config: Configuration snapshot (draft model and refine budget)
+        role: Role label for the statistics
+        **params: Completion parameters of the turn (max_tokens, temperature, stop, model, ...)
+
+    Returns:
+        ChatResult: The final turn, reported under the main model with the usage of both calls
+    """
+    model = params.get("model") or config.model
+    try:
+        draft = caller.complete(messages, **{**params, "model": config.draft_model})
+    except RETRYABLE_ERRORS as e:
+        if config.verbose:
+            print(f"⚠️  Draft model failed ({type(e).__name__}); generating {role or 'turn'} with {model}")
+        _stats.record(role, "direct")
+        return caller.complete(messages, **params)
+
+    refine_messages = list(messages) + [
+        {"role": "assistant", "content": draft.text},
+        {"role": "user", "content": REFINE_PROMPT},
+    ]
+    try:
+        refine = caller.complete(refine_messages, model=params.get("model"), temperature=0,
+                                 max_tokens=config.refine_max_tokens)
+    except RETRYABLE_ERRORS as e:
+        if config.verbose:
+            print(f"⚠️  Refine call failed ({type(e).__name__}); using the draft for {role or 'turn'}")
+        _stats.record(role, "kept", draft.usage.get("completion_tokens", 0))
+        return draft
+
+    reply = refine.text.strip()
+    text, finish_reason, edits = draft.text, draft.finish_reason, 0
+    refine_tokens = refine.usage.get("completion_tokens", 0)
+    if refine.finish_reason == "length":
+        # A cut-off edit list may be missing its most important edits: the draft stands
+        outcome, refine_tokens = "truncated", 0
+    elif reply.upper().rstrip(".!") == "APPROVED":
+        outcome = "approved"
+    else:
+        text, edits = apply_edits(draft.text, parse_edits(reply))
+        if edits:
+            outcome = "edited"
+        elif not _EDIT_BLOCK.search(reply) and len(reply) >= REWRITE_MIN_RATIO * len(draft.text):
+            outcome, text, finish_reason = "rewritten", reply, refine.finish_reason
+        else:
+            # Unparseable or non-matching edits: the draft stands
+            outcome = "kept"
+
+    _stats.record(role, outcome, draft.usage.get("completion_tokens", 0), refine_tokens, edits)
+    if config.verbose:
+        print(f"✏️  {role or 'turn'}: draft {outcome}" + (f" ({edits} edits)" if edits else ""))
+    return ChatResult(
+        text=text,
+        model=model,
+        endpoint=refine.endpoint,
+        latency=draft.latency + refine.latency,
+        finish_reason=finish_reason,
+        usage=_add_usage(draft.usage, refine.usage),
+        hedged=draft.hedged or refine.hedged,
+    )
@@ -0,0 +1,589 @@
+"""
+Durable Job Queue with Admission Control for AutoGen and CrewAI Lab Demo
+
+Runs ``crewai_demo`` trips and AutoGen GroupChats as queued jobs behind a
+scheduler instead of starting them unbounded. The queue lives in SQLite
+(``Config.CACHE_DIR / "jobs.sqlite3"``), so jobs survive restarts and any
+process can submit work.
+
+- Priority classes: ``interactive`` jobs are always claimed before ``batch``
+  jobs, and ``Config.JOB_INTERACTIVE_RESERVE`` workers per job kind only take
+  interactive work, so interactive latency does not depend on the batch backlog.
+  Batch work fills the remaining workers.
+- Per-tenant concurrency caps (``JOB_TENANT_CAP`` / ``JOB_TENANT_CAPS``): a
+  tenant at its cap is skipped and the next tenant's job runs.
+- Deadlines: jobs are ordered earliest-deadline-first within a class. A
+  submission that cannot start and finish before its deadline (given the
+  queue ahead of it and recent job durations) is rejected up front. A queued
+  job whose deadline passes is expired without running, and a running job is
+  stopped at its deadline.
+- Admission control and load shedding: submissions beyond
+  ``JOB_QUEUE_MAX_DEPTH`` queued jobs are rejected. When the LLM provider is
+  saturated, new batch jobs are rejected and queued batch jobs are held back
+  until it recovers. Saturation means that recent jobs fail on rate limits or
+  timeouts, or take far longer than usual.
+
+Usage:
+    python shared_jobs.py serve --workers crewai=3,autogen=1
+    python shared_jobs.py submit crewai --payload '{"destination": "Japan"}' \\
+        --tenant acme --priority interactive --deadline 600
+    python shared_jobs.py status
+    python shared_jobs.py result 42
+
+    from shared_jobs import JobQueue
+    job = JobQueue().submit("crewai", {"destination": "Japan"}, priority="interactive", deadline=600)
+"""
+
+import argparse
+import importlib
+import json
+import math
+import multiprocessing as mp
+import re
+import sqlite3
+import statistics
+import sys
+import threading
+import time
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+from shared_config import Config
+
+# Lower value = claimed first
+PRIORITY_CLASSES = {"interactive": 0, "batch": 1}
+
+# Job kind -> (directory, module, function). The function takes the payload and
+# returns a JSON-serializable result; it runs in a warm worker process.
+JOB_KINDS = {
+    "crewai": ("crewai", "batch_runner", "run_job"),
+    "autogen": ("autogen", "autogen_simple_demo", "run_job"),
+}
+
+# Failures that indicate a saturated provider rather than a broken job
+_PROVIDER_ERROR = re.compile(r"RateLimit|429|Timeout|timed out|APIConnection|InternalServer|50[23]|overloaded",
+                             re.IGNORECASE)
+
+_COLUMNS = ("id, kind, tenant, priority, payload, status, deadline, enqueued_at, started_at, "
+            "finished_at, attempts, worker, result, error")
+
+
+class AdmissionRejected(RuntimeError):
+    """Raised when the queue refuses a job (full, saturated provider or infeasible deadline)"""
+
+
+@dataclass
+class Job:
+    """One queued, running or finished job"""
+
+    id: int
+    kind: str
+    tenant: str
+    priority: int
+    payload: Dict[str, Any]
+    status: str  # queued | running | done | failed | expired | rejected
+    deadline: Optional[float]
+    enqueued_at: float
+    started_at: Optional[float] = None
+    finished_at: Optional[float] = None
+    attempts: int = 0
+    worker: str = ""
+    result: Any = None
+    error: str = ""
+
+    @classmethod
+    def from_row(cls, row: Tuple) -> "Job":
+        values = list(row)
+        values[4] = json.loads(values[4])
+        values[12] = json.loads(values[12]) if values[12] else None
+        values[11], values[13] = values[11] or "", values[13] or ""
+        return cls(*values)
+
+    @property
+    def priority_class(self) -> str:
+        return next(name for name, value in PRIORITY_CLASSES.items() if value == self.priority)
+
+    @property
+    def wait(self) -> Optional[float]:
+        return self.started_at - self.enqueued_at if self.started_at else None
+
+    @property
+    def duration(self) -> Optional[float]:
+        return self.finished_at - self.started_at if self.finished_at and self.started_at else None
+
+
+@dataclass
+class ProviderPressure:
+    """Saturation signal derived from recently finished jobs"""
+
+    samples: int
+    failure_rate: float
+    slowdown: float
+
+    @property
+    def saturated(self) -> bool:
+        return self.samples >= 4 and (self.failure_rate >= Config.JOB_SHED_FAILURE_RATE
+                                      or self.slowdown >= Config.JOB_SHED_SLOWDOWN)
+
+
+def parse_caps(spec: str) -> Dict[str, int]:
+    """Parse "tenant=cap,tenant=cap" (JOB_TENANT_CAPS)"""
+    caps = {}
+    for item in filter(None, (part.strip() for part in spec.split(","))):
+        tenant, _, cap = item.partition("=")
+        caps[tenant.strip()] = int(cap)
+    return caps
+
+
+class JobQueue:
+    """Durable job queue with priorities, tenant caps, deadlines and admission control"""
+
+    def __init__(self, path: Optional[Path] = None):
+        """
+        Args:
+            path: SQLite file (defaults to Config.CACHE_DIR / "jobs.sqlite3")
+        """
+        self.path = Path(path or Config.CACHE_DIR / "jobs.sqlite3")
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.tenant_caps = parse_caps(Config.JOB_TENANT_CAPS)
+        self._pressure: Tuple[float, Optional[ProviderPressure]] = (0.0, None)
+        # One connection per thread; SQLite handles cross-process locking
+        self._local = threading.local()
+        with self._conn() as conn:
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS jobs (id INTEGER PRIMARY KEY AUTOINCREMENT, kind TEXT NOT NULL, "
+                "tenant TEXT NOT NULL, priority INTEGER NOT NULL, payload TEXT NOT NULL, status TEXT NOT NULL, "
+                "deadline REAL, enqueued_at REAL NOT NULL, started_at REAL, finished_at REAL, "
+                "attempts INTEGER NOT NULL DEFAULT 0, worker TEXT, result TEXT, error TEXT)"
+            )
+            conn.execute("CREATE INDEX IF NOT EXISTS jobs_queued ON jobs (status, kind, priority, deadline)")
+            conn.execute("CREATE TABLE IF NOT EXISTS capacity (kind TEXT PRIMARY KEY, workers INTEGER NOT NULL)")
+
+    def _conn(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=30)
+            conn.execute("PRAGMA journal_mode=WAL")
+            self._local.conn = conn
+        return conn
+
+    def tenant_cap(self, tenant: str) -> int:
+        return self.tenant_caps.get(tenant, Config.JOB_TENANT_CAP)
+
+    # ------------------------------------------------------------------
+    # Submission and admission control
+    # ------------------------------------------------------------------
+
+    def submit(self, kind: str, payload: Optional[Dict[str, Any]] = None, tenant: str = "default",
+               priority: str = "batch", deadline: Optional[float] = None) -> Job:
+        """
+        Admit a job to the queue.
+
+        Args:
+            kind: Job kind (a key of JOB_KINDS)
+            payload: Arguments for the job function
+            tenant: Tenant the job is accounted to
+            priority: "interactive" or "batch"
+            deadline: Seconds from now by which the job must finish (None = no deadline)
+
+        Returns:
+            Job: The queued job
+
+        Raises:
+            AdmissionRejected: Queue full, provider saturated (batch) or deadline infeasible.
+                               The rejection is recorded with status "rejected".
+        """
+        if kind not in JOB_KINDS:
+            raise ValueError(f"Unknown job kind '{kind}'. Expected one of {sorted(JOB_KINDS)}")
+        if priority not in PRIORITY_CLASSES:
+            raise ValueError(f"Unknown priority '{priority}'. Expected one of {sorted(PRIORITY_CLASSES)}")
+        now = time.time()
+        level = PRIORITY_CLASSES[priority]
+        absolute_deadline = now + deadline if deadline else None
+        reason = self._admission_check(kind, level, absolute_deadline, now)
+
+        with self._conn() as conn:
+            cursor = conn.execute(
+                "INSERT INTO jobs (kind, tenant, priority, payload, status, deadline, enqueued_at, error) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                (kind, tenant, level, json.dumps(payload or {}), "rejected" if reason else "queued",
+                 absolute_deadline, now, reason or None),
+            )
+            job_id = cursor.lastrowid
+        if reason:
+            raise AdmissionRejected(f"Job {job_id} rejected: {reason}")
+        return self.get(job_id)
+
+    def _admission_check(self, kind: str, level: int, deadline: Optional[float], now: float) -> str:
+        """Reason to reject a new job, or "" to admit it"""
+        conn = self._conn()
+        depth = conn.execute("SELECT COUNT(*) FROM jobs WHERE status = 'queued' AND priority = ?",
+                             (level,)).fetchone()[0]
+        if depth >= Config.JOB_QUEUE_MAX_DEPTH:
+            return f"queue full ({depth} queued jobs)"
+        if level > PRIORITY_CLASSES["interactive"] and self.pressure().saturated:
+            return "provider saturated, batch work is being shed"
+        if deadline is not None:
+            duration = self.typical_duration(kind)
+            if duration is not None:
+                wait = self.estimate_wait(kind, level, deadline, duration)
+                if now + wait + duration > deadline:
+                    return (f"deadline infeasible (needs ~{wait + duration:.0f}s: {wait:.0f}s queueing "
+                            f"+ {duration:.0f}s run, {deadline - now:.0f}s left)")
+        return ""
+
+    def typical_duration(self, kind: str, limit: int = 50) -> Optional[float]:
+        """Median duration of the last successful jobs of a kind (None without history)"""
+        rows = self._conn().execute(
+            "SELECT finished_at - started_at FROM jobs WHERE kind = ? AND status = 'done' "
+            "ORDER BY finished_at DESC LIMIT ?", (kind, limit),
+        ).fetchall()
+        return statistics.median(r[0] for r in rows) if rows else None
+
+    def estimate_wait(self, kind: str, level: int, deadline: Optional[float], duration: float) -> float:
+        """Seconds until a new job would start, given the work scheduled ahead of it"""
+        conn = self._conn()
+        ahead = conn.execute(
+            "SELECT COUNT(*) FROM jobs WHERE kind = ? AND (status = 'running' OR (status = 'queued' AND "
+            "(priority < ? OR (priority = ? AND (deadline IS NOT NULL AND (? IS NULL OR deadline <= ?))))))",
+            (kind, level, level, deadline, deadline),
+        ).fetchone()[0]
+        row = conn.execute("SELECT workers FROM capacity WHERE kind = ?", (kind,)).fetchone()
+        workers = row[0] if row else 1
+        if level > PRIORITY_CLASSES["interactive"]:
+            workers = max(1, workers - Config.JOB_INTERACTIVE_RESERVE)
+        # Jobs ahead drain in waves of `workers`; the new job starts after the waves before it
+        return math.floor(ahead / max(1, workers)) * duration
+
+    def set_capacity(self, kind: str, workers: int) -> None:
+        """Record how many workers serve a kind (used for wait estimates)"""
+        with self._conn() as conn:
+            conn.execute("INSERT OR REPLACE INTO capacity (kind, workers) VALUES (?, ?)", (kind, workers))
+
+    def pressure(self, window: float = Config.JOB_PRESSURE_WINDOW) -> ProviderPressure:
+        """
+        Provider saturation from jobs finished in the last ``window`` seconds.
+
+        ``failure_rate`` is the share of them that failed on rate limits, timeouts
+        or server errors; ``slowdown`` is their median duration relative to the
+        usual duration of successful jobs of the same kind. Cached for a few seconds.
+        """
+        checked_at, cached = self._pressure
+        if cached is not None and time.monotonic() - checked_at < 5:
+            return cached
+        conn = self._conn()
+        since = time.time() - window
+        rows = conn.execute(
+            "SELECT kind, status, error, finished_at - started_at FROM jobs "
+            "WHERE finished_at >= ? AND status IN ('done', 'failed', 'expired') AND started_at IS NOT NULL",
+            (since,),
+        ).fetchall()
+        provider_failures = sum(1 for _, status, error, _ in rows
+                                if status == "expired" or (status == "failed" and _PROVIDER_ERROR.search(error or "")))
+        ratios = []
+        for kind, status, _, duration in rows:
+            if status == "done":
+                usual = conn.execute(
+                    "SELECT finished_at - started_at FROM jobs WHERE kind = ? AND status = 'done' AND "
+                    "finished_at < ? ORDER BY finished_at DESC LIMIT 50", (kind, since),
+                ).fetchall()
+                if usual:
+                    ratios.append(duration / max(statistics.median(r[0] for r in usual), 1e-3))
+        pressure = ProviderPressure(
+            samples=len(rows),
+            failure_rate=provider_failures / len(rows) if rows else 0.0,
+            slowdown=statistics.median(ratios) if ratios else 1.0,
+        )
+        self._pressure = (time.monotonic(), pressure)
+        return pressure
+
+    # ------------------------------------------------------------------
+    # Scheduling
+    # ------------------------------------------------------------------
+
+    def claim(self, kind: str, worker: str, interactive_only: bool = False) -> Optional[Job]:
+        """
+        Atomically take the next job a worker should run.
+
+        Order: priority class, then earliest deadline, then submission time. Tenants
+        at their concurrency cap are skipped; batch jobs are held back while the
+        provider is saturated. Queued jobs whose deadline has passed are expired.
+
+        Args:
+            kind: Job kind the worker runs
+            worker: Worker name recorded on the job
+            interactive_only: Reserved worker that never takes batch jobs
+
+        Returns:
+            Optional[Job]: The claimed job, or None if nothing is runnable
+        """
+        now = time.time()
+        hold_batch = interactive_only or self.pressure().saturated
+        with self._conn() as conn:
+            conn.execute("BEGIN IMMEDIATE")
+            conn.execute(
+                "UPDATE jobs SET status = 'expired', finished_at = ?, error = 'deadline passed before start' "
+                "WHERE status = 'queued' AND kind = ? AND deadline < ?", (now, kind, now),
+            )
+            running = dict(conn.execute(
+                "SELECT tenant, COUNT(*) FROM jobs WHERE status = 'running' GROUP BY tenant").fetchall())
+            query = (f"SELECT {_COLUMNS} FROM jobs WHERE status = 'queued' AND kind = ?"
+                     + (" AND priority = ?" if hold_batch else "")
+                     + " ORDER BY priority, deadline IS NULL, deadline, enqueued_at LIMIT 200")
+            args = (kind, PRIORITY_CLASSES["interactive"]) if hold_batch else (kind,)
+            for row in conn.execute(query, args).fetchall():
+                job = Job.from_row(row)
+                if running.get(job.tenant, 0) >= self.tenant_cap(job.tenant):
+                    continue
+                conn.execute(
+                    "UPDATE jobs SET status = 'running', started_at = ?, worker = ?, attempts = attempts + 1 "
+                    "WHERE id = ?", (now, worker, job.id),
+                )
+                job.status, job.started_at, job.worker, job.attempts = "running", now, worker, job.attempts + 1
+                return job
+        return None
+
+    def _finish(self, job_id: int, status: str, result: Any = None, error: str = "") -> None:
+        with self._conn() as conn:
+            conn.execute(
+                "UPDATE jobs SET status = ?, finished_at = ?, result = ?, error = ? WHERE id = ? AND status = 'running'",
+                (status, time.time(), json.dumps(result) if result is not None else None, error or None, job_id),
+            )
+
+    def complete(self, job_id: int, result: Any) -> None:
+        self._finish(job_id, "done", result=result)
+
+    def fail(self, job_id: int, error: str) -> None:
+        self._finish(job_id, "failed", error=error)
+
+    def expire(self, job_id: int, error: str = "deadline passed while running") -> None:
+        self._finish(job_id, "expired", error=error)
+
+    def requeue_running(self, worker: Optional[str] = None) -> int:
+        """Put jobs left 'running' by a dead worker (or all workers) back in the queue"""
+        query, args = "UPDATE jobs SET status = 'queued', started_at = NULL, worker = NULL WHERE status = 'running'", []
+        if worker is not None:
+            query, args = query + " AND worker = ?", [worker]
+        with self._conn() as conn:
+            return conn.execute(query, args).rowcount
+
+    def overdue(self, grace: float = 5.0) -> List[Job]:
+        """Running jobs past their deadline"""
+        rows = self._conn().execute(
+            f"SELECT {_COLUMNS} FROM jobs WHERE status = 'running' AND deadline < ?", (time.time() - grace,),
+        ).fetchall()
+        return [Job.from_row(row) for row in rows]
+
+    # ------------------------------------------------------------------
+    # Inspection
+    # ------------------------------------------------------------------
+
+    def get(self, job_id: int) -> Optional[Job]:
+        row = self._conn().execute(f"SELECT {_COLUMNS} FROM jobs WHERE id = ?", (job_id,)).fetchone()
+        return Job.from_row(row) if row else None
+
+    def pending(self) -> int:
+        return self._conn().execute(
+            "SELECT COUNT(*) FROM jobs WHERE status IN ('queued', 'running')").fetchone()[0]
+
+    def stats(self, since: Optional[float] = None) -> Dict[str, Dict[str, Any]]:
+        """Job counts by status and wait/run latency per priority class"""
+        since = since or 0.0
+        out = {}
+        for name, level in PRIORITY_CLASSES.items():
+            rows = self._conn().execute(
+                "SELECT status, started_at - enqueued_at, finished_at - started_at FROM jobs "
+                "WHERE priority = ? AND enqueued_at >= ?", (level, since),
+            ).fetchall()
+            counts: Dict[str, int] = {}
+            for status, _, _ in rows:
+                counts[status] = counts.get(status, 0) + 1
+            waits = sorted(w for _, w, _ in rows if w is not None)
+            runs = sorted(r for s, _, r in rows if s == "done" and r is not None)
+            out[name] = {
+                "counts": counts,
+                "wait_p50": waits[len(waits) // 2] if waits else 0.0,
+                "wait_p95": waits[min(len(waits) - 1, int(0.95 * len(waits)))] if waits else 0.0,
+                "run_p50": runs[len(runs) // 2] if runs else 0.0,
+            }
+        return out
+
+    def print_status(self) -> None:
+        pressure = self.pressure()
+        print("\n" + "-" * 80)
+        print("📬 JOB QUEUE")
+        print("-" * 80)
+        for name, stats in self.stats().items():
+            counts = ", ".join(f"{status} {n}" for status, n in sorted(stats["counts"].items())) or "empty"
+            print(f"{name:<12} {counts}")
+            print(f"{'':<12} wait p50 {stats['wait_p50']:.1f}s p95 {stats['wait_p95']:.1f}s | "
+                  f"run p50 {stats['run_p50']:.1f}s")
+        state = "SATURATED (shedding batch work)" if pressure.saturated else "ok"
+        print(f"Provider:    {state} — {pressure.samples} recent jobs, "
+              f"{pressure.failure_rate:.0%} provider failures, {pressure.slowdown:.1f}x usual duration")
+
+
+# ============================================================================
+# SCHEDULER
+# ============================================================================
+
+def _worker_main(kind: str, name: str, interactive_only: bool, db_path: str, poll: float) -> None:
+    """Worker process: claim and run jobs of one kind until terminated."""
+    directory, module, function = JOB_KINDS[kind]
+    # Framework modules use flat imports (e.g. `from config import Config`)
+    sys.path.insert(0, str(Config.PROJECT_ROOT / directory))
+    log_dir = Config.CACHE_DIR / "jobs"
+    log_dir.mkdir(parents=True, exist_ok=True)
+    sys.stdout = sys.stderr = open(log_dir / f"{name}.log", "a", buffering=1)
+    run = getattr(importlib.import_module(module), function)
+    queue = JobQueue(Path(db_path))
+    # Warm workers pick up .env edits: each job starts on the latest snapshot
+    Config.watch_for_changes()
+
+    while True:
+        job = queue.claim(kind, name, interactive_only)
+        if job is None:
+            time.sleep(poll)
+            continue
+        print(f"\n=== job {job.id} ({job.priority_class}, tenant {job.tenant}) ===")
+        try:
+            queue.complete(job.id, run(job.payload))
+        except Exception as e:
+            queue.fail(job.id, f"{type(e).__name__}: {e}")
+
+
+class JobScheduler:
+    """Runs warm worker processes per job kind and enforces running deadlines"""
+
+    def __init__(self, queue: JobQueue, workers: Dict[str, int],
+                 reserve: int = Config.JOB_INTERACTIVE_RESERVE, poll: float = 0.5):
+        """
+        Args:
+            queue: The job queue
+            workers: Worker processes per job kind
+            reserve: Workers per kind that only run interactive jobs (at most workers - 1,
+                     so batch work always has a worker)
+            poll: Seconds an idle worker waits before checking the queue again
+        """
+        unknown = set(workers) - set(JOB_KINDS)
+        if unknown:
+            raise ValueError(f"Unknown job kinds {sorted(unknown)}. Expected some of {sorted(JOB_KINDS)}")
+        self.queue = queue
+        self.workers = workers
+        self.reserve = reserve
+        self.poll = poll
+        self._ctx = mp.get_context("spawn")
+        self._processes: Dict[str, Tuple[Any, str, bool]] = {}  # name -> (process, kind, interactive_only)
+
+    def _spawn(self, name: str, kind: str, interactive_only: bool) -> None:
+        process = self._ctx.Process(target=_worker_main, daemon=True,
+                                    args=(kind, name, interactive_only, str(self.queue.path), self.poll))
+        process.start()
+        self._processes[name] = (process, kind, interactive_only)
+
+    def start(self) -> None:
+        # Nothing can be running before the scheduler starts; jobs left running were interrupted
+        requeued = self.queue.requeue_running()
+        if requeued:
+            print(f"↩️  Requeued {requeued} interrupted jobs")
+        for kind, count in self.workers.items():
+            self.queue.set_capacity(kind, count)
+            reserved = min(self.reserve, count - 1)
+            for i in range(count):
+                self._spawn(f"{kind}-{i}", kind, interactive_only=i < reserved)
+        print(f"🚀 Job scheduler: " + ", ".join(
+            f"{kind} x{count} ({min(self.reserve, count - 1)} interactive-only)" for kind, count in self.workers.items()))
+
+    def tick(self) -> None:
+        """Stop jobs past their deadline and replace dead workers"""
+        for job in self.queue.overdue():
+            entry = self._processes.get(job.worker)
+            if entry:
+                entry[0].terminate()
+                entry[0].join(timeout=5)
+            self.queue.expire(job.id)
+            print(f"⏱️  Job {job.id} stopped at its deadline ({job.worker})")
+        for name, (process, kind, interactive_only) in list(self._processes.items()):
+            if not process.is_alive():
+                self.queue.requeue_running(name)
+                self._spawn(name, kind, interactive_only)
+
+    def serve(self, drain: bool = False, status_every: float = 30.0) -> None:
+        """
+        Run until interrupted (or, with ``drain``, until the queue is empty).
+
+        Args:
+            drain: Exit once no job is queued or running
+            status_every: Seconds between status reports
+        """
+        self.start()
+        last_status = time.monotonic()
+        try:
+            while True:
+                time.sleep(1.0)
+                self.tick()
+                if time.monotonic() - last_status >= status_every:
+                    self.queue.print_status()
+                    last_status = time.monotonic()
+                if drain and not self.queue.pending():
+                    break
+        except KeyboardInterrupt:
+            print("\nStopping workers...")
+        finally:
+            for process, _, _ in self._processes.values():
+                process.terminate()
+            for process, _, _ in self._processes.values():
+                process.join(timeout=5)
+            self.queue.requeue_running()
+        self.queue.print_status()
+
+
+def _parse_workers(spec: str) -> Dict[str, int]:
+    return {kind: int(count) for kind, count in parse_caps(spec).items()}
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Durable job queue for the AutoGen and CrewAI demos")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    serve = commands.add_parser("serve", help="Run worker processes for queued jobs")
+    serve.add_argument("--workers", default="crewai=2,autogen=1", help='Workers per kind, e.g. "crewai=3,autogen=1"')
+    serve.add_argument("--reserve", type=int, default=Config.JOB_INTERACTIVE_RESERVE,
+                       help="Interactive-only workers per kind")
+    serve.add_argument("--drain", action="store_true", help="Exit when the queue is empty")
+
+    submit = commands.add_parser("submit", help="Submit a job")
+    submit.add_argument("kind", choices=sorted(JOB_KINDS))
+    submit.add_argument("--payload", default="{}", help="JSON arguments, e.g. '{\"destination\": \"Japan\"}'")
+    submit.add_argument("--tenant", default="default")
+    submit.add_argument("--priority", choices=sorted(PRIORITY_CLASSES), default="batch")
+    submit.add_argument("--deadline", type=float, default=None, help="Seconds from now the job must finish by")
+
+    commands.add_parser("status", help="Show queue and provider status")
+    result = commands.add_parser("result", help="Show a job")
+    result.add_argument("job_id", type=int)
+    args = parser.parse_args()
+
+    queue = JobQueue()
+    if args.command == "serve":
+        from shared_config import validate_config
+        if not validate_config():
+            exit(1)
+        JobScheduler(queue, _parse_workers(args.workers), reserve=args.reserve).serve(drain=args.drain)
+    elif args.command == "submit":
+        try:
+            job = queue.submit(args.kind, json.loads(args.payload), tenant=args.tenant,
+                               priority=args.priority, deadline=args.deadline)
+            print(f"✅ Job {job.id} queued ({job.priority_class}, tenant {job.tenant})")
+        except AdmissionRejected as e:
+            print(f"❌ {e}")
+            exit(2)
+    elif args.command == "status":
+        queue.print_status()
+    else:
+        job = queue.get(args.job_id)
+        if job is None:
+            print(f"No job {args.job_id}")
+            exit(1)
+        print(json.dumps({k: v for k, v in job.__dict__.items()}, indent=2, default=str))
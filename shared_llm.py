@@ -0,0 +1,374 @@
+"""
+Resilient LLM Call Layer for AutoGen and CrewAI Lab Demo
+
+Both demos run their agents sequentially, so one slow completion stalls the
+whole pipeline. This module wraps OpenAI-compatible chat completions with:
+
+- per-attempt deadlines (``Config.ATTEMPT_TIMEOUT``)
+- jittered exponential-backoff retries (``Config.MAX_RETRIES``)
+- hedged requests: if the primary has not answered after its observed p95
+  latency, a duplicate request goes to the hedge endpoint/model
+  (``HEDGE_API_BASE`` / ``HEDGE_MODEL``); the first answer wins and the loser
+  is cancelled by closing its response stream
+- run deadlines: inside ``RunDeadline.activate()`` (``shared_deadline.py``)
+  attempts end at the run's deadline, and ``DeadlineExceeded`` replaces retries
+
+Enable it with ``RESILIENT_CALLS=True``. AutoGen uses it through
+``autogen/model_client.py`` and CrewAI through ``crewai/resilient_llm.py``.
+Both call ``complete``, which also answers from the semantic response cache
+(``shared_semantic_cache.py``) when ``SEMANTIC_CACHE=True`` and lets a small
+model draft the turn for roles in draft-and-refine mode (``shared_draft.py``).
+With ``local=True`` it runs on the local model of ``LOCAL_ROLES`` instead
+(``shared_local_llm.py``).
+
+Usage:
+    from shared_llm import get_caller
+
+    result = get_caller().complete(
+        [{"role": "user", "content": "Hello"}],
+        max_tokens=200,
+    )
+    print(result.text, result.latency, result.endpoint)
+
+    # Same, answered from the semantic cache of the "crewai/flight" scope when possible
+    result = complete(messages, scope="crewai/flight", max_tokens=800)
+"""
+
+import random
+import threading
+import time
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from dataclasses import dataclass, field
+from typing import Any, Deque, Dict, List, Optional, Sequence, Tuple
+
+import openai
+
+from shared_config import Config, ConfigSnapshot
+from shared_deadline import DeadlineExceeded, current_deadline
+
+
+class AttemptCancelled(Exception):
+    """Raised inside an attempt that lost a hedge race"""
+
+
+class AttemptTimeout(Exception):
+    """Raised when an attempt exceeds its deadline"""
+
+
+# Failures worth another attempt; anything else (bad request, auth) is raised immediately
+RETRYABLE_ERRORS = (
+    AttemptTimeout,
+    openai.APITimeoutError,
+    openai.APIConnectionError,
+    openai.RateLimitError,
+    openai.InternalServerError,
+)
+
+
+@dataclass
+class ChatResult:
+    """One completed chat completion"""
+
+    text: str
+    model: str
+    endpoint: str
+    latency: float
+    finish_reason: Optional[str] = None
+    usage: Dict[str, int] = field(default_factory=dict)
+    hedged: bool = False
+    cached: bool = False
+
+
+class ChatEndpoint:
+    """An OpenAI-compatible chat completions endpoint serving one model"""
+
+    def __init__(self, name: str, model: str, base_url: str, api_key: str):
+        self.name = name
+        self.model = model
+        self.base_url = base_url
+        self.api_key = api_key
+        self._client: Optional[openai.OpenAI] = None
+
+    @property
+    def client(self) -> openai.OpenAI:
+        # Retries are handled by ResilientCaller, not the SDK
+        if self._client is None:
+            self._client = openai.OpenAI(base_url=self.base_url, api_key=self.api_key, max_retries=0)
+        return self._client
+
+    def complete(self, messages: Sequence[Dict[str, Any]], deadline: float,
+                 cancel: Optional[threading.Event] = None, **params) -> ChatResult:
+        """
+        Run one streamed completion.
+
+        Streaming lets the attempt check its deadline and cancel flag between
+        chunks and close the connection as soon as it has lost.
+
+        Args:
+            messages: Chat messages
+            deadline: Absolute ``time.monotonic()`` deadline for this attempt
+            cancel: Event set when another attempt already won
+            **params: Extra completion parameters (max_tokens, temperature, stop, ...);
+                ``model`` overrides the endpoint's model for this call
+
+        Returns:
+            ChatResult: The completion
+        """
+        start = time.monotonic()
+        params = {k: v for k, v in params.items() if v is not None}
+        model = params.pop("model", self.model)
+        stream = self.client.chat.completions.create(
+            model=model,
+            messages=list(messages),
+            stream=True,
+            stream_options={"include_usage": True},
+            timeout=max(0.1, deadline - start),
+            **params,
+        )
+        parts: List[str] = []
+        finish_reason, usage = None, {}
+        try:
+            for chunk in stream:
+                if cancel is not None and cancel.is_set():
+                    raise AttemptCancelled(self.name)
+                if time.monotonic() > deadline:
+                    raise AttemptTimeout(f"{self.name} exceeded its {deadline - start:.1f}s deadline")
+                if chunk.usage:
+                    usage = {
+                        "prompt_tokens": chunk.usage.prompt_tokens,
+                        "completion_tokens": chunk.usage.completion_tokens,
+                        "total_tokens": chunk.usage.total_tokens,
+                    }
+                for choice in chunk.choices:
+                    parts.append(choice.delta.content or "")
+                    finish_reason = choice.finish_reason or finish_reason
+        finally:
+            stream.close()
+        return ChatResult(
+            text="".join(parts),
+            model=model,
+            endpoint=self.name,
+            latency=time.monotonic() - start,
+            finish_reason=finish_reason,
+            usage=usage,
+        )
+
+
+class LatencyTracker:
+    """Rolling windows of successful call latencies per model, used to time hedges"""
+
+    def __init__(self, window: int = 100, min_samples: int = 10):
+        self.window = window
+        self.min_samples = min_samples
+        self._samples: Dict[str, Deque[float]] = {}
+        self._lock = threading.Lock()
+
+    def add(self, model: str, latency: float) -> None:
+        with self._lock:
+            self._samples.setdefault(model, deque(maxlen=self.window)).append(latency)
+
+    def percentile(self, model: str, q: float) -> Optional[float]:
+        """Latency percentile (0-100) of a model, or None until enough samples exist"""
+        with self._lock:
+            samples = sorted(self._samples.get(model, ()))
+        if len(samples) < self.min_samples:
+            return None
+        return samples[min(len(samples) - 1, int(q / 100 * len(samples)))]
+
+
+class ResilientCaller:
+    """Retries, deadlines and hedging on top of one or two ChatEndpoints"""
+
+    BACKOFF_BASE = 1.0   # Seconds
+    BACKOFF_CAP = 20.0
+
+    def __init__(self, primary: ChatEndpoint, hedge: Optional[ChatEndpoint] = None,
+                 max_retries: int = Config.MAX_RETRIES,
+                 attempt_timeout: float = Config.ATTEMPT_TIMEOUT,
+                 hedge_delay: float = Config.HEDGE_DELAY):
+        self.primary = primary
+        self.hedge = hedge
+        self.max_retries = max_retries
+        self.attempt_timeout = attempt_timeout
+        self.default_hedge_delay = hedge_delay
+        self.latency = LatencyTracker()
+        self.stats = {"calls": 0, "retries": 0, "hedges": 0, "hedge_wins": 0, "failures": 0}
+        # The caller is shared by every agent thread
+        self._stats_lock = threading.Lock()
+        self._pool = ThreadPoolExecutor(max_workers=16, thread_name_prefix="llm-call")
+
+    def hedge_delay(self, model: Optional[str] = None) -> float:
+        """Seconds to wait for the primary before hedging (observed p95 of the model)"""
+        p95 = self.latency.percentile(model or self.primary.model, 95)
+        return p95 if p95 is not None else self.default_hedge_delay
+
+    def _count(self, stat: str) -> None:
+        with self._stats_lock:
+            self.stats[stat] += 1
+
+    def complete(self, messages: Sequence[Dict[str, Any]], **params) -> ChatResult:
+        """
+        Complete a chat with retries and hedging.
+
+        Args:
+            messages: Chat messages
+            **params: Completion parameters (max_tokens, temperature, stop, ...)
+
+        Returns:
+            ChatResult: The first successful completion
+        """
+        self._count("calls")
+        run_deadline = current_deadline()
+        for attempt in range(self.max_retries + 1):
+            if run_deadline is not None:
+                run_deadline.check()
+            try:
+                return self._attempt(messages, params)
+            except RETRYABLE_ERRORS as e:
+                if run_deadline is not None and run_deadline.expired:
+                    # Cut off by the run's deadline: no time left for another attempt
+                    self._count("failures")
+                    raise DeadlineExceeded(f"LLM call cut off by the run deadline ({type(e).__name__})") from e
+                if attempt == self.max_retries:
+                    self._count("failures")
+                    raise
+                self._count("retries")
+                # Full jitter keeps concurrent retries from synchronizing
+                delay = random.uniform(0, min(self.BACKOFF_CAP, self.BACKOFF_BASE * 2 ** attempt))
+                if Config.VERBOSE:
+                    print(f"⚠️  LLM call failed ({type(e).__name__}); retry {attempt + 1}/{self.max_retries} in {delay:.1f}s")
+                time.sleep(delay)
+
+    def _attempt(self, messages: Sequence[Dict[str, Any]], params: Dict[str, Any]) -> ChatResult:
+        deadline = time.monotonic() + self.attempt_timeout
+        run_deadline = current_deadline()
+        if run_deadline is not None:
+            deadline = min(deadline, run_deadline.ends_at)
+        cancels = {self.primary.name: threading.Event()}
+        futures: Dict[Future, ChatEndpoint] = {
+            self._pool.submit(self.primary.complete, messages, deadline, cancels[self.primary.name], **params): self.primary
+        }
+
+        model = params.get("model") or self.primary.model
+        done, _ = wait(futures, timeout=self.hedge_delay(model) if self.hedge else None,
+                       return_when=FIRST_COMPLETED)
+        if not done and self.hedge:
+            self._count("hedges")
+            cancels[self.hedge.name] = threading.Event()
+            # The hedge gets a fresh deadline of its own
+            hedge_deadline = time.monotonic() + self.attempt_timeout
+            if run_deadline is not None:
+                hedge_deadline = min(hedge_deadline, run_deadline.ends_at)
+            # A per-call model override names a primary-side model; the hedge keeps its own
+            hedge_params = {k: v for k, v in params.items() if k != "model"}
+            futures[self._pool.submit(self.hedge.complete, messages, hedge_deadline,
+                                      cancels[self.hedge.name], **hedge_params)] = self.hedge
+
+        pending = set(futures)
+        error: Optional[BaseException] = None
+        while pending:
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                try:
+                    result = future.result()
+                except BaseException as e:
+                    error = e
+                    continue
+                # Winner: cancel every other attempt still streaming
+                for name, event in cancels.items():
+                    if name != futures[future].name:
+                        event.set()
+                result.hedged = len(futures) > 1
+                if futures[future] is self.primary:
+                    self.latency.add(model, result.latency)
+                else:
+                    self._count("hedge_wins")
+                return result
+        raise error
+
+
+def build_caller(config: Optional[ConfigSnapshot] = None) -> ResilientCaller:
+    """Build a ResilientCaller from a configuration snapshot (default: the current one)"""
+    config = config or Config.snapshot()
+    primary = ChatEndpoint("primary", config.model, config.api_base, config.api_key)
+    hedge = None
+    if config.hedge_api_base or config.hedge_model:
+        hedge = ChatEndpoint(
+            "hedge",
+            config.hedge_model or config.model,
+            config.hedge_api_base or config.api_base,
+            config.hedge_api_key or config.api_key,
+        )
+    return ResilientCaller(primary, hedge, max_retries=config.max_retries,
+                           attempt_timeout=config.attempt_timeout, hedge_delay=config.hedge_delay)
+
+
+_callers: Dict[Tuple, ResilientCaller] = {}
+_caller_lock = threading.Lock()
+
+
+def get_caller(config: Optional[ConfigSnapshot] = None) -> ResilientCaller:
+    """
+    Process-wide caller, so latency percentiles accumulate across agents.
+
+    Callers are shared by every snapshot with the same endpoint settings, so a
+    config reload that only changes e.g. budgets keeps the warm connection pool
+    and latency history.
+
+    Args:
+        config: Configuration snapshot of the run (default: the current one)
+
+    Returns:
+        ResilientCaller: The caller for the snapshot's endpoints
+    """
+    config = config or Config.snapshot()
+    key = (config.model, config.api_base, config.api_key, config.hedge_model, config.hedge_api_base,
+           config.hedge_api_key, config.max_retries, config.attempt_timeout, config.hedge_delay)
+    with _caller_lock:
+        if key not in _callers:
+            _callers[key] = build_caller(config)
+        return _callers[key]
+
+
+def complete(messages: Sequence[Dict[str, Any]], scope: str = "", config: Optional[ConfigSnapshot] = None,
+             draft: bool = False, local: bool = False, **params) -> ChatResult:
+    """
+    Complete through the process-wide caller, consulting the semantic cache first.
+
+    Args:
+        messages: Chat messages
+        scope: Cache scope, e.g. the agent role ("" never uses the cache)
+        config: Configuration snapshot of the run (default: the current one)
+        draft: Let ``DRAFT_MODEL`` draft the turn and the main model approve or edit it
+        local: Run on the local model (``shared_local_llm.get_local_caller``); ``draft`` and ``model`` are ignored
+        **params: Completion parameters (max_tokens, temperature, stop, model, ...)
+
+    Returns:
+        ChatResult: The completion (``cached`` when it came from the semantic cache)
+    """
+    config = config or Config.snapshot()
+    if local:
+        from shared_local_llm import get_local_caller
+        caller = get_local_caller()
+        params["model"] = None
+    else:
+        caller = get_caller(config)
+    cache = None
+    if config.semantic_cache and scope:
+        from shared_semantic_cache import get_semantic_cache
+        cache = get_semantic_cache()
+        scope = f"{scope}|{params.get('model') or caller.primary.model}"
+        hit = cache.lookup(scope, messages)
+        if hit is not None:
+            return ChatResult(text=hit.text, model=hit.model, endpoint="semantic-cache",
+                              latency=hit.latency, finish_reason="stop", cached=True)
+    if draft and not local:
+        from shared_draft import draft_and_refine
+        result = draft_and_refine(caller, messages, config, role=scope.split("|")[0], **params)
+    else:
+        result = caller.complete(messages, **params)
+    # Truncated answers are not worth replaying
+    if cache is not None and result.finish_reason != "length":
+        cache.store(scope, messages, result.text, result.model)
+    return result
@@ -0,0 +1,745 @@
+"""
+Load Testing Harness for the AutoGen and CrewAI Demos
+
+Measures how many concurrent planning sessions one worker process sustains
+before latency collapses. Sessions run the real framework code paths:
+``crewai_demo.build_crew`` plus ``kickoff``, or ``GroupChatInterviewPlatform.chat``.
+They run against a local mock LLM, so a load test costs nothing and its
+latencies come from a known distribution.
+
+- ``MockLLMServer``: OpenAI-compatible ``/v1/chat/completions`` (plain and
+  streamed). Time to first token is drawn from a ``LatencyModel`` (fixed,
+  uniform, normal or lognormal), and decoding adds ``per_token`` seconds per
+  output token. A share of requests can fail with 429. An optional concurrency
+  limit makes requests beyond it wait in the mock's queue, like a busy provider.
+- Load generator: closed loop (``--concurrency`` sessions back to back) or
+  open loop (Poisson arrivals at ``--rps``, at most ``--concurrency`` running,
+  the rest queueing). It replays a request mix of the trip arguments
+  ``crewai_demo`` takes on its command line.
+- Report: throughput, session latency percentiles, queueing before a session
+  starts, latency and error rate per stage (crew build and each task, or each
+  GroupChat turn including its speaker selection), and provider-side queueing.
+  ``--sweep`` repeats the test at increasing concurrency and reports the
+  highest level that still meets the latency objective.
+
+Usage:
+    python shared_loadtest.py crewai --concurrency 8 --duration 120
+    python shared_loadtest.py crewai --rps 0.5 --concurrency 8 --duration 300 --latency lognormal:2.0,0.6
+    python shared_loadtest.py crewai --sweep 1,2,4,8,16 --sessions 40 --slo 60
+    python shared_loadtest.py autogen --concurrency 4 --sessions 20 --provider-concurrency 8
+    python shared_loadtest.py mock --port 8765 --latency normal:1.5,0.3
+
+Mix files are JSONL: trip objects ({"destination": "Japan", "weight": 3}) or
+argument lists as crewai_demo.py takes them (["France", "7 days", "Los Angeles"]).
+"""
+
+import argparse
+import contextlib
+import json
+import math
+import os
+import random
+import re
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+# Parameters per latency distribution (seconds): fixed:S, uniform:MIN,MAX,
+# normal:MEAN,SD, lognormal:MEDIAN,SIGMA (the long-tailed shape of real providers)
+LATENCY_KINDS = {"fixed": 1, "uniform": 2, "normal": 2, "lognormal": 2}
+
+# Positional arguments of crewai_demo.py, in order
+ARGV_FIELDS = ("destination", "trip_duration", "departure_city", "trip_dates", "travelers", "budget_preference")
+
+# Default request mix: (weight, trip)
+DEFAULT_MIX = [
+    (4, {"destination": "Iceland", "trip_duration": "5 days", "departure_city": "New York"}),
+    (3, {"destination": "Japan", "trip_duration": "7 days", "departure_city": "Los Angeles"}),
+    (3, {"destination": "France", "trip_duration": "5 days", "departure_city": "Chicago"}),
+    (2, {"destination": "Italy", "trip_duration": "10 days", "departure_city": "Boston"}),
+    (1, {"destination": "Peru", "trip_duration": "3 days", "departure_city": "Miami"}),
+]
+
+# Mock answer: shaped to pass the travel workflow's output validation, so load
+# tests measure the normal path rather than repairs
+_DAYS = "\n".join(f"### Day {n}: Morning sightseeing, afternoon museum visit, dinner at a local restaurant"
+                  for n in range(1, 15))
+MOCK_REPLY = f"""### Option 1: Northwind Air (nonstop)
+- Departs 8:40 PM, arrives 6:15 AM, 5h 35m
+- Price: $489 round trip
+### Option 2: Harbor View Hotel
+- Price: $620
+### Option 3: Summit Lodge
+- Price: $710
+
+Recommendation: Option 1 offers the best balance of price and convenience.
+
+{_DAYS}
+
+### Total cost
+- Flights: $480
+- Accommodation: $900
+- Meals and food: $300
+- Activities and tours: $200
+- Local transport: $120
+**Total: $2,000**"""
+
+_SELECT_SPEAKER = re.compile(r"select the next role from \[(.*?)\] to play", re.DOTALL)
+
+
+def _percentile(values: Sequence[float], q: float) -> float:
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(q / 100 * len(ordered)))]
+
+
+# ============================================================================
+# MOCK LLM PROVIDER
+# ============================================================================
+
+@dataclass(frozen=True)
+class LatencyModel:
+    """Distribution of the mock provider's time to first token"""
+
+    kind: str = "lognormal"
+    params: Tuple[float, ...] = (1.0, 0.5)
+
+    @classmethod
+    def parse(cls, spec: str) -> "LatencyModel":
+        """Parse "kind:p1,p2" (e.g. "lognormal:1.0,0.5", "fixed:0.2")"""
+        kind, _, args = spec.partition(":")
+        if kind not in LATENCY_KINDS:
+            raise ValueError(f"Unknown latency distribution '{kind}'. Expected one of {sorted(LATENCY_KINDS)}")
+        params = tuple(float(p) for p in args.split(",") if p.strip())
+        if len(params) != LATENCY_KINDS[kind]:
+            raise ValueError(f"Latency '{kind}' takes {LATENCY_KINDS[kind]} parameter(s), got '{spec}'")
+        return cls(kind, params)
+
+    def sample(self, rng: random.Random) -> float:
+        if self.kind == "fixed":
+            return self.params[0]
+        if self.kind == "uniform":
+            return rng.uniform(*self.params)
+        if self.kind == "normal":
+            return max(0.0, rng.gauss(*self.params))
+        return self.params[0] * math.exp(rng.gauss(0.0, self.params[1]))
+
+    def __str__(self) -> str:
+        return f"{self.kind}:{','.join(f'{p:g}' for p in self.params)}"
+
+
+def mock_reply(messages: List[Dict[str, Any]]) -> str:
+    """Answer a chat request: a speaker name for GroupChat speaker selection, else MOCK_REPLY"""
+    recent = " ".join(str(m.get("content") or "") for m in messages[-2:])
+    select = _SELECT_SPEAKER.search(recent)
+    if select:
+        names = [n.strip(" '\"") for n in select.group(1).split(",") if n.strip(" '\"")]
+        spoken = {m.get("name") for m in messages}
+        return next((n for n in names if n not in spoken), names[-1])
+    system = messages[0].get("content") or "" if messages and messages[0].get("role") == "system" else ""
+    # Agents told to close the discussion with TERMINATE do so
+    return MOCK_REPLY + ("\nTERMINATE" if "TERMINATE" in system else "")
+
+
+class _MockHandler(BaseHTTPRequestHandler):
+    def log_message(self, *args) -> None:
+        pass
+
+    def _send_json(self, status: int, payload: Dict[str, Any], headers: Optional[Dict[str, str]] = None) -> None:
+        body = json.dumps(payload).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_GET(self) -> None:
+        mock: MockLLMServer = self.server.mock
+        if self.path.rstrip("/").endswith("/models"):
+            self._send_json(200, {"object": "list", "data": [{"id": "mock", "object": "model"}]})
+        elif self.path.rstrip("/").endswith("/stats"):
+            self._send_json(200, mock.stats())
+        else:
+            self._send_json(404, {"error": {"message": "not found"}})
+
+    def do_POST(self) -> None:
+        mock: MockLLMServer = self.server.mock
+        if not self.path.rstrip("/").endswith("/chat/completions"):
+            self._send_json(404, {"error": {"message": "not found"}})
+            return
+        body = json.loads(self.rfile.read(int(self.headers.get("Content-Length", 0))) or b"{}")
+        mock.serve(self, body)
+
+
+class MockLLMServer:
+    """OpenAI-compatible chat completions endpoint with simulated provider latency"""
+
+    def __init__(self, latency: LatencyModel = LatencyModel(), per_token: float = 0.005,
+                 error_rate: float = 0.0, max_concurrency: int = 0, host: str = "127.0.0.1",
+                 port: int = 0, seed: Optional[int] = None):
+        """
+        Args:
+            latency: Time to first token distribution
+            per_token: Decode seconds per output token
+            error_rate: Share of requests answered with 429 (rate limited)
+            max_concurrency: Requests served at once; more wait in the queue (0 = unlimited)
+            host: Bind address
+            port: Port (0 = pick a free one)
+            seed: Random seed for latencies and errors
+        """
+        self.latency = latency
+        self.per_token = per_token
+        self.error_rate = error_rate
+        self.max_concurrency = max_concurrency
+        self._slots = threading.BoundedSemaphore(max_concurrency) if max_concurrency else None
+        self._rng = random.Random(seed)
+        self._lock = threading.Lock()
+        self._httpd = ThreadingHTTPServer((host, port), _MockHandler)
+        self._httpd.daemon_threads = True
+        self._httpd.mock = self
+        self.reset_stats()
+
+    @property
+    def url(self) -> str:
+        host, port = self._httpd.server_address[:2]
+        return f"http://{host}:{port}/v1"
+
+    def start(self) -> "MockLLMServer":
+        threading.Thread(target=self._httpd.serve_forever, daemon=True).start()
+        return self
+
+    def stop(self) -> None:
+        self._httpd.shutdown()
+        self._httpd.server_close()
+
+    def reset_stats(self) -> None:
+        with self._lock:
+            self._requests = self._rate_limited = self._in_flight = self._peak = 0
+            self._queue_waits: List[float] = []
+            self._service: List[float] = []
+            self._tokens = [0, 0]
+
+    def stats(self) -> Dict[str, Any]:
+        """Provider-side view: requests, rate limits, concurrency, queueing and service time"""
+        with self._lock:
+            return {
+                "requests": self._requests,
+                "rate_limited": self._rate_limited,
+                "peak_in_flight": self._peak,
+                "queue_wait_p50": _percentile(self._queue_waits, 50),
+                "queue_wait_p95": _percentile(self._queue_waits, 95),
+                "service_p50": _percentile(self._service, 50),
+                "service_p95": _percentile(self._service, 95),
+                "prompt_tokens": self._tokens[0],
+                "completion_tokens": self._tokens[1],
+            }
+
+    def serve(self, handler: _MockHandler, body: Dict[str, Any]) -> None:
+        """Answer one chat completion request"""
+        with self._lock:
+            self._requests += 1
+            rate_limited = self._rng.random() < self.error_rate
+            self._rate_limited += rate_limited
+            ttft = self.latency.sample(self._rng)
+        if rate_limited:
+            handler._send_json(429, {"error": {"message": "Rate limit reached (mock)", "type": "rate_limit_error",
+                                               "code": "rate_limit_exceeded"}}, {"Retry-After": "1"})
+            return
+
+        arrived = time.perf_counter()
+        if self._slots:
+            self._slots.acquire()
+        started = time.perf_counter()
+        with self._lock:
+            self._in_flight += 1
+            self._peak = max(self._peak, self._in_flight)
+            self._queue_waits.append(started - arrived)
+        try:
+            self._respond(handler, body, ttft)
+        finally:
+            with self._lock:
+                self._in_flight -= 1
+                self._service.append(time.perf_counter() - started)
+            if self._slots:
+                self._slots.release()
+
+    def _respond(self, handler: _MockHandler, body: Dict[str, Any], ttft: float) -> None:
+        messages = body.get("messages") or []
+        text = mock_reply(messages)
+        finish_reason = "stop"
+        max_tokens = body.get("max_tokens") or body.get("max_completion_tokens")
+        if max_tokens and len(text) > 4 * max_tokens:
+            text, finish_reason = text[:4 * max_tokens], "length"
+        usage = {"prompt_tokens": sum(len(str(m.get("content") or "")) for m in messages) // 4,
+                 "completion_tokens": max(1, len(text) // 4)}
+        usage["total_tokens"] = usage["prompt_tokens"] + usage["completion_tokens"]
+        with self._lock:
+            self._tokens[0] += usage["prompt_tokens"]
+            self._tokens[1] += usage["completion_tokens"]
+        base = {"id": "chatcmpl-mock", "created": int(time.time()), "model": body.get("model", "mock")}
+
+        time.sleep(ttft)
+        if not body.get("stream"):
+            time.sleep(usage["completion_tokens"] * self.per_token)
+            handler._send_json(200, {**base, "object": "chat.completion", "usage": usage, "choices": [
+                {"index": 0, "message": {"role": "assistant", "content": text}, "finish_reason": finish_reason}]})
+            return
+
+        handler.send_response(200)
+        handler.send_header("Content-Type", "text/event-stream")
+        handler.end_headers()
+        chunk = {**base, "object": "chat.completion.chunk"}
+        for i in range(0, len(text), 16):  # ~4 tokens per chunk
+            handler.wfile.write(f"data: {json.dumps({**chunk, 'choices': [{'index': 0, 'delta': {'content': text[i:i + 16]}, 'finish_reason': None}]})}\n\n".encode())
+            handler.wfile.flush()
+            time.sleep(4 * self.per_token)
+        handler.wfile.write(f"data: {json.dumps({**chunk, 'choices': [{'index': 0, 'delta': {}, 'finish_reason': finish_reason}]})}\n\n".encode())
+        handler.wfile.write(f"data: {json.dumps({**chunk, 'choices': [], 'usage': usage})}\n\ndata: [DONE]\n\n".encode())
+        handler.wfile.flush()
+
+
+def use_endpoint(url: str) -> None:
+    """
+    Point both frameworks at ``url`` (e.g. a MockLLMServer).
+
+    Must run before shared_config is imported: the endpoint is set as a real
+    environment variable, which takes precedence over the .env file. AutoGen's
+    response cache is disabled so every session reaches the endpoint.
+    """
+    os.environ["GROQ_API_KEY"] = "gsk_loadtest_mock_key"
+    os.environ["GROQ_API_BASE"] = url
+    os.environ["AUTOGEN_CACHE_SEED"] = "none"
+    os.environ.setdefault("CREWAI_TRACING_ENABLED", "false")
+
+
+# ============================================================================
+# SESSIONS
+# ============================================================================
+
+class StageTimer:
+    """Stage clock of one session: each mark closes the stage running since the previous mark"""
+
+    def __init__(self, expected: Sequence[str] = ()):
+        self.expected = list(expected)
+        self.stages: List[Tuple[str, float]] = []
+        self._last = time.perf_counter()
+
+    @property
+    def current(self) -> str:
+        """Stage in progress (the next expected one, or "" when unknown)"""
+        return self.expected[len(self.stages)] if len(self.stages) < len(self.expected) else ""
+
+    def mark(self, stage: Optional[str] = None) -> None:
+        now = time.perf_counter()
+        self.stages.append((stage or self.current or f"stage{len(self.stages) + 1}", now - self._last))
+        self._last = now
+
+
+class CrewAISessions:
+    """Trip planning sessions: one crew run per request on template crews, like batch workers"""
+
+    framework = "crewai"
+
+    def __init__(self):
+        from shared_config import Config
+        sys.path.insert(0, str(Config.CREWAI_DIR))
+        import crewai_demo
+
+        self.demo = crewai_demo
+        self.config_cls = Config
+        self._templates: Dict[tuple, Any] = {}
+        self._lock = threading.Lock()
+
+    def run(self, request: Dict[str, Any], timer: StageTimer) -> None:
+        trip = {**self.demo.DEFAULT_TRIP, **{k: v for k, v in request.items() if k in self.demo.DEFAULT_TRIP}}
+        config = self.config_cls.snapshot()
+        workflow = self.demo.load_travel_workflow()
+        timer.expected = ["build"] + [spec.key for spec in workflow.tasks]
+        shape = tuple(trip[name] for name in self.demo.DEFAULT_TRIP)
+        key = (shape, config.version, workflow.version)
+        with self._lock:
+            template = self._templates.get(key)
+        if template is None:
+            template = self.demo.build_crew(*shape, log=lambda *a, **k: None, verbose=False,
+                                            config=config, workflow=workflow)
+            with self._lock:
+                self._templates[key] = template
+        crew = template.copy()
+        crew.task_callback = lambda output: timer.mark()
+        timer.mark("build")
+        crew.kickoff(inputs=self.demo.trip_inputs(**trip))
+
+
+class AutoGenSessions:
+    """Product planning sessions: one GroupChat (with its summary) per request"""
+
+    framework = "autogen"
+
+    def __init__(self):
+        from shared_config import Config
+        sys.path.insert(0, str(Config.AUTOGEN_DIR))
+        import autogen_simple_demo
+        from config import AgentConfig
+
+        self.demo = autogen_simple_demo
+        self.agent_config = AgentConfig
+
+    def run(self, request: Dict[str, Any], timer: StageTimer) -> None:
+        timer.expected = ["build"]
+        workflow = self.demo.GroupChatInterviewPlatform()
+        timer.mark("build")
+        # A turn's stage includes the speaker selection that picked it
+        workflow.groupchat.observers.append(lambda message, speaker: timer.mark(
+            self.agent_config.get_phase_for_agent(message.get("name", "")) or message.get("name") or "message"))
+        timer.expected = []
+        try:
+            workflow.chat()
+        finally:
+            workflow.close()
+        timer.mark("summary")
+
+
+SESSION_KINDS = {"crewai": CrewAISessions, "autogen": AutoGenSessions}
+
+
+def load_mix(path: Optional[Path]) -> List[Tuple[float, Dict[str, Any]]]:
+    """Weighted request mix from a JSONL file (trip objects or crewai_demo.py argument lists)"""
+    if path is None:
+        return DEFAULT_MIX
+    mix = []
+    with open(path) as f:
+        for line in f:
+            if not line.strip():
+                continue
+            item = json.loads(line)
+            if isinstance(item, list):
+                item = dict(zip(ARGV_FIELDS, item))
+                if "travelers" in item:
+                    item["travelers"] = int(item["travelers"])
+            mix.append((float(item.pop("weight", 1)), item))
+    return mix
+
+
+# ============================================================================
+# LOAD GENERATOR
+# ============================================================================
+
+@dataclass
+class SessionResult:
+    """Timing of one session"""
+
+    id: int
+    request: Dict[str, Any]
+    arrived: float
+    started: float = 0.0
+    finished: float = 0.0
+    stages: List[Tuple[str, float]] = field(default_factory=list)
+    error: str = ""
+    failed_stage: str = ""
+
+    @property
+    def queued(self) -> float:
+        return self.started - self.arrived
+
+    @property
+    def latency(self) -> float:
+        return self.finished - self.started
+
+
+@dataclass
+class LoadReport:
+    """Results of one load level"""
+
+    framework: str
+    mode: str
+    concurrency: int
+    rps: Optional[float]
+    wall: float
+    sessions: List[SessionResult]
+    provider: Dict[str, Any] = field(default_factory=dict)
+
+    @property
+    def completed(self) -> List[SessionResult]:
+        return [s for s in self.sessions if not s.error]
+
+    @property
+    def error_rate(self) -> float:
+        return 1 - len(self.completed) / len(self.sessions) if self.sessions else 0.0
+
+    @property
+    def throughput(self) -> float:
+        """Completed sessions per minute"""
+        return 60 * len(self.completed) / self.wall if self.wall else 0.0
+
+    def latency(self, q: float) -> float:
+        return _percentile([s.latency for s in self.completed], q)
+
+    def stage_stats(self) -> Dict[str, Dict[str, float]]:
+        stats: Dict[str, Dict[str, Any]] = {}
+        for session in self.sessions:
+            for stage, seconds in session.stages:
+                stats.setdefault(stage, {"times": [], "errors": 0})["times"].append(seconds)
+            if session.failed_stage:
+                stats.setdefault(session.failed_stage, {"times": [], "errors": 0})["errors"] += 1
+        return {stage: {"count": len(s["times"]), "p50": _percentile(s["times"], 50),
+                        "p95": _percentile(s["times"], 95), "errors": s["errors"],
+                        "error_rate": s["errors"] / (len(s["times"]) + s["errors"])}
+                for stage, s in stats.items()}
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "framework": self.framework, "mode": self.mode, "concurrency": self.concurrency, "rps": self.rps,
+            "wall_s": self.wall, "sessions": len(self.sessions), "completed": len(self.completed),
+            "error_rate": self.error_rate, "throughput_per_min": self.throughput,
+            "latency": {f"p{q}": self.latency(q) for q in (50, 90, 95, 99)},
+            "queued": {f"p{q}": _percentile([s.queued for s in self.sessions], q) for q in (50, 95)},
+            "stages": self.stage_stats(),
+            "errors": sorted({s.error for s in self.sessions if s.error})[:10],
+            "provider": self.provider,
+        }
+
+    def print_report(self) -> None:
+        load = f"{self.rps:g} sessions/s open loop, {self.concurrency} slots" if self.rps else \
+            f"{self.concurrency} concurrent sessions (closed loop)"
+        print("\n" + "=" * 80)
+        print(f"LOAD TEST: {self.framework} — {load}")
+        print("=" * 80)
+        print(f"Sessions:     {len(self.completed)}/{len(self.sessions)} completed in {self.wall:.1f}s "
+              f"({self.throughput:.2f}/min) | errors {self.error_rate:.1%}")
+        print(f"Latency:      p50 {self.latency(50):.1f}s | p90 {self.latency(90):.1f}s | "
+              f"p95 {self.latency(95):.1f}s | p99 {self.latency(99):.1f}s")
+        queued = [s.queued for s in self.sessions]
+        print(f"Queueing:     p50 {_percentile(queued, 50):.1f}s | p95 {_percentile(queued, 95):.1f}s "
+              f"(waiting for a session slot)")
+        print(f"\n{'Stage':<14} {'count':>6} {'p50':>8} {'p95':>8} {'errors':>8}")
+        for stage, stats in self.stage_stats().items():
+            print(f"{stage:<14} {stats['count']:>6} {stats['p50']:>7.2f}s {stats['p95']:>7.2f}s "
+                  f"{stats['error_rate']:>8.1%}")
+        if self.provider:
+            p = self.provider
+            print(f"\nProvider:     {p['requests']} requests, {p['rate_limited']} rate limited, "
+                  f"peak {p['peak_in_flight']} in flight")
+            print(f"              queue p50 {p['queue_wait_p50']:.2f}s p95 {p['queue_wait_p95']:.2f}s | "
+                  f"service p50 {p['service_p50']:.2f}s p95 {p['service_p95']:.2f}s")
+        for error in self.to_dict()["errors"][:3]:
+            print(f"  - {error}")
+
+
+class LoadTest:
+    """Drives sessions of one framework at a target concurrency or arrival rate"""
+
+    def __init__(self, sessions, mix: List[Tuple[float, Dict[str, Any]]], concurrency: int = 1,
+                 rps: Optional[float] = None, duration: Optional[float] = None, total: Optional[int] = None,
+                 think: float = 0.0, seed: int = 0, mock: Optional[MockLLMServer] = None, progress=None):
+        """
+        Args:
+            sessions: Session runner (CrewAISessions or AutoGenSessions)
+            mix: Weighted request mix
+            concurrency: Sessions running at once (closed loop), or session slots (open loop)
+            rps: Arrival rate for an open-loop test (None = closed loop)
+            duration: Seconds to generate load for
+            total: Sessions to run (the test stops at whichever limit comes first)
+            think: Pause between a closed-loop user's sessions
+            seed: Random seed for the request mix and arrivals
+            mock: Mock provider whose statistics go into the report
+            progress: Stream for progress lines (None = quiet)
+        """
+        if duration is None and total is None:
+            raise ValueError("Set a duration, a session count, or both")
+        self.sessions = sessions
+        self.mix = mix
+        self.concurrency = concurrency
+        self.rps = rps
+        self.duration = duration
+        self.total = total
+        self.think = think
+        self.mock = mock
+        self.progress = progress
+        self._rng = random.Random(seed)
+        self._lock = threading.Lock()
+        self._results: List[SessionResult] = []
+        self._issued = 0
+
+    def _next_request(self, now: float) -> Optional[SessionResult]:
+        """Claim the next session, or None when the test's limits are reached"""
+        with self._lock:
+            if (self.total is not None and self._issued >= self.total) or \
+                    (self.duration is not None and now - self._start >= self.duration):
+                return None
+            self._issued += 1
+            request = self._rng.choices([r for _, r in self.mix], weights=[w for w, _ in self.mix])[0]
+            return SessionResult(self._issued, dict(request), arrived=now)
+
+    def _execute(self, session: SessionResult) -> None:
+        session.started = time.perf_counter()
+        timer = StageTimer()
+        try:
+            self.sessions.run(session.request, timer)
+        except BaseException as e:  # SystemExit from a demo's config check counts as a failure too
+            session.error = f"{type(e).__name__}: {str(e)[:200]}"
+            session.failed_stage = timer.current or "other"
+        session.finished = time.perf_counter()
+        session.stages = timer.stages
+        with self._lock:
+            self._results.append(session)
+
+    def _closed_loop_user(self) -> None:
+        while True:
+            session = self._next_request(time.perf_counter())
+            if session is None:
+                return
+            self._execute(session)
+            if self.think:
+                time.sleep(self.think)
+
+    def _report_progress(self, done: threading.Event) -> None:
+        while not done.wait(5.0):
+            with self._lock:
+                results = list(self._results)
+            failed = sum(1 for s in results if s.error)
+            latencies = [s.latency for s in results if not s.error]
+            print(f"[{time.perf_counter() - self._start:6.0f}s] {len(results)} done, "
+                  f"{self._issued - len(results)} in flight/queued, {failed} failed, "
+                  f"p50 {_percentile(latencies, 50):.1f}s", file=self.progress, flush=True)
+
+    def run(self) -> LoadReport:
+        if self.mock:
+            self.mock.reset_stats()
+        self._start = time.perf_counter()
+        done = threading.Event()
+        if self.progress:
+            threading.Thread(target=self._report_progress, args=(done,), daemon=True).start()
+
+        if self.rps:
+            # Open loop: Poisson arrivals; sessions wait for one of `concurrency` slots
+            with ThreadPoolExecutor(max_workers=self.concurrency) as pool:
+                next_arrival = self._start
+                while True:
+                    time.sleep(max(0.0, next_arrival - time.perf_counter()))
+                    session = self._next_request(next_arrival)
+                    if session is None:
+                        break
+                    pool.submit(self._execute, session)
+                    next_arrival += self._rng.expovariate(self.rps)
+        else:
+            users = [threading.Thread(target=self._closed_loop_user, daemon=True) for _ in range(self.concurrency)]
+            for user in users:
+                user.start()
+            for user in users:
+                user.join()
+        done.set()
+
+        return LoadReport(
+            framework=self.sessions.framework,
+            mode="open" if self.rps else "closed",
+            concurrency=self.concurrency,
+            rps=self.rps,
+            wall=time.perf_counter() - self._start,
+            sessions=sorted(self._results, key=lambda s: s.id),
+            provider=self.mock.stats() if self.mock else {},
+        )
+
+
+def print_sweep(reports: List[LoadReport], slo: Optional[float] = None) -> Optional[int]:
+    """
+    Print the capacity curve and return the highest sustainable concurrency.
+
+    A level is sustainable when under 1% of its sessions fail and its p95 latency
+    stays within ``slo`` seconds (default: twice the p95 of the lowest level).
+    """
+    limit = slo or 2 * reports[0].latency(95)
+    print("\n" + "=" * 80)
+    print(f"CAPACITY SWEEP: {reports[0].framework} (p95 objective {limit:.1f}s"
+          f"{'' if slo else ', 2x the lowest level'})")
+    print("=" * 80)
+    print(f"{'concurrency':>11} {'per min':>8} {'p50':>8} {'p95':>8} {'queue p95':>10} {'errors':>7}")
+    sustainable = None
+    for report in reports:
+        ok = report.error_rate < 0.01 and report.latency(95) <= limit
+        if ok:
+            sustainable = max(sustainable or 0, report.concurrency)
+        queue_p95 = report.provider.get("queue_wait_p95", 0.0)
+        print(f"{report.concurrency:>11} {report.throughput:>8.2f} {report.latency(50):>7.1f}s "
+              f"{report.latency(95):>7.1f}s {queue_p95:>9.2f}s {report.error_rate:>7.1%}{'' if ok else '  ✗'}")
+    if sustainable:
+        print(f"\n✅ Sustainable: {sustainable} concurrent sessions per worker")
+    else:
+        print("\n❌ No level met the objective")
+    return sustainable
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Load test the AutoGen and CrewAI demos against a mock LLM")
+    parser.add_argument("target", choices=sorted(SESSION_KINDS) + ["mock"],
+                        help="Framework to load, or 'mock' to only serve the mock LLM")
+    load = parser.add_argument_group("load")
+    load.add_argument("--concurrency", type=int, default=4, help="Concurrent sessions (open loop: session slots)")
+    load.add_argument("--rps", type=float, default=None, help="Open-loop arrival rate in sessions/s")
+    load.add_argument("--duration", type=float, default=None, help="Seconds to generate load")
+    load.add_argument("--sessions", type=int, default=None, help="Sessions to run (default 20 without --duration)")
+    load.add_argument("--sweep", default="", help='Concurrency levels to sweep, e.g. "1,2,4,8"')
+    load.add_argument("--slo", type=float, default=None, help="p95 session latency objective in seconds (sweep)")
+    load.add_argument("--think", type=float, default=0.0, help="Pause between a closed-loop user's sessions")
+    load.add_argument("--mix", type=Path, default=None, help="JSONL request mix (default: built-in mix)")
+    load.add_argument("--seed", type=int, default=0)
+    load.add_argument("--output", type=Path, default=None, help="Write the report(s) as JSON")
+    load.add_argument("--log", type=Path, default=None, help="Framework output (default CACHE_DIR/loadtest.log)")
+    mock_args = parser.add_argument_group("mock provider")
+    mock_args.add_argument("--endpoint", default="", help="Use this OpenAI-compatible endpoint instead of the mock")
+    mock_args.add_argument("--latency", type=LatencyModel.parse, default=LatencyModel(),
+                           help='Time to first token: fixed:S, uniform:A,B, normal:MEAN,SD, lognormal:MEDIAN,SIGMA')
+    mock_args.add_argument("--per-token", type=float, default=0.005, help="Decode seconds per output token")
+    mock_args.add_argument("--error-rate", type=float, default=0.0, help="Share of requests answered with 429")
+    mock_args.add_argument("--provider-concurrency", type=int, default=0,
+                           help="Requests the mock serves at once; more queue (0 = unlimited)")
+    mock_args.add_argument("--port", type=int, default=0, help="Mock port (default: a free one)")
+    args = parser.parse_args()
+
+    mock = None
+    if not args.endpoint:
+        mock = MockLLMServer(args.latency, args.per_token, args.error_rate, args.provider_concurrency,
+                             port=args.port or (8765 if args.target == "mock" else 0), seed=args.seed).start()
+        print(f"🧪 Mock LLM at {mock.url} (latency {args.latency}, {args.per_token * 1000:g}ms/token, "
+              f"{args.error_rate:.0%} rate limited, provider slots {args.provider_concurrency or 'unlimited'})")
+    if args.target == "mock":
+        try:
+            while True:
+                time.sleep(60)
+                print(json.dumps(mock.stats()))
+        except KeyboardInterrupt:
+            exit(0)
+    use_endpoint(args.endpoint or mock.url)
+    from shared_config import Config
+
+    args.log = args.log or Config.CACHE_DIR / "loadtest.log"
+
+    levels = [int(level) for level in args.sweep.split(",") if level.strip()] or [args.concurrency]
+    total = args.sessions if args.sessions or args.duration else 20
+    args.log.parent.mkdir(parents=True, exist_ok=True)
+    reports = []
+    with open(args.log, "a") as log, contextlib.redirect_stdout(log), contextlib.redirect_stderr(log):
+        # Framework output (agent transcripts, tracebacks) goes to the log; progress to the terminal
+        sessions = SESSION_KINDS[args.target]()
+        for level in levels:
+            print(f"▶️  {args.target}: {level} {'slots' if args.rps else 'concurrent sessions'}"
+                  + (f", {args.rps:g} sessions/s" if args.rps else ""), file=sys.__stdout__, flush=True)
+            reports.append(LoadTest(sessions, load_mix(args.mix), concurrency=level, rps=args.rps,
+                                    duration=args.duration, total=total, think=args.think, seed=args.seed,
+                                    mock=mock, progress=sys.__stdout__).run())
+
+    for report in reports:
+        report.print_report()
+    if len(reports) > 1:
+        print_sweep(reports, args.slo)
+    if args.output:
+        args.output.write_text(json.dumps([r.to_dict() for r in reports], indent=2))
+        print(f"\n✅ Report saved to {args.output}")
+    print(f"Framework output: {args.log}")
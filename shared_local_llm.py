@@ -0,0 +1,404 @@
+"""
+Local CPU Inference for AutoGen and CrewAI Lab Demo
+
+Every completion used to go to the remote endpoint, so even small, frequent
+calls such as GroupChat speaker selection paid a network round trip and used
+up the provider's rate limit. Roles listed in ``LOCAL_ROLES`` run on a local
+model instead (``LOCAL_BACKEND``):
+
+- ``llama_cpp``: a GGUF model (``LOCAL_MODEL_PATH``) loaded in-process with
+  llama-cpp-python, on ``LOCAL_THREADS`` CPU threads
+- ``server``: an OpenAI-compatible server on this machine (``LOCAL_API_BASE``),
+  e.g. llama.cpp's ``llama-server --parallel 4``, which batches concurrent
+  requests itself
+- ``mock``: a deterministic stand-in without a model file or network, for tests
+  and offline runs. It answers "select ... from ['A', 'B']" prompts with the
+  option that spoke least recently, and anything else with the opening words
+  of the last message.
+
+In-process models run behind ``LocalInference`` on one thread. Requests that
+arrive within ``LOCAL_BATCH_WAIT_MS`` of each other form a batch of up to
+``LOCAL_BATCH_SIZE``. Identical requests in a batch are answered once, and the
+rest run in prompt order, so each prompt reuses the model's KV cache for the
+prefix it shares with the one before.
+
+Calls reach the local model in two ways:
+
+- ``shared_llm.complete(..., local=True)`` goes through ``get_local_caller()``,
+  with the usual retries and per-attempt deadlines. AutoGen's
+  ``ResilientModelClient`` and CrewAI's ``ResilientLLM`` use it for local roles.
+- ``local_api_base()`` is an OpenAI-compatible URL for clients that cannot take
+  a custom client, such as the throwaway agents AutoGen builds for speaker
+  selection. In-process models are served on a loopback port for them.
+
+Usage:
+    from shared_local_llm import get_local_caller, local_api_base
+
+    result = get_local_caller().complete([{"role": "user", "content": "Say hi"}], max_tokens=10)
+    client = openai.OpenAI(base_url=local_api_base(), api_key="local")
+"""
+
+import json
+import queue
+import re
+import threading
+import time
+import uuid
+from abc import ABC, abstractmethod
+from concurrent.futures import Future, TimeoutError as FutureTimeout
+from dataclasses import dataclass, field
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Sequence
+
+from shared_config import Config
+from shared_llm import AttemptCancelled, AttemptTimeout, ChatEndpoint, ChatResult, ResilientCaller
+from shared_tokens import count_message_tokens, count_tokens
+
+# "... select the next role from ['A', 'B', 'C'] ..." (AutoGen's speaker selection prompt)
+CHOICE_LIST = re.compile(r"\[('[^']*'(?:,\s*'[^']*')*)\]")
+
+
+@dataclass
+class LocalCompletion:
+    """One completion of a local model"""
+
+    text: str
+    finish_reason: str = "stop"
+    prompt_tokens: int = 0
+    completion_tokens: int = 0
+
+
+class LocalModel(ABC):
+    """A chat model running on this machine, used by one thread at a time"""
+
+    name = ""
+
+    @abstractmethod
+    def complete(self, messages: Sequence[Dict[str, Any]], max_tokens: int, temperature: float,
+                 stop: Optional[List[str]] = None) -> LocalCompletion:
+        """Generate one reply to ``messages``"""
+
+
+class LlamaCppModel(LocalModel):
+    """A GGUF model on the CPU through llama-cpp-python"""
+
+    def __init__(self, path: str = Config.LOCAL_MODEL_PATH, threads: int = Config.LOCAL_THREADS,
+                 context: int = Config.LOCAL_CONTEXT):
+        if not path:
+            raise ValueError("LOCAL_BACKEND=llama_cpp needs LOCAL_MODEL_PATH (a .gguf file)")
+        try:
+            from llama_cpp import Llama
+        except ImportError:
+            raise ImportError("LOCAL_BACKEND=llama_cpp needs llama-cpp-python (pip install llama-cpp-python), "
+                              "or use LOCAL_BACKEND=server or mock") from None
+        self.name = Config.LOCAL_MODEL or Path(path).stem
+        self.llama = Llama(model_path=str(path), n_ctx=context, n_threads=threads or None, verbose=False)
+
+    def complete(self, messages: Sequence[Dict[str, Any]], max_tokens: int, temperature: float,
+                 stop: Optional[List[str]] = None) -> LocalCompletion:
+        response = self.llama.create_chat_completion(
+            messages=[{"role": m.get("role", "user"), "content": m.get("content") or ""} for m in messages],
+            max_tokens=max_tokens,
+            temperature=temperature,
+            stop=stop or None,
+        )
+        choice = response["choices"][0]
+        usage = response.get("usage") or {}
+        return LocalCompletion(choice["message"].get("content") or "", choice.get("finish_reason") or "stop",
+                               usage.get("prompt_tokens", 0), usage.get("completion_tokens", 0))
+
+
+class MockLocalModel(LocalModel):
+    """Deterministic offline stand-in: no model file, no network"""
+
+    name = "mock-local"
+
+    def complete(self, messages: Sequence[Dict[str, Any]], max_tokens: int, temperature: float,
+                 stop: Optional[List[str]] = None) -> LocalCompletion:
+        prompt = str(messages[-1].get("content") or "") if messages else ""
+        finish_reason = "stop"
+        choices = CHOICE_LIST.search(prompt)
+        if choices:
+            options = re.findall(r"'([^']*)'", choices.group(1))
+            last_spoke = {m.get("name"): i for i, m in enumerate(messages)}
+            # Ties keep the list order, so options that never spoke go first
+            text = min(options, key=lambda option: last_spoke.get(option, -1))
+        else:
+            words = prompt.split()
+            text = " ".join(words[:max_tokens])
+            finish_reason = "length" if len(words) > max_tokens else "stop"
+        return LocalCompletion(text, finish_reason, count_message_tokens(messages, self.name),
+                               count_tokens(text, self.name))
+
+
+_MODELS = {"llama_cpp": LlamaCppModel, "mock": MockLocalModel}
+
+
+@dataclass
+class _Request:
+    messages: List[Dict[str, Any]]
+    max_tokens: int
+    temperature: float
+    stop: Optional[List[str]]
+    future: Future = field(default_factory=Future)
+
+    @property
+    def key(self) -> str:
+        # Messages first, so that sorting the keys puts shared prompt prefixes next to each other
+        return json.dumps([self.messages, self.max_tokens, self.temperature, self.stop], sort_keys=True, default=str)
+
+
+class LocalInference:
+    """Runs a LocalModel on its own thread, answering concurrent requests in batches"""
+
+    def __init__(self, model: LocalModel, batch_size: int = Config.LOCAL_BATCH_SIZE,
+                 batch_wait_ms: float = Config.LOCAL_BATCH_WAIT_MS):
+        """
+        Args:
+            model: The model (only the inference thread calls it)
+            batch_size: Requests per batch at most
+            batch_wait_ms: Milliseconds a batch waits for more requests after its first
+        """
+        self.model = model
+        self.batch_size = max(1, batch_size)
+        self.batch_wait = max(0.0, batch_wait_ms) / 1000
+        self.stats = {"requests": 0, "batches": 0, "deduplicated": 0, "largest_batch": 0, "seconds": 0.0}
+        self._queue: "queue.SimpleQueue[_Request]" = queue.SimpleQueue()
+        self._thread = threading.Thread(target=self._loop, daemon=True, name="local-inference")
+        self._thread.start()
+
+    def submit(self, messages: Sequence[Dict[str, Any]], max_tokens: int, temperature: float = 0.0,
+               stop: Optional[List[str]] = None) -> Future:
+        """Queue a completion; the future resolves to a LocalCompletion"""
+        request = _Request([dict(m) for m in messages], max_tokens, temperature, list(stop) if stop else None)
+        self._queue.put(request)
+        return request.future
+
+    def _loop(self) -> None:
+        while True:
+            batch = [self._queue.get()]
+            ends = time.monotonic() + self.batch_wait
+            while len(batch) < self.batch_size:
+                try:
+                    batch.append(self._queue.get(timeout=max(0.0, ends - time.monotonic())))
+                except queue.Empty:
+                    break
+            self._run(batch)
+
+    def _run(self, batch: List[_Request]) -> None:
+        groups: Dict[str, List[_Request]] = {}
+        for request in batch:
+            # Requests whose caller gave up while queued are dropped
+            if request.future.set_running_or_notify_cancel():
+                groups.setdefault(request.key, []).append(request)
+        started = time.perf_counter()
+        for key in sorted(groups):
+            first = groups[key][0]
+            try:
+                completion = self.model.complete(first.messages, first.max_tokens, first.temperature, first.stop)
+            except Exception as e:
+                for request in groups[key]:
+                    request.future.set_exception(e)
+                continue
+            for request in groups[key]:
+                request.future.set_result(completion)
+        requests = sum(len(group) for group in groups.values())
+        self.stats["requests"] += requests
+        self.stats["batches"] += 1 if groups else 0
+        self.stats["deduplicated"] += requests - len(groups)
+        self.stats["largest_batch"] = max(self.stats["largest_batch"], requests)
+        self.stats["seconds"] += time.perf_counter() - started
+
+    def print_report(self) -> None:
+        """Print requests, batches and model time of this process"""
+        stats = self.stats
+        if not stats["requests"]:
+            return
+        print(f"\n🖥️  Local model {self.model.name}: {stats['requests']} requests in {stats['batches']} batches "
+              f"(largest {stats['largest_batch']}, {stats['deduplicated']} answered from a duplicate), "
+              f"{stats['seconds']:.1f}s of model time")
+
+
+class LocalEndpoint:
+    """``ChatEndpoint`` interface over an in-process LocalInference"""
+
+    def __init__(self, engine: LocalInference, name: str = "local"):
+        self.name = name
+        self.engine = engine
+        self.model = engine.model.name
+
+    def complete(self, messages: Sequence[Dict[str, Any]], deadline: float,
+                 cancel: Optional[threading.Event] = None, **params) -> ChatResult:
+        """
+        Run one completion on the local model.
+
+        Args:
+            messages: Chat messages
+            deadline: Absolute ``time.monotonic()`` deadline for this attempt
+            cancel: Event set when another attempt already won
+            **params: max_tokens, temperature and stop; other parameters (e.g. a remote ``model``) are ignored
+
+        Returns:
+            ChatResult: The completion
+        """
+        start = time.monotonic()
+        temperature = params.get("temperature")
+        future = self.engine.submit(messages, params.get("max_tokens") or Config.AGENT_MAX_TOKENS,
+                                    Config.AGENT_TEMPERATURE if temperature is None else temperature,
+                                    params.get("stop"))
+        try:
+            completion = future.result(timeout=max(0.0, deadline - start))
+        except FutureTimeout:
+            future.cancel()
+            raise AttemptTimeout(f"{self.name} exceeded its {deadline - start:.1f}s deadline") from None
+        if cancel is not None and cancel.is_set():
+            raise AttemptCancelled(self.name)
+        return ChatResult(
+            text=completion.text,
+            model=self.model,
+            endpoint=self.name,
+            latency=time.monotonic() - start,
+            finish_reason=completion.finish_reason,
+            usage={"prompt_tokens": completion.prompt_tokens, "completion_tokens": completion.completion_tokens,
+                   "total_tokens": completion.prompt_tokens + completion.completion_tokens},
+        )
+
+
+class _CompletionsHandler(BaseHTTPRequestHandler):
+    """``/v1/chat/completions`` and ``/v1/models`` of the OpenAI API over a LocalInference"""
+
+    server: "_LocalServer"
+
+    def do_GET(self) -> None:
+        if not self.path.rstrip("/").endswith("/models"):
+            return self._send_json(404, {"error": {"message": f"unknown path {self.path}"}})
+        self._send_json(200, {"object": "list", "data": [{"id": self.server.engine.model.name, "object": "model",
+                                                          "owned_by": "local"}]})
+
+    def do_POST(self) -> None:
+        if not self.path.rstrip("/").endswith("/chat/completions"):
+            return self._send_json(404, {"error": {"message": f"unknown path {self.path}"}})
+        body = json.loads(self.rfile.read(int(self.headers.get("Content-Length", 0))) or b"{}")
+        stop = body.get("stop")
+        temperature = body.get("temperature")
+        future = self.server.engine.submit(
+            body.get("messages") or [],
+            body.get("max_tokens") or body.get("max_completion_tokens") or Config.AGENT_MAX_TOKENS,
+            Config.AGENT_TEMPERATURE if temperature is None else temperature,
+            [stop] if isinstance(stop, str) else stop,
+        )
+        try:
+            completion = future.result()
+        except Exception as e:
+            return self._send_json(500, {"error": {"message": f"{type(e).__name__}: {e}", "type": "server_error"}})
+
+        model = self.server.engine.model.name
+        usage = {"prompt_tokens": completion.prompt_tokens, "completion_tokens": completion.completion_tokens,
+                 "total_tokens": completion.prompt_tokens + completion.completion_tokens}
+        base = {"id": f"chatcmpl-local-{uuid.uuid4().hex[:12]}", "created": int(time.time()), "model": model}
+        if not body.get("stream"):
+            return self._send_json(200, {**base, "object": "chat.completion", "usage": usage, "choices": [
+                {"index": 0, "message": {"role": "assistant", "content": completion.text},
+                 "finish_reason": completion.finish_reason}]})
+
+        chunks = [{**base, "object": "chat.completion.chunk", "choices": [
+            {"index": 0, "delta": {"role": "assistant", "content": completion.text},
+             "finish_reason": completion.finish_reason}]}]
+        if (body.get("stream_options") or {}).get("include_usage"):
+            chunks.append({**base, "object": "chat.completion.chunk", "choices": [], "usage": usage})
+        self.send_response(200)
+        self.send_header("Content-Type", "text/event-stream")
+        self.end_headers()
+        for chunk in chunks:
+            self.wfile.write(f"data: {json.dumps(chunk)}\n\n".encode())
+        self.wfile.write(b"data: [DONE]\n\n")
+
+    def _send_json(self, status: int, payload: Dict[str, Any]) -> None:
+        data = json.dumps(payload).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def log_message(self, format: str, *args: Any) -> None:
+        pass
+
+
+class _LocalServer(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(self, engine: LocalInference):
+        super().__init__(("127.0.0.1", 0), _CompletionsHandler)
+        self.engine = engine
+
+
+_engine: Optional[LocalInference] = None
+_caller: Optional[ResilientCaller] = None
+_server: Optional[_LocalServer] = None
+_lock = threading.Lock()
+
+
+def get_local_inference() -> Optional[LocalInference]:
+    """
+    Process-wide local model (loaded on first use).
+
+    Returns:
+        Optional[LocalInference]: The in-process model, or None with ``LOCAL_BACKEND=server``
+    """
+    global _engine
+    backend = Config.LOCAL_BACKEND
+    if backend == "server":
+        return None
+    if backend not in _MODELS:
+        raise ValueError(f"Unknown LOCAL_BACKEND '{backend}'. Expected one of {sorted(_MODELS) + ['server']}")
+    with _lock:
+        if _engine is None:
+            _engine = LocalInference(_MODELS[backend]())
+        return _engine
+
+
+def get_local_caller() -> ResilientCaller:
+    """Process-wide caller for the local model (retries and per-attempt deadlines, no hedging)"""
+    global _caller
+    engine = get_local_inference()
+    with _lock:
+        if _caller is None:
+            if engine is None:
+                endpoint = ChatEndpoint("local", Config.LOCAL_MODEL or "local", Config.LOCAL_API_BASE, "local")
+            else:
+                endpoint = LocalEndpoint(engine)
+            _caller = ResilientCaller(endpoint, max_retries=Config.MAX_RETRIES, attempt_timeout=Config.ATTEMPT_TIMEOUT)
+        return _caller
+
+
+def local_model_name() -> str:
+    """Name of the local model, as reported in results and token accounting"""
+    engine = get_local_inference()
+    return engine.model.name if engine is not None else Config.LOCAL_MODEL or "local"
+
+
+def local_api_base() -> str:
+    """
+    OpenAI-compatible base URL of the local model.
+
+    Returns:
+        str: ``LOCAL_API_BASE`` with ``LOCAL_BACKEND=server``, else the URL of a
+        loopback server (started on first use) in front of the in-process model
+    """
+    global _server
+    engine = get_local_inference()
+    if engine is None:
+        return Config.LOCAL_API_BASE
+    with _lock:
+        if _server is None:
+            _server = _LocalServer(engine)
+            threading.Thread(target=_server.serve_forever, daemon=True, name="local-inference-http").start()
+        return f"http://127.0.0.1:{_server.server_port}/v1"
+
+
+def print_local_report() -> None:
+    """Print the in-process local model's batching report (nothing when it was not used)"""
+    if _engine is not None:
+        _engine.print_report()
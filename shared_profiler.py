@@ -0,0 +1,340 @@
+"""
+Run Profiler for AutoGen and CrewAI Lab Demo
+
+Token counts say what a run costs, not where its time goes. With
+``PROFILE=True`` both demos run under a ``RunProfiler``. The profiler samples
+the stacks of all threads every ``PROFILE_INTERVAL_MS`` and attributes wall
+time per step (GroupChat speaker, crew task) to one of these categories:
+
+==============  ============================================================
+``llm wait``    a thread blocks in the HTTP client (httpx/httpcore/ssl/socket)
+``tools``       a tool call runs or is awaited (``shared_tools``)
+``own code``    the innermost non-stdlib frame is in this repository
+``framework``   the innermost non-stdlib frame is in an installed package
+                (broken down per package: autogen, crewai, litellm, ...)
+``idle``        every thread waits on a lock, queue, future or selector
+==============  ============================================================
+
+When threads overlap, a tick counts once, under the first matching category
+in table order. Process CPU time is measured per tick and counted under the
+tick's step (the sampler's own CPU is subtracted), so CPU can be told apart
+from I/O wait. Stack frames
+named in ``phases`` relabel their samples: AutoGen's speaker selection and
+chat summary show up as steps of their own.
+
+Also reported: RSS at start, end and peak, and garbage collections per
+generation with their pause time. With ``PROFILE_FLAMEGRAPH=True`` the samples
+are written as collapsed stacks (``CACHE_DIR/profiles/*.folded``). Open them
+with speedscope, inferno or flamegraph.pl. The report is saved as JSON next to them.
+
+Usage:
+    from shared_profiler import RunProfiler
+
+    profiler = RunProfiler("crewai/iceland")
+    with profiler.activate():
+        profiler.step("flight")
+        ...
+        profiler.step("hotel")
+        ...
+    profiler.print_report()
+    profiler.save()
+"""
+
+import gc
+import json
+import os
+import sys
+import sysconfig
+import threading
+import time
+from collections import Counter, defaultdict
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+from shared_config import Config
+
+CATEGORIES = ("llm wait", "tools", "own code", "framework", "idle")
+# Modules a thread is in while it waits on the network
+NETWORK_MODULES = ("httpx", "httpcore", "h11", "h2", "anyio", "aiohttp", "urllib3", "requests")
+NETWORK_STDLIB = ("ssl.py", "socket.py")
+# Innermost functions of those modules that block on the network (anything else there is CPU work)
+BLOCKING_CALLS = frozenset({"read", "recv", "recv_into", "_read", "write", "send", "sendall", "connect",
+                            "connect_tcp", "start_tls", "do_handshake", "getaddrinfo", "create_connection",
+                            "wait_for_read", "wait_for_write", "wait", "_wait", "select", "poll"})
+# Innermost stdlib files of a thread that is only waiting
+IDLE_FILES = ("threading.py", "queue.py", "selectors.py", "_base.py", "base_events.py", "connection.py")
+# Innermost (file, function) of threads blocked in C code, e.g. an idle tool worker in SimpleQueue.get
+IDLE_FUNCTIONS = frozenset({("shared_tools.py", "_work")})
+# Frames of this module and of the sampler are never attributed
+_SELF = os.path.abspath(__file__)
+
+
+def _rss_bytes() -> int:
+    """Current resident set size (0 where it cannot be read)"""
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, AttributeError):
+        return 0
+
+
+def _peak_rss_bytes() -> int:
+    try:
+        import resource
+    except ImportError:
+        return 0
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak if sys.platform == "darwin" else peak * 1024
+
+
+class _FileKinds:
+    """Classifies code files as project, package (with its name), stdlib or network code"""
+
+    def __init__(self):
+        self.project = str(Config.PROJECT_ROOT.resolve())
+        self.stdlib = os.path.realpath(sysconfig.get_paths()["stdlib"])
+        self._cache: Dict[str, Tuple[str, str]] = {}
+
+    def kind(self, filename: str) -> Tuple[str, str]:
+        """("own" | "package" | "stdlib" | "network" | "self", package name)"""
+        cached = self._cache.get(filename)
+        if cached is None:
+            cached = self._cache[filename] = self._classify(filename)
+        return cached
+
+    def _classify(self, filename: str) -> Tuple[str, str]:
+        path = os.path.realpath(filename) if not filename.startswith("<") else filename
+        if path == _SELF:
+            return "self", ""
+        parts = path.replace("\\", "/").split("/")
+        for marker in ("site-packages", "dist-packages"):
+            if marker in parts:
+                package = parts[parts.index(marker) + 1].split(".")[0] if parts[-1] != marker else ""
+                return ("network" if package in NETWORK_MODULES else "package"), package
+        if path.startswith(self.project):
+            return "own", ""
+        if path.startswith(self.stdlib) or filename.startswith("<"):
+            if parts[-1] in NETWORK_STDLIB:
+                return "network", parts[-1][:-3]
+            return "stdlib", ""
+        return "package", parts[-2] if len(parts) > 1 else ""
+
+
+class RunProfiler:
+    """Sampling profiler attributing a run's wall time to LLM wait, tools, framework and own code per step"""
+
+    def __init__(self, name: str, interval_ms: float = Config.PROFILE_INTERVAL_MS,
+                 flamegraph: bool = Config.PROFILE_FLAMEGRAPH, phases: Optional[Dict[str, str]] = None):
+        """
+        Args:
+            name: Run name (report title and file names)
+            interval_ms: Milliseconds between samples
+            flamegraph: Keep collapsed stacks for a flamegraph file
+            phases: Function name -> step label for samples with that frame on the stack
+        """
+        self.name = name
+        self.interval = max(interval_ms, 0.5) / 1000
+        self.flamegraph = flamegraph
+        self.phases = dict(phases or {})
+        self.label = "(setup)"
+        self.steps: Dict[str, Dict[str, float]] = defaultdict(lambda: dict.fromkeys(CATEGORIES, 0.0))
+        self.packages: Counter = Counter()
+        self.stacks: Counter = Counter()
+        self.cpu: Dict[str, float] = defaultdict(float)
+        self.samples = 0
+        self.gc: Dict[int, List[float]] = defaultdict(lambda: [0, 0.0])  # generation -> [collections, seconds]
+        self.rss = {"start": 0, "end": 0, "peak": 0}
+        self.wall = 0.0
+        self.sampler_cpu = 0.0
+        self._kinds = _FileKinds()
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._gc_started = 0.0
+
+    # --- steps ------------------------------------------------------------
+
+    def step(self, label: str) -> None:
+        """Attribute what follows to ``label`` (a speaker, a task)"""
+        with self._lock:
+            self.label = label
+
+    # --- sampling ---------------------------------------------------------
+
+    @contextmanager
+    def activate(self) -> Iterator["RunProfiler"]:
+        """Sample all threads while the block runs"""
+        self.rss["start"] = self.rss["start"] or _rss_bytes()
+        gc.callbacks.append(self._on_gc)
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._sample_loop, daemon=True, name="run-profiler")
+        started = time.perf_counter()
+        self._thread.start()
+        try:
+            yield self
+        finally:
+            self._stop.set()
+            self._thread.join()
+            self.wall += time.perf_counter() - started
+            gc.callbacks.remove(self._on_gc)
+            self.rss["end"] = _rss_bytes()
+            self.rss["peak"] = max(self.rss["peak"], self.rss["end"], _peak_rss_bytes())
+
+    def _on_gc(self, phase: str, info: Dict[str, Any]) -> None:
+        if phase == "start":
+            self._gc_started = time.perf_counter()
+        else:
+            entry = self.gc[info["generation"]]
+            entry[0] += 1
+            entry[1] += time.perf_counter() - self._gc_started
+
+    def _sample_loop(self) -> None:
+        me = threading.get_ident()
+        base_cpu = self.sampler_cpu  # Earlier activations' sampler threads
+        last, last_cpu = time.perf_counter(), time.process_time()
+        while not self._stop.wait(self.interval):
+            now = time.perf_counter()
+            names = {t.ident: t.name for t in threading.enumerate()}
+            frames = sys._current_frames()
+            # The tick's process CPU without what the sampler itself used since the last tick
+            sampler_cpu = base_cpu + time.thread_time()
+            process_cpu = time.process_time()
+            cpu = max(0.0, (process_cpu - last_cpu) - (sampler_cpu - self.sampler_cpu))
+            self._sample({ident: frame for ident, frame in frames.items() if ident != me}, names, now - last, cpu)
+            last, last_cpu = now, process_cpu
+            self.sampler_cpu = sampler_cpu
+            if self.samples % 100 == 0:
+                self.rss["peak"] = max(self.rss["peak"], _rss_bytes())
+
+    def _sample(self, frames: Dict[int, Any], names: Dict[int, str], elapsed: float, cpu: float) -> None:
+        best, best_package, best_stack, phase = len(CATEGORIES) - 1, "", None, None
+        for ident, frame in frames.items():
+            category, package, stack, thread_phase = self._classify(frame, names.get(ident, ""))
+            phase = phase or thread_phase
+            rank = CATEGORIES.index(category)
+            if rank < best or (rank == best and best_stack is None):
+                best, best_package, best_stack = rank, package, stack
+        category = CATEGORIES[best]
+        with self._lock:
+            self.samples += 1
+            label = phase or self.label
+            self.steps[label][category] += elapsed
+            self.cpu[label] += cpu
+            if category == "framework":
+                self.packages[best_package or "?"] += elapsed
+            if self.flamegraph and best_stack:
+                self.stacks[f"{label};{category};" + ";".join(best_stack)] += 1
+
+    def _classify(self, frame, thread_name: str) -> Tuple[str, str, Optional[List[str]], Optional[str]]:
+        """(category, framework package, stack for the flamegraph, phase label) of one thread's stack"""
+        innermost = frame.f_code
+        innermost_kind = self._kinds.kind(innermost.co_filename)[0]
+        network = innermost_kind == "network" and innermost.co_name in BLOCKING_CALLS
+        innermost_file = os.path.basename(innermost.co_filename)
+        # A worker waiting for work is idle, while a thread waiting on a tool's result counts as tools
+        waiting = (innermost_file, innermost.co_name) in IDLE_FUNCTIONS
+        idle = waiting or (innermost_kind == "stdlib" and innermost_file in IDLE_FILES)
+        code_owner: Optional[Tuple[str, str]] = None  # innermost non-stdlib frame's kind
+        tool = False
+        phase = None
+        stack = [] if self.flamegraph else None
+        while frame is not None:
+            code = frame.f_code
+            kind, package = self._kinds.kind(code.co_filename)
+            if kind == "self":
+                return "idle", "", None, None
+            if kind in ("own", "package", "network") and code_owner is None:
+                code_owner = ("own" if kind == "own" else "package", package)
+            if kind == "own" and code.co_filename.endswith("shared_tools.py"):
+                tool = True
+            if code.co_name in self.phases and phase is None:
+                phase = self.phases[code.co_name]
+            if stack is not None:
+                stack.append(f"{code.co_name} ({os.path.basename(code.co_filename)})")
+            frame = frame.f_back
+        if stack is not None:
+            stack.reverse()
+        if (tool or thread_name.startswith("tool-worker")) and not waiting:
+            return "tools", "", stack, phase
+        if network:
+            return "llm wait", "", stack, phase
+        if idle:
+            return "idle", "", stack, phase
+        if code_owner is None:
+            return "framework", "stdlib", stack, phase
+        return ("own code", "", stack, phase) if code_owner[0] == "own" else ("framework", code_owner[1], stack, phase)
+
+    # --- report -----------------------------------------------------------
+
+    def to_dict(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "name": self.name,
+                "wall": round(self.wall, 3),
+                "samples": self.samples,
+                "interval_ms": self.interval * 1000,
+                "steps": {label: {**{k: round(v, 3) for k, v in split.items()},
+                                  "cpu": round(self.cpu.get(label, 0.0), 3)}
+                          for label, split in self.steps.items()},
+                "framework_packages": {k: round(v, 3) for k, v in self.packages.most_common()},
+                "sampler_cpu": round(self.sampler_cpu, 3),
+                "rss": dict(self.rss),
+                "gc": {str(gen): {"collections": n, "seconds": round(s, 4)} for gen, (n, s) in sorted(self.gc.items())},
+            }
+
+    def print_report(self) -> None:
+        """Print wall time per step and category, CPU time, memory and GC"""
+        report = self.to_dict()
+        steps = report["steps"]
+        if not steps:
+            return
+        print(f"\n🔬 Profile: {self.name}: {report['wall']:.1f}s wall, {report['samples']} samples "
+              f"every {report['interval_ms']:g}ms")
+        header = "".join(f"{c:>12}" for c in CATEGORIES)
+        print(f"   {'step':<22}{'sampled':>9}{'cpu':>8}{header}")
+        totals = dict.fromkeys(CATEGORIES + ("cpu",), 0.0)
+        for label, split in steps.items():
+            sampled = sum(split[c] for c in CATEGORIES)
+            for key in totals:
+                totals[key] += split[key]
+            print(f"   {label[:22]:<22}{sampled:>8.1f}s{split['cpu']:>7.1f}s"
+                  + "".join(f"{split[c]:>11.1f}s" for c in CATEGORIES))
+        sampled = sum(totals[c] for c in CATEGORIES)
+        print(f"   {'total':<22}{sampled:>8.1f}s{totals['cpu']:>7.1f}s"
+              + "".join(f"{totals[c]:>11.1f}s" for c in CATEGORIES))
+        if sampled:
+            print("   share:" + " ".join(f"{c} {totals[c] / sampled:.0%}" for c in CATEGORIES))
+        if report["framework_packages"]:
+            print("   framework time by package: " + ", ".join(
+                f"{package} {seconds:.2f}s" for package, seconds in list(report["framework_packages"].items())[:8]))
+        mb = 1024 * 1024
+        rss = report["rss"]
+        print(f"   memory: RSS {rss['start'] / mb:.0f} → {rss['end'] / mb:.0f} MB (peak {rss['peak'] / mb:.0f} MB)")
+        if report["gc"]:
+            print("   gc: " + ", ".join(f"gen{gen} {entry['collections']}× {entry['seconds'] * 1000:.0f}ms"
+                                       for gen, entry in report["gc"].items()))
+        print(f"   profiler overhead: {report['sampler_cpu']:.2f}s CPU (not counted in the steps)")
+
+    def save(self, directory: Optional[Path] = None) -> Path:
+        """
+        Write the report as JSON (and the collapsed stacks when flamegraphs are on).
+
+        Args:
+            directory: Output directory (default: CACHE_DIR/profiles)
+
+        Returns:
+            Path: The JSON report
+        """
+        directory = Path(directory or Config.CACHE_DIR / "profiles")
+        directory.mkdir(parents=True, exist_ok=True)
+        stem = f"{self.name.replace('/', '_').replace(' ', '_')}_{time.strftime('%Y%m%d_%H%M%S')}"
+        path = directory / f"{stem}.json"
+        path.write_text(json.dumps(self.to_dict(), indent=2))
+        if self.flamegraph and self.stacks:
+            folded = directory / f"{stem}.folded"
+            with self._lock:
+                folded.write_text("".join(f"{stack} {count}\n" for stack, count in self.stacks.most_common()))
+            print(f"🔥 Flamegraph stacks: {folded}")
+        print(f"🔬 Profile saved to {path}")
+        return path
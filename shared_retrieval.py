@@ -0,0 +1,326 @@
+"""
+Local Retrieval Module for AutoGen and CrewAI Lab Demo
+
+A NumPy-backed vector index over the documents in ``knowledge/`` (competitor
+profiles for the AutoGen workflow, destination guides for the CrewAI crew).
+Agents get only the top-k relevant chunks in their prompts instead of
+"recalling" facts in long generations.
+
+- Embeddings are computed locally with feature hashing (no model download,
+  no API call). Any callable returning L2-normalized float32 rows can replace it.
+- Vectors are stored as ``.npy`` files and opened memory-mapped, so large
+  indexes load instantly and are shared between processes by the OS page cache.
+- Search is batched cosine similarity with ``argpartition`` top-k. Indexes above
+  ``IVF_THRESHOLD`` chunks are partitioned with k-means (inverted file) and
+  only the ``nprobe`` closest partitions are scanned, which keeps queries well
+  under a millisecond at 100k+ chunks.
+- The index is rebuilt when the set of documents changes: the saved manifest
+  of document paths, sizes and mtimes must match the knowledge directory.
+
+Both demos add retrieved notes to their prompts with ``retrieval_notes``,
+which returns "" while ``RETRIEVAL_ENABLED`` is off.
+
+Usage:
+    from shared_retrieval import get_retriever, retrieval_notes
+
+    retriever = get_retriever()
+    context = retriever.context_for("HireVue pricing and weaknesses", k=4)
+
+    system_message += retrieval_notes("HireVue strengths and weaknesses")
+"""
+
+import json
+import math
+import re
+import threading
+import zlib
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Callable, Dict, Iterable, List, Optional, Sequence
+
+try:
+    import numpy as np
+except ImportError:
+    print("ERROR: NumPy is required for retrieval!")
+    print("Please run: pip install -r requirements.txt")
+    raise
+
+from shared_config import Config
+
+_TOKEN = re.compile(r"[a-z0-9]+(?:[.'][a-z0-9]+)*")
+
+
+@dataclass
+class Chunk:
+    """A retrievable piece of a knowledge document"""
+
+    text: str
+    source: str
+    score: float = 0.0
+
+
+class HashingEmbedder:
+    """Local bag-of-words embedder using signed feature hashing of unigrams and bigrams"""
+
+    def __init__(self, dim: int = 256):
+        self.dim = dim
+
+    def _features(self, text: str) -> Iterable[str]:
+        tokens = _TOKEN.findall(text.lower())
+        yield from tokens
+        yield from (f"{a} {b}" for a, b in zip(tokens, tokens[1:]))
+
+    def embed(self, texts: Sequence[str]) -> "np.ndarray":
+        """
+        Embed texts into L2-normalized rows.
+
+        Args:
+            texts: Texts to embed
+
+        Returns:
+            np.ndarray: float32 array of shape (len(texts), dim)
+        """
+        out = np.zeros((len(texts), self.dim), dtype=np.float32)
+        for row, text in enumerate(texts):
+            counts: Dict[int, float] = {}
+            for feature in self._features(text):
+                h = zlib.crc32(feature.encode())
+                index = h % self.dim
+                counts[index] = counts.get(index, 0.0) + (1.0 if h & 0x80000000 else -1.0)
+            for index, value in counts.items():
+                # Sublinear term frequency keeps repeated words from dominating
+                out[row, index] = math.copysign(1.0 + math.log(abs(value)), value) if value else 0.0
+        norms = np.linalg.norm(out, axis=1, keepdims=True)
+        return out / np.maximum(norms, 1e-12)
+
+
+def chunk_text(text: str, source: str, max_words: int = 120, overlap: int = 20) -> List[Chunk]:
+    """
+    Split a markdown document into overlapping chunks.
+
+    Sections (``#`` headings) are chunked separately and each chunk is prefixed
+    with its heading so it stays meaningful on its own.
+
+    Args:
+        text: Document text
+        source: Document name, kept with every chunk
+        max_words: Words per chunk
+        overlap: Words shared by consecutive chunks of a section
+
+    Returns:
+        List[Chunk]: Chunks in document order
+    """
+    chunks = []
+    for section in re.split(r"\n(?=#)", text):
+        lines = section.strip().splitlines()
+        if not lines:
+            continue
+        heading = lines[0].lstrip("# ").strip() if lines[0].startswith("#") else ""
+        words = " ".join(lines[1:] if heading else lines).split()
+        step = max(1, max_words - overlap)
+        for start in range(0, max(1, len(words)), step):
+            body = " ".join(words[start:start + max_words])
+            if body:
+                chunks.append(Chunk(f"{heading}: {body}" if heading else body, source))
+            if start + max_words >= len(words):
+                break
+    return chunks
+
+
+class VectorIndex:
+    """Cosine-similarity index over normalized vectors, optionally IVF-partitioned"""
+
+    IVF_THRESHOLD = 20000
+
+    def __init__(self, vectors: "np.ndarray", chunks: List[Dict[str, str]],
+                 centroids: Optional["np.ndarray"] = None, offsets: Optional["np.ndarray"] = None,
+                 nprobe: int = 8):
+        self.vectors = vectors
+        self.chunks = chunks
+        self.centroids = centroids
+        self.offsets = offsets
+        self.nprobe = nprobe
+
+    @classmethod
+    def build(cls, vectors: "np.ndarray", chunks: List[Dict[str, str]], seed: int = 0) -> "VectorIndex":
+        """
+        Build an index; large inputs are partitioned with k-means.
+
+        Rows are reordered by partition so every partition is one contiguous
+        slice, which lets a query scan it without copying.
+
+        Args:
+            vectors: L2-normalized float32 rows
+            chunks: Chunk metadata, aligned with ``vectors``
+            seed: Random seed for k-means initialization
+
+        Returns:
+            VectorIndex: The index
+        """
+        vectors = np.ascontiguousarray(vectors, dtype=np.float32)
+        if len(vectors) < cls.IVF_THRESHOLD:
+            return cls(vectors, chunks)
+
+        rng = np.random.default_rng(seed)
+        nlist = int(math.sqrt(len(vectors)))
+        sample = vectors[rng.choice(len(vectors), size=min(len(vectors), nlist * 40), replace=False)]
+        centroids = sample[rng.choice(len(sample), size=nlist, replace=False)].copy()
+        for _ in range(10):
+            assign = np.argmax(sample @ centroids.T, axis=1)
+            for c in range(nlist):
+                members = sample[assign == c]
+                if len(members):
+                    centroids[c] = members.mean(axis=0)
+            centroids /= np.maximum(np.linalg.norm(centroids, axis=1, keepdims=True), 1e-12)
+
+        assign = np.concatenate([
+            np.argmax(vectors[i:i + 8192] @ centroids.T, axis=1) for i in range(0, len(vectors), 8192)
+        ])
+        order = np.argsort(assign, kind="stable")
+        offsets = np.searchsorted(assign[order], np.arange(nlist + 1))
+        return cls(vectors[order], [chunks[i] for i in order], centroids, offsets)
+
+    def search(self, queries: "np.ndarray", k: int = 4) -> List[List[Chunk]]:
+        """
+        Batch cosine top-k search.
+
+        Args:
+            queries: L2-normalized query rows, shape (m, dim) or (dim,)
+            k: Results per query
+
+        Returns:
+            List[List[Chunk]]: Best chunks per query, highest score first
+        """
+        queries = np.atleast_2d(np.asarray(queries, dtype=np.float32))
+        if self.centroids is None:
+            return [self._top_k(scores, np.arange(len(scores)), k) for scores in (queries @ self.vectors.T)]
+
+        results = []
+        probes = np.argsort(-(queries @ self.centroids.T), axis=1)[:, : self.nprobe]
+        for query, lists in zip(queries, probes):
+            ids = np.concatenate([np.arange(self.offsets[c], self.offsets[c + 1]) for c in lists])
+            scores = np.concatenate([self.vectors[self.offsets[c]:self.offsets[c + 1]] @ query for c in lists])
+            results.append(self._top_k(scores, ids, k))
+        return results
+
+    def _top_k(self, scores: "np.ndarray", ids: "np.ndarray", k: int) -> List[Chunk]:
+        k = min(k, len(scores))
+        if k == 0:
+            return []
+        best = np.argpartition(-scores, k - 1)[:k]
+        best = best[np.argsort(-scores[best])]
+        return [Chunk(self.chunks[ids[i]]["text"], self.chunks[ids[i]]["source"], float(scores[i])) for i in best]
+
+    def save(self, directory: Path) -> None:
+        """Write vectors (.npy), partition data and chunk metadata to a directory"""
+        directory.mkdir(parents=True, exist_ok=True)
+        np.save(directory / "vectors.npy", self.vectors)
+        if self.centroids is not None:
+            np.save(directory / "centroids.npy", self.centroids)
+            np.save(directory / "offsets.npy", self.offsets)
+        else:
+            # A flat rebuild of a once-partitioned index: load() must not pair old partitions with new vectors
+            (directory / "centroids.npy").unlink(missing_ok=True)
+            (directory / "offsets.npy").unlink(missing_ok=True)
+        with open(directory / "chunks.json", "w") as f:
+            json.dump(self.chunks, f)
+
+    @classmethod
+    def load(cls, directory: Path) -> "VectorIndex":
+        """Open a saved index with memory-mapped vectors"""
+        with open(directory / "chunks.json") as f:
+            chunks = json.load(f)
+        centroids = offsets = None
+        if (directory / "centroids.npy").exists():
+            centroids = np.load(directory / "centroids.npy")
+            offsets = np.load(directory / "offsets.npy")
+        return cls(np.load(directory / "vectors.npy", mmap_mode="r"), chunks, centroids, offsets)
+
+
+class Retriever:
+    """Knowledge-directory retriever: builds, caches and queries the index"""
+
+    def __init__(self, knowledge_dir: Path = Config.KNOWLEDGE_DIR,
+                 index_dir: Optional[Path] = None,
+                 embedder: Optional[Callable[[Sequence[str]], "np.ndarray"]] = None):
+        self.knowledge_dir = Path(knowledge_dir)
+        self.index_dir = index_dir or Config.CACHE_DIR / "knowledge_index"
+        self.embed = embedder or HashingEmbedder().embed
+        self.index = self._load_or_build()
+
+    def _documents(self) -> List[Path]:
+        return sorted(p for p in self.knowledge_dir.rglob("*")
+                      if p.suffix in (".md", ".txt") and p.name != "README.md")
+
+    def _manifest(self, documents: List[Path]) -> Dict[str, List[int]]:
+        """Path -> [size, mtime_ns] of every document; any change means the index is stale"""
+        manifest = {}
+        for path in documents:
+            stat = path.stat()
+            manifest[str(path.relative_to(self.knowledge_dir))] = [stat.st_size, stat.st_mtime_ns]
+        return manifest
+
+    def _load_or_build(self) -> VectorIndex:
+        documents = self._documents()
+        manifest = self._manifest(documents)
+        marker = self.index_dir / "documents.json"
+        if marker.exists() and (self.index_dir / "chunks.json").exists():
+            with open(marker) as f:
+                if json.load(f) == manifest:
+                    return VectorIndex.load(self.index_dir)
+
+        chunks: List[Chunk] = []
+        for path in documents:
+            chunks.extend(chunk_text(path.read_text(), str(path.relative_to(self.knowledge_dir))))
+        meta = [{"text": c.text, "source": c.source} for c in chunks]
+        vectors = self.embed([c.text for c in chunks]) if chunks else np.zeros((0, 1), dtype=np.float32)
+        index = VectorIndex.build(vectors, meta)
+        index.save(self.index_dir)
+        # Written last: an interrupted build leaves no manifest and is redone
+        with open(marker, "w") as f:
+            json.dump(manifest, f)
+        return index
+
+    def retrieve(self, query: str, k: int = Config.RETRIEVAL_TOP_K) -> List[Chunk]:
+        """Top-k chunks for one query"""
+        if not self.index.chunks:
+            return []
+        return self.index.search(self.embed([query]), k)[0]
+
+    def context_for(self, query: str, k: int = Config.RETRIEVAL_TOP_K) -> str:
+        """Top-k chunks formatted as a prompt section ("" if nothing matched)"""
+        chunks = [c for c in self.retrieve(query, k) if c.score > 0]
+        if not chunks:
+            return ""
+        return "Reference notes (retrieved):\n" + "\n".join(f"- [{c.source}] {c.text}" for c in chunks)
+
+
+_retriever: Optional[Retriever] = None
+_retriever_lock = threading.Lock()
+
+
+def get_retriever() -> Retriever:
+    """Process-wide retriever over ``Config.KNOWLEDGE_DIR``"""
+    global _retriever
+    with _retriever_lock:
+        if _retriever is None:
+            _retriever = Retriever()
+        return _retriever
+
+
+def retrieval_notes(query: str, k: int = Config.RETRIEVAL_TOP_K) -> str:
+    """
+    Top-k knowledge chunks for ``query`` as a prompt section.
+
+    Args:
+        query: What the agent or task is about
+        k: Chunks to include
+
+    Returns:
+        str: The notes, separated from the preceding prompt text ("" when
+        retrieval is disabled or nothing matched)
+    """
+    if not Config.RETRIEVAL_ENABLED:
+        return ""
+    notes = get_retriever().context_for(query, k)
+    return f"\n\n{notes}\n" if notes else ""
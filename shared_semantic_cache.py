@@ -0,0 +1,369 @@
+"""
+Semantic LLM Response Cache for AutoGen and CrewAI Lab Demo
+
+An exact-match cache misses requests that differ only cosmetically: the same
+trip with dates shifted by a day, or a reworded kickoff message. This cache
+answers such a request with a stored completion when the new prompt is close
+enough to a stored one.
+
+- Prompts are normalized (role-tagged, whitespace collapsed) and embedded
+  locally with the retrieval ``HashingEmbedder``. No model download or API call.
+- Entries are scoped per agent role and model, so a flight prompt never returns
+  a hotel answer.
+- Each scope keeps an in-memory index: one contiguous float32 matrix scanned
+  with a single matrix-vector product (well under a millisecond at the
+  per-scope capacity). Exact repeats are found by digest without a scan.
+- Bag-of-words embeddings cannot tell "Iceland" from "Japan" inside a long
+  shared prompt (both score ~0.98). Every candidate above the threshold is
+  therefore verified with a token diff against the stored prompt. Reworded
+  lowercase text and numbers within 10% (dates shifted by a day) are cosmetic.
+  A changed proper noun, a larger change in a number (5 vs. 7 days), an added
+  or removed negation, or a changed ``KEY_TERMS`` word (a "mid-range" budget
+  that became "luxury") rejects the candidate.
+- Entries persist in SQLite (``CACHE_DIR/semantic_cache.sqlite3``), shared by
+  processes such as batch workers, with a TTL and LRU eviction per scope.
+
+Enable it with ``SEMANTIC_CACHE=True``. Both demos then route their agent
+calls through ``shared_llm.complete``, which consults the cache first.
+
+Usage:
+    from shared_semantic_cache import get_semantic_cache
+
+    cache = get_semantic_cache()
+    hit = cache.lookup("crewai/flight|llama-3.3-70b-versatile", messages)
+    if hit is None:
+        text = call_llm(messages)
+        cache.store("crewai/flight|llama-3.3-70b-versatile", messages, text, model)
+"""
+
+import difflib
+import hashlib
+import json
+import re
+import sqlite3
+import threading
+import time
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Sequence
+
+try:
+    import numpy as np
+except ImportError:
+    print("ERROR: NumPy is required for the semantic cache!")
+    print("Please run: pip install -r requirements.txt")
+    raise
+
+from shared_config import Config
+from shared_retrieval import HashingEmbedder
+
+# Words, numbers (with decimals/thousands separators) and sentence ends, for the diff
+_DIFF_TOKEN = re.compile(r"[A-Za-z]+(?:'[a-z]+)?|\d+(?:[.,]\d+)*|[.!?:]")
+_SENTENCE_END = {".", "!", "?", ":"}
+
+# Relative difference under which two numbers count as the same (Jan 15 vs. Jan 16)
+NUMBER_TOLERANCE = 0.1
+# Share of the prompt that may be reworded before a candidate is rejected
+MAX_REWORDED = 0.15
+
+# Lowercase words that carry a request's meaning (template inputs such as the budget
+# tier or travel class); changing one is never cosmetic
+KEY_TERMS = frozenset({
+    "budget", "cheap", "cheapest", "affordable", "economy", "mid", "moderate", "standard",
+    "luxury", "luxurious", "premium", "upscale", "deluxe", "business", "first",
+    "family", "solo", "vegetarian", "vegan", "accessible", "nonstop", "direct",
+})
+# Words that invert what follows them ("n't" contractions are matched by suffix)
+NEGATIONS = frozenset({"not", "no", "never", "without", "except", "avoid", "excluding", "nor"})
+
+
+@dataclass
+class CacheHit:
+    """A stored completion answering a lookup"""
+
+    text: str
+    model: str
+    similarity: float
+    latency: float
+
+
+def normalize(messages: Sequence[Dict[str, Any]]) -> str:
+    """One string per conversation: role-tagged messages with whitespace collapsed"""
+    return "\n".join(f"{m.get('role', 'user')}: {' '.join(str(m.get('content') or '').split())}"
+                     for m in messages)
+
+
+def _number(token: str) -> Optional[float]:
+    if not token[0].isdigit():
+        return None
+    try:
+        return float(token.replace(",", ""))
+    except ValueError:
+        return None
+
+
+def _is_proper(tokens: List[str], i: int) -> bool:
+    """Capitalized word that does not start a sentence (a name, place or acronym)"""
+    return tokens[i][0].isupper() and i > 0 and tokens[i - 1] not in _SENTENCE_END
+
+
+def _key_word(token: str) -> bool:
+    word = token.lower()
+    return word in KEY_TERMS or word in NEGATIONS or word.endswith("n't")
+
+
+def cosmetic_difference(stored: str, query: str) -> Optional[str]:
+    """
+    Check that two prompts differ only cosmetically.
+
+    Args:
+        stored: Normalized prompt of the cache entry
+        query: Normalized prompt of the request
+
+    Returns:
+        Optional[str]: Why the difference is not cosmetic, or None
+    """
+    a, b = _DIFF_TOKEN.findall(stored), _DIFF_TOKEN.findall(query)
+    reworded = 0
+    matcher = difflib.SequenceMatcher(None, a, b, autojunk=False)
+    for op, i1, i2, j1, j2 in matcher.get_opcodes():
+        if op == "equal":
+            continue
+        old, new = list(range(i1, i2)), list(range(j1, j2))
+        old_numbers = [_number(a[i]) for i in old if _number(a[i]) is not None]
+        new_numbers = [_number(b[j]) for j in new if _number(b[j]) is not None]
+        if len(old_numbers) != len(new_numbers):
+            return "a number was added or removed"
+        for x, y in zip(old_numbers, new_numbers):
+            if abs(x - y) > NUMBER_TOLERANCE * max(abs(x), abs(y)):
+                return f"{x:g} became {y:g}"
+        proper_old = {a[i] for i in old if _is_proper(a, i)}
+        proper_new = {b[j] for j in new if _is_proper(b, j)}
+        if proper_old != proper_new:
+            return f"{', '.join(sorted(proper_old ^ proper_new))} changed"
+        key_old = sorted(a[i].lower() for i in old if _key_word(a[i]))
+        key_new = sorted(b[j].lower() for j in new if _key_word(b[j]))
+        if key_old != key_new:
+            return f"{' '.join(key_old) or 'nothing'} became {' '.join(key_new) or 'nothing'}"
+        reworded += max(len(old), len(new)) - len(old_numbers)
+    if reworded > MAX_REWORDED * max(len(a), len(b), 1):
+        return f"{reworded} words reworded"
+    return None
+
+
+class _ScopeIndex:
+    """In-memory vectors of one scope: a growable matrix plus entry ids and recency"""
+
+    def __init__(self, dim: int):
+        self.vectors = np.zeros((16, dim), dtype=np.float32)
+        self.ids: List[int] = []
+        self.last_used: List[float] = []
+        self.digests: Dict[str, int] = {}  # digest -> row
+        self.max_id = 0
+
+    def add(self, entry_id: int, digest: str, vector: "np.ndarray", last_used: float) -> None:
+        row = len(self.ids)
+        if row == len(self.vectors):
+            self.vectors = np.concatenate([self.vectors, np.zeros_like(self.vectors)])
+        self.vectors[row] = vector
+        self.ids.append(entry_id)
+        self.last_used.append(last_used)
+        self.digests[digest] = row
+        self.max_id = max(self.max_id, entry_id)
+
+    def remove(self, row: int) -> int:
+        """Drop a row (the last row moves into its place); returns the removed entry id"""
+        entry_id, last = self.ids[row], len(self.ids) - 1
+        self.vectors[row] = self.vectors[last]
+        self.ids[row], self.last_used[row] = self.ids[last], self.last_used[last]
+        self.ids.pop()
+        self.last_used.pop()
+        self.digests = {d: (row if r == last else r) for d, r in self.digests.items() if r != row}
+        return entry_id
+
+
+class SemanticCache:
+    """Similarity-based completion cache, scoped per agent role and model"""
+
+    def __init__(self, path: Optional[Path] = None, threshold: float = Config.SEMANTIC_CACHE_THRESHOLD,
+                 max_entries: int = Config.SEMANTIC_CACHE_MAX_ENTRIES,
+                 ttl: float = Config.SEMANTIC_CACHE_TTL_HOURS * 3600, dim: int = 512):
+        """
+        Args:
+            path: SQLite file (defaults to Config.CACHE_DIR / "semantic_cache.sqlite3")
+            threshold: Minimum cosine similarity of a candidate (before verification)
+            max_entries: Entries kept per scope; the least recently used are evicted
+            ttl: Seconds an entry stays valid
+            dim: Embedding dimensions
+        """
+        self.path = Path(path or Config.CACHE_DIR / "semantic_cache.sqlite3")
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.threshold = threshold
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.embedder = HashingEmbedder(dim)
+        self.stats = {"hits": 0, "misses": 0, "rejected": 0, "stores": 0, "evictions": 0}
+        self._scopes: Dict[str, _ScopeIndex] = {}
+        self._lock = threading.RLock()
+        # One connection per thread; SQLite handles cross-process locking
+        self._local = threading.local()
+        with self._conn() as conn:
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS entries (id INTEGER PRIMARY KEY AUTOINCREMENT, scope TEXT NOT NULL, "
+                "digest TEXT NOT NULL, prompt TEXT NOT NULL, vector BLOB NOT NULL, response TEXT NOT NULL, "
+                "model TEXT NOT NULL, created REAL NOT NULL, last_used REAL NOT NULL, hits INTEGER DEFAULT 0)"
+            )
+            conn.execute("CREATE INDEX IF NOT EXISTS entries_scope ON entries (scope, id)")
+
+    def _conn(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=30)
+            conn.execute("PRAGMA journal_mode=WAL")
+            self._local.conn = conn
+        return conn
+
+    def _sync(self, scope: str) -> _ScopeIndex:
+        """The scope's index, with entries stored since the last sync (also by other processes)"""
+        index = self._scopes.get(scope)
+        if index is None:
+            index = self._scopes[scope] = _ScopeIndex(self.embedder.dim)
+        rows = self._conn().execute(
+            "SELECT id, digest, vector, last_used FROM entries WHERE scope = ? AND id > ? AND created > ?",
+            (scope, index.max_id, time.time() - self.ttl),
+        ).fetchall()
+        for entry_id, digest, vector, last_used in rows:
+            index.add(entry_id, digest, np.frombuffer(vector, dtype=np.float32), last_used)
+        return index
+
+    def _drop(self, scope: str, row: int) -> None:
+        entry_id = self._scopes[scope].remove(row)
+        with self._conn() as conn:
+            conn.execute("DELETE FROM entries WHERE id = ?", (entry_id,))
+
+    def lookup(self, scope: str, messages: Sequence[Dict[str, Any]]) -> Optional[CacheHit]:
+        """
+        Find a stored completion for a prompt.
+
+        Args:
+            scope: Cache scope (agent role and model)
+            messages: Chat messages of the request
+
+        Returns:
+            Optional[CacheHit]: The best verified entry, or None
+        """
+        start = time.perf_counter()
+        prompt = normalize(messages)
+        digest = hashlib.sha256(prompt.encode()).hexdigest()
+        with self._lock:
+            index = self._sync(scope)
+            if not index.ids:
+                self.stats["misses"] += 1
+                return None
+            if digest in index.digests:
+                candidates = [(index.digests[digest], 1.0)]
+            else:
+                scores = index.vectors[:len(index.ids)] @ self.embedder.embed([prompt])[0]
+                best = np.argsort(-scores)[:3]
+                candidates = [(int(row), float(scores[row])) for row in best if scores[row] >= self.threshold]
+
+            rejected = False
+            for row, similarity in candidates:
+                entry_id = index.ids[row]
+                found = self._conn().execute(
+                    "SELECT prompt, response, model, created FROM entries WHERE id = ?", (entry_id,)
+                ).fetchone()
+                if found is None or found[3] < time.time() - self.ttl:
+                    # Evicted by another process, or expired
+                    self._drop(scope, row)
+                    return self.lookup(scope, messages)
+                stored_prompt, response, model, _ = found
+                if similarity < 1.0 and cosmetic_difference(stored_prompt, prompt):
+                    rejected = True
+                    continue
+                now = time.time()
+                index.last_used[row] = now
+                with self._conn() as conn:
+                    conn.execute("UPDATE entries SET hits = hits + 1, last_used = ? WHERE id = ?", (now, entry_id))
+                self.stats["hits"] += 1
+                return CacheHit(response, model, similarity, time.perf_counter() - start)
+            self.stats["rejected" if rejected else "misses"] += 1
+            return None
+
+    def store(self, scope: str, messages: Sequence[Dict[str, Any]], response: str, model: str) -> None:
+        """Store a completion, evicting the scope's least recently used entries beyond capacity"""
+        if not response.strip():
+            return
+        prompt = normalize(messages)
+        digest = hashlib.sha256(prompt.encode()).hexdigest()
+        vector = self.embedder.embed([prompt])[0]
+        now = time.time()
+        with self._lock:
+            index = self._sync(scope)
+            if digest in index.digests:
+                return
+            with self._conn() as conn:
+                cursor = conn.execute(
+                    "INSERT INTO entries (scope, digest, prompt, vector, response, model, created, last_used) "
+                    "VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                    (scope, digest, prompt, vector.tobytes(), response, model, now, now),
+                )
+            index.add(cursor.lastrowid, digest, vector, now)
+            self.stats["stores"] += 1
+            while len(index.ids) > self.max_entries:
+                self._drop(scope, int(np.argmin(index.last_used)))
+                self.stats["evictions"] += 1
+
+    def purge_expired(self) -> int:
+        """Delete expired entries; returns how many were removed"""
+        with self._lock, self._conn() as conn:
+            cursor = conn.execute("DELETE FROM entries WHERE created < ?", (time.time() - self.ttl,))
+            self._scopes.clear()
+            return cursor.rowcount
+
+    def print_report(self) -> None:
+        """Print hit rate and what the cache saved this process"""
+        lookups = self.stats["hits"] + self.stats["misses"] + self.stats["rejected"]
+        if not lookups:
+            return
+        print(f"\n🧠 Semantic cache: {self.stats['hits']}/{lookups} calls answered from cache "
+              f"({self.stats['hits'] / lookups:.0%}), {self.stats['rejected']} near matches rejected, "
+              f"{self.stats['stores']} stored, {self.stats['evictions']} evicted")
+
+    def to_dict(self) -> Dict[str, Any]:
+        return dict(self.stats)
+
+
+_cache: Optional[SemanticCache] = None
+_cache_lock = threading.Lock()
+
+
+def get_semantic_cache() -> SemanticCache:
+    """Process-wide semantic cache"""
+    global _cache
+    with _cache_lock:
+        if _cache is None:
+            _cache = SemanticCache()
+        return _cache
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Inspect or clear the semantic LLM response cache")
+    parser.add_argument("command", choices=["stats", "purge", "clear"])
+    args = parser.parse_args()
+
+    cache = get_semantic_cache()
+    if args.command == "purge":
+        print(f"Removed {cache.purge_expired()} expired entries")
+    elif args.command == "clear":
+        with cache._conn() as conn:
+            conn.execute("DELETE FROM entries")
+        print("Semantic cache cleared")
+    else:
+        rows = cache._conn().execute(
+            "SELECT scope, COUNT(*), SUM(hits), SUM(LENGTH(response)) FROM entries GROUP BY scope ORDER BY scope"
+        ).fetchall()
+        print(json.dumps({scope: {"entries": n, "hits": hits, "response_bytes": size}
+                          for scope, n, hits, size in rows}, indent=2))
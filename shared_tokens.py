@@ -0,0 +1,263 @@
+"""
+Token Accounting Module for AutoGen and CrewAI Lab Demo
+
+Gives both demos token and cost visibility:
+
+- ``count_tokens`` / ``count_message_tokens`` estimate prompt sizes locally
+  before a call is sent (tiktoken when installed, ~4 characters per token
+  otherwise).
+- ``UsageLedger`` accumulates pre-flight estimates and actual usage reported by
+  the provider, per agent and per model, and prints per-run or per-batch cost
+  reports.
+- ``BudgetGuard`` checks every call against the run budget
+  (``RUN_BUDGET_USD`` / ``RUN_BUDGET_TOKENS``). It aborts with
+  ``BudgetExceeded`` or switches to ``BUDGET_DOWNGRADE_MODEL`` before the run
+  goes over, depending on ``BUDGET_ACTION``.
+
+Usage:
+    from shared_tokens import BudgetGuard, UsageLedger, count_message_tokens
+
+    ledger = UsageLedger("run-1")
+    guard = BudgetGuard(ledger)
+    prompt_tokens = count_message_tokens(messages, model)
+    model = guard.check("ResearchAgent", model, prompt_tokens, max_output_tokens=800)
+    ...
+    ledger.record_actual("ResearchAgent", model, prompt_tokens=812, completion_tokens=403)
+    ledger.print_report()
+"""
+
+import json
+import math
+import threading
+from collections import defaultdict
+from functools import lru_cache
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from shared_config import Config
+
+try:
+    import tiktoken
+except ImportError:
+    tiktoken = None
+
+
+# USD per 1M tokens (input, output). Override or extend with MODEL_PRICING_FILE.
+MODEL_PRICING: Dict[str, Tuple[float, float]] = {
+    "gpt-4-turbo-preview": (10.00, 30.00),
+    "gpt-4-turbo": (10.00, 30.00),
+    "gpt-4o": (2.50, 10.00),
+    "gpt-4o-mini": (0.15, 0.60),
+    "gpt-3.5-turbo": (0.50, 1.50),
+    "llama-3.3-70b-versatile": (0.59, 0.79),
+    "llama-3.1-70b-versatile": (0.59, 0.79),
+    "llama-3.1-8b-instant": (0.05, 0.08),
+}
+
+
+class BudgetExceeded(RuntimeError):
+    """Raised when a call would push the run over its token or cost budget"""
+
+
+def _load_pricing() -> Dict[str, Tuple[float, float]]:
+    pricing = dict(MODEL_PRICING)
+    if Config.MODEL_PRICING_FILE:
+        with open(Config.MODEL_PRICING_FILE) as f:
+            pricing.update({model: tuple(prices) for model, prices in json.load(f).items()})
+    return pricing
+
+
+_PRICING = _load_pricing()
+
+
+def model_prices(model: str) -> Tuple[float, float]:
+    """(input, output) USD per 1M tokens; unknown models are priced at zero"""
+    name = model.split("/")[-1]
+    return _PRICING.get(name, (0.0, 0.0))
+
+
+def estimate_cost(model: str, prompt_tokens: int, completion_tokens: int) -> float:
+    """Cost in USD of one call"""
+    price_in, price_out = model_prices(model)
+    return (prompt_tokens * price_in + completion_tokens * price_out) / 1_000_000
+
+
+@lru_cache(maxsize=16)
+def _encoding(model: str):
+    """tiktoken encoding for a model, or None when tiktoken cannot provide one"""
+    if tiktoken is None:
+        return None
+    try:
+        try:
+            return tiktoken.encoding_for_model(model.split("/")[-1])
+        except KeyError:
+            # Non-OpenAI models (e.g. Llama on Groq): cl100k is a close enough proxy
+            return tiktoken.get_encoding("cl100k_base")
+    except Exception:
+        # Encoding files are downloaded on first use; offline hosts fall back to the estimate
+        return None
+
+
+def count_tokens(text: str, model: str = "") -> int:
+    """
+    Count tokens in a text.
+
+    Args:
+        text: Text to count
+        model: Model name, used to pick the tokenizer
+
+    Returns:
+        int: Token count (exact with tiktoken, estimated otherwise)
+    """
+    if not text:
+        return 0
+    encoding = _encoding(model or Config.OPENAI_MODEL)
+    if encoding is not None:
+        return len(encoding.encode(text, disallowed_special=()))
+    return math.ceil(len(text) / 4)
+
+
+def count_message_tokens(messages: Iterable[Dict[str, Any]], model: str = "") -> int:
+    """Prompt tokens for a chat message list, including per-message overhead"""
+    total = 2  # Reply priming
+    for message in messages:
+        total += 4 + count_tokens(str(message.get("content") or ""), model) + count_tokens(message.get("name") or "", model)
+    return total
+
+
+class UsageLedger:
+    """Thread-safe record of estimated and actual token usage for a run or batch"""
+
+    def __init__(self, run_id: str = "run"):
+        self.run_id = run_id
+        self._lock = threading.Lock()
+        # (agent, model) -> counters
+        self.entries: Dict[Tuple[str, str], Dict[str, float]] = defaultdict(
+            lambda: {"calls": 0, "estimated_prompt_tokens": 0, "prompt_tokens": 0, "completion_tokens": 0, "cost": 0.0}
+        )
+
+    def record_estimate(self, agent: str, model: str, prompt_tokens: int) -> None:
+        """Record the pre-flight prompt estimate of a call about to be sent"""
+        with self._lock:
+            entry = self.entries[(agent, model)]
+            entry["calls"] += 1
+            entry["estimated_prompt_tokens"] += prompt_tokens
+
+    def record_actual(self, agent: str, model: str, prompt_tokens: int, completion_tokens: int,
+                      cost: Optional[float] = None) -> None:
+        """Record usage reported by the provider"""
+        with self._lock:
+            entry = self.entries[(agent, model)]
+            entry["prompt_tokens"] += prompt_tokens
+            entry["completion_tokens"] += completion_tokens
+            entry["cost"] += cost if cost else estimate_cost(model, prompt_tokens, completion_tokens)
+
+    def merge(self, other: "UsageLedger") -> None:
+        """Add another ledger's entries (e.g. from a batch worker)"""
+        for key, counters in other.entries.items():
+            with self._lock:
+                entry = self.entries[key]
+                for name, value in counters.items():
+                    entry[name] += value
+
+    @property
+    def total_tokens(self) -> int:
+        with self._lock:
+            return int(sum(e["prompt_tokens"] + e["completion_tokens"] for e in self.entries.values()))
+
+    @property
+    def total_cost(self) -> float:
+        with self._lock:
+            return sum(e["cost"] for e in self.entries.values())
+
+    def to_dict(self) -> Dict[str, Any]:
+        """JSON-serializable form (used to ship worker usage to a parent process)"""
+        with self._lock:
+            return {"run_id": self.run_id,
+                    "entries": [{"agent": a, "model": m, **c} for (a, m), c in self.entries.items()]}
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "UsageLedger":
+        ledger = cls(data.get("run_id", "run"))
+        for item in data.get("entries", []):
+            counters = {k: v for k, v in item.items() if k not in ("agent", "model")}
+            ledger.entries[(item["agent"], item["model"])].update(counters)
+        return ledger
+
+    def print_report(self, title: str = "") -> None:
+        """Print usage and cost by agent and by model"""
+        with self._lock:
+            entries = dict(self.entries)
+        if not entries:
+            return
+        print("\n" + "-" * 80)
+        print(f"💰 TOKEN USAGE & COST — {title or self.run_id}")
+        print("-" * 80)
+        print(f"{'Agent':<22} {'Model':<26} {'Calls':>5} {'Est.In':>8} {'In':>8} {'Out':>7} {'USD':>9}")
+        for (agent, model), e in sorted(entries.items()):
+            print(f"{agent[:22]:<22} {model[:26]:<26} {int(e['calls']):>5} {int(e['estimated_prompt_tokens']):>8} "
+                  f"{int(e['prompt_tokens']):>8} {int(e['completion_tokens']):>7} {e['cost']:>9.4f}")
+        by_model: Dict[str, List[float]] = defaultdict(lambda: [0, 0, 0.0])
+        for (_, model), e in entries.items():
+            by_model[model][0] += e["prompt_tokens"]
+            by_model[model][1] += e["completion_tokens"]
+            by_model[model][2] += e["cost"]
+        print("By model:")
+        for model, (tokens_in, tokens_out, cost) in sorted(by_model.items()):
+            print(f"  {model:<30} in {int(tokens_in):>8}  out {int(tokens_out):>7}  ${cost:.4f}")
+        print(f"Total: {self.total_tokens} tokens, ${self.total_cost:.4f}")
+
+
+class BudgetGuard:
+    """Pre-flight budget check for each call of a run"""
+
+    def __init__(self, ledger: UsageLedger,
+                 max_cost: float = Config.RUN_BUDGET_USD,
+                 max_tokens: int = Config.RUN_BUDGET_TOKENS,
+                 action: str = Config.BUDGET_ACTION,
+                 downgrade_model: str = Config.BUDGET_DOWNGRADE_MODEL):
+        if action not in ("abort", "downgrade"):
+            raise ValueError(f"Unknown BUDGET_ACTION '{action}'. Expected 'abort' or 'downgrade'")
+        self.ledger = ledger
+        self.max_cost = max_cost
+        self.max_tokens = max_tokens
+        self.action = action
+        self.downgrade_model = downgrade_model
+
+    @property
+    def enabled(self) -> bool:
+        return bool(self.max_cost or self.max_tokens)
+
+    def _fits(self, model: str, prompt_tokens: int, max_output_tokens: int) -> bool:
+        if self.max_tokens and self.ledger.total_tokens + prompt_tokens + max_output_tokens > self.max_tokens:
+            return False
+        projected = estimate_cost(model, prompt_tokens, max_output_tokens)
+        return not (self.max_cost and self.ledger.total_cost + projected > self.max_cost)
+
+    def check(self, agent: str, model: str, prompt_tokens: int, max_output_tokens: int) -> str:
+        """
+        Check a call before it is sent, assuming it uses its whole output budget.
+
+        Args:
+            agent: Agent making the call
+            model: Model the call would use
+            prompt_tokens: Estimated prompt tokens
+            max_output_tokens: The call's max_tokens
+
+        Returns:
+            str: Model to use (the downgrade model if the original does not fit)
+
+        Raises:
+            BudgetExceeded: If the call does not fit the remaining budget
+        """
+        if not self.enabled or self._fits(model, prompt_tokens, max_output_tokens):
+            return model
+        if (self.action == "downgrade" and self.downgrade_model and self.downgrade_model != model
+                and self._fits(self.downgrade_model, prompt_tokens, max_output_tokens)):
+            if Config.VERBOSE:
+                print(f"⚠️  Budget: {agent} downgraded from {model} to {self.downgrade_model}")
+            return self.downgrade_model
+        raise BudgetExceeded(
+            f"{agent}: a {prompt_tokens}+{max_output_tokens} token call on {model} would exceed the run budget "
+            f"(spent {self.ledger.total_tokens} tokens / ${self.ledger.total_cost:.4f}; "
+            f"limits {self.max_tokens or '-'} tokens / ${self.max_cost or '-'})"
+        )
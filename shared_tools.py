@@ -0,0 +1,351 @@
+"""
+Tool Execution for AutoGen and CrewAI Lab Demo
+
+Agent tools used to run inline on the agent's thread with no time limit, so a
+single hung lookup could stall a whole crew. ``ToolExecutor`` runs every tool
+call on a bounded pool instead:
+
+- Timeouts: the caller waits at most ``TOOL_TIMEOUT`` seconds (``TOOL_TIMEOUTS``
+  per tool), and never past the end of an active run deadline. A call still
+  queued at its timeout is cancelled. A running call cannot be interrupted, so
+  it finishes in the background and its result still fills the cache.
+- Isolation: at most ``TOOL_CONCURRENCY`` calls of one tool are in flight,
+  hung ones included, so a stuck tool uses up its own slots and not the pool.
+  ``TOOL_EXECUTOR=process`` runs the calls in worker processes (module-level
+  tool functions only). Workers are daemons, so a hung call never blocks exit.
+- Fallbacks: a call that times out, fails, or finds its tool at its limit gets
+  the last good result for the same arguments. That result comes from memory,
+  or else from the ``tool_results`` disk cache for ``TOOL_CACHE_TTL_HOURS``.
+  Without one, the tool's registered default is used (the CrewAI lookups use
+  their destination-independent ``default`` entries). Failing that, the agent
+  gets a short notice that no data was retrieved.
+- Metrics: per tool calls, timeouts, errors, fallbacks and latency
+  percentiles (``print_report``).
+
+Usage:
+    from shared_tools import get_tool_executor
+
+    executor = get_tool_executor()
+    executor.register("search_flights", lookup_flights, default=generic_flights)
+    text = executor.call("search_flights", destination="Japan")
+    texts = executor.call_many([("search_flights", {"destination": "Japan"}),
+                                ("search_hotels", {"location": "Tokyo"})])
+    executor.print_report()
+"""
+
+import multiprocessing
+import queue
+import threading
+import time
+from collections import OrderedDict, deque
+from concurrent.futures import CancelledError, Future, TimeoutError as FutureTimeout
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
+
+from shared_cache import DiskCache
+from shared_config import Config
+from shared_deadline import current_deadline
+
+# Results kept in memory for fallbacks
+MEMORY_CACHE_SIZE = 256
+# Latencies kept per tool for the percentiles
+LATENCY_WINDOW = 1000
+
+
+def parse_timeouts(spec: str) -> Dict[str, float]:
+    """Parse "tool=seconds,tool=seconds" (TOOL_TIMEOUTS)"""
+    timeouts = {}
+    for item in filter(None, (part.strip() for part in spec.split(","))):
+        name, _, seconds = item.partition("=")
+        timeouts[name.strip()] = float(seconds)
+    return timeouts
+
+
+@dataclass
+class ToolSpec:
+    """A registered tool and its limits"""
+
+    name: str
+    fn: Callable[..., Any]
+    timeout: float
+    concurrency: int
+    default: Optional[Callable[..., Any]] = None
+
+
+class _DaemonThreadPool:
+    """Thread pool whose workers are daemons: a hung call never holds up interpreter exit
+
+    ``concurrent.futures.ThreadPoolExecutor`` joins its workers at exit.
+    """
+
+    def __init__(self, max_workers: int):
+        self._queue: "queue.SimpleQueue[Tuple[Future, Callable, tuple, dict]]" = queue.SimpleQueue()
+        for i in range(max(1, max_workers)):
+            threading.Thread(target=self._work, daemon=True, name=f"tool-worker-{i}").start()
+
+    def submit(self, fn: Callable, *args, **kwargs) -> Future:
+        future: Future = Future()
+        self._queue.put((future, fn, args, kwargs))
+        return future
+
+    def _work(self) -> None:
+        while True:
+            future, fn, args, kwargs = self._queue.get()
+            if not future.set_running_or_notify_cancel():
+                continue  # Cancelled while queued
+            try:
+                future.set_result(fn(*args, **kwargs))
+            except BaseException as e:
+                future.set_exception(e)
+
+    def shutdown(self) -> None:
+        while True:
+            try:
+                self._queue.get_nowait()[0].cancel()
+            except queue.Empty:
+                return
+
+
+class _ProcessPool:
+    """``multiprocessing.Pool`` (daemon workers, terminable) behind the Future interface"""
+
+    def __init__(self, max_workers: int):
+        self._pool = multiprocessing.Pool(max(1, max_workers))
+
+    def submit(self, fn: Callable, *args, **kwargs) -> Future:
+        future: Future = Future()
+        future.set_running_or_notify_cancel()  # Pool tasks cannot be cancelled
+        self._pool.apply_async(fn, args, kwargs, callback=future.set_result,
+                               error_callback=future.set_exception)
+        return future
+
+    def shutdown(self) -> None:
+        self._pool.terminate()
+
+
+class ToolStats:
+    """Outcomes and latencies of one tool's calls in this process"""
+
+    def __init__(self):
+        self.calls = 0
+        self.ok = 0
+        self.timeouts = 0
+        self.errors = 0
+        self.saturated = 0
+        self.fallbacks: Dict[str, int] = {"cache": 0, "default": 0, "notice": 0}
+        self.latencies: deque = deque(maxlen=LATENCY_WINDOW)
+
+    def percentile(self, q: float) -> float:
+        ordered = sorted(self.latencies)
+        if not ordered:
+            return 0.0
+        return ordered[min(len(ordered) - 1, int(q * len(ordered)))]
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {"calls": self.calls, "ok": self.ok, "timeouts": self.timeouts, "errors": self.errors,
+                "saturated": self.saturated, "fallbacks": dict(self.fallbacks),
+                "p50": round(self.percentile(0.5), 3), "p95": round(self.percentile(0.95), 3),
+                "max": round(max(self.latencies, default=0.0), 3)}
+
+
+class ToolExecutor:
+    """Runs tool calls on a bounded pool with per-tool timeouts, limits, fallbacks and metrics"""
+
+    def __init__(self, kind: str = Config.TOOL_EXECUTOR, max_workers: int = Config.TOOL_MAX_WORKERS,
+                 disk_cache: bool = True):
+        """
+        Args:
+            kind: "thread" or "process" workers
+            max_workers: Calls run at the same time across all tools
+            disk_cache: Keep good results in the ``tool_results`` disk cache for fallbacks
+        """
+        if kind not in ("thread", "process"):
+            raise ValueError(f"Unknown TOOL_EXECUTOR '{kind}'. Expected 'thread' or 'process'")
+        self.kind = kind
+        self._pool = _ProcessPool(max_workers) if kind == "process" else _DaemonThreadPool(max_workers)
+        self._tools: Dict[str, ToolSpec] = {}
+        self._slots: Dict[str, threading.BoundedSemaphore] = {}
+        self._stats: Dict[str, ToolStats] = {}
+        self._memory: "OrderedDict[str, Any]" = OrderedDict()
+        self._disk = DiskCache("tool_results") if disk_cache else None
+        self._timeouts = parse_timeouts(Config.TOOL_TIMEOUTS)
+        self._lock = threading.Lock()
+
+    def register(self, name: str, fn: Callable[..., Any], timeout: Optional[float] = None,
+                 concurrency: Optional[int] = None, default: Optional[Callable[..., Any]] = None) -> None:
+        """
+        Register a tool (registering a name again replaces it).
+
+        Args:
+            name: Tool name
+            fn: The function doing the tool's I/O
+            timeout: Seconds a caller waits (default: TOOL_TIMEOUTS entry, else TOOL_TIMEOUT)
+            concurrency: Calls in flight at most (default: TOOL_CONCURRENCY)
+            default: Cheap local function called with the same arguments when no cached result exists
+        """
+        timeout = timeout if timeout is not None else self._timeouts.get(name, Config.TOOL_TIMEOUT)
+        concurrency = max(1, concurrency or Config.TOOL_CONCURRENCY)
+        with self._lock:
+            self._tools[name] = ToolSpec(name, fn, timeout, concurrency, default)
+            self._slots[name] = threading.BoundedSemaphore(concurrency)
+            self._stats.setdefault(name, ToolStats())
+
+    # --- calls ------------------------------------------------------------
+
+    def call(self, name: str, *args, **kwargs) -> Any:
+        """
+        Run one tool call; never waits longer than the tool's timeout.
+
+        Args:
+            name: Registered tool name
+            *args, **kwargs: The tool's arguments
+
+        Returns:
+            Any: The tool's result, or its fallback
+        """
+        return self._finish(self._start(name, args, kwargs))
+
+    def call_many(self, calls: Sequence[Tuple[str, Dict[str, Any]]]) -> List[Any]:
+        """
+        Run tool calls concurrently.
+
+        Args:
+            calls: (tool name, keyword arguments) pairs
+
+        Returns:
+            List[Any]: Results (or fallbacks) in the order of ``calls``
+        """
+        pending = [self._start(name, (), kwargs) for name, kwargs in calls]
+        return [self._finish(call) for call in pending]
+
+    def _start(self, name: str, args: tuple, kwargs: Dict[str, Any]) -> Dict[str, Any]:
+        spec = self._tools.get(name)
+        if spec is None:
+            raise KeyError(f"Unknown tool '{name}'. Registered: {sorted(self._tools)}")
+        timeout = spec.timeout
+        deadline = current_deadline()
+        if deadline is not None:
+            timeout = min(timeout, deadline.remaining())
+        started = time.monotonic()
+        call = {"spec": spec, "args": args, "kwargs": kwargs, "started": started, "ends_at": started + timeout,
+                "key": DiskCache.make_key([name, list(args), kwargs]), "future": None}
+        if timeout <= 0:
+            return call
+        slots = self._slots[name]
+        # Only a free slot lets the call start: a hung tool holds its own slots, not the pool's
+        if slots.acquire(blocking=False) or slots.acquire(timeout=timeout):
+            future = self._pool.submit(spec.fn, *args, **kwargs)
+            future.add_done_callback(lambda f: self._done(slots, call["key"], f))
+            call["future"] = future
+        return call
+
+    def _finish(self, call: Dict[str, Any]) -> Any:
+        spec, future = call["spec"], call["future"]
+        stats = self._stats[spec.name]
+        if future is None and call["ends_at"] <= call["started"]:
+            outcome, reason = "timeouts", "run deadline reached"
+        elif future is None:
+            outcome, reason = "saturated", f"all {spec.concurrency} slots busy"
+        else:
+            try:
+                result = future.result(timeout=max(0.0, call["ends_at"] - time.monotonic()))
+            except (FutureTimeout, CancelledError):
+                future.cancel()
+                outcome, reason = "timeouts", f"no answer within {call['ends_at'] - call['started']:.1f}s"
+            except Exception as e:
+                outcome, reason = "errors", f"{type(e).__name__}: {e}"
+            else:
+                with self._lock:
+                    stats.calls += 1
+                    stats.ok += 1
+                    stats.latencies.append(time.monotonic() - call["started"])
+                return result
+        with self._lock:
+            stats.calls += 1
+            setattr(stats, outcome, getattr(stats, outcome) + 1)
+            stats.latencies.append(time.monotonic() - call["started"])
+        if Config.VERBOSE:
+            print(f"🔧 Tool {spec.name}: {reason}; using fallback")
+        return self._fallback(spec, call, reason)
+
+    def _done(self, slots: threading.BoundedSemaphore, key: str, future: Future) -> None:
+        """Runs when a call really ends (possibly after its caller gave up): free its slot, cache its result"""
+        slots.release()
+        if future.cancelled() or future.exception() is not None:
+            return
+        self._remember(key, future.result())
+
+    # --- fallbacks --------------------------------------------------------
+
+    def _remember(self, key: str, result: Any) -> None:
+        with self._lock:
+            self._memory[key] = result
+            self._memory.move_to_end(key)
+            while len(self._memory) > MEMORY_CACHE_SIZE:
+                self._memory.popitem(last=False)
+        if self._disk is not None and isinstance(result, (str, int, float, list, dict)):
+            self._disk.set(key, result, ttl=Config.TOOL_CACHE_TTL_HOURS * 3600)
+
+    def _cached(self, key: str) -> Any:
+        with self._lock:
+            if key in self._memory:
+                return self._memory[key]
+        return self._disk.get(key) if self._disk is not None else None
+
+    def _fallback(self, spec: ToolSpec, call: Dict[str, Any], reason: str) -> Any:
+        stats = self._stats[spec.name]
+        result, source = self._cached(call["key"]), "cache"
+        if result is None and spec.default is not None:
+            try:
+                result, source = spec.default(*call["args"], **call["kwargs"]), "default"
+            except Exception:
+                result = None
+        if result is None:
+            with self._lock:
+                stats.fallbacks["notice"] += 1
+            return (f"[{spec.name} returned no data ({reason}). Continue without it and state any "
+                    "assumptions you make instead of inventing specifics.]")
+        with self._lock:
+            stats.fallbacks[source] += 1
+        if isinstance(result, str):
+            label = "an earlier cached result" if source == "cache" else "generic default data"
+            return f"Note: the live {spec.name} lookup failed ({reason}); showing {label}.\n\n{result}"
+        return result
+
+    # --- metrics and lifecycle --------------------------------------------
+
+    def to_dict(self) -> Dict[str, Dict[str, Any]]:
+        with self._lock:
+            return {name: stats.to_dict() for name, stats in self._stats.items() if stats.calls}
+
+    def print_report(self) -> None:
+        """Print per-tool outcomes and latencies of this process"""
+        stats = self.to_dict()
+        if not stats:
+            return
+        print(f"\n🔧 Tool calls ({self.kind} pool):")
+        for name, entry in sorted(stats.items()):
+            fallbacks = sum(entry["fallbacks"].values())
+            problems = ", ".join(f"{entry[k]} {k}" for k in ("timeouts", "errors", "saturated") if entry[k])
+            print(f"   {name:<32} {entry['calls']:>4} calls, p50 {entry['p50'] * 1000:>6.0f}ms, "
+                  f"p95 {entry['p95'] * 1000:>6.0f}ms, max {entry['max'] * 1000:>6.0f}ms"
+                  + (f" | {problems}; fallbacks: " + ", ".join(f"{n} {source}" for source, n in
+                                                               entry["fallbacks"].items() if n)
+                     if fallbacks else ""))
+
+    def shutdown(self) -> None:
+        """Cancel queued calls (the process pool also stops its running ones)"""
+        self._pool.shutdown()
+
+
+_executor: Optional[ToolExecutor] = None
+_executor_lock = threading.Lock()
+
+
+def get_tool_executor() -> ToolExecutor:
+    """Process-wide tool executor"""
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            _executor = ToolExecutor()
+        return _executor
@@ -0,0 +1,345 @@
+"""
+Declarative Workflow Definitions for AutoGen and CrewAI Lab Demo
+
+Agents, prompts and tasks are described in a workflow file (JSON, or YAML when
+PyYAML is installed) instead of Python code. A file is compiled once per
+process into a validated, immutable ``CompiledWorkflow``:
+
+- Every string is parsed into a ``Template``: its static segments and input
+  fields are split up front, so rendering a prompt for a request is a single
+  join with no format-string parsing. Strings without fields render to
+  themselves at no cost.
+- Template fields, agent references of tasks and tool names are checked at
+  compile time, so a broken workflow fails on load rather than mid-run.
+- ``dependencies`` maps each task to the inputs its output depends on, through
+  its templates and its context, so a caller can tell which tasks a changed
+  input invalidates (``affected_tasks``).
+- ``load_workflow`` caches the compiled graph per (path, mtime): editing the
+  file recompiles it, every other call is a dictionary lookup.
+
+Framework code turns the rendered specs into agents and tasks; keys a
+framework does not know (e.g. ``llm_role``) are reserved for it to interpret.
+
+Workflow file layout:
+    {
+      "name": "travel_planning",
+      "inputs": {"destination": "Iceland", "trip_dates": null},
+      "lookups": {"hotel_location": {"from": "destination", "values": {"iceland": "Reykjavik"}}},
+      "agents": {"flight": {"role": "Flight Specialist", "goal": "... {destination} ...",
+                            "tools": ["search_flight_prices"], "llm_role": "flight"}},
+      "tasks": [{"key": "flight", "agent": "flight", "description": "..."}],
+      "settings": {"process": "sequential"}
+    }
+
+    ``inputs`` maps each input to its default (null = required), ``lookups``
+    derive inputs from other inputs (unmatched values pass through). A task's
+    ``context`` lists the earlier tasks whose outputs it reads (default: all).
+
+Usage:
+    from shared_workflow import load_workflow
+
+    workflow = load_workflow("crewai/workflows/travel_planning.json", tools={"search_flight_prices"})
+    values = workflow.values({"destination": "Japan", "trip_dates": "April 1-10"})
+    for agent in workflow.agents:
+        fields = agent.render(values)
+"""
+
+import hashlib
+import json
+import string
+from dataclasses import dataclass
+from functools import lru_cache
+from pathlib import Path
+from typing import Any, Dict, FrozenSet, Iterable, Mapping, Optional, Tuple, Union
+
+# Keys whose values are structure, not prompt text
+RESERVED_KEYS = frozenset({"key", "agent", "tools", "context", "llm_role"})
+
+_FORMATTER = string.Formatter()
+
+
+class WorkflowError(ValueError):
+    """A workflow file that cannot be compiled or instantiated"""
+
+
+@dataclass(frozen=True)
+class Template:
+    """A prompt string pre-split into static segments and input fields"""
+
+    source: str
+    parts: Tuple[Tuple[str, Optional[str], str], ...]  # (literal, field, format_spec)
+    fields: FrozenSet[str]
+
+    @classmethod
+    def compile(cls, source: str, where: str = "") -> "Template":
+        """
+        Parse a ``str.format`` template once.
+
+        Args:
+            source: Template text; ``{name}`` fields, ``{{``/``}}`` for literal braces
+            where: Location used in error messages
+
+        Returns:
+            Template: The compiled template
+        """
+        try:
+            parsed = list(_FORMATTER.parse(source))
+        except ValueError as e:
+            raise WorkflowError(f"{where}: invalid template ({e})") from e
+        parts = []
+        for literal, field, spec, conversion in parsed:
+            if field is not None and (not field.isidentifier() or conversion):
+                raise WorkflowError(f"{where}: unsupported field '{{{field}}}' (use plain names)")
+            if parts and parts[-1][1] is None:
+                # Merge adjacent literals (escaped braces split them)
+                literal = parts.pop()[0] + literal
+            parts.append((literal, field, spec or ""))
+        return cls(source, tuple(parts), frozenset(p[1] for p in parts if p[1] is not None))
+
+    @property
+    def static(self) -> bool:
+        return not self.fields
+
+    def render(self, values: Mapping[str, Any]) -> str:
+        """Fill in the fields from ``values``"""
+        if not self.fields:
+            return self.parts[0][0] if self.parts else ""
+        return "".join(literal + (format(values[field], spec) if field is not None else "")
+                       for literal, field, spec in self.parts)
+
+
+def _compile_value(value: Any, where: str) -> Any:
+    """Compile strings (recursively) into templates; other values stay as they are"""
+    if isinstance(value, str):
+        return Template.compile(value, where)
+    if isinstance(value, list):
+        return tuple(_compile_value(v, f"{where}[{i}]") for i, v in enumerate(value))
+    if isinstance(value, dict):
+        return {k: (v if k in RESERVED_KEYS else _compile_value(v, f"{where}.{k}")) for k, v in value.items()}
+    return value
+
+
+def _render_value(value: Any, values: Mapping[str, Any]) -> Any:
+    if isinstance(value, Template):
+        return value.render(values)
+    if isinstance(value, tuple):
+        return [_render_value(v, values) for v in value]
+    if isinstance(value, dict):
+        return {k: _render_value(v, values) for k, v in value.items()}
+    return value
+
+
+def _template_fields(value: Any) -> Iterable[str]:
+    if isinstance(value, Template):
+        yield from value.fields
+    elif isinstance(value, tuple):
+        for v in value:
+            yield from _template_fields(v)
+    elif isinstance(value, dict):
+        for v in value.values():
+            yield from _template_fields(v)
+
+
+@dataclass(frozen=True)
+class NodeSpec:
+    """A compiled agent or task: reserved structure plus templated fields"""
+
+    key: str
+    fields: Mapping[str, Any]
+
+    def get(self, name: str, default: Any = None) -> Any:
+        """Raw (uncompiled) value of a reserved key, or a compiled field"""
+        return self.fields.get(name, default)
+
+    def render(self, values: Mapping[str, Any]) -> Dict[str, Any]:
+        """All fields with templates filled in (reserved keys are returned unchanged)"""
+        return {k: _render_value(v, values) for k, v in self.fields.items()}
+
+
+@dataclass(frozen=True)
+class CompiledWorkflow:
+    """An immutable, validated agent/task graph"""
+
+    name: str
+    version: str
+    source: str
+    inputs: Mapping[str, Any]
+    lookups: Mapping[str, Tuple[str, Mapping[str, str]]]
+    agents: Tuple[NodeSpec, ...]
+    tasks: Tuple[NodeSpec, ...]
+    settings: Mapping[str, Any]
+
+    def agent(self, key: str) -> NodeSpec:
+        for spec in self.agents:
+            if spec.key == key:
+                return spec
+        raise WorkflowError(f"{self.source}: no agent '{key}'")
+
+    @property
+    def roles(self) -> Tuple[str, ...]:
+        """Output budget role of each agent, in agent order"""
+        return tuple(spec.get("llm_role", spec.key) for spec in self.agents)
+
+    def values(self, inputs: Optional[Mapping[str, Any]] = None) -> Dict[str, Any]:
+        """
+        Resolve the template values for one request.
+
+        Args:
+            inputs: Request inputs; missing ones take the workflow defaults
+
+        Returns:
+            Dict[str, Any]: Inputs plus derived lookup values
+        """
+        values = {**self.inputs, **(inputs or {})}
+        missing = [name for name in self.inputs if values.get(name) is None]
+        if missing:
+            raise WorkflowError(f"{self.source}: missing required inputs {missing}")
+        for name, (source, table) in self.lookups.items():
+            value = values.get(source, "")
+            values[name] = table.get(str(value).lower(), value)
+        return values
+
+    def context(self, key: str) -> Tuple[str, ...]:
+        """Tasks whose outputs a task reads: its ``context``, or every earlier task when it names none"""
+        keys = [spec.key for spec in self.tasks]
+        spec = self.tasks[keys.index(key)]
+        if "context" in spec.fields:
+            return tuple(spec.get("context") or ())
+        return tuple(keys[:keys.index(key)])
+
+    def dependencies(self) -> Dict[str, FrozenSet[str]]:
+        """
+        The inputs each task's output depends on, by task key.
+
+        A task depends on the fields of its own and its agent's templates (lookups
+        count as the input they are derived from) and, through its context, on
+        everything its upstream tasks depend on.
+
+        Returns:
+            Dict[str, FrozenSet[str]]: Input names per task, in task order
+        """
+        derived = {name: source for name, (source, _) in self.lookups.items()}
+        dependencies: Dict[str, FrozenSet[str]] = {}
+        for spec in self.tasks:
+            fields = set(_template_fields(spec.fields)) | set(_template_fields(self.agent(spec.get("agent")).fields))
+            inputs = {derived.get(name, name) for name in fields}
+            for upstream in self.context(spec.key):
+                inputs |= dependencies[upstream]
+            dependencies[spec.key] = frozenset(inputs)
+        return dependencies
+
+    def affected_tasks(self, changed: Iterable[str]) -> Tuple[str, ...]:
+        """Tasks whose outputs are stale after the ``changed`` inputs took new values, in task order"""
+        changed = set(changed)
+        return tuple(key for key, inputs in self.dependencies().items() if inputs & changed)
+
+    def setting(self, name: str, values: Optional[Mapping[str, Any]] = None, default: Any = None) -> Any:
+        """A workflow setting, rendered with ``values`` when given"""
+        if name not in self.settings:
+            return default
+        return _render_value(self.settings[name], values or {})
+
+
+def compile_workflow(definition: Mapping[str, Any], source: str = "<workflow>",
+                     tools: Optional[Iterable[str]] = None) -> CompiledWorkflow:
+    """
+    Validate a workflow definition and compile its templates.
+
+    Args:
+        definition: Parsed workflow file
+        source: Name used in error messages
+        tools: Tool names the framework provides (None skips the tool check)
+
+    Returns:
+        CompiledWorkflow: The compiled graph
+    """
+    inputs = dict(definition.get("inputs") or {})
+    lookups = {}
+    for name, spec in (definition.get("lookups") or {}).items():
+        if spec.get("from") not in inputs:
+            raise WorkflowError(f"{source}: lookup '{name}' reads unknown input '{spec.get('from')}'")
+        lookups[name] = (spec["from"], {str(k).lower(): v for k, v in (spec.get("values") or {}).items()})
+    known_fields = set(inputs) | set(lookups)
+
+    agent_defs = definition.get("agents") or {}
+    if not agent_defs:
+        raise WorkflowError(f"{source}: no agents defined")
+    agents = tuple(NodeSpec(key, {"key": key, **_compile_value(dict(spec), f"agents.{key}")})
+                   for key, spec in agent_defs.items())
+
+    tasks = []
+    for i, spec in enumerate(definition.get("tasks") or []):
+        key = spec.get("key") or f"task_{i + 1}"
+        if spec.get("agent") not in agent_defs:
+            raise WorkflowError(f"{source}: task '{key}' references unknown agent '{spec.get('agent')}'")
+        earlier = {t.key for t in tasks}
+        if key in earlier:
+            raise WorkflowError(f"{source}: duplicate task key '{key}'")
+        unknown_context = [c for c in spec.get("context") or [] if c not in earlier]
+        if unknown_context:
+            raise WorkflowError(f"{source}: task '{key}' context {unknown_context} is not an earlier task")
+        tasks.append(NodeSpec(key, {**_compile_value(dict(spec), f"tasks.{key}"), "key": key}))
+
+    settings = _compile_value(dict(definition.get("settings") or {}), "settings")
+
+    for node in agents + tuple(tasks) + (NodeSpec("settings", settings),):
+        unknown = set(_template_fields(node.fields)) - known_fields
+        if unknown:
+            raise WorkflowError(f"{source}: '{node.key}' uses undeclared inputs {sorted(unknown)}")
+
+    if tools is not None:
+        available = set(tools)
+        for spec in agents:
+            missing = [t for t in spec.get("tools") or [] if t not in available]
+            if missing:
+                raise WorkflowError(f"{source}: agent '{spec.key}' uses unknown tools {missing}")
+
+    digest = hashlib.sha256(json.dumps(definition, sort_keys=True, default=str).encode()).hexdigest()[:12]
+    return CompiledWorkflow(
+        name=definition.get("name") or Path(source).stem,
+        version=digest,
+        source=source,
+        inputs=inputs,
+        lookups=lookups,
+        agents=agents,
+        tasks=tuple(tasks),
+        settings=settings,
+    )
+
+
+def _parse(path: Path) -> Dict[str, Any]:
+    text = path.read_text()
+    if path.suffix in (".yaml", ".yml"):
+        try:
+            import yaml
+        except ImportError:
+            raise WorkflowError(f"{path}: YAML workflows need PyYAML (pip install pyyaml), or use JSON")
+        return yaml.safe_load(text)
+    try:
+        return json.loads(text)
+    except json.JSONDecodeError as e:
+        raise WorkflowError(f"{path}: {e}") from e
+
+
+@lru_cache(maxsize=32)
+def _load(path: str, mtime_ns: int, tools: Optional[FrozenSet[str]]) -> CompiledWorkflow:
+    return compile_workflow(_parse(Path(path)), source=path, tools=tools)
+
+
+def load_workflow(path: Union[str, Path], tools: Optional[Iterable[str]] = None) -> CompiledWorkflow:
+    """
+    Load and compile a workflow file, reusing the compiled graph until the file changes.
+
+    Args:
+        path: Workflow file (.json, or .yaml/.yml with PyYAML)
+        tools: Tool names the framework provides (None skips the tool check)
+
+    Returns:
+        CompiledWorkflow: The compiled graph
+    """
+    path = Path(path).resolve()
+    try:
+        mtime_ns = path.stat().st_mtime_ns
+    except OSError as e:
+        raise WorkflowError(f"Workflow file not found: {path}") from e
+    return _load(str(path), mtime_ns, frozenset(tools) if tools is not None else None)
@@ -0,0 +1,25 @@
+"""
+Shared setup for the unit tests
+
+The modules under test import each other the way the demos do: ``shared_*``
+from the project root, ``validation`` from ``crewai/`` and ``message_store``
+from ``autogen/``. ``Config`` is resolved at import, so the cache directory is
+pointed at a temporary directory before anything imports it.
+
+Usage:
+    python -m pytest -q
+"""
+
+import os
+import sys
+import tempfile
+from pathlib import Path
+
+ROOT = Path(__file__).parent.parent
+
+os.environ["CACHE_DIR"] = tempfile.mkdtemp(prefix="multi-agent-tests-")
+os.environ.setdefault("VERBOSE", "False")
+
+for directory in (ROOT, ROOT / "crewai", ROOT / "autogen"):
+    if str(directory) not in sys.path:
+        sys.path.insert(0, str(directory))
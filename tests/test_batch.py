@@ -0,0 +1,14 @@
+"""Tests for the batch backend interface (shared_batch.py)"""
+
+import pytest
+
+from shared_batch import BatchBackend
+
+
+def test_incomplete_backend_fails_at_instantiation():
+    class UploadOnly(BatchBackend):
+        def upload(self, path):
+            return "file-1"
+
+    with pytest.raises(TypeError, match="retrieve"):
+        UploadOnly()
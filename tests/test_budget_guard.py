@@ -0,0 +1,68 @@
+"""Tests for the run budget guard and usage ledger (shared_tokens.py)"""
+
+import pytest
+
+from shared_tokens import BudgetExceeded, BudgetGuard, UsageLedger, estimate_cost
+
+BIG = "llama-3.3-70b-versatile"
+SMALL = "llama-3.1-8b-instant"
+
+
+def test_disabled_guard_allows_any_call():
+    guard = BudgetGuard(UsageLedger(), max_cost=0, max_tokens=0)
+    assert not guard.enabled
+    assert guard.check("ResearchAgent", BIG, 1_000_000, 100_000) == BIG
+
+
+def test_token_budget_counts_spent_and_projected_tokens():
+    ledger = UsageLedger()
+    guard = BudgetGuard(ledger, max_cost=0, max_tokens=1000, action="abort")
+    assert guard.check("ResearchAgent", BIG, 400, 500) == BIG
+
+    ledger.record_actual("ResearchAgent", BIG, prompt_tokens=400, completion_tokens=300)
+    assert guard.check("ResearchAgent", BIG, 100, 200) == BIG
+    with pytest.raises(BudgetExceeded, match="ResearchAgent"):
+        guard.check("ResearchAgent", BIG, 100, 201)
+
+
+def test_cost_budget_aborts():
+    guard = BudgetGuard(UsageLedger(), max_cost=0.001, max_tokens=0, action="abort", downgrade_model=SMALL)
+    assert estimate_cost(BIG, 10_000, 1000) > 0.001
+    with pytest.raises(BudgetExceeded):
+        guard.check("flight", BIG, 10_000, 1000)
+
+
+def test_downgrade_switches_to_the_cheaper_model_when_it_fits():
+    guard = BudgetGuard(UsageLedger(), max_cost=0.001, max_tokens=0, action="downgrade", downgrade_model=SMALL)
+    assert estimate_cost(SMALL, 10_000, 1000) < 0.001
+    assert guard.check("flight", BIG, 10_000, 1000) == SMALL
+    assert guard.check("flight", BIG, 100, 100) == BIG
+
+
+def test_downgrade_aborts_when_the_cheaper_model_does_not_fit_either():
+    guard = BudgetGuard(UsageLedger(), max_cost=0.0001, max_tokens=0, action="downgrade", downgrade_model=SMALL)
+    with pytest.raises(BudgetExceeded):
+        guard.check("flight", BIG, 10_000, 1000)
+
+
+def test_downgrade_without_a_model_aborts():
+    guard = BudgetGuard(UsageLedger(), max_cost=0, max_tokens=100, action="downgrade", downgrade_model="")
+    with pytest.raises(BudgetExceeded):
+        guard.check("flight", BIG, 80, 80)
+
+
+def test_unknown_action_is_rejected():
+    with pytest.raises(ValueError, match="BUDGET_ACTION"):
+        BudgetGuard(UsageLedger(), action="warn")
+
+
+def test_ledger_merge_and_round_trip():
+    worker = UsageLedger("worker")
+    worker.record_estimate("flight", BIG, 120)
+    worker.record_actual("flight", BIG, prompt_tokens=100, completion_tokens=50)
+
+    ledger = UsageLedger.from_dict(worker.to_dict())
+    ledger.merge(worker)
+    assert ledger.total_tokens == 300
+    assert ledger.total_cost == pytest.approx(2 * estimate_cost(BIG, 100, 50))
+    assert ledger.entries[("flight", BIG)]["calls"] == 2
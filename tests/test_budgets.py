@@ -0,0 +1,46 @@
+"""Tests for output budgets and their adaptive tuning (shared_budgets.py)"""
+
+import json
+import os
+
+from shared_budgets import OutputBudgetTuner, is_truncated
+
+
+def _write(path, tokens, mtime_ns):
+    path.write_text(json.dumps({"review": {"tokens": tokens, "truncated": [False] * len(tokens)}}))
+    os.utime(path, ns=(mtime_ns, mtime_ns))
+
+
+def test_recommendation_follows_observed_lengths():
+    tuner = OutputBudgetTuner(stats={})
+    assert tuner.recommend("review", 1000) == 1000
+    for tokens in (300, 320, 340, 360, 380):
+        tuner.observe("review", tokens, truncated=False)
+    assert tuner.recommend("review", 1000) == 512
+    assert tuner.recommend("review", 400) == 400
+
+    tuner.observe("review", 390, truncated=True)
+    assert tuner.recommend("review", 1000) == 1000
+
+
+def test_current_tuner_is_parsed_once_per_file_version(tmp_path):
+    path = tmp_path / "output_budgets.json"
+    _write(path, [300] * 5, 1_000_000_000)
+    first = OutputBudgetTuner.current(path)
+    assert OutputBudgetTuner.current(path) is first
+    assert first.recommend("review", 1000) == 384
+
+    _write(path, [700] * 5, 2_000_000_000)
+    second = OutputBudgetTuner.current(path)
+    assert second is not first
+    assert second.recommend("review", 2000) == 896
+
+
+def test_current_tuner_without_a_file_keeps_the_ceiling(tmp_path):
+    assert OutputBudgetTuner.current(tmp_path / "missing.json").recommend("review", 1000) == 1000
+
+
+def test_truncation_uses_the_finish_reason_when_known():
+    assert is_truncated("short", 800, finish_reason="length")
+    assert not is_truncated("word " * 2000, 800, finish_reason="stop")
+    assert not is_truncated("A finished answer.", 800)
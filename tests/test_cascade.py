@@ -0,0 +1,93 @@
+"""Tests for the model cascade, output scoring and cascade statistics (shared_cascade.py)"""
+
+import json
+import threading
+
+import pytest
+
+from shared_cascade import CascadeStats, ModelCascade, completeness_problems
+
+ANSWER = "Day 1: Golden Circle tour ($95). Day 2: Blue Lagoon ($75). Day 3: South Coast waterfalls and Vik."
+
+
+def test_complete_answer_has_no_problems():
+    assert completeness_problems(ANSWER) == []
+
+
+@pytest.mark.parametrize("text, finish_reason, fragment", [
+    ("Too short.", None, "only 10 characters"),
+    (ANSWER, "length", "cut off"),
+    ("I'm sorry, but I can't plan this trip. " + ANSWER, None, "declines"),
+    (ANSWER + " Hotel: [insert hotel name], price TBD.", None, "placeholders (TBD, [insert hotel name])"),
+])
+def test_incomplete_answers_are_reported(text, finish_reason, fragment):
+    problems = completeness_problems(text, finish_reason)
+    assert len(problems) == 1 and fragment in problems[0]
+
+
+def test_required_terms_accept_alternatives():
+    assert completeness_problems(ANSWER, required=["lagoon|spa", "vik"]) == []
+    assert completeness_problems(ANSWER, required=["budget|cost"]) == ["the answer does not cover: budget"]
+
+
+def test_cascade_escalates_until_the_strongest_model():
+    cascade = ModelCascade(["small", "medium", "large"])
+    assert cascade.model == "small"
+    assert cascade.escalate() and cascade.model == "medium"
+    assert cascade.escalate() and cascade.model == "large"
+    assert not cascade.escalate() and cascade.level == 2
+    cascade.reset()
+    assert cascade.model == "small"
+
+
+def test_cascade_needs_a_model():
+    with pytest.raises(ValueError):
+        ModelCascade([])
+
+
+def test_cascade_levels_are_per_thread():
+    cascade = ModelCascade(["small", "large"])
+    cascade.escalate()
+    seen = {}
+
+    def other_run():
+        seen["start"] = cascade.model
+        cascade.escalate()
+        cascade.escalate()
+        seen["end"] = cascade.model
+
+    thread = threading.Thread(target=other_run)
+    thread.start()
+    thread.join()
+    assert seen == {"start": "small", "end": "large"}
+    assert cascade.level == 1
+
+
+def test_begin_resets_the_level_for_a_new_owner_only():
+    cascade = ModelCascade(["small", "large"])
+    first, second = object(), object()
+    cascade.begin(first)
+    cascade.escalate()
+    cascade.begin(first)
+    assert cascade.model == "large"
+
+    # A repair chain cut short never resets; the next task still starts cheap
+    cascade.begin(second)
+    assert cascade.model == "small"
+
+
+def test_stats_record_rates_and_merge_with_stored_totals(tmp_path):
+    path = tmp_path / "cascade_stats.json"
+    path.write_text(json.dumps({"crewai/flight": {"outputs": 2, "escalations": 0, "escalated": 0, "failed": 0,
+                                                  "models": {"small": 2}}}))
+    stats = CascadeStats(path)
+    stats.record("crewai/flight", "small", 0)
+    stats.record("crewai/flight", "large", 1, passed=False)
+    assert stats.escalation_rate("crewai/flight") == 0.5
+    assert stats.escalation_rate("crewai/hotel") == 0.0
+
+    stats.save()
+    assert stats.to_dict() == {}
+    totals = json.loads(path.read_text())["crewai/flight"]
+    assert totals == {"outputs": 4, "escalations": 1, "escalated": 1, "failed": 1,
+                      "models": {"small": 3, "large": 1}}
@@ -0,0 +1,78 @@
+"""Tests for config snapshots and .env hot reload (shared_config.py)"""
+
+import pytest
+
+from shared_config import Config, ConfigSnapshot, ConfigStore
+
+VALID = "GROQ_API_KEY=gsk_test\nGROQ_MODEL=llama-3.3-70b-versatile\nAGENT_MAX_TOKENS=1500\n"
+
+
+@pytest.fixture
+def store(tmp_path):
+    env_path = tmp_path / ".env"
+    env_path.write_text(VALID)
+    return ConfigStore(env_path, process_env={})
+
+
+def test_snapshot_from_env_resolves_settings():
+    snapshot = ConfigSnapshot.from_env({"GROQ_API_KEY": "gsk_test", "AGENT_MAX_TOKENS": "1000",
+                                        "AGENT_MAX_TOKENS_REVIEW": "900", "MODEL_CASCADE": "a, b"})
+    assert snapshot.provider == "Groq"
+    assert snapshot.model_cascade == ("a", "b")
+    assert snapshot.get_max_tokens("review") == 900
+    assert snapshot.get_max_tokens("flight") == 800
+    assert snapshot.get_max_tokens("itinerary") == 1000
+
+
+def test_reload_publishes_a_new_version_on_change(store):
+    seen = []
+    store.subscribe(seen.append)
+    assert not store.reload()
+
+    store.env_path.write_text(VALID.replace("1500", "1200"))
+    assert store.reload()
+    assert store.current().version == 1 and store.current().agent_max_tokens == 1200
+    assert store.get(0).agent_max_tokens == 1500
+    assert seen == [store.current()]
+
+
+def test_reload_keeps_the_snapshot_when_a_value_is_invalid(store):
+    seen = []
+    store.subscribe(seen.append)
+    before = store.current()
+
+    store.env_path.write_text(VALID.replace("1500", "lots"))
+    assert not store.reload()
+    assert store.current() is before
+    assert store.get(1) is None and seen == []
+
+
+def test_reload_keeps_the_snapshot_when_the_api_key_is_missing(store):
+    before = store.current()
+    store.env_path.write_text("GROQ_MODEL=llama-3.1-8b-instant\n")
+    assert not store.reload()
+    assert store.current() is before
+
+
+def test_process_env_takes_precedence_over_the_file(tmp_path):
+    env_path = tmp_path / ".env"
+    env_path.write_text(VALID)
+    store = ConfigStore(env_path, process_env={"AGENT_MAX_TOKENS": "700"})
+    env_path.write_text(VALID.replace("1500", "1200"))
+    assert not store.reload()
+    assert store.current().agent_max_tokens == 700
+
+
+def test_history_drops_old_versions(store):
+    for i in range(ConfigStore.HISTORY + 1):
+        store.env_path.write_text(VALID.replace("1500", str(1000 + i)))
+        assert store.reload()
+    assert store.get(0) is None
+    assert store.get(store.current().version - ConfigStore.HISTORY + 1) is not None
+
+
+def test_config_role_helpers_follow_the_import_snapshot():
+    for role in ("review", "flight", "speaker_selection", "unknown"):
+        assert Config.get_max_tokens(role) == Config._env.get_max_tokens(role)
+        assert Config.drafts(role, default=True) == Config._env.drafts(role, default=True)
+        assert Config.runs_locally(role) == Config._env.runs_locally(role)
@@ -0,0 +1,75 @@
+"""Tests for run deadlines (shared_deadline.py) and the GroupChat deadline guard (autogen/deadline.py)"""
+
+import time
+from types import SimpleNamespace
+
+import pytest
+
+from shared_deadline import DeadlineExceeded, RunDeadline
+
+
+def test_short_deadline_starts_at_full_level():
+    deadline = RunDeadline(3, steps=4, step_estimate=20)
+    assert deadline.step_estimate == pytest.approx(0.75)
+    assert deadline.update() == 0
+    assert deadline.affordable_steps() >= 3
+
+
+def test_prior_is_kept_when_the_deadline_covers_it():
+    deadline = RunDeadline(100, steps=4, step_estimate=20)
+    assert deadline.step_estimate == 20
+    assert deadline.affordable_steps() == 4
+
+
+def test_slow_steps_degrade_the_level_and_scale_outputs():
+    deadline = RunDeadline(1.0, steps=4, step_estimate=0.1, fallback_model="small")
+    time.sleep(0.6)
+    deadline.end_step()
+    assert deadline.level_name == "wrap_up"
+    assert deadline.skip_optional
+    assert deadline.max_tokens(1000) == 300
+    assert deadline.model("large") == "small"
+    assert deadline.history and deadline.history[-1][1] == "wrap_up"
+
+
+def test_check_raises_once_expired():
+    deadline = RunDeadline(0.01, steps=1)
+    deadline.check()
+    time.sleep(0.02)
+    with pytest.raises(DeadlineExceeded):
+        deadline.check()
+
+
+@pytest.fixture
+def guard_for():
+    pytest.importorskip("autogen")
+    from deadline import DeadlineGuard
+
+    def build(deadline, max_round=10):
+        groupchat = SimpleNamespace(max_round=max_round, messages=[{"content": "kickoff"}], observers=[])
+        return DeadlineGuard(deadline, SimpleNamespace(groupchat=groupchat, _reply_func_list=[]))
+    return build
+
+
+def test_guard_lets_the_first_turn_start_under_a_tight_deadline(guard_for):
+    deadline = RunDeadline(0.5, steps=4, step_estimate=20)
+    deadline.level = 3  # wrap-up before anyone spoke
+    guard = guard_for(deadline)
+    guard.observe({"content": "kickoff"}, None)
+    assert guard.groupchat.max_round == 2
+
+
+def test_guard_ends_the_chat_after_a_turn_that_leaves_no_time(guard_for):
+    deadline = RunDeadline(0.2, steps=4, step_estimate=0.05)
+    guard = guard_for(deadline)
+    guard.observe({"content": "kickoff"}, None)
+    assert guard.groupchat.max_round > 2
+
+    time.sleep(0.15)
+    guard.groupchat.messages.append({"content": "research"})
+    guard.observe({"content": "research"}, None)
+    assert guard.groupchat.max_round == 2
+    assert guard.ended_early()
+
+    guard.close()
+    assert guard.groupchat.max_round == 10
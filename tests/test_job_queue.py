@@ -0,0 +1,93 @@
+"""Tests for job claiming, tenant caps and deadlines (shared_jobs.py)"""
+
+import time
+
+import pytest
+
+from shared_jobs import AdmissionRejected, JobQueue
+
+
+@pytest.fixture
+def queue(tmp_path):
+    queue = JobQueue(tmp_path / "jobs.sqlite3")
+    queue.tenant_caps = {"acme": 1}
+    return queue
+
+
+def test_tenant_at_its_cap_is_skipped(queue):
+    first = queue.submit("crewai", {"destination": "Japan"}, tenant="acme")
+    second = queue.submit("crewai", {"destination": "Peru"}, tenant="acme")
+    other = queue.submit("crewai", {"destination": "Iceland"}, tenant="globex")
+
+    assert queue.claim("crewai", "w1").id == first.id
+    assert queue.claim("crewai", "w2").id == other.id
+    assert queue.claim("crewai", "w3") is None
+
+    queue.complete(first.id, {"ok": True})
+    claimed = queue.claim("crewai", "w1")
+    assert claimed.id == second.id and claimed.payload == {"destination": "Peru"}
+    assert queue.get(first.id).status == "done" and queue.get(first.id).result == {"ok": True}
+
+
+def test_default_cap_applies_to_other_tenants(queue, monkeypatch):
+    monkeypatch.setattr("shared_jobs.Config.JOB_TENANT_CAP", 2)
+    jobs = [queue.submit("crewai", tenant="globex") for _ in range(3)]
+    assert [queue.claim("crewai", "w").id for _ in range(2)] == [jobs[0].id, jobs[1].id]
+    assert queue.claim("crewai", "w") is None
+
+
+def test_interactive_before_batch_then_earliest_deadline(queue):
+    batch = queue.submit("crewai", tenant="a", priority="batch")
+    late = queue.submit("crewai", tenant="b", priority="interactive", deadline=600)
+    soon = queue.submit("crewai", tenant="c", priority="interactive", deadline=60)
+
+    assert [queue.claim("crewai", "w").id for _ in range(3)] == [soon.id, late.id, batch.id]
+
+
+def test_reserved_worker_takes_only_interactive_jobs(queue):
+    queue.submit("crewai", priority="batch")
+    assert queue.claim("crewai", "reserved", interactive_only=True) is None
+    assert queue.claim("crewai", "w") is not None
+
+
+def test_queued_job_past_its_deadline_expires_without_running(queue):
+    job = queue.submit("crewai", deadline=0.01)
+    time.sleep(0.05)
+    assert queue.claim("crewai", "w") is None
+    expired = queue.get(job.id)
+    assert expired.status == "expired" and expired.started_at is None
+    assert "before start" in expired.error
+
+
+def test_running_job_past_its_deadline_is_overdue(queue):
+    job = queue.submit("crewai", deadline=0.05)
+    assert queue.claim("crewai", "w").id == job.id
+    time.sleep(0.1)
+    assert [j.id for j in queue.overdue(grace=0)] == [job.id]
+
+    queue.expire(job.id)
+    assert queue.get(job.id).status == "expired"
+    assert queue.overdue(grace=0) == []
+
+
+def test_requeued_jobs_are_claimed_again(queue):
+    job = queue.submit("crewai", tenant="acme")
+    queue.claim("crewai", "dead-worker")
+    assert queue.requeue_running("dead-worker") == 1
+    claimed = queue.claim("crewai", "w")
+    assert claimed.id == job.id and claimed.attempts == 2
+
+
+def test_full_queue_rejects_and_records_the_submission(queue, monkeypatch):
+    monkeypatch.setattr("shared_jobs.Config.JOB_QUEUE_MAX_DEPTH", 1)
+    queue.submit("crewai")
+    with pytest.raises(AdmissionRejected, match="queue full"):
+        queue.submit("crewai")
+    assert queue.stats()["batch"]["counts"] == {"queued": 1, "rejected": 1}
+
+
+def test_unknown_kind_and_priority_are_rejected(queue):
+    with pytest.raises(ValueError):
+        queue.submit("langchain")
+    with pytest.raises(ValueError):
+        queue.submit("crewai", priority="urgent")
@@ -0,0 +1,14 @@
+"""Tests for the local model interface (shared_local_llm.py)"""
+
+import pytest
+
+from shared_local_llm import LocalModel, MockLocalModel
+
+
+def test_model_without_complete_fails_at_instantiation():
+    class Unfinished(LocalModel):
+        name = "unfinished"
+
+    with pytest.raises(TypeError, match="complete"):
+        Unfinished()
+    assert isinstance(MockLocalModel(), LocalModel)
@@ -0,0 +1,119 @@
+"""Tests for compact GroupChat message storage (autogen/message_store.py)"""
+
+from collections import defaultdict
+from types import SimpleNamespace
+
+import pytest
+
+from message_store import MessageArena, MessageStore, compact_histories, message_previews, transcript
+
+MESSAGES = [
+    {"content": "Research HireVue and Pymetrics.", "role": "user", "name": "ProductManager"},
+    {"content": "HireVue “leads” on video interviews 🎥", "role": "user", "name": "Researcher"},
+    {"content": "Blueprint draft", "role": "assistant"},
+]
+
+
+def test_behaves_like_a_list_of_message_dicts():
+    store = MessageStore(MESSAGES)
+    assert len(store) == 3
+    assert list(store) == MESSAGES
+    assert store[-1] == MESSAGES[-1] and "name" not in store[-1]
+    assert store[1:] == MESSAGES[1:]
+    assert store.copy() == MESSAGES and isinstance(store.copy(), list)
+    assert store + [{"content": "x"}] == MESSAGES + [{"content": "x"}]
+    assert [{"content": "x"}] + store == [{"content": "x"}] + MESSAGES
+    with pytest.raises(IndexError):
+        store[3]
+
+
+def test_returned_dicts_are_copies():
+    store = MessageStore(MESSAGES)
+    message = store[0]
+    message["content"] = "edited"
+    assert store[0]["content"] == MESSAGES[0]["content"]
+
+    store[0] = message
+    assert store[0]["content"] == "edited"
+
+
+def test_insert_delete_and_clear():
+    store = MessageStore(MESSAGES)
+    store.insert(0, {"content": "system prompt", "role": "system"})
+    assert store[0]["role"] == "system" and len(store) == 4
+    del store[0]
+    assert list(store) == MESSAGES
+    store.insert(10, {"content": "appended"})
+    assert store[-1] == {"content": "appended"}
+
+    store.clear()
+    assert len(store) == 0 and list(store) == []
+    store.append(MESSAGES[0])
+    assert list(store) == MESSAGES[:1]
+
+
+def test_extra_keys_and_non_string_content_are_kept():
+    call = {"content": None, "role": "assistant", "name": "Researcher",
+            "tool_calls": [{"id": "1", "function": {"name": "search", "arguments": "{}"}}]}
+    store = MessageStore([call, {"content": [{"type": "text", "text": "hi"}], "role": "user"}])
+    assert store[0] == call
+    assert store[1]["content"] == [{"type": "text", "text": "hi"}]
+    assert store.content(0) is None
+
+
+def test_compact_accessors_do_not_build_dicts():
+    store = MessageStore(MESSAGES)
+    assert store.speaker(1) == "Researcher" and store.speaker(2) is None
+    assert store.content(1) == MESSAGES[1]["content"]
+    assert store.content_length(1) == len(MESSAGES[1]["content"])
+    assert store.preview(1, width=7) == "HireVue..."
+    assert store.preview(1, width=200) == MESSAGES[1]["content"]
+    assert list(store.turns())[0] == ("ProductManager", MESSAGES[0]["content"])
+
+
+def test_arena_stores_repeated_content_once():
+    arena = MessageArena()
+    groupchat = MessageStore(arena=arena)
+    histories = [MessageStore(arena=arena) for _ in range(4)]
+    for message in MESSAGES:
+        groupchat.append(message)
+        for history in histories:
+            history.append(dict(message, role="assistant"))
+
+    stored = sum(len(m["content"].encode("utf-8")) for m in MESSAGES)
+    assert arena.nbytes == stored
+    assert all(list(h) == [dict(m, role="assistant") for m in MESSAGES] for h in histories)
+
+
+def test_arena_reuse_checks_the_bytes():
+    arena = MessageArena()
+    first = arena.put("same length A")
+    second = arena.put("same length B")
+    assert first != second
+    assert arena.text(*first) == "same length A" and arena.text(*second) == "same length B"
+    assert arena.put("same length A") == first
+
+
+def test_cleared_store_keeps_content_shared_with_other_stores():
+    arena = MessageArena()
+    a, b = MessageStore(MESSAGES, arena=arena), MessageStore(MESSAGES, arena=arena)
+    a.clear()
+    assert list(b) == MESSAGES
+
+
+def test_compact_histories_moves_agent_histories_into_the_arena():
+    arena = MessageArena()
+    manager = SimpleNamespace(_oai_messages=defaultdict(list))
+    manager._oai_messages["Researcher"] = list(MESSAGES)
+    compact_histories([manager], arena)
+
+    assert isinstance(manager._oai_messages["Researcher"], MessageStore)
+    assert list(manager._oai_messages["Researcher"]) == MESSAGES
+    assert manager._oai_messages["Reviewer"].arena is arena
+
+
+def test_previews_and_transcript_accept_stores_and_lists():
+    store = MessageStore(MESSAGES)
+    assert list(message_previews(store, width=10)) == list(message_previews(MESSAGES, width=10))
+    assert list(transcript(store)) == list(transcript(MESSAGES))
+    assert list(transcript(store))[2] == ("Unknown", "Blueprint draft")
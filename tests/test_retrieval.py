@@ -0,0 +1,175 @@
+"""Tests for the local vector index and knowledge retriever (shared_retrieval.py)"""
+
+import numpy as np
+import pytest
+
+import shared_retrieval
+from shared_config import Config
+from shared_retrieval import HashingEmbedder, Retriever, VectorIndex, chunk_text, retrieval_notes
+
+
+def _unit_rows(n: int, dim: int = 32, seed: int = 0) -> np.ndarray:
+    rows = np.random.default_rng(seed).normal(size=(n, dim)).astype(np.float32)
+    return rows / np.linalg.norm(rows, axis=1, keepdims=True)
+
+
+def _meta(n: int):
+    return [{"text": f"chunk {i}", "source": f"doc{i % 3}.md"} for i in range(n)]
+
+
+class CountingEmbedder:
+    """HashingEmbedder that counts how many texts it embedded"""
+
+    def __init__(self):
+        self.texts = 0
+        self._embedder = HashingEmbedder()
+
+    def __call__(self, texts):
+        self.texts += len(texts)
+        return self._embedder.embed(texts)
+
+
+def test_hashing_embedder_rows_are_normalized():
+    rows = HashingEmbedder(dim=64).embed(["Reykjavik hotels", "flights to Tokyo", ""])
+    assert rows.shape == (3, 64) and rows.dtype == np.float32
+    assert np.allclose(np.linalg.norm(rows[:2], axis=1), 1.0)
+    assert not rows[2].any()
+
+
+def test_chunk_text_prefixes_headings_and_overlaps():
+    words = " ".join(f"w{i}" for i in range(250))
+    chunks = chunk_text(f"# Pricing\n{words}\n# Other\nshort section", "hirevue.md", max_words=100, overlap=20)
+    pricing = [c for c in chunks if c.text.startswith("Pricing: ")]
+    assert len(pricing) == 3
+    assert pricing[0].text.split()[-20:] == pricing[1].text.split()[1:21]
+    assert chunks[-1].text == "Other: short section"
+    assert {c.source for c in chunks} == {"hirevue.md"}
+
+
+def test_flat_index_returns_best_matches_first():
+    vectors = _unit_rows(50)
+    index = VectorIndex.build(vectors, _meta(50))
+    assert index.centroids is None
+
+    results = index.search(vectors[[7, 21]], k=3)
+    assert [r[0].text for r in results] == ["chunk 7", "chunk 21"]
+    for hits in results:
+        scores = [hit.score for hit in hits]
+        assert scores == sorted(scores, reverse=True)
+        assert scores[0] == pytest.approx(1.0, abs=1e-5)
+
+
+def test_search_caps_k_at_index_size():
+    index = VectorIndex.build(_unit_rows(3), _meta(3))
+    assert len(index.search(_unit_rows(1, seed=1), k=10)[0]) == 3
+
+
+def test_ivf_index_partitions_and_finds_exact_vectors(monkeypatch):
+    monkeypatch.setattr(VectorIndex, "IVF_THRESHOLD", 100)
+    vectors = _unit_rows(400)
+    index = VectorIndex.build(vectors, _meta(400))
+
+    assert index.centroids is not None and len(index.centroids) == 20
+    assert index.offsets[0] == 0 and index.offsets[-1] == 400
+    assert sorted(c["text"] for c in index.chunks) == sorted(c["text"] for c in _meta(400))
+    for i in (0, 123, 399):
+        best = index.search(vectors[i], k=1)[0][0]
+        assert best.text == f"chunk {i}"
+        assert best.score == pytest.approx(1.0, abs=1e-5)
+
+
+def test_saved_index_loads_memory_mapped(tmp_path):
+    vectors = _unit_rows(10)
+    VectorIndex.build(vectors, _meta(10)).save(tmp_path)
+    loaded = VectorIndex.load(tmp_path)
+    assert isinstance(loaded.vectors, np.memmap)
+    assert loaded.search(vectors[4], k=1)[0][0].text == "chunk 4"
+
+
+def test_flat_rebuild_replaces_a_saved_ivf_index(tmp_path, monkeypatch):
+    monkeypatch.setattr(VectorIndex, "IVF_THRESHOLD", 100)
+    VectorIndex.build(_unit_rows(400), _meta(400)).save(tmp_path)
+    assert (tmp_path / "centroids.npy").exists()
+
+    vectors = _unit_rows(20, seed=2)
+    VectorIndex.build(vectors, _meta(20)).save(tmp_path)
+    loaded = VectorIndex.load(tmp_path)
+    assert loaded.centroids is None and loaded.offsets is None
+    assert loaded.search(vectors[19], k=1)[0][0].text == "chunk 19"
+
+
+@pytest.fixture
+def knowledge(tmp_path):
+    directory = tmp_path / "knowledge"
+    directory.mkdir()
+    (directory / "iceland.md").write_text("# Iceland\nReykjavik hotels cost about $200 per night.")
+    (directory / "japan.md").write_text("# Japan\nThe JR Pass covers most Shinkansen trains.")
+    (directory / "README.md").write_text("Not indexed.")
+    return directory
+
+
+def test_retriever_reuses_index_while_documents_are_unchanged(knowledge, tmp_path):
+    embedder = CountingEmbedder()
+    index_dir = tmp_path / "index"
+    first = Retriever(knowledge, index_dir, embedder)
+    built = embedder.texts
+    assert built and {c["source"] for c in first.index.chunks} == {"iceland.md", "japan.md"}
+
+    Retriever(knowledge, index_dir, embedder)
+    assert embedder.texts == built
+
+    assert first.retrieve("Shinkansen JR Pass", k=1)[0].source == "japan.md"
+    assert "[iceland.md]" in first.context_for("Reykjavik hotels", k=1)
+
+
+def test_retriever_rebuilds_when_a_document_changes(knowledge, tmp_path):
+    embedder = CountingEmbedder()
+    index_dir = tmp_path / "index"
+    Retriever(knowledge, index_dir, embedder)
+    built = embedder.texts
+
+    (knowledge / "japan.md").write_text("# Japan\nKyoto temples and ryokan stays near Gion.")
+    retriever = Retriever(knowledge, index_dir, embedder)
+    assert embedder.texts > built
+    assert "Kyoto" in retriever.retrieve("ryokan in Gion", k=1)[0].text
+
+
+def test_retriever_rebuilds_when_documents_are_added_or_removed(knowledge, tmp_path):
+    index_dir = tmp_path / "index"
+    Retriever(knowledge, index_dir, CountingEmbedder())
+
+    (knowledge / "iceland.md").unlink()
+    retriever = Retriever(knowledge, index_dir, CountingEmbedder())
+    assert {c["source"] for c in retriever.index.chunks} == {"japan.md"}
+
+    (knowledge / "peru.md").write_text("# Peru\nMachu Picchu permits sell out months ahead.")
+    retriever = Retriever(knowledge, index_dir, CountingEmbedder())
+    assert {c["source"] for c in retriever.index.chunks} == {"japan.md", "peru.md"}
+
+
+def test_retriever_rebuilds_an_interrupted_build(knowledge, tmp_path):
+    embedder = CountingEmbedder()
+    index_dir = tmp_path / "index"
+    Retriever(knowledge, index_dir, embedder)
+    (index_dir / "documents.json").unlink()
+
+    built = embedder.texts
+    Retriever(knowledge, index_dir, embedder)
+    assert embedder.texts == 2 * built
+
+
+def test_empty_knowledge_directory_retrieves_nothing(tmp_path):
+    (tmp_path / "knowledge").mkdir()
+    retriever = Retriever(tmp_path / "knowledge", tmp_path / "index", CountingEmbedder())
+    assert retriever.retrieve("anything") == []
+    assert retriever.context_for("anything") == ""
+
+
+def test_retrieval_notes_follow_the_retrieval_switch(knowledge, tmp_path, monkeypatch):
+    monkeypatch.setattr(shared_retrieval, "_retriever", Retriever(knowledge, tmp_path / "index", CountingEmbedder()))
+    monkeypatch.setattr(Config, "RETRIEVAL_ENABLED", False)
+    assert retrieval_notes("Reykjavik hotels") == ""
+
+    monkeypatch.setattr(Config, "RETRIEVAL_ENABLED", True)
+    notes = retrieval_notes("Reykjavik hotels", k=1)
+    assert notes.startswith("\n\nReference notes (retrieved):") and "[iceland.md]" in notes
@@ -0,0 +1,65 @@
+"""Tests for the semantic response cache's cosmetic-difference check (shared_semantic_cache.py)"""
+
+from pathlib import Path
+
+import pytest
+
+from shared_semantic_cache import SemanticCache, cosmetic_difference, normalize
+from shared_workflow import load_workflow
+
+TRAVEL_WORKFLOW = Path(__file__).parent.parent / "crewai" / "workflows" / "travel_planning.json"
+SCOPE = "crewai/budget|llama-3.3-70b-versatile"
+
+
+def _task_prompt(key, **inputs):
+    workflow = load_workflow(TRAVEL_WORKFLOW)
+    task = next(spec for spec in workflow.tasks if spec.key == key)
+    return [{"role": "user", "content": task.render(workflow.values(inputs))["description"]}]
+
+
+@pytest.fixture
+def cache(tmp_path):
+    return SemanticCache(tmp_path / "semantic_cache.sqlite3", threshold=0.9)
+
+
+def test_reworded_text_and_nearby_numbers_are_cosmetic():
+    stored = "user: Plan a 7 day trip to Iceland starting 2025-06-15 for 2 travelers. Please list hotels."
+    query = "user: Plan a 7 day trip to Iceland starting 2025-06-16 for 2 travelers. Kindly list hotels."
+    assert cosmetic_difference(stored, query) is None
+
+
+@pytest.mark.parametrize("stored, query", [
+    ("user: Plan a trip to Iceland for a budget traveler.", "user: Plan a trip to Iceland for a luxury traveler."),
+    ("user: Plan a trip to Iceland with a mid-range hotel.", "user: Plan a trip to Iceland with a luxury hotel."),
+    ("user: Include guided tours in the Iceland plan.", "user: Do not include guided tours in the Iceland plan."),
+    ("user: Include guided tours in the Iceland plan.", "user: Don't include guided tours in the Iceland plan."),
+    ("user: Plan a trip to Iceland.", "user: Plan a trip to Japan."),
+    ("user: Plan a 5 day trip.", "user: Plan a 7 day trip."),
+])
+def test_meaningful_changes_are_not_cosmetic(stored, query):
+    assert cosmetic_difference(stored, query) is not None
+
+
+def test_budget_task_for_another_tier_is_a_miss(cache):
+    mid_range = _task_prompt("budget", budget_preference="mid-range")
+    luxury = _task_prompt("budget", budget_preference="luxury")
+    assert cosmetic_difference(normalize(mid_range), normalize(luxury)) is not None
+
+    cache.store(SCOPE, mid_range, "Mid-range plan: $4,200 total", "llama-3.3-70b-versatile")
+    assert cache.lookup(SCOPE, luxury) is None
+    assert cache.stats["rejected"] == 1
+    assert cache.lookup(SCOPE, mid_range).text == "Mid-range plan: $4,200 total"
+
+
+def test_flight_task_with_dates_shifted_by_a_day_is_a_hit(cache):
+    stored = _task_prompt("flight", trip_dates="January 15-20, 2026")
+    cache.store(SCOPE, stored, "Flights: $650", "llama-3.3-70b-versatile")
+    hit = cache.lookup(SCOPE, _task_prompt("flight", trip_dates="January 16-21, 2026"))
+    assert hit is not None and hit.text == "Flights: $650"
+    assert cache.lookup(SCOPE, _task_prompt("flight", trip_dates="March 15-20, 2026")) is None
+
+
+def test_scopes_do_not_share_entries(cache):
+    prompt = _task_prompt("budget")
+    cache.store(SCOPE, prompt, "plan", "llama-3.3-70b-versatile")
+    assert cache.lookup("crewai/hotel|llama-3.3-70b-versatile", prompt) is None
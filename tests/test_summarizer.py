@@ -0,0 +1,51 @@
+"""Tests for the extractive and incremental summary strategies (autogen/summarizer.py)"""
+
+import pytest
+
+pytest.importorskip("autogen")
+
+from summarizer import (ExtractiveSummarizer, IncrementalSummarizer, _PhaseSummarizer,  # noqa: E402
+                        create_summarizer)
+
+FIRST = """\
+- HireVue leads enterprise video interviewing with 700+ customers
+- Pymetrics uses neuroscience games for early-career hiring
+"""
+SECOND = "- Market gap: structured interviews for SMBs priced under $50 per seat, a 2025 opportunity worth $1.2B"
+
+
+class FailingClient:
+    def create(self, **kwargs):
+        raise RuntimeError("provider down")
+
+
+def test_phase_summarizer_requires_an_update_strategy():
+    with pytest.raises(TypeError):
+        _PhaseSummarizer()
+
+
+def test_extractive_summary_keeps_the_best_points_across_turns():
+    summarizer = ExtractiveSummarizer(points_per_section=2)
+    summarizer.observe({"name": "ResearchAgent", "content": FIRST}, None)
+    summarizer.observe({"name": "ResearchAgent", "content": SECOND}, None)
+    assert len(summarizer.sections["research"]) == 2
+    assert any("$1.2B" in point for point in summarizer.sections["research"])
+    assert summarizer.render().count("\n- ") == 2
+
+
+def test_failed_incremental_update_re_ranks_instead_of_dropping_the_turn():
+    with IncrementalSummarizer([{"model": "test-model", "api_key": "test"}], points_per_section=2) as summarizer:
+        summarizer.client = FailingClient()
+        summarizer.observe({"name": "ResearchAgent", "content": FIRST}, None)
+        summarizer.observe({"name": "ResearchAgent", "content": SECOND}, None)
+        summary = summarizer.summarize(None, None)
+    assert len(summarizer.sections["research"]) == 2
+    assert "$1.2B" in summary
+    assert summarizer._executor._shutdown
+
+
+def test_create_summarizer_by_method():
+    assert create_summarizer("reflection_with_llm", []) is None
+    assert isinstance(create_summarizer("extractive", []), ExtractiveSummarizer)
+    with pytest.raises(ValueError, match="SUMMARY_METHOD"):
+        create_summarizer("abstractive", [])
@@ -0,0 +1,44 @@
+"""Tests for AutoGen token accounting (autogen/usage.py)"""
+
+from types import SimpleNamespace
+
+import pytest
+
+pytest.importorskip("autogen")
+
+from usage import TokenAccountant  # noqa: E402
+
+MODEL = "llama-3.3-70b-versatile"
+
+
+def _client(prompt_tokens, completion_tokens, cost=0.01):
+    usage = {"prompt_tokens": prompt_tokens, "completion_tokens": completion_tokens, "cost": cost}
+    return SimpleNamespace(actual_usage_summary={"total_cost": cost, MODEL: usage})
+
+
+def test_sync_copies_only_new_usage():
+    accountant = TokenAccountant()
+    agent = SimpleNamespace(client=_client(100, 50))
+    accountant._clients.append(("ResearchAgent", agent))
+    accountant.sync()
+    accountant.sync()
+    assert accountant.ledger.total_tokens == 150
+
+    agent.client.actual_usage_summary[MODEL] = {"prompt_tokens": 300, "completion_tokens": 80, "cost": 0.03}
+    accountant.sync()
+    assert accountant.ledger.total_tokens == 380
+    assert accountant.ledger.total_cost == pytest.approx(0.03)
+
+
+def test_rebuilt_client_does_not_lose_the_old_clients_last_calls():
+    accountant = TokenAccountant()
+    agent = SimpleNamespace(client=_client(100, 50))
+    accountant._clients.append(("ResearchAgent", agent))
+    accountant.sync()
+
+    # A last call on the old client, then a degrade or downgrade rebuilds it
+    agent.client.actual_usage_summary[MODEL] = {"prompt_tokens": 250, "completion_tokens": 90, "cost": 0.02}
+    agent.client = _client(40, 10, cost=0.005)
+    accountant.sync()
+    assert accountant.ledger.total_tokens == 340 + 50
+    assert accountant.ledger.total_cost == pytest.approx(0.025)
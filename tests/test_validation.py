@@ -0,0 +1,136 @@
+"""Tests for the local task-output checks and the repair guardrail (crewai/validation.py)"""
+
+import threading
+from types import SimpleNamespace
+
+import pytest
+
+import shared_cascade
+from shared_cascade import CascadeStats, ModelCascade
+from validation import TaskValidator, check_days, check_mentions, check_options, check_totals
+
+FLIGHTS = """\
+1. **Icelandair FI 614** – nonstop, 6h – $650 round trip
+2. **PLAY OG 112** – 1 stop – $420 round trip
+3. **Delta DL 208** – nonstop – $780 round trip
+
+**Recommendation:** PLAY for price, Icelandair for comfort.
+"""
+
+ITINERARY = "Day 1: Golden Circle\nDay 2: Blue Lagoon\nDay 3: South Coast\n"
+
+
+def _output(text):
+    return SimpleNamespace(raw=text)
+
+
+def test_check_options_counts_priced_entries():
+    assert check_options(FLIGHTS, min=2, max=3) == ""
+    assert "list at least 4" in check_options(FLIGHTS, min=4)
+    assert "at most 2" in check_options(FLIGHTS, min=1, max=2)
+
+
+def test_check_days_reports_missing_days():
+    assert check_days(ITINERARY, count="3 days") == ""
+    assert "Day 4, Day 5" in check_days(ITINERARY, count=5)
+
+
+def test_check_mentions_accepts_alternatives():
+    text = "Lodging: $900\nMeals: $300"
+    assert check_mentions(text, ["lodging|hotel", "meals"]) == ""
+    assert check_mentions(text, ["transport|car"]).endswith("transport")
+
+
+def test_check_totals_compares_totals_with_itemized_amounts():
+    good = "Hotel: $600\nFood: $300\nTotal: $900\n"
+    assert check_totals(good) == ""
+    assert "items add up to $900" in check_totals(good.replace("$900", "$1,200"))
+
+
+def test_unknown_check_is_rejected():
+    with pytest.raises(ValueError, match="Unknown validation checks"):
+        TaskValidator("flight", [{"check": "vibes"}])
+
+
+def test_passing_output_is_accepted_without_repair():
+    validator = TaskValidator("itinerary", [{"check": "days", "count": 3}])
+    output = _output(ITINERARY)
+    assert validator.validate(output) == (True, output)
+    assert validator.last.passed and validator.last.repairs == 0
+
+
+def test_failing_output_gets_a_repair_prompt_listing_the_problems():
+    validator = TaskValidator("itinerary", [{"check": "days", "count": 5}], max_repairs=1)
+    accepted, feedback = validator.validate(_output(ITINERARY))
+    assert not accepted
+    assert "Day 4, Day 5" in feedback and feedback.startswith("Your answer does not yet meet")
+
+    repaired = _output(ITINERARY + "Day 4: Snaefellsnes\nDay 5: Reykjavik\n")
+    assert validator.validate(repaired) == (True, repaired)
+    assert validator.last.passed and validator.last.repairs == 1
+
+
+def test_output_still_failing_after_the_repairs_is_accepted_and_reported():
+    validator = TaskValidator("itinerary", [{"check": "days", "count": 5}], max_repairs=1)
+    output = _output(ITINERARY)
+    assert not validator.validate(output)[0]
+    assert validator.validate(output) == (True, output)
+    assert not validator.last.passed and validator.last.repairs == 1
+    assert validator.last.problems
+
+    # The next output starts a new repair chain
+    assert not validator.validate(output)[0]
+
+
+def test_repair_chains_are_tracked_per_thread():
+    validator = TaskValidator("itinerary", [{"check": "days", "count": 5}], max_repairs=1)
+    assert not validator.validate(_output(ITINERARY))[0]
+
+    other = {}
+
+    def run_copy():
+        other["first"] = validator.validate(_output(ITINERARY))[0]
+        other["last"] = validator.last
+
+    thread = threading.Thread(target=run_copy)
+    thread.start()
+    thread.join()
+    assert other == {"first": False, "last": None}
+    assert validator.validate(_output(ITINERARY))[0]
+    assert validator.last.repairs == 1
+
+
+@pytest.fixture
+def stats(tmp_path, monkeypatch):
+    stats = CascadeStats(tmp_path / "cascade_stats.json")
+    monkeypatch.setattr(shared_cascade, "_stats", stats)
+    return stats
+
+
+def test_cascade_escalates_before_repairing(stats):
+    cascade = ModelCascade(["small", "large"])
+    validator = TaskValidator("itinerary", [{"check": "days", "count": 5}], max_repairs=1, cascade=cascade)
+    assert validator.max_retries == 2
+    assert any(spec["check"] == "complete" for spec in validator.checks)
+
+    short = _output(ITINERARY)
+    accepted, feedback = validator.validate(short)
+    assert not accepted and cascade.model == "large"
+    assert "Day 4, Day 5" in feedback
+
+    # On the strongest model the remaining attempts are repairs
+    assert not validator.validate(short)[0]
+    assert validator.validate(short) == (True, short)
+    result = validator.last
+    assert (result.passed, result.model, result.escalations, result.repairs) == (False, "large", 1, 1)
+    assert cascade.model == "small"
+    assert stats.to_dict()["crewai/itinerary"]["failed"] == 1
+
+
+def test_cascade_output_passing_on_the_cheap_model_is_not_escalated(stats):
+    cascade = ModelCascade(["small", "large"])
+    validator = TaskValidator("itinerary", [{"check": "days", "count": 3}], cascade=cascade)
+    output = _output(ITINERARY + "Each day ends back in Reykjavik, with dinner near the harbour.")
+    assert validator.validate(output) == (True, output)
+    assert (validator.last.model, validator.last.escalations) == ("small", 0)
+    assert stats.to_dict()["crewai/itinerary"]["models"] == {"small": 1}